@@ -141,6 +141,14 @@ class Settings(BaseSettings):
     METRICS_ENABLED: bool = Field(default=True)
     HEALTH_CHECK_INTERVAL: int = Field(default=60)  # 60秒
 
+    # 操作日志缓冲写入（请求路径仅入队，后台批量写库）
+    OPLOG_BUFFER_ENABLED: bool = Field(default=True)
+    OPLOG_BUFFER_MAX_SIZE: int = Field(default=10000, ge=1, description="内存队列上限（条）")
+    OPLOG_BUFFER_BATCH_SIZE: int = Field(default=200, ge=1, description="单次 insert_many 最大条数")
+    OPLOG_BUFFER_FLUSH_INTERVAL_MS: int = Field(default=500, ge=10, description="刷写间隔（毫秒）")
+    OPLOG_BUFFER_OVERFLOW_POLICY: str = Field(default="drop_oldest", description="队列满时策略：drop_oldest/drop_newest/spill")
+    OPLOG_BUFFER_SPILL_FILE: str = Field(default="logs/operation_logs_spill.ndjson", description="spill 策略下的溢出文件")
+
 
     # 配置真相来源（方案A）：file|db|hybrid
     # - file：以文件/env 为准（推荐，生产缺省）
@@ -222,6 +222,10 @@ async def init_database_views_and_indexes():
         # 2. 创建必要的索引
         await create_database_indexes(db)
 
+        # 3. 后台为旧报告补建检索词（不阻塞启动）
+        from app.services.report_search_index import backfill_report_search_terms
+        asyncio.create_task(backfill_report_search_terms(db))
+
         logger.info("✅ 数据库视图和索引初始化完成")
 
     except Exception as e:
@@ -362,6 +366,10 @@ async def create_database_indexes(db):
         await market_quotes.create_index([("amount", -1)])
         await market_quotes.create_index([("updated_at", -1)])
 
+        # analysis_reports 的检索与游标分页索引
+        from app.services.report_search_index import ensure_report_search_indexes
+        await ensure_report_search_indexes(db)
+
         logger.info("✅ 数据库索引创建完成")
 
     except Exception as e:
@@ -39,27 +39,9 @@ from app.routers import websocket_notifications as websocket_notifications_route
 from app.routers import scheduler as scheduler_router
 from app.services.basics_sync_service import get_basics_sync_service
 from app.services.multi_source_basics_sync_service import MultiSourceBasicsSyncService
-from app.services.scheduler_service import set_scheduler_instance
-from app.worker.tushare_sync_service import (
-    run_tushare_basic_info_sync,
-    run_tushare_quotes_sync,
-    run_tushare_historical_sync,
-    run_tushare_financial_sync,
-    run_tushare_status_check
-)
-from app.worker.akshare_sync_service import (
-    run_akshare_basic_info_sync,
-    run_akshare_quotes_sync,
-    run_akshare_historical_sync,
-    run_akshare_financial_sync,
-    run_akshare_status_check
-)
-from app.worker.baostock_sync_service import (
-    run_baostock_basic_info_sync,
-    run_baostock_daily_quotes_sync,
-    run_baostock_historical_sync,
-    run_baostock_status_check
-)
+# 数据源同步服务（Tushare/AKShare/BaoStock 等）在导入时加载对应 SDK，
+# 定时任务通过 lazy_job 按引用注册，服务在首次使用时才导入
+from app.services.scheduler_service import set_scheduler_instance, lazy_job
 # 港股和美股改为按需获取+缓存模式，不再需要定时同步任务
 # from app.worker.hk_sync_service import ...
 # from app.worker.us_sync_service import ...
@@ -253,6 +235,14 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logging.getLogger("webapi").warning(f"Failed to apply dynamic settings: {e}")
 
+    # 启动操作日志缓冲写入（请求路径仅入队）
+    if settings.OPLOG_BUFFER_ENABLED:
+        try:
+            from app.services.operation_log_buffer import get_operation_log_buffer
+            await get_operation_log_buffer().start()
+        except Exception as e:
+            logger.warning(f"⚠️ 操作日志缓冲写入启动失败，将直接写库: {e}")
+
     # 显示配置摘要
     await _print_config_summary(logger)
 
@@ -336,7 +326,7 @@ async def lifespan(app: FastAPI):
 
         # 基础信息同步任务
         scheduler.add_job(
-            run_tushare_basic_info_sync,
+            lazy_job("app.worker.tushare_sync_service:run_tushare_basic_info_sync"),
             CronTrigger.from_crontab(settings.TUSHARE_BASIC_INFO_SYNC_CRON, timezone=settings.TIMEZONE),
             id="tushare_basic_info_sync",
             name="股票基础信息同步（Tushare）",
@@ -350,7 +340,7 @@ async def lifespan(app: FastAPI):
 
         # 实时行情同步任务
         scheduler.add_job(
-            run_tushare_quotes_sync,
+            lazy_job("app.worker.tushare_sync_service:run_tushare_quotes_sync"),
             CronTrigger.from_crontab(settings.TUSHARE_QUOTES_SYNC_CRON, timezone=settings.TIMEZONE),
             id="tushare_quotes_sync",
             name="实时行情同步（Tushare）"
@@ -363,7 +353,7 @@ async def lifespan(app: FastAPI):
 
         # 历史数据同步任务
         scheduler.add_job(
-            run_tushare_historical_sync,
+            lazy_job("app.worker.tushare_sync_service:run_tushare_historical_sync"),
             CronTrigger.from_crontab(settings.TUSHARE_HISTORICAL_SYNC_CRON, timezone=settings.TIMEZONE),
             id="tushare_historical_sync",
             name="历史数据同步（Tushare）",
@@ -377,7 +367,7 @@ async def lifespan(app: FastAPI):
 
         # 财务数据同步任务
         scheduler.add_job(
-            run_tushare_financial_sync,
+            lazy_job("app.worker.tushare_sync_service:run_tushare_financial_sync"),
             CronTrigger.from_crontab(settings.TUSHARE_FINANCIAL_SYNC_CRON, timezone=settings.TIMEZONE),
             id="tushare_financial_sync",
             name="财务数据同步（Tushare）"
@@ -390,7 +380,7 @@ async def lifespan(app: FastAPI):
 
         # 状态检查任务
         scheduler.add_job(
-            run_tushare_status_check,
+            lazy_job("app.worker.tushare_sync_service:run_tushare_status_check"),
             CronTrigger.from_crontab(settings.TUSHARE_STATUS_CHECK_CRON, timezone=settings.TIMEZONE),
             id="tushare_status_check",
             name="数据源状态检查（Tushare）"
@@ -406,7 +396,7 @@ async def lifespan(app: FastAPI):
 
         # 基础信息同步任务
         scheduler.add_job(
-            run_akshare_basic_info_sync,
+            lazy_job("app.worker.akshare_sync_service:run_akshare_basic_info_sync"),
             CronTrigger.from_crontab(settings.AKSHARE_BASIC_INFO_SYNC_CRON, timezone=settings.TIMEZONE),
             id="akshare_basic_info_sync",
             name="股票基础信息同步（AKShare）",
@@ -420,7 +410,7 @@ async def lifespan(app: FastAPI):
 
         # 实时行情同步任务
         scheduler.add_job(
-            run_akshare_quotes_sync,
+            lazy_job("app.worker.akshare_sync_service:run_akshare_quotes_sync"),
             CronTrigger.from_crontab(settings.AKSHARE_QUOTES_SYNC_CRON, timezone=settings.TIMEZONE),
             id="akshare_quotes_sync",
             name="实时行情同步（AKShare）"
@@ -433,7 +423,7 @@ async def lifespan(app: FastAPI):
 
         # 历史数据同步任务
         scheduler.add_job(
-            run_akshare_historical_sync,
+            lazy_job("app.worker.akshare_sync_service:run_akshare_historical_sync"),
             CronTrigger.from_crontab(settings.AKSHARE_HISTORICAL_SYNC_CRON, timezone=settings.TIMEZONE),
             id="akshare_historical_sync",
             name="历史数据同步（AKShare）",
@@ -447,7 +437,7 @@ async def lifespan(app: FastAPI):
 
         # 财务数据同步任务
         scheduler.add_job(
-            run_akshare_financial_sync,
+            lazy_job("app.worker.akshare_sync_service:run_akshare_financial_sync"),
             CronTrigger.from_crontab(settings.AKSHARE_FINANCIAL_SYNC_CRON, timezone=settings.TIMEZONE),
             id="akshare_financial_sync",
             name="财务数据同步（AKShare）"
@@ -460,7 +450,7 @@ async def lifespan(app: FastAPI):
 
         # 状态检查任务
         scheduler.add_job(
-            run_akshare_status_check,
+            lazy_job("app.worker.akshare_sync_service:run_akshare_status_check"),
             CronTrigger.from_crontab(settings.AKSHARE_STATUS_CHECK_CRON, timezone=settings.TIMEZONE),
             id="akshare_status_check",
             name="数据源状态检查（AKShare）"
@@ -476,7 +466,7 @@ async def lifespan(app: FastAPI):
 
         # 基础信息同步任务
         scheduler.add_job(
-            run_baostock_basic_info_sync,
+            lazy_job("app.worker.baostock_sync_service:run_baostock_basic_info_sync"),
             CronTrigger.from_crontab(settings.BAOSTOCK_BASIC_INFO_SYNC_CRON, timezone=settings.TIMEZONE),
             id="baostock_basic_info_sync",
             name="股票基础信息同步（BaoStock）"
@@ -489,7 +479,7 @@ async def lifespan(app: FastAPI):
 
         # 日K线同步任务（注意：BaoStock不支持实时行情）
         scheduler.add_job(
-            run_baostock_daily_quotes_sync,
+            lazy_job("app.worker.baostock_sync_service:run_baostock_daily_quotes_sync"),
             CronTrigger.from_crontab(settings.BAOSTOCK_DAILY_QUOTES_SYNC_CRON, timezone=settings.TIMEZONE),
             id="baostock_daily_quotes_sync",
             name="日K线数据同步（BaoStock）"
@@ -502,7 +492,7 @@ async def lifespan(app: FastAPI):
 
         # 历史数据同步任务
         scheduler.add_job(
-            run_baostock_historical_sync,
+            lazy_job("app.worker.baostock_sync_service:run_baostock_historical_sync"),
             CronTrigger.from_crontab(settings.BAOSTOCK_HISTORICAL_SYNC_CRON, timezone=settings.TIMEZONE),
             id="baostock_historical_sync",
             name="历史数据同步（BaoStock）"
@@ -515,7 +505,7 @@ async def lifespan(app: FastAPI):
 
         # 状态检查任务
         scheduler.add_job(
-            run_baostock_status_check,
+            lazy_job("app.worker.baostock_sync_service:run_baostock_status_check"),
             CronTrigger.from_crontab(settings.BAOSTOCK_STATUS_CHECK_CRON, timezone=settings.TIMEZONE),
             id="baostock_status_check",
             name="数据源状态检查（BaoStock）"
@@ -529,11 +519,10 @@ async def lifespan(app: FastAPI):
         # 新闻数据同步任务配置（使用AKShare同步所有股票新闻）
         logger.info("🔄 配置新闻数据同步任务...")
 
-        from app.worker.akshare_sync_service import get_akshare_sync_service
-
         async def run_news_sync():
             """运行新闻同步任务 - 使用AKShare同步自选股新闻"""
             try:
+                from app.worker.akshare_sync_service import get_akshare_sync_service
                 logger.info("📰 开始新闻数据同步（AKShare - 仅自选股）...")
                 service = await get_akshare_sync_service()
                 result = await service.sync_news_data(
@@ -589,6 +578,13 @@ async def lifespan(app: FastAPI):
             except Exception as e:
                 logger.warning(f"Scheduler shutdown error: {e}")
 
+        # 刷写剩余操作日志（需在关闭数据库之前）
+        try:
+            from app.services.operation_log_buffer import get_operation_log_buffer
+            await get_operation_log_buffer().stop()
+        except Exception as e:
+            logger.warning(f"Operation log buffer shutdown error: {e}")
+
         # 关闭 UserService MongoDB 连接
         try:
             from app.services.user_service import user_service
@@ -11,8 +11,6 @@ from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
 from pydantic import BaseModel, Field
 
 from app.core.database import get_mongo_db
-from app.worker.akshare_init_service import get_akshare_init_service
-from app.worker.akshare_sync_service import get_akshare_sync_service
 from app.routers.auth_db import get_current_user
 from app.utils.timezone import now_tz
 
@@ -20,6 +18,19 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/akshare-init", tags=["AKShare初始化"])
 
+
+async def get_akshare_init_service():
+    """获取AKShare初始化服务（首次使用时才导入，导入会加载 AKShare SDK）"""
+    from app.worker.akshare_init_service import get_akshare_init_service as _get_service
+    return await _get_service()
+
+
+async def get_akshare_sync_service():
+    """获取AKShare同步服务（首次使用时才导入）"""
+    from app.worker.akshare_sync_service import get_akshare_sync_service as _get_service
+    return await _get_service()
+
+
 # 全局任务状态存储
 _initialization_status = {
     "is_running": False,
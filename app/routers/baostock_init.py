@@ -10,13 +10,24 @@ from typing import Dict, Any, Optional
 from fastapi import APIRouter, BackgroundTasks, HTTPException
 from pydantic import BaseModel, Field
 
-from app.worker.baostock_init_service import BaoStockInitService
-from app.worker.baostock_sync_service import BaoStockSyncService
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/baostock-init", tags=["BaoStock初始化"])
 
+
+def _create_init_service():
+    """创建BaoStock初始化服务（首次使用时才导入，导入会加载 BaoStock SDK）"""
+    from app.worker.baostock_init_service import BaoStockInitService as _Service
+    return _Service()
+
+
+def _create_sync_service():
+    """创建BaoStock同步服务（首次使用时才导入）"""
+    from app.worker.baostock_sync_service import BaoStockSyncService as _Service
+    return _Service()
+
+
 # 全局状态管理
 _initialization_status = {
     "is_running": False,
@@ -45,7 +56,7 @@ class InitializationResponse(BaseModel):
 async def get_database_status():
     """获取数据库状态"""
     try:
-        service = BaoStockInitService()
+        service = _create_init_service()
         status = await service.check_database_status()
         
         return {
@@ -63,7 +74,7 @@ async def get_database_status():
 async def test_baostock_connection():
     """测试BaoStock连接"""
     try:
-        service = BaoStockSyncService()
+        service = _create_sync_service()
         connected = await service.provider.test_connection()
         
         return {
@@ -256,7 +267,7 @@ async def _run_full_initialization_task(historical_days: int, force: bool, task_
     try:
         logger.info(f"🚀 开始BaoStock完整初始化任务: {task_id}")
         
-        service = BaoStockInitService()
+        service = _create_init_service()
         stats = await service.full_initialization(
             historical_days=historical_days,
             force=force
@@ -289,7 +300,7 @@ async def _run_basic_initialization_task(task_id: str):
     try:
         logger.info(f"🚀 开始BaoStock基础初始化任务: {task_id}")
         
-        service = BaoStockInitService()
+        service = _create_init_service()
         stats = await service.basic_initialization()
         
         # 更新状态
@@ -316,7 +327,7 @@ async def _run_basic_initialization_task(task_id: str):
 async def get_service_status():
     """获取BaoStock服务状态"""
     try:
-        service = BaoStockSyncService()
+        service = _create_sync_service()
         status = await service.check_service_status()
         
         return {
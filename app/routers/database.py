@@ -24,6 +24,11 @@ class BackupRequest(BaseModel):
     name: str
     collections: List[str] = []  # 空列表表示备份所有集合
 
+class RestoreRequest(BaseModel):
+    """恢复请求"""
+    collections: List[str] = []  # 空列表表示恢复备份中的所有集合
+    overwrite: bool = False
+
 class ImportRequest(BaseModel):
     """导入请求"""
     collection: str
@@ -33,7 +38,7 @@ class ImportRequest(BaseModel):
 class ExportRequest(BaseModel):
     """导出请求"""
     collections: List[str] = []  # 空列表表示导出所有集合
-    format: str = "json"  # json, csv
+    format: str = "json"  # json, ndjson（gzip 压缩，适合大集合）, csv, xlsx
     sanitize: bool = False  # 是否脱敏（清空敏感字段，用于演示系统）
 
 # 响应模型
@@ -235,6 +240,53 @@ async def export_data(
             detail=f"导出数据失败: {str(e)}"
         )
 
+@router.post("/backups/{backup_id}/resume")
+async def resume_backup(
+    backup_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """从断点继续未完成的备份"""
+    try:
+        logger.info(f"⏩ 用户 {current_user['username']} 继续备份: {backup_id}")
+        backup_info = await database_service.resume_backup(backup_id)
+        return {
+            "success": True,
+            "message": "备份完成",
+            "data": backup_info
+        }
+    except Exception as e:
+        logger.error(f"继续备份失败: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"继续备份失败: {str(e)}"
+        )
+
+@router.post("/backups/{backup_id}/restore")
+async def restore_backup(
+    backup_id: str,
+    request: RestoreRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """从备份恢复数据"""
+    try:
+        logger.info(f"♻️ 用户 {current_user['username']} 从备份恢复: {backup_id}（覆盖模式: {request.overwrite}）")
+        result = await database_service.restore_backup(
+            backup_id,
+            collections=request.collections,
+            overwrite=request.overwrite
+        )
+        return {
+            "success": True,
+            "message": "数据恢复成功",
+            "data": result
+        }
+    except Exception as e:
+        logger.error(f"恢复备份失败: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"恢复备份失败: {str(e)}"
+        )
+
 @router.delete("/backups/{backup_id}")
 async def delete_backup(
     backup_id: str,
@@ -25,6 +25,8 @@ class LogReadRequest(BaseModel):
     keyword: Optional[str] = Field(default=None, description="关键词过滤")
     start_time: Optional[str] = Field(default=None, description="开始时间（ISO格式）")
     end_time: Optional[str] = Field(default=None, description="结束时间（ISO格式）")
+    before: Optional[int] = Field(default=None, ge=0, description="读取该字节偏移之前的内容（上一页）")
+    after: Optional[int] = Field(default=None, ge=0, description="读取该字节偏移之后的内容（下一页/新增）")
 
 
 class LogExportRequest(BaseModel):
@@ -52,6 +54,7 @@ class LogContentResponse(BaseModel):
     filename: str
     lines: List[str]
     stats: dict
+    cursor: Optional[dict] = None
 
 
 class LogStatisticsResponse(BaseModel):
@@ -61,6 +64,8 @@ class LogStatisticsResponse(BaseModel):
     error_files: int
     recent_errors: List[str]
     log_types: dict
+    level_counts: dict = {}
+    level_counts_approximate: bool = False
 
 
 @router.get("/files", response_model=List[LogFileInfo])
@@ -98,6 +103,7 @@ async def read_log_file(
     - level: 日志级别（ERROR, WARNING, INFO, DEBUG）
     - keyword: 关键词搜索
     - start_time/end_time: 时间范围
+    - before/after: 按字节偏移翻页（取自上次响应的 cursor）
     """
     try:
         logger.info(f"📖 用户 {current_user['username']} 读取日志文件: {request.filename}")
@@ -109,7 +115,9 @@ async def read_log_file(
             level=request.level,
             keyword=request.keyword,
             start_time=request.start_time,
-            end_time=request.end_time
+            end_time=request.end_time,
+            before=request.before,
+            after=request.after
         )
         
         return content
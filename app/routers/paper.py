@@ -2,8 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from pydantic import BaseModel, Field
 from typing import Literal, Optional, Dict, Any, List, Tuple
 from datetime import datetime
+import asyncio
 import logging
+import os
 import re
+import time
 
 from app.routers.auth_db import get_current_user
 from app.core.database import get_mongo_db
@@ -191,73 +194,158 @@ async def _get_available_quantity(user_id: str, code: str, market: str) -> int:
     return total_qty
 
 
-async def _get_last_price(code: str, market: str) -> Optional[float]:
+# 持仓估值用的价格快照：同一股票在有效期内跨请求复用（下单仍实时取价）
+_PRICE_SNAPSHOT_TTL = float(os.getenv("TA_PAPER_PRICE_TTL", "5"))
+_PRICE_SNAPSHOT_MAX = 20000
+_price_snapshot: Dict[Tuple[str, str], Tuple[float, float]] = {}
+# 港股/美股行情并发获取的上限
+_FOREIGN_QUOTE_CONCURRENCY = 8
+
+
+def _valid_price(value: Any) -> Optional[float]:
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        return None
+    return price if price > 0 else None
+
+
+def _snapshot_get(key: Tuple[str, str]) -> Optional[float]:
+    item = _price_snapshot.get(key)
+    if item is None:
+        return None
+    price, expires_at = item
+    if expires_at < time.monotonic():
+        _price_snapshot.pop(key, None)
+        return None
+    return price
+
+
+def _snapshot_put(prices: Dict[Tuple[str, str], Optional[float]]) -> None:
+    now = time.monotonic()
+    if len(_price_snapshot) + len(prices) > _PRICE_SNAPSHOT_MAX:
+        for key in [k for k, (_, exp) in _price_snapshot.items() if exp < now]:
+            _price_snapshot.pop(key, None)
+        if len(_price_snapshot) + len(prices) > _PRICE_SNAPSHOT_MAX:
+            _price_snapshot.clear()
+    expires_at = now + _PRICE_SNAPSHOT_TTL
+    for key, price in prices.items():
+        if price is not None:
+            _price_snapshot[key] = (price, expires_at)
+
+
+async def _find_cn_prices(db, collection: str, field: str, codes: List[str]) -> Dict[str, float]:
+    """一次 $in 查询取一批A股价格（code 或 symbol 匹配）"""
+    docs = await db[collection].find(
+        {"$or": [{"code": {"$in": codes}}, {"symbol": {"$in": codes}}]},
+        {"_id": 0, "code": 1, "symbol": 1, field: 1}
+    ).to_list(None)
+    wanted = set(codes)
+    prices: Dict[str, float] = {}
+    for doc in docs:
+        price = _valid_price(doc.get(field))
+        if price is None:
+            continue
+        for key in (doc.get("code"), doc.get("symbol")):
+            if key in wanted and key not in prices:
+                prices[key] = price
+    return prices
+
+
+async def _get_cn_prices(db, codes: List[str]) -> Dict[Tuple[str, str], Optional[float]]:
+    """A股：1. market_quotes 收盘价  2. 回退到 stock_basic_info 的 current_price"""
+    found = await _find_cn_prices(db, "market_quotes", "close", codes)
+    missing = [c for c in codes if c not in found]
+    if missing:
+        found.update(await _find_cn_prices(db, "stock_basic_info", "current_price", missing))
+    for code in codes:
+        if code not in found:
+            logger.error(f"❌ 无法从数据库获取A股价格: {code}")
+    return {("CN", code): found.get(code) for code in codes}
+
+
+async def _no_prices() -> Dict[Tuple[str, str], Optional[float]]:
+    return {}
+
+
+async def _get_foreign_prices(db, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[float]]:
+    """并发获取港股/美股价格（ForeignStockService 逐只查询，限制并发数）"""
+    from app.services.foreign_stock_service import ForeignStockService
+    service = ForeignStockService(db=db)
+    semaphore = asyncio.Semaphore(_FOREIGN_QUOTE_CONCURRENCY)
+
+    async def _one(market: str, code: str) -> Optional[float]:
+        async with semaphore:
+            try:
+                quote = await service.get_quote(market, code, force_refresh=False)
+            except Exception as e:
+                logger.error(f"❌ 获取{market}股价格失败 {code}: {e}")
+                return None
+        if not quote:
+            return None
+        # 尝试多个可能的价格字段
+        return _valid_price(quote.get("price") or quote.get("current_price") or quote.get("close"))
+
+    results = await asyncio.gather(*[_one(market, code) for market, code in keys])
+    return dict(zip(keys, results))
+
+
+async def _get_last_prices(
+    positions: List[Tuple[str, str]], use_snapshot: bool = True
+) -> Dict[Tuple[str, str], Optional[float]]:
     """
-    获取股票最新价格（支持多市场）
+    批量获取最新价格（支持多市场）
+
+    A股按 market_quotes -> stock_basic_info.current_price 的顺序，每个集合一次 $in 查询；
+    港股/美股通过 ForeignStockService 并发获取。use_snapshot 时先查跨请求共享的价格快照。
 
     Args:
-        code: 股票代码
-        market: 市场类型 (CN/HK/US)
+        positions: [(code, market)]
 
     Returns:
-        最新价格，如果获取失败返回 None
+        {(market, code): 最新价格}，获取失败的为 None
     """
     db = get_mongo_db()
+    prices: Dict[Tuple[str, str], Optional[float]] = {}
+    pending: Dict[str, List[str]] = {"CN": [], "HK": [], "US": []}
+    for code, market in positions:
+        key = (market, code)
+        if key in prices:
+            continue
+        cached = _snapshot_get(key) if use_snapshot else None
+        prices[key] = cached
+        if cached is None:
+            if market in pending:
+                pending[market].append(code)
+            else:
+                logger.error(f"❌ 无法获取股票价格: {code} (market={market})")
 
-    # A股：从数据库获取
-    if market == "CN":
-        # 1. 尝试从 market_quotes 获取
-        q = await db["market_quotes"].find_one(
-            {"$or": [{"code": code}, {"symbol": code}]},
-            {"_id": 0, "close": 1}
-        )
-        if q and q.get("close") is not None:
-            try:
-                price = float(q["close"])
-                if price > 0:
-                    logger.debug(f"✅ 从 market_quotes 获取价格: {code} = {price}")
-                    return price
-            except Exception as e:
-                logger.warning(f"⚠️ market_quotes 价格转换失败 {code}: {e}")
+    # A股与港股/美股同时获取
+    foreign = [(m, c) for m in ("HK", "US") for c in pending[m]]
+    parts = await asyncio.gather(
+        _get_cn_prices(db, pending["CN"]) if pending["CN"] else _no_prices(),
+        _get_foreign_prices(db, foreign) if foreign else _no_prices(),
+    )
+    fetched: Dict[Tuple[str, str], Optional[float]] = {**parts[0], **parts[1]}
+    prices.update(fetched)
+    if use_snapshot:
+        _snapshot_put(fetched)
+    return prices
 
-        # 2. 回退到 stock_basic_info 的 current_price
-        basic_info = await db["stock_basic_info"].find_one(
-            {"$or": [{"code": code}, {"symbol": code}]},
-            {"_id": 0, "current_price": 1}
-        )
-        if basic_info and basic_info.get("current_price") is not None:
-            try:
-                price = float(basic_info["current_price"])
-                if price > 0:
-                    logger.debug(f"✅ 从 stock_basic_info 获取价格: {code} = {price}")
-                    return price
-            except Exception as e:
-                logger.warning(f"⚠️ stock_basic_info 价格转换失败 {code}: {e}")
 
-        logger.error(f"❌ 无法从数据库获取A股价格: {code}")
-        return None
+async def _get_last_price(code: str, market: str) -> Optional[float]:
+    """
+    获取股票最新价格（支持多市场，不使用价格快照，供下单使用）
 
-    # 港股/美股：使用 ForeignStockService
-    elif market in ['HK', 'US']:
-        try:
-            from app.services.foreign_stock_service import ForeignStockService
-            db = get_mongo_db()
-            service = ForeignStockService(db=db)
-
-            quote = await service.get_quote(market, code, force_refresh=False)
-
-            if quote:
-                # 尝试多个可能的价格字段
-                price = quote.get("price") or quote.get("current_price") or quote.get("close")
-                if price and float(price) > 0:
-                    logger.debug(f"✅ 从 ForeignStockService 获取{market}价格: {code} = {price}")
-                    return float(price)
-        except Exception as e:
-            logger.error(f"❌ 获取{market}股价格失败 {code}: {e}")
-            return None
+    Args:
+        code: 股票代码
+        market: 市场类型 (CN/HK/US)
 
-    logger.error(f"❌ 无法获取股票价格: {code} (market={market})")
-    return None
+    Returns:
+        最新价格，如果获取失败返回 None
+    """
+    prices = await _get_last_prices([(code, market)], use_snapshot=False)
+    return prices.get((market, code))
 
 
 def _zfill_code(code: str) -> str:
@@ -282,6 +370,9 @@ async def get_account(current_user: dict = Depends(get_current_user)):
         "USD": 0.0
     }
 
+    # 整个组合一次批量取价
+    prices = await _get_last_prices([(p.get("code"), p.get("market", "CN")) for p in positions])
+
     detailed_positions: List[Dict[str, Any]] = []
     for p in positions:
         code = p.get("code")
@@ -292,7 +383,7 @@ async def get_account(current_user: dict = Depends(get_current_user)):
         available_qty = p.get("available_qty", qty)
 
         # 获取最新价
-        last = await _get_last_price(code, market)
+        last = prices.get((market, code))
         mkt_value = round((last or 0.0) * qty, 2)
         positions_value_by_currency[currency] += mkt_value
 
@@ -535,6 +626,7 @@ async def list_positions(current_user: dict = Depends(get_current_user)):
     """获取持仓列表（支持多市场）"""
     db = get_mongo_db()
     items = await db["paper_positions"].find({"user_id": current_user["id"]}).to_list(None)
+    prices = await _get_last_prices([(p.get("code"), p.get("market", "CN")) for p in items])
     enriched: List[Dict[str, Any]] = []
     for p in items:
         code = p.get("code")
@@ -544,7 +636,7 @@ async def list_positions(current_user: dict = Depends(get_current_user)):
         available_qty = p.get("available_qty", qty)
         avg_cost = float(p.get("avg_cost", 0.0))
 
-        last = await _get_last_price(code, market)
+        last = prices.get((market, code))
         mkt = round((last or 0.0) * qty, 2)
         enriched.append({
             "code": code,
@@ -13,78 +13,14 @@ from pydantic import BaseModel
 
 from .auth_db import get_current_user
 from ..core.database import get_mongo_db
+from ..services.report_search_index import approximate_count, encode_cursor, keyset_filter, search_filter
+from ..services.stock_name_resolver import get_stock_name_resolver
 from ..utils.timezone import to_config_tz
+from tradingagents.utils.render_pool import RenderQueueFull, RenderTimeout
 import logging
 
 logger = logging.getLogger("webapi")
 
-# 股票名称缓存
-_stock_name_cache = {}
-
-def get_stock_name(stock_code: str) -> str:
-    """
-    获取股票名称
-    优先级：缓存 -> MongoDB（按数据源优先级） -> 默认返回股票代码
-    """
-    global _stock_name_cache
-
-    # 检查缓存
-    if stock_code in _stock_name_cache:
-        return _stock_name_cache[stock_code]
-
-    try:
-        # 从 MongoDB 获取股票名称
-        from ..core.database import get_mongo_db_sync
-        from ..core.unified_config import UnifiedConfigManager
-
-        db = get_mongo_db_sync()
-        code6 = str(stock_code).zfill(6)
-
-        # 🔥 按数据源优先级查询
-        config = UnifiedConfigManager()
-        data_source_configs = config.get_data_source_configs()
-
-        # 提取启用的数据源，按优先级排序
-        enabled_sources = [
-            ds.type.lower() for ds in data_source_configs
-            if ds.enabled and ds.type.lower() in ['tushare', 'akshare', 'baostock']
-        ]
-
-        if not enabled_sources:
-            enabled_sources = ['tushare', 'akshare', 'baostock']
-
-        # 按数据源优先级查询
-        stock_info = None
-        for data_source in enabled_sources:
-            stock_info = db.stock_basic_info.find_one(
-                {"$or": [{"symbol": code6}, {"code": code6}], "source": data_source}
-            )
-            if stock_info:
-                logger.debug(f"✅ 使用数据源 {data_source} 获取股票名称 {code6}")
-                break
-
-        # 如果所有数据源都没有，尝试不带 source 条件查询（兼容旧数据）
-        if not stock_info:
-            stock_info = db.stock_basic_info.find_one(
-                {"$or": [{"symbol": code6}, {"code": code6}]}
-            )
-            if stock_info:
-                logger.warning(f"⚠️ 使用旧数据（无 source 字段）获取股票名称 {code6}")
-
-        if stock_info and stock_info.get("name"):
-            stock_name = stock_info["name"]
-            _stock_name_cache[stock_code] = stock_name
-            return stock_name
-
-        # 如果没有找到，返回股票代码
-        _stock_name_cache[stock_code] = stock_code
-        return stock_code
-
-    except Exception as e:
-        logger.warning(f"⚠️ 获取股票名称失败 {stock_code}: {e}")
-        return stock_code
-
-
 # 统一构建报告查询：支持 _id(ObjectId) / analysis_id / task_id 三种
 def _build_report_query(report_id: str) -> Dict[str, Any]:
     ors = [
@@ -125,9 +61,14 @@ async def get_reports_list(
     start_date: Optional[str] = Query(None, description="开始日期"),
     end_date: Optional[str] = Query(None, description="结束日期"),
     stock_code: Optional[str] = Query(None, description="股票代码"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的 next_cursor），传入时忽略 page"),
     user: dict = Depends(get_current_user)
 ):
-    """获取分析报告列表"""
+    """获取分析报告列表
+
+    关键词通过 search_terms 检索索引匹配（支持中文），按 (created_at, _id) 倒序排列；
+    传入 cursor 时按游标翻页，深分页不再随页码线性变慢。总数超过上限时为近似值。
+    """
     try:
         logger.info(f"🔍 获取报告列表: 用户={user['id']}, 页码={page}, 每页={page_size}, 市场={market_filter}")
 
@@ -136,13 +77,11 @@ async def get_reports_list(
         # 构建查询条件
         query = {}
 
-        # 搜索关键词
+        # 搜索关键词（检索词索引，覆盖代码、名称、分析ID、摘要和各模块正文）
         if search_keyword:
-            query["$or"] = [
-                {"stock_symbol": {"$regex": search_keyword, "$options": "i"}},
-                {"analysis_id": {"$regex": search_keyword, "$options": "i"}},
-                {"summary": {"$regex": search_keyword, "$options": "i"}}
-            ]
+            keyword_filter = search_filter(search_keyword)
+            if keyword_filter:
+                query.update(keyword_filter)
 
         # 市场筛选
         if market_filter:
@@ -163,21 +102,41 @@ async def get_reports_list(
 
         logger.info(f"📊 查询条件: {query}")
 
-        # 计算总数
-        total = await db.analysis_reports.count_documents(query)
+        # 计算总数（超过上限时为近似值）
+        total, total_approximate = await approximate_count(db.analysis_reports, query)
 
-        # 分页查询
-        skip = (page - 1) * page_size
-        cursor = db.analysis_reports.find(query).sort("created_at", -1).skip(skip).limit(page_size)
+        # 分页查询：有游标时按 (created_at, _id) 定位，否则兼容按页码跳过
+        page_query = query
+        skip = 0
+        if cursor:
+            try:
+                after = keyset_filter(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            page_query = {"$and": [query, after]} if query else after
+        else:
+            skip = (page - 1) * page_size
+        find_cursor = (
+            db.analysis_reports.find(page_query, {"search_terms": 0})
+            .sort([("created_at", -1), ("_id", -1)])
+            .skip(skip)
+            .limit(page_size + 1)
+        )
+        docs = await find_cursor.to_list(length=page_size + 1)
+        has_more = len(docs) > page_size
+        docs = docs[:page_size]
+        next_cursor = encode_cursor(docs[-1]) if has_more and docs else None
+
+        # 🔥 优先使用MongoDB中保存的股票名称，缺失的整页一次批量查询
+        names = await get_stock_name_resolver().resolve_many(
+            doc.get("stock_symbol", "") for doc in docs if not doc.get("stock_name")
+        )
 
         reports = []
-        async for doc in cursor:
+        for doc in docs:
             # 转换为前端需要的格式
             stock_code = doc.get("stock_symbol", "")
-            # 🔥 优先使用MongoDB中保存的股票名称，如果没有则查询
-            stock_name = doc.get("stock_name")
-            if not stock_name:
-                stock_name = get_stock_name(stock_code)
+            stock_name = doc.get("stock_name") or names.get(stock_code, stock_code)
 
             # 🔥 获取市场类型，如果没有则根据股票代码推断
             market_type = doc.get("market_type")
@@ -225,12 +184,17 @@ async def get_reports_list(
             "data": {
                 "reports": reports,
                 "total": total,
+                "total_approximate": total_approximate,
                 "page": page,
-                "page_size": page_size
+                "page_size": page_size,
+                "has_more": has_more,
+                "next_cursor": next_cursor
             },
             "message": "报告列表获取成功"
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ 获取报告列表失败: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -276,7 +240,7 @@ async def get_report_detail(
             stock_symbol = r.get("stock_symbol", r.get("stock_code", tasks_doc.get("stock_code", "")))
             stock_name = r.get("stock_name")
             if not stock_name:
-                stock_name = get_stock_name(stock_symbol)
+                stock_name = await get_stock_name_resolver().resolve(stock_symbol)
 
             report = {
                 "id": tasks_doc.get("task_id", report_id),
@@ -306,7 +270,7 @@ async def get_report_detail(
             stock_symbol = doc.get("stock_symbol", "")
             stock_name = doc.get("stock_name")
             if not stock_name:
-                stock_name = get_stock_name(stock_symbol)
+                stock_name = await get_stock_name_resolver().resolve(stock_symbol)
 
             # 获取时间（数据库中是 UTC 时间，需要转换为 UTC+8）
             created_at = doc.get("created_at", datetime.utcnow())
@@ -520,8 +484,8 @@ async def download_report(
                 )
 
             try:
-                # 生成 Word 文档
-                docx_content = report_exporter.generate_docx_report(doc)
+                # 生成 Word 文档（共享渲染池，相同内容命中导出缓存）
+                docx_content = await report_exporter.generate_report_async(doc, "docx")
                 filename = f"{stock_symbol}_{analysis_date}_report.docx"
 
                 # 返回文件流
@@ -533,6 +497,10 @@ async def download_report(
                     media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
                     headers={"Content-Disposition": f"attachment; filename={filename}"}
                 )
+            except RenderQueueFull as e:
+                raise HTTPException(status_code=503, detail=str(e))
+            except RenderTimeout as e:
+                raise HTTPException(status_code=504, detail=str(e))
             except Exception as e:
                 logger.error(f"❌ Word 文档生成失败: {e}")
                 raise HTTPException(status_code=500, detail=f"Word 文档生成失败: {str(e)}")
@@ -548,8 +516,8 @@ async def download_report(
                 )
 
             try:
-                # 生成 PDF 文档
-                pdf_content = report_exporter.generate_pdf_report(doc)
+                # 生成 PDF 文档（共享渲染池，相同内容命中导出缓存）
+                pdf_content = await report_exporter.generate_report_async(doc, "pdf")
                 filename = f"{stock_symbol}_{analysis_date}_report.pdf"
 
                 # 返回文件流
@@ -561,6 +529,10 @@ async def download_report(
                     media_type="application/pdf",
                     headers={"Content-Disposition": f"attachment; filename={filename}"}
                 )
+            except RenderQueueFull as e:
+                raise HTTPException(status_code=503, detail=str(e))
+            except RenderTimeout as e:
+                raise HTTPException(status_code=504, detail=str(e))
             except Exception as e:
                 logger.error(f"❌ PDF 文档生成失败: {e}")
                 raise HTTPException(status_code=500, detail=f"PDF 文档生成失败: {str(e)}")
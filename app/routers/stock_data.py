@@ -2,6 +2,7 @@
 股票数据API路由 - 基于扩展数据模型
 提供标准化的股票数据访问接口
 """
+import logging
 from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi import status
@@ -238,31 +239,42 @@ async def search_stocks(
 
         preferred_source = enabled_sources[0] if enabled_sources else 'tushare'
 
-        # 构建搜索条件
-        search_conditions = []
-
-        # 如果是6位数字，按代码精确匹配
-        if keyword.isdigit() and len(keyword) == 6:
-            search_conditions.append({"symbol": keyword})
-        else:
-            # 按名称模糊匹配
-            search_conditions.append({"name": {"$regex": keyword, "$options": "i"}})
-            # 如果包含数字，也尝试代码匹配
-            if any(c.isdigit() for c in keyword):
-                search_conditions.append({"symbol": {"$regex": keyword}})
-
-        # 🔥 添加数据源筛选：只查询优先级最高的数据源
-        query = {
-            "$and": [
-                {"$or": search_conditions},
-                {"source": preferred_source}
-            ]
-        }
+        # 🔥 优先使用进程内股票主索引（前缀/拼音/容错匹配，不扫描集合）
+        results = None
+        try:
+            from app.services.symbol_master import get_symbol_master
+            master = get_symbol_master()
+            await master.ensure_loaded(db, "CN", enabled_sources)
+            results = master.search(keyword, market="CN", limit=limit)
+        except Exception as e:
+            logging.getLogger("webapi").warning(f"⚠️ 股票主索引不可用，回退到数据库查询: {e}")
+
+        if results is None:
+            # 构建搜索条件
+            search_conditions = []
+
+            # 如果是6位数字，按代码精确匹配
+            if keyword.isdigit() and len(keyword) == 6:
+                search_conditions.append({"symbol": keyword})
+            else:
+                # 按名称模糊匹配
+                search_conditions.append({"name": {"$regex": keyword, "$options": "i"}})
+                # 如果包含数字，也尝试代码匹配
+                if any(c.isdigit() for c in keyword):
+                    search_conditions.append({"symbol": {"$regex": keyword}})
+
+            # 🔥 添加数据源筛选：只查询优先级最高的数据源
+            query = {
+                "$and": [
+                    {"$or": search_conditions},
+                    {"source": preferred_source}
+                ]
+            }
 
-        # 执行搜索
-        cursor = collection.find(query, {"_id": 0}).limit(limit)
+            # 执行搜索
+            cursor = collection.find(query, {"_id": 0}).limit(limit)
 
-        results = await cursor.to_list(length=limit)
+            results = await cursor.to_list(length=limit)
 
         # 数据标准化
         service = get_stock_data_service()
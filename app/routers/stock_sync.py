@@ -10,9 +10,6 @@ from pydantic import BaseModel, Field
 from app.routers.auth_db import get_current_user
 from app.core.response import ok
 from app.core.database import get_mongo_db
-from app.worker.tushare_sync_service import get_tushare_sync_service
-from app.worker.akshare_sync_service import get_akshare_sync_service
-from app.worker.financial_data_sync_service import get_financial_sync_service
 import logging
 import asyncio
 from datetime import datetime, timedelta
@@ -22,6 +19,22 @@ logger = logging.getLogger("webapi")
 router = APIRouter(prefix="/api/stock-sync", tags=["股票数据同步"])
 
 
+# 同步服务导入时会加载 Tushare/AKShare 等 SDK，首次调用接口时才导入
+async def get_tushare_sync_service():
+    from app.worker.tushare_sync_service import get_tushare_sync_service as _get_service
+    return await _get_service()
+
+
+async def get_akshare_sync_service():
+    from app.worker.akshare_sync_service import get_akshare_sync_service as _get_service
+    return await _get_service()
+
+
+async def get_financial_sync_service():
+    from app.worker.financial_data_sync_service import get_financial_sync_service as _get_service
+    return await _get_service()
+
+
 async def _sync_latest_to_market_quotes(symbol: str) -> None:
     """
     将 stock_daily_quotes 中的最新数据同步到 market_quotes
@@ -108,43 +108,18 @@ async def get_quote(
             )
 
     # A股：使用现有逻辑
-    db = get_mongo_db()
+    from app.services.market_data_repository import get_market_data_repository
+    repo = get_market_data_repository()
     code6 = normalized_code
 
     # 行情
-    q = await db["market_quotes"].find_one({"code": code6}, {"_id": 0})
+    q = await repo.get_quote(code6)
 
     # 🔥 调试日志：查看查询结果
-    logger.info(f"🔍 查询 market_quotes: code={code6}")
-    if q:
-        logger.info(f"  ✅ 找到数据: volume={q.get('volume')}, amount={q.get('amount')}, volume_ratio={q.get('volume_ratio')}")
-    else:
-        logger.info(f"  ❌ 未找到数据")
-
-    # 🔥 基础信息 - 按数据源优先级查询
-    from app.core.unified_config import UnifiedConfigManager
-    config = UnifiedConfigManager()
-    data_source_configs = await config.get_data_source_configs_async()
-
-    # 提取启用的数据源，按优先级排序
-    enabled_sources = [
-        ds.type.lower() for ds in data_source_configs
-        if ds.enabled and ds.type.lower() in ['tushare', 'akshare', 'baostock']
-    ]
+    logger.debug(f"🔍 查询 market_quotes: code={code6}, 找到数据: {bool(q)}")
 
-    if not enabled_sources:
-        enabled_sources = ['tushare', 'akshare', 'baostock']
-
-    # 按优先级查询基础信息
-    b = None
-    for src in enabled_sources:
-        b = await db["stock_basic_info"].find_one({"code": code6, "source": src}, {"_id": 0})
-        if b:
-            break
-
-    # 如果所有数据源都没有，尝试不带 source 条件查询（兼容旧数据）
-    if not b:
-        b = await db["stock_basic_info"].find_one({"code": code6}, {"_id": 0})
+    # 🔥 基础信息 - 按数据源优先级查询（单次查询，兼容旧数据）
+    b = await repo.get_basic_info(code6)
 
     if not q and not b:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="未找到该股票的任何信息")
@@ -497,35 +472,23 @@ async def get_kline(
     today_str_yyyymmdd = now.strftime("%Y%m%d")  # 格式：20251028（用于查询）
     today_str_formatted = now.strftime("%Y-%m-%d")  # 格式：2025-10-28（用于返回）
 
-    # 1. 优先从 MongoDB 缓存获取
-    try:
-        from tradingagents.dataflows.cache.mongodb_cache_adapter import get_mongodb_cache_adapter
-        adapter = get_mongodb_cache_adapter()
-
-        # 计算日期范围
-        end_date = now.strftime("%Y-%m-%d")
-        start_date = (now - timedelta(days=limit * 2)).strftime("%Y-%m-%d")
+    # 1. 优先从 MongoDB 缓存获取（Motor 异步查询，不阻塞事件循环）
+    from tradingagents.config.runtime_settings import use_app_cache_enabled
+    if use_app_cache_enabled(False):
+        try:
+            from app.services.market_data_repository import bars_to_items, get_market_data_repository
+            repo = get_market_data_repository()
 
-        logger.info(f"🔍 尝试从 MongoDB 获取 K 线数据: {code_padded}, period={period} (MongoDB: {mongodb_period}), limit={limit}")
-        df = adapter.get_historical_data(code_padded, start_date, end_date, period=mongodb_period)
+            logger.info(f"🔍 尝试从 MongoDB 获取 K 线数据: {code_padded}, period={period} (MongoDB: {mongodb_period}), limit={limit}")
+            bars = await repo.get_bars(code_padded, period=mongodb_period, limit=limit,
+                                       end_date=now.strftime("%Y-%m-%d"))
 
-        if df is not None and not df.empty:
-            # 转换 DataFrame 为列表格式
-            items = []
-            for _, row in df.tail(limit).iterrows():
-                items.append({
-                    "time": row.get("trade_date", row.get("date", "")),  # 前端期望 time 字段
-                    "open": float(row.get("open", 0)),
-                    "high": float(row.get("high", 0)),
-                    "low": float(row.get("low", 0)),
-                    "close": float(row.get("close", 0)),
-                    "volume": float(row.get("volume", row.get("vol", 0))),
-                    "amount": float(row.get("amount", 0)) if "amount" in row else None,
-                })
-            source = "mongodb"
-            logger.info(f"✅ 从 MongoDB 获取到 {len(items)} 条 K 线数据")
-    except Exception as e:
-        logger.warning(f"⚠️ MongoDB 获取 K 线失败: {e}")
+            if bars:
+                items = bars_to_items(bars)
+                source = "mongodb"
+                logger.info(f"✅ 从 MongoDB 获取到 {len(items)} 条 K 线数据")
+        except Exception as e:
+            logger.warning(f"⚠️ MongoDB 获取 K 线失败: {e}")
 
     # 2. 如果 MongoDB 没有数据，降级到外部 API（带超时保护）
     if not items:
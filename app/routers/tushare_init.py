@@ -10,12 +10,17 @@ from pydantic import BaseModel, Field
 
 from app.routers.auth_db import get_current_user
 from app.core.database import get_mongo_db
-from app.worker.tushare_init_service import get_tushare_init_service
 from app.core.response import ok
 
 router = APIRouter(prefix="/api/tushare-init", tags=["Tushare初始化"])
 
 
+async def get_tushare_init_service():
+    """获取Tushare初始化服务（首次使用时才导入，导入会加载 Tushare SDK）"""
+    from app.worker.tushare_init_service import get_tushare_init_service as _get_service
+    return await _get_service()
+
+
 class InitializationRequest(BaseModel):
     """初始化请求模型"""
     historical_days: int = Field(default=365, ge=1, le=3650, description="历史数据天数")
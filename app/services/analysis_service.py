@@ -8,7 +8,7 @@ import uuid
 import json
 import logging
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Callable
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Callable
 from pathlib import Path
 import sys
 
@@ -20,7 +20,9 @@ sys.path.insert(0, str(project_root))
 from tradingagents.utils.logging_init import init_logging
 init_logging()
 
-from tradingagents.graph.trading_graph import TradingAgentsGraph
+# TradingAgentsGraph 会加载全部 LLM SDK 与数据源，延迟到创建分析实例时再导入
+if TYPE_CHECKING:
+    from tradingagents.graph.trading_graph import TradingAgentsGraph
 from tradingagents.default_config import DEFAULT_CONFIG
 from app.services.simple_analysis_service import create_analysis_config, get_provider_by_model_name
 from app.models.analysis import (
@@ -79,8 +81,10 @@ class AnalysisService:
             logger.warning(f"⚠️ 生成新的用户ID: {new_object_id}")
             return PyObjectId(new_object_id)
     
-    def _get_trading_graph(self, config: Dict[str, Any]) -> TradingAgentsGraph:
+    def _get_trading_graph(self, config: Dict[str, Any]) -> "TradingAgentsGraph":
         """获取或创建TradingAgents图实例（带缓存）- 与单股分析保持一致"""
+        from tradingagents.graph.trading_graph import TradingAgentsGraph
+
         config_key = json.dumps(config, sort_keys=True)
 
         if config_key not in self._trading_graph_cache:
@@ -20,6 +20,8 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from pymongo import UpdateOne
 
 from app.core.database import get_mongo_db
+from app.services.stock_name_resolver import get_stock_name_resolver
+from app.services.symbol_master import get_symbol_master
 from app.core.config import settings
 
 from app.services.basics_sync import (
@@ -341,6 +343,9 @@ class BasicsSyncService:
             stats.status = "success" if errors == 0 else "success_with_errors"
             stats.finished_at = datetime.utcnow().isoformat()
             await self._persist_status(db, stats.__dict__.copy())
+            # 股票主索引在下次搜索前增量刷新，股票名称缓存随之失效
+            get_symbol_master().mark_stale("CN")
+            get_stock_name_resolver().invalidate()
             logger.info(
                 f"Stock basics sync finished: total={stats.total} inserted={inserted} updated={updated} errors={errors} trade_date={latest_trade_date}"
             )
@@ -39,6 +39,25 @@ class ConfigService:
                 self.db = get_mongo_db()
         return self.db
 
+    async def _notify_data_source_config_changed(self):
+        """system_configs 变更后通知数据源优先级快照失效（本进程立即生效，其他进程经 Redis 通知）"""
+        try:
+            from tradingagents.config.data_source_priority import (
+                DATA_SOURCE_CONFIG_CHANNEL,
+                get_data_source_priority_config,
+            )
+            get_data_source_priority_config().invalidate()
+        except Exception as e:
+            logger.debug(f"数据源优先级快照失效失败: {e}")
+            return
+
+        try:
+            from app.core.database import get_redis_client
+            await get_redis_client().publish(DATA_SOURCE_CONFIG_CHANNEL, str(time.time()))
+        except Exception as e:
+            # Redis 不可用时其他进程依赖版本戳轮询刷新
+            logger.debug(f"发布数据源配置变更通知失败: {e}")
+
     # ==================== 市场分类管理 ====================
 
     async def get_market_categories(self) -> List[MarketCategory]:
@@ -277,6 +296,7 @@ class ConfigService:
                             }
                         )
                         logger.info(f"✅ [优先级同步] system_configs 版本更新: {version} -> {version + 1}")
+                        await self._notify_data_source_config_changed()
                     else:
                         logger.warning(f"⚠️ [优先级同步] 未找到匹配的数据源配置: {data_source_name}")
 
@@ -347,6 +367,7 @@ class ConfigService:
                         }
                     )
                     print(f"✅ [优先级同步] 已同步更新 system_configs 集合，新版本: {config_data.get('version', 0) + 1}")
+                    await self._notify_data_source_config_changed()
                 else:
                     print(f"⚠️ [优先级同步] 没有找到需要更新的数据源配置")
             else:
@@ -552,6 +573,7 @@ class ConfigService:
 
             insert_result = await config_collection.insert_one(config_dict)
             print(f"📝 新配置ID: {insert_result.inserted_id}")
+            await self._notify_data_source_config_changed()
 
             # 验证保存结果
             saved_config = await config_collection.find_one({"_id": insert_result.inserted_id})
@@ -1,13 +1,17 @@
 """
 AKShare data source adapter
 """
-from typing import Optional, Dict
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional, Dict
 import logging
 from datetime import datetime, timedelta
-import pandas as pd
 
 from .base import DataSourceAdapter
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = logging.getLogger(__name__)
 
 
@@ -114,6 +118,8 @@ class AKShareAdapter(DataSourceAdapter):
 
     def get_daily_basic(self, trade_date: str) -> Optional[pd.DataFrame]:
         """获取每日基础财务数据（快速版）"""
+        import pandas as pd
+
         if not self.is_available():
             return None
         try:
@@ -206,15 +212,13 @@ class AKShareAdapter(DataSourceAdapter):
             return None
 
         try:
-            import akshare as ak  # type: ignore
-
-            # 根据 source 参数选择接口
-            if source == "sina":
-                df = ak.stock_zh_a_spot()  # 新浪财经接口
-                logger.info("使用 AKShare 新浪财经接口获取实时行情")
-            else:  # 默认使用东方财富
-                df = ak.stock_zh_a_spot_em()  # 东方财富接口
-                logger.info("使用 AKShare 东方财富接口获取实时行情")
+            # 根据 source 参数选择接口（新浪财经 / 东方财富），复用进程级全市场快照
+            from tradingagents.dataflows.providers.china.spot_snapshot import (
+                SOURCE_EASTMONEY, SOURCE_SINA, get_spot_snapshot_service,
+            )
+            snapshot_source = SOURCE_SINA if source == "sina" else SOURCE_EASTMONEY
+            df = get_spot_snapshot_service().get_snapshot_sync(snapshot_source).df
+            logger.info(f"使用 AKShare {snapshot_source} 全市场快照获取实时行情")
 
             if df is None or getattr(df, "empty", True):
                 logger.warning(f"AKShare {source} 返回空数据")
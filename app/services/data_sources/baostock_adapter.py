@@ -1,13 +1,17 @@
 """
 BaoStock data source adapter
 """
-from typing import Optional
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
 import logging
 from datetime import datetime, timedelta
-import pandas as pd
 
 from .base import DataSourceAdapter
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,6 +36,8 @@ class BaoStockAdapter(DataSourceAdapter):
             return False
 
     def get_stock_list(self) -> Optional[pd.DataFrame]:
+        import pandas as pd
+
         if not self.is_available():
             return None
         try:
@@ -112,6 +118,8 @@ class BaoStockAdapter(DataSourceAdapter):
             trade_date: 交易日期 (YYYYMMDD)
             max_stocks: 最大处理股票数量，None表示处理所有股票
         """
+        import pandas as pd
+
         if not self.is_available():
             return None
         try:
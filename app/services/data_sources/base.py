@@ -1,9 +1,14 @@
 """
 Base classes and shared typing for data source adapters
 """
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
-from typing import Optional, Dict
-import pandas as pd
+from typing import TYPE_CHECKING, Optional, Dict
+
+# pandas 只在适配器实际拉取数据时使用，这里仅用于类型标注
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class DataSourceAdapter(ABC):
@@ -1,16 +1,20 @@
 """
 Data source manager that orchestrates multiple adapters with priority and optional consistency checks
 """
-from typing import List, Optional, Tuple, Dict
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List, Optional, Tuple, Dict
 import logging
 from datetime import datetime, timedelta
-import pandas as pd
 
 from .base import DataSourceAdapter
 from .tushare_adapter import TushareAdapter
 from .akshare_adapter import AKShareAdapter
 from .baostock_adapter import BaoStockAdapter
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = logging.getLogger(__name__)
 
 
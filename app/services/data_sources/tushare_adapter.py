@@ -1,13 +1,17 @@
 """
 Tushare data source adapter
 """
-from typing import Optional, Dict
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional, Dict
 import logging
 from datetime import datetime, timedelta
-import pandas as pd
 
 from .base import DataSourceAdapter
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = logging.getLogger(__name__)
 
 
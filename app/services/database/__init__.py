@@ -1,9 +1,10 @@
-from . import status_checks, backups, cleanup, serialization
+from . import status_checks, backups, cleanup, serialization, streaming
 
 __all__ = [
     "status_checks",
     "backups",
     "cleanup",
     "serialization",
+    "streaming",
 ]
 
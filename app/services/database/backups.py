@@ -3,6 +3,7 @@ Backup, import, and export routines extracted from DatabaseService.
 """
 from __future__ import annotations
 
+import io
 import json
 import os
 import gzip
@@ -18,6 +19,7 @@ from bson import ObjectId
 from app.core.database import get_mongo_db
 from app.core.config import settings
 from .serialization import serialize_document
+from . import streaming as _streaming
 
 logger = logging.getLogger(__name__)
 
@@ -93,14 +95,6 @@ async def create_backup_native(name: str, backup_dir: str, collections: Optional
         raise
 
     # 计算备份大小
-    def _get_dir_size(path):
-        total = 0
-        for dirpath, dirnames, filenames in os.walk(path):
-            for filename in filenames:
-                filepath = os.path.join(dirpath, filename)
-                total += os.path.getsize(filepath)
-        return total
-
     file_size = await asyncio.to_thread(_get_dir_size, backup_path)
 
     # 获取实际备份的集合列表
@@ -134,69 +128,149 @@ async def create_backup_native(name: str, backup_dir: str, collections: Optional
     }
 
 
-async def create_backup(name: str, backup_dir: str, collections: Optional[List[str]] = None, user_id: str | None = None) -> Dict[str, Any]:
+async def create_backup(name: str, backup_dir: str, collections: Optional[List[str]] = None, user_id: str | None = None,
+                        *, fmt: str = "ndjson", batch_size: int = _streaming.DEFAULT_BATCH_SIZE,
+                        chunk_docs: int = _streaming.DEFAULT_CHUNK_DOCS) -> Dict[str, Any]:
     """
-    创建数据库备份（Python 实现，兼容性好但速度较慢）
+    创建数据库备份（Python 流式实现，不依赖 mongodump）
 
-    对于大数据量（>100MB），建议使用 create_backup_native() 方法
+    每个集合分批读取并写入 gzip 压缩的 NDJSON（或 BSON）分片，内存占用与集合大小无关；
+    备份中断后可通过 resume_backup() 从断点继续。
     """
     db = get_mongo_db()
 
     backup_id = str(ObjectId())
     timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    backup_filename = f"backup_{name}_{timestamp}.json.gz"
-    backup_path = os.path.join(backup_dir, backup_filename)
+    backup_dirname = f"backup_{name}_{timestamp}"
+    backup_path = os.path.join(backup_dir, backup_dirname)
 
     if not collections:
         collections = await db.list_collection_names()
-
-    backup_data: Dict[str, Any] = {
-        "backup_id": backup_id,
-        "name": name,
-        "created_at": datetime.utcnow().isoformat(),
-        "created_by": user_id,
-        "collections": collections,
-        "data": {},
-    }
-
-    for collection_name in collections:
-        collection = db[collection_name]
-        documents: List[dict] = []
-        async for doc in collection.find():
-            documents.append(serialize_document(doc))
-        backup_data["data"][collection_name] = documents
-
-    os.makedirs(backup_dir, exist_ok=True)
-
-    # 🔥 使用 asyncio.to_thread 将阻塞的文件 I/O 操作放到线程池执行
-    def _write_backup():
-        with gzip.open(backup_path, "wt", encoding="utf-8") as f:
-            json.dump(backup_data, f, ensure_ascii=False, indent=2)
-        return os.path.getsize(backup_path)
-
-    file_size = await asyncio.to_thread(_write_backup)
+        collections = [c for c in collections if not c.startswith("system.")]
 
     backup_meta = {
         "_id": ObjectId(backup_id),
         "name": name,
-        "filename": backup_filename,
+        "filename": backup_dirname,
         "file_path": backup_path,
-        "size": file_size,
+        "size": 0,
         "collections": collections,
         "created_at": datetime.utcnow(),
         "created_by": user_id,
+        "backup_type": fmt,
+        "status": "in_progress",
     }
-
     await db.database_backups.insert_one(backup_meta)
 
+    logger.info(f"🔄 开始流式备份: {name}（{len(collections)} 个集合，格式 {fmt}）")
+    return await _run_stream_backup(db, backup_meta, resume=False, batch_size=batch_size, chunk_docs=chunk_docs)
+
+
+async def resume_backup(backup_id: str, *, batch_size: int = _streaming.DEFAULT_BATCH_SIZE,
+                        chunk_docs: int = _streaming.DEFAULT_CHUNK_DOCS) -> Dict[str, Any]:
+    """从断点继续一个未完成的流式备份"""
+    db = get_mongo_db()
+    backup_meta = await db.database_backups.find_one({"_id": ObjectId(backup_id)})
+    if not backup_meta:
+        raise Exception("备份不存在")
+    if backup_meta.get("backup_type") not in _streaming.SUPPORTED_FORMATS:
+        raise Exception("只有流式备份支持断点续传")
+    if backup_meta.get("status") == "completed":
+        return _backup_info(backup_meta)
+    logger.info(f"⏩ 继续备份: {backup_meta['name']}")
+    return await _run_stream_backup(db, backup_meta, resume=True, batch_size=batch_size, chunk_docs=chunk_docs)
+
+
+async def _run_stream_backup(db, backup_meta: Dict[str, Any], *, resume: bool, batch_size: int, chunk_docs: int) -> Dict[str, Any]:
+    backup_path = backup_meta["file_path"]
+
+    async def _on_checkpoint(manifest: Dict[str, Any]) -> None:
+        # 每个分片完成后记录进度，供备份列表展示
+        progress = {c: st["documents"] for c, st in manifest["collections"].items()}
+        await db.database_backups.update_one({"_id": backup_meta["_id"]}, {"$set": {"progress": progress}})
+
+    def _log_progress(collection: str, done: int, total: Optional[int]) -> None:
+        if done % (batch_size * 100) == 0:
+            logger.info(f"📦 备份 {collection}: {done}/{total or '?'} 条")
+
+    try:
+        manifest = await _streaming.stream_backup(
+            db, backup_path, backup_meta["collections"],
+            backup_id=str(backup_meta["_id"]), name=backup_meta["name"], fmt=backup_meta["backup_type"],
+            resume=resume, batch_size=batch_size, chunk_docs=chunk_docs,
+            progress=_log_progress, on_checkpoint=_on_checkpoint,
+        )
+    except Exception as e:
+        logger.error(f"❌ 流式备份失败（可调用 resume_backup 从断点继续）: {e}")
+        await db.database_backups.update_one({"_id": backup_meta["_id"]}, {"$set": {"status": "failed", "error": str(e)}})
+        raise
+
+    file_size = await asyncio.to_thread(_get_dir_size, backup_path)
+    documents = {c: st["documents"] for c, st in manifest["collections"].items()}
+    await db.database_backups.update_one(
+        {"_id": backup_meta["_id"]},
+        {"$set": {"status": "completed", "size": file_size, "progress": documents}, "$unset": {"error": ""}},
+    )
+    backup_meta.update(status="completed", size=file_size, progress=documents)
+    logger.info(f"✅ 流式备份完成: {backup_meta['name']}（{sum(documents.values())} 条，{file_size} 字节）")
+    return _backup_info(backup_meta)
+
+
+def _get_dir_size(path: str) -> int:
+    total = 0
+    for dirpath, dirnames, filenames in os.walk(path):
+        for filename in filenames:
+            total += os.path.getsize(os.path.join(dirpath, filename))
+    return total
+
+
+def _backup_info(backup_meta: Dict[str, Any]) -> Dict[str, Any]:
     return {
-        "id": backup_id,
-        "name": name,
-        "filename": backup_filename,
-        "file_path": backup_path,
-        "size": file_size,
-        "collections": collections,
+        "id": str(backup_meta["_id"]),
+        "name": backup_meta["name"],
+        "filename": backup_meta["filename"],
+        "file_path": backup_meta["file_path"],
+        "size": backup_meta.get("size", 0),
+        "collections": backup_meta["collections"],
         "created_at": backup_meta["created_at"].isoformat(),
+        "backup_type": backup_meta.get("backup_type", "python"),
+        "status": backup_meta.get("status", "completed"),
+    }
+
+
+async def restore_backup(backup_id: str, collections: Optional[List[str]] = None, *, overwrite: bool = False,
+                         batch_size: int = _streaming.DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    从流式备份恢复数据（逐批有序写入，内存占用与集合大小无关）
+
+    旧版单文件 JSON 备份仍通过 import_data 一次性导入；mongodump 备份请使用 mongorestore。
+    """
+    db = get_mongo_db()
+    backup_meta = await db.database_backups.find_one({"_id": ObjectId(backup_id)})
+    if not backup_meta:
+        raise Exception("备份不存在")
+
+    backup_type = backup_meta.get("backup_type", "python")
+    if backup_type == "mongodump":
+        raise Exception("mongodump 备份请使用 mongorestore 恢复")
+    if backup_type not in _streaming.SUPPORTED_FORMATS:
+        def _read_legacy():
+            with gzip.open(backup_meta["file_path"], "rb") as f:
+                return json.dumps(json.load(f)["data"]).encode("utf-8")
+        content = await asyncio.to_thread(_read_legacy)
+        return await import_data(content, "", overwrite=overwrite, filename=backup_meta["filename"])
+
+    restored = await _streaming.stream_restore(
+        db, backup_meta["file_path"], collections=collections, overwrite=overwrite, batch_size=batch_size,
+    )
+    return {
+        "mode": "multi_collection",
+        "collections": list(restored),
+        "total_collections": len(restored),
+        "total_inserted": sum(restored.values()),
+        "restored": restored,
+        "filename": backup_meta["filename"],
+        "overwrite": overwrite,
     }
 
 
@@ -212,6 +286,9 @@ async def list_backups() -> List[Dict[str, Any]]:
             "collections": backup["collections"],
             "created_at": backup["created_at"].isoformat(),
             "created_by": backup.get("created_by"),
+            "backup_type": backup.get("backup_type", "python"),
+            "status": backup.get("status", "completed"),
+            "progress": backup.get("progress"),
         })
     return backups
 
@@ -223,12 +300,11 @@ async def delete_backup(backup_id: str) -> None:
         raise Exception("备份不存在")
     if os.path.exists(backup["file_path"]):
         # 🔥 使用 asyncio.to_thread 将阻塞的文件删除操作放到线程池执行
-        backup_type = backup.get("backup_type", "python")
-        if backup_type == "mongodump":
-            # mongodump 备份是目录，需要递归删除
+        if os.path.isdir(backup["file_path"]):
+            # mongodump 与流式备份是目录，需要递归删除
             await asyncio.to_thread(shutil.rmtree, backup["file_path"])
         else:
-            # Python 备份是单个文件
+            # 旧版 Python 备份是单个文件
             await asyncio.to_thread(os.remove, backup["file_path"])
     await db.database_backups.delete_one({"_id": ObjectId(backup_id)})
 
@@ -262,6 +338,46 @@ def _convert_date_fields(doc: dict) -> dict:
     return doc
 
 
+async def _import_ndjson(db, content: bytes, *, overwrite: bool, filename: str | None) -> Dict[str, Any]:
+    """导入 export_data(format="ndjson") 生成的文件：逐批解析，按集合有序写入"""
+    def _records():
+        raw = gzip.GzipFile(fileobj=io.BytesIO(content)) if content[:2] == b"\x1f\x8b" else io.BytesIO(content)
+        for line in raw:
+            if line.strip():
+                yield _streaming.decode_document(line.decode("utf-8"))
+
+    records = _records()
+    counts: Dict[str, int] = {}
+    cleared: set = set()
+    while True:
+        batch = await asyncio.to_thread(_streaming.next_batch, records, _streaming.DEFAULT_BATCH_SIZE)
+        if not batch:
+            break
+        grouped: Dict[str, List[dict]] = {}
+        for record in batch:
+            if "collection" in record:
+                grouped.setdefault(record["collection"], []).append(record["document"])
+        for coll_name, documents in grouped.items():
+            if overwrite and coll_name not in cleared:
+                deleted = await db[coll_name].delete_many({})
+                logger.info(f"🗑️ 清空集合 {coll_name}：删除 {deleted.deleted_count} 条文档")
+                cleared.add(coll_name)
+            await db[coll_name].insert_many(documents, ordered=True)
+            counts[coll_name] = counts.get(coll_name, 0) + len(documents)
+
+    for coll_name, count in counts.items():
+        logger.info(f"✅ 导入集合 {coll_name}：{count} 条文档")
+    return {
+        "mode": "multi_collection",
+        "collections": list(counts),
+        "total_collections": len(counts),
+        "total_inserted": sum(counts.values()),
+        "filename": filename,
+        "format": "ndjson",
+        "overwrite": overwrite,
+    }
+
+
 async def import_data(content: bytes, collection: str, *, format: str = "json", overwrite: bool = False, filename: str | None = None) -> Dict[str, Any]:
     """
     导入数据到数据库
@@ -272,6 +388,9 @@ async def import_data(content: bytes, collection: str, *, format: str = "json",
     """
     db = get_mongo_db()
 
+    if format.lower() == "ndjson":
+        return await _import_ndjson(db, content, overwrite=overwrite, filename=filename)
+
     if format.lower() == "json":
         # 🔥 使用 asyncio.to_thread 将阻塞的 JSON 解析放到线程池执行
         def _parse_json():
@@ -399,6 +518,27 @@ async def import_data(content: bytes, collection: str, *, format: str = "json",
         }
 
 
+_SENSITIVE_KEYWORDS = [
+    "api_key", "api_secret", "secret", "token", "password",
+    "client_secret", "webhook_secret", "private_key"
+]
+
+# 排除的字段（虽然包含敏感关键词，但不是敏感信息）
+_EXCLUDED_FIELDS = [
+    "max_tokens",      # LLM 配置：最大 token 数
+    "timeout",         # 超时时间
+    "retry_times",     # 重试次数
+    "context_length",  # 上下文长度
+]
+
+
+def _is_sensitive_field(key: str) -> bool:
+    key = key.lower()
+    if key in _EXCLUDED_FIELDS:
+        return False
+    return any(keyword in key for keyword in _SENSITIVE_KEYWORDS)
+
+
 def _sanitize_document(doc: Any) -> Any:
     """
     递归清空文档中的敏感字段
@@ -408,31 +548,11 @@ def _sanitize_document(doc: Any) -> Any:
 
     排除字段：max_tokens, timeout, retry_times 等配置字段（不是敏感信息）
     """
-    SENSITIVE_KEYWORDS = [
-        "api_key", "api_secret", "secret", "token", "password",
-        "client_secret", "webhook_secret", "private_key"
-    ]
-
-    # 排除的字段（虽然包含敏感关键词，但不是敏感信息）
-    EXCLUDED_FIELDS = [
-        "max_tokens",      # LLM 配置：最大 token 数
-        "timeout",         # 超时时间
-        "retry_times",     # 重试次数
-        "context_length",  # 上下文长度
-    ]
-
     if isinstance(doc, dict):
         sanitized = {}
         for k, v in doc.items():
-            # 检查是否在排除列表中
-            if k.lower() in [f.lower() for f in EXCLUDED_FIELDS]:
-                # 保留该字段
-                if isinstance(v, (dict, list)):
-                    sanitized[k] = _sanitize_document(v)
-                else:
-                    sanitized[k] = v
-            # 检查字段名是否包含敏感关键词（忽略大小写）
-            elif any(keyword in k.lower() for keyword in SENSITIVE_KEYWORDS):
+            # 检查字段名是否包含敏感关键词（忽略大小写，排除列表中的字段保留）
+            if _is_sensitive_field(k):
                 sanitized[k] = ""  # 清空敏感字段
             elif isinstance(v, (dict, list)):
                 sanitized[k] = _sanitize_document(v)  # 递归处理
@@ -445,9 +565,78 @@ def _sanitize_document(doc: Any) -> Any:
         return doc
 
 
-async def export_data(collections: Optional[List[str]] = None, *, export_dir: str, format: str = "json", sanitize: bool = False) -> str:
-    import pandas as pd
+def _skip_in_sanitized_export(collection_name: str) -> bool:
+    """脱敏导出时整体跳过的集合：users 以及名称本身包含敏感关键词的集合"""
+    return collection_name == "users" or _is_sensitive_field(collection_name)
+
+
+async def _iter_export_batches(db, collection_name: str, sanitize: bool, batch_size: int = _streaming.DEFAULT_BATCH_SIZE):
+    """分批读取待导出的文档（脱敏模式下逐条清空敏感字段）"""
+    # users 集合在脱敏模式下只导出空数组（保留结构，不导出实际用户数据）
+    if sanitize and _skip_in_sanitized_export(collection_name):
+        return
+    batch: List[dict] = []
+    async for doc in db[collection_name].find().batch_size(batch_size):
+        batch.append(_sanitize_document(doc) if sanitize else doc)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _export_stream(db, collections: List[str], file_path: str, fmt: str, sanitize: bool) -> str:
+    """
+    流式导出为 JSON 或 gzip 压缩的 NDJSON，每次只在内存中保留一批文档
+
+    - json:   与旧版结构相同（export_info + data），可直接用 import_data 导入
+    - ndjson: 首行为 export_info，之后每行 {"collection": 集合名, "document": 扩展 JSON 文档}
+    """
+    export_info = {
+        "created_at": datetime.utcnow().isoformat(),
+        "collections": collections,
+        "format": fmt,
+    }
+    if fmt == "json":
+        f = await asyncio.to_thread(open, file_path, "w", encoding="utf-8")
+    else:
+        f = await asyncio.to_thread(gzip.open, file_path, "wt", encoding="utf-8", compresslevel=_streaming.GZIP_LEVEL)
 
+    def _write_batch(collection_name: str, batch: List[dict], first: bool) -> None:
+        if fmt == "json":
+            text = ",\n".join(json.dumps(serialize_document(doc), ensure_ascii=False) for doc in batch)
+            f.write(("\n" if first else ",\n") + text)
+        else:
+            f.write("".join(
+                _streaming.encode_document({"collection": collection_name, "document": doc}) + "\n" for doc in batch
+            ))
+
+    try:
+        if fmt == "json":
+            header = '{"export_info": ' + json.dumps(export_info, ensure_ascii=False) + ', "data": {'
+        else:
+            header = json.dumps({"export_info": export_info}, ensure_ascii=False) + "\n"
+        await asyncio.to_thread(f.write, header)
+
+        for index, collection_name in enumerate(collections):
+            if fmt == "json":
+                prefix = ("," if index else "") + "\n" + json.dumps(collection_name, ensure_ascii=False) + ": ["
+                await asyncio.to_thread(f.write, prefix)
+            first = True
+            async for batch in _iter_export_batches(db, collection_name, sanitize):
+                await asyncio.to_thread(_write_batch, collection_name, batch, first)
+                first = False
+            if fmt == "json":
+                await asyncio.to_thread(f.write, "]")
+
+        if fmt == "json":
+            await asyncio.to_thread(f.write, "\n}}\n")
+    finally:
+        await asyncio.to_thread(f.close)
+    return file_path
+
+
+async def export_data(collections: Optional[List[str]] = None, *, export_dir: str, format: str = "json", sanitize: bool = False) -> str:
     # 🔥 使用异步数据库连接
     db = get_mongo_db()
     timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
@@ -459,46 +648,25 @@ async def export_data(collections: Optional[List[str]] = None, *, export_dir: st
 
     os.makedirs(export_dir, exist_ok=True)
 
+    fmt = format.lower()
+    if fmt == "json":
+        return await _export_stream(db, collections, os.path.join(export_dir, f"export_{timestamp}.json"), fmt, sanitize)
+    if fmt == "ndjson":
+        return await _export_stream(db, collections, os.path.join(export_dir, f"export_{timestamp}.ndjson.gz"), fmt, sanitize)
+    if fmt not in ("csv", "xlsx", "excel"):
+        raise Exception(f"不支持的导出格式: {format}")
+
+    import pandas as pd
+
+    # 表格格式需要构建完整的 DataFrame，仍整体读入内存；大集合请使用 json / ndjson
     all_data: Dict[str, List[dict]] = {}
     for collection_name in collections:
-        collection = db[collection_name]
         docs: List[dict] = []
-
-        # users 集合在脱敏模式下只导出空数组（保留结构，不导出实际用户数据）
-        if sanitize and collection_name == "users":
-            all_data[collection_name] = []
-            continue
-
-        # 🔥 异步迭代查询结果
-        async for doc in collection.find():
-            docs.append(serialize_document(doc))
+        async for batch in _iter_export_batches(db, collection_name, sanitize):
+            docs.extend(serialize_document(doc) for doc in batch)
         all_data[collection_name] = docs
 
-    # 如果启用脱敏，递归清空所有敏感字段
-    if sanitize:
-        all_data = _sanitize_document(all_data)
-
-    if format.lower() == "json":
-        filename = f"export_{timestamp}.json"
-        file_path = os.path.join(export_dir, filename)
-        export_data_dict = {
-            "export_info": {
-                "created_at": datetime.utcnow().isoformat(),
-                "collections": collections,
-                "format": format,
-            },
-            "data": all_data,
-        }
-
-        # 🔥 使用 asyncio.to_thread 将阻塞的文件 I/O 操作放到线程池执行
-        def _write_json():
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(export_data_dict, f, ensure_ascii=False, indent=2)
-
-        await asyncio.to_thread(_write_json)
-        return file_path
-
-    if format.lower() == "csv":
+    if fmt == "csv":
         filename = f"export_{timestamp}.csv"
         file_path = os.path.join(export_dir, filename)
         rows: List[dict] = []
@@ -518,20 +686,16 @@ async def export_data(collections: Optional[List[str]] = None, *, export_dir: st
         await asyncio.to_thread(_write_csv)
         return file_path
 
-    if format.lower() in ["xlsx", "excel"]:
-        filename = f"export_{timestamp}.xlsx"
-        file_path = os.path.join(export_dir, filename)
-
-        # 🔥 使用 asyncio.to_thread 将阻塞的文件 I/O 操作放到线程池执行
-        def _write_excel():
-            with pd.ExcelWriter(file_path, engine="openpyxl") as writer:
-                for collection_name, documents in all_data.items():
-                    df = pd.DataFrame(documents) if documents else pd.DataFrame()
-                    sheet = collection_name[:31]
-                    df.to_excel(writer, sheet_name=sheet, index=False)
-
-        await asyncio.to_thread(_write_excel)
-        return file_path
-
-    raise Exception(f"不支持的导出格式: {format}")
+    filename = f"export_{timestamp}.xlsx"
+    file_path = os.path.join(export_dir, filename)
 
+    # 🔥 使用 asyncio.to_thread 将阻塞的文件 I/O 操作放到线程池执行
+    def _write_excel():
+        with pd.ExcelWriter(file_path, engine="openpyxl") as writer:
+            for collection_name, documents in all_data.items():
+                df = pd.DataFrame(documents) if documents else pd.DataFrame()
+                sheet = collection_name[:31]
+                df.to_excel(writer, sheet_name=sheet, index=False)
+
+    await asyncio.to_thread(_write_excel)
+    return file_path
@@ -0,0 +1,399 @@
+"""
+Streaming backup / restore helpers.
+
+原先的 Python 备份与导出把整个集合读入列表，再用 json.dumps(indent=2) 一次性写出，
+备份 stock_daily_quotes 这类大集合需要数倍于集合大小的内存。这里改为流式处理：
+
+- 按 _id 升序分批读取游标，每批在线程池中序列化并追加写入 gzip 文件（与读取下一批重叠），
+  内存中最多保留两批文档
+- 每个集合拆分为若干分片文件（<集合>.<序号>.ndjson.gz 或 .bson.gz），分片写完后
+  将进度（文档数、最后一个 _id）记录到 manifest.json，作为断点
+- 中断后以 resume=True 重新执行：删除未记录的残留分片，从断点 _id 之后继续
+- 恢复时按分片顺序逐批读取（预读下一批），使用有序 insert_many 写入
+
+NDJSON 每行一个文档，ObjectId / datetime 编码为扩展 JSON（{"$oid": ...} / {"$date": ...}），
+其它 BSON 类型交给 bson.json_util 处理，恢复时还原为原类型。
+"""
+from __future__ import annotations
+
+import asyncio
+import glob
+import gzip
+import json
+import logging
+import os
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import bson
+from bson import ObjectId, json_util
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+SUPPORTED_FORMATS = ("ndjson", "bson")
+
+# 每次从游标读取、写入文件的文档数
+DEFAULT_BATCH_SIZE = 1000
+# 每个分片文件的文档数（断点粒度）
+DEFAULT_CHUNK_DOCS = 200_000
+# gzip 压缩级别：备份以吞吐为主
+GZIP_LEVEL = 5
+
+ProgressCallback = Callable[[str, int, Optional[int]], Any]
+
+
+# ---- 文档编码 ----
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return {"$oid": str(value)}
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    return json_util.default(value)
+
+
+def _object_hook(obj: Dict[str, Any]) -> Any:
+    if len(obj) <= 2:
+        key = next(iter(obj), "")
+        if key.startswith("$"):
+            if key == "$oid":
+                return ObjectId(obj["$oid"])
+            if key == "$date" and isinstance(obj["$date"], str):
+                return datetime.fromisoformat(obj["$date"])
+            return json_util.object_hook(obj)
+    return obj
+
+
+# 复用编码器/解码器实例：json.dumps/json.loads 带自定义参数时每次调用都会新建一个
+_encoder = json.JSONEncoder(default=_json_default, ensure_ascii=False)
+_decoder = json.JSONDecoder(object_hook=_object_hook)
+
+
+def encode_document(doc: Dict[str, Any]) -> str:
+    """文档编码为一行扩展 JSON"""
+    return _encoder.encode(doc)
+
+
+def decode_document(line: str) -> Dict[str, Any]:
+    """encode_document 的逆操作"""
+    return _decoder.decode(line)
+
+
+# ---- manifest ----
+
+def read_manifest(backup_path: str) -> Dict[str, Any]:
+    with open(os.path.join(backup_path, MANIFEST_NAME), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_manifest(backup_path: str, manifest: Dict[str, Any]) -> None:
+    # 先写临时文件再替换，中断时 manifest 始终是完整的
+    path = os.path.join(backup_path, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def _chunk_filename(collection: str, index: int, fmt: str) -> str:
+    return f"{collection}.{index:05d}.{fmt}.gz"
+
+
+# ---- 写入 ----
+
+class _ChunkWriter:
+    """写入一个集合的分片文件（只在线程池中调用）"""
+
+    def __init__(self, backup_path: str, collection: str, fmt: str, start_index: int):
+        self.backup_path = backup_path
+        self.collection = collection
+        self.fmt = fmt
+        self.index = start_index
+        self.count = 0
+        self._file = None
+        self.filename: Optional[str] = None
+
+    def write(self, docs: List[Dict[str, Any]]) -> None:
+        if self._file is None:
+            self.filename = _chunk_filename(self.collection, self.index, self.fmt)
+            self._file = gzip.open(os.path.join(self.backup_path, self.filename), "wb", compresslevel=GZIP_LEVEL)
+        if self.fmt == "bson":
+            self._file.write(b"".join(bson.encode(doc) for doc in docs))
+        else:
+            self._file.write(("\n".join(encode_document(doc) for doc in docs) + "\n").encode("utf-8"))
+        self.count += len(docs)
+
+    def close(self) -> None:
+        """关闭当前分片但不提交（备份出错时调用）"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def finish(self) -> Optional[str]:
+        """关闭当前分片，返回文件名（没有写入内容时返回 None）"""
+        if self._file is None:
+            return None
+        self._file.close()
+        filename = self.filename
+        self._file = None
+        self.filename = None
+        self.index += 1
+        self.count = 0
+        return filename
+
+
+def _remove_uncommitted_chunks(backup_path: str, collection: str, committed: List[str]) -> None:
+    for path in glob.glob(os.path.join(backup_path, glob.escape(collection) + ".*.gz")):
+        if os.path.basename(path) not in committed:
+            os.remove(path)
+
+
+async def _estimate_count(collection) -> Optional[int]:
+    try:
+        return await collection.estimated_document_count()
+    except Exception:
+        return None
+
+
+async def dump_collection(
+    db,
+    collection_name: str,
+    backup_path: str,
+    manifest: Dict[str, Any],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    chunk_docs: int = DEFAULT_CHUNK_DOCS,
+    progress: Optional[ProgressCallback] = None,
+    on_checkpoint: Optional[Callable[[Dict[str, Any]], Any]] = None,
+) -> Dict[str, Any]:
+    """
+    流式备份一个集合，每个分片完成后更新 manifest 断点
+
+    Returns:
+        该集合在 manifest 中的状态
+    """
+    fmt = manifest["format"]
+    state = manifest["collections"].setdefault(collection_name, {
+        "status": "pending", "documents": 0, "chunks": [], "last_id": None,
+    })
+    if state["status"] == "completed":
+        return state
+
+    collection = db[collection_name]
+    await asyncio.to_thread(_remove_uncommitted_chunks, backup_path, collection_name, state["chunks"])
+    state["status"] = "in_progress"
+    state["estimated_total"] = await _estimate_count(collection)
+
+    query: Dict[str, Any] = {}
+    if state["last_id"] is not None:
+        query = {"_id": {"$gt": decode_document(state["last_id"])["_id"]}}
+        logger.info(f"⏩ 从断点继续备份 {collection_name}（已完成 {state['documents']} 条）")
+
+    writer = _ChunkWriter(backup_path, collection_name, fmt, start_index=len(state["chunks"]))
+    written = 0  # 当前分片已写入、尚未记录断点的文档数
+
+    last_doc: Optional[Dict[str, Any]] = None
+
+    async def _checkpoint() -> None:
+        nonlocal written
+        filename = await asyncio.to_thread(writer.finish)
+        if filename:
+            state["chunks"].append(filename)
+            state["documents"] += written
+            state["last_id"] = encode_document({"_id": last_doc["_id"]})
+        written = 0
+        await asyncio.to_thread(_write_manifest, backup_path, manifest)
+        if on_checkpoint:
+            await on_checkpoint(manifest)
+
+    # 上一批在线程池中编码写入的同时读取下一批，内存中最多两批文档
+    pending: Optional[asyncio.Future] = None
+
+    async def _flush() -> None:
+        nonlocal pending, written
+        if pending is None:
+            return
+        count = await pending
+        pending = None
+        written += count
+        if progress:
+            progress(collection_name, state["documents"] + written, state["estimated_total"])
+        if writer.count >= chunk_docs:
+            await _checkpoint()
+
+    def _write(docs: List[Dict[str, Any]]) -> int:
+        writer.write(docs)
+        return len(docs)
+
+    cursor = collection.find(query).sort("_id", 1).batch_size(batch_size)
+    batch: List[Dict[str, Any]] = []
+    try:
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) < batch_size:
+                continue
+            await _flush()
+            last_doc = batch[-1]
+            pending = asyncio.ensure_future(asyncio.to_thread(_write, batch))
+            batch = []
+
+        await _flush()
+        if batch:
+            last_doc = batch[-1]
+            pending = asyncio.ensure_future(asyncio.to_thread(_write, batch))
+            await _flush()
+    except BaseException:
+        # 未记录断点的分片在续传时会被删除，这里只需等待写入结束并关闭文件
+        if pending is not None:
+            await asyncio.gather(pending, return_exceptions=True)
+        await asyncio.to_thread(writer.close)
+        raise
+    state["status"] = "completed"
+    await _checkpoint()
+    logger.info(f"✅ 集合 {collection_name} 备份完成：{state['documents']} 条，{len(state['chunks'])} 个分片")
+    return state
+
+
+async def stream_backup(
+    db,
+    backup_path: str,
+    collections: List[str],
+    *,
+    backup_id: str,
+    name: str,
+    fmt: str = "ndjson",
+    resume: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    chunk_docs: int = DEFAULT_CHUNK_DOCS,
+    progress: Optional[ProgressCallback] = None,
+    on_checkpoint: Optional[Callable[[Dict[str, Any]], Any]] = None,
+) -> Dict[str, Any]:
+    """
+    将多个集合流式备份到 backup_path 目录
+
+    Args:
+        fmt: "ndjson"（gzip 压缩的扩展 JSON 行）或 "bson"（gzip 压缩的 BSON 序列）
+        resume: 读取目录中已有的 manifest，跳过已完成的集合与分片
+        progress: 每批写入后回调 (集合名, 已备份条数, 预估总数)
+        on_checkpoint: 每个分片完成后以 manifest 为参数调用的协程函数
+
+    Returns:
+        最终的 manifest
+    """
+    if resume:
+        manifest = await asyncio.to_thread(read_manifest, backup_path)
+        for collection_name in collections:
+            manifest["collections"].setdefault(collection_name, {
+                "status": "pending", "documents": 0, "chunks": [], "last_id": None,
+            })
+    else:
+        if fmt not in SUPPORTED_FORMATS:
+            raise ValueError(f"不支持的备份格式: {fmt}")
+        os.makedirs(backup_path, exist_ok=True)
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "backup_id": backup_id,
+            "name": name,
+            "format": fmt,
+            "created_at": datetime.utcnow().isoformat(),
+            "status": "in_progress",
+            "collections": {c: {"status": "pending", "documents": 0, "chunks": [], "last_id": None}
+                            for c in collections},
+        }
+        await asyncio.to_thread(_write_manifest, backup_path, manifest)
+
+    manifest["status"] = "in_progress"
+    for collection_name in list(manifest["collections"]):
+        await dump_collection(
+            db, collection_name, backup_path, manifest,
+            batch_size=batch_size, chunk_docs=chunk_docs,
+            progress=progress, on_checkpoint=on_checkpoint,
+        )
+
+    manifest["status"] = "completed"
+    manifest["completed_at"] = datetime.utcnow().isoformat()
+    await asyncio.to_thread(_write_manifest, backup_path, manifest)
+    return manifest
+
+
+# ---- 读取与恢复 ----
+
+def _iter_chunk(path: str, fmt: str) -> Iterator[Dict[str, Any]]:
+    with gzip.open(path, "rb") as f:
+        if fmt == "bson":
+            yield from bson.decode_file_iter(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield decode_document(line.decode("utf-8"))
+
+
+def iter_backup_documents(backup_path: str, collection_name: str, manifest: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """按分片顺序逐条读取一个集合的备份文档（同步迭代器）"""
+    manifest = manifest or read_manifest(backup_path)
+    state = manifest["collections"][collection_name]
+    for filename in state["chunks"]:
+        yield from _iter_chunk(os.path.join(backup_path, filename), manifest["format"])
+
+
+def next_batch(iterator: Iterator[Dict[str, Any]], size: int) -> List[Dict[str, Any]]:
+    """从同步迭代器取下一批（供 asyncio.to_thread 调用）"""
+    return list(islice(iterator, size))
+
+
+async def stream_restore(
+    db,
+    backup_path: str,
+    *,
+    collections: Optional[List[str]] = None,
+    overwrite: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, int]:
+    """
+    从流式备份恢复集合：逐批读取分片，使用有序 insert_many 写入
+
+    Args:
+        collections: 只恢复这些集合（默认全部）
+        overwrite: 写入前清空目标集合
+
+    Returns:
+        {集合名: 写入条数}
+    """
+    manifest = await asyncio.to_thread(read_manifest, backup_path)
+    names = collections or list(manifest["collections"])
+    restored: Dict[str, int] = {}
+    for collection_name in names:
+        state = manifest["collections"].get(collection_name)
+        if state is None:
+            raise ValueError(f"备份中不包含集合: {collection_name}")
+        if state["status"] != "completed":
+            logger.warning(f"⚠️ 集合 {collection_name} 的备份未完成，只恢复已完成的 {state['documents']} 条")
+
+        target = db[collection_name]
+        if overwrite:
+            await target.delete_many({})
+
+        iterator = iter_backup_documents(backup_path, collection_name, manifest)
+        total = 0
+        # 写入当前批的同时在线程池中解码下一批
+        prefetch = asyncio.ensure_future(asyncio.to_thread(next_batch, iterator, batch_size))
+        try:
+            while True:
+                batch = await prefetch
+                if not batch:
+                    break
+                prefetch = asyncio.ensure_future(asyncio.to_thread(next_batch, iterator, batch_size))
+                await target.insert_many(batch, ordered=True)
+                total += len(batch)
+                if progress:
+                    progress(collection_name, total, state["documents"])
+        except BaseException:
+            await asyncio.gather(prefetch, return_exceptions=True)
+            raise
+        restored[collection_name] = total
+        logger.info(f"✅ 集合 {collection_name} 恢复完成：{total} 条")
+    return restored
@@ -138,7 +138,7 @@ class DatabaseService:
                 user_id=user_id
             )
         else:
-            logger.warning("⚠️ mongodump 不可用，使用 Python 备份（较慢）")
+            logger.warning("⚠️ mongodump 不可用，使用 Python 流式备份（较慢）")
             logger.warning("💡 建议安装 MongoDB Database Tools 以获得更快的备份速度")
             return await _db_backups.create_backup(
                 name=name,
@@ -151,6 +151,14 @@ class DatabaseService:
         """获取备份列表（委托子模块）"""
         return await _db_backups.list_backups()
 
+    async def resume_backup(self, backup_id: str) -> Dict[str, Any]:
+        """从断点继续未完成的流式备份（委托子模块）"""
+        return await _db_backups.resume_backup(backup_id)
+
+    async def restore_backup(self, backup_id: str, collections: List[str] = None, overwrite: bool = False) -> Dict[str, Any]:
+        """从备份恢复数据（委托子模块）"""
+        return await _db_backups.restore_backup(backup_id, collections or None, overwrite=overwrite)
+
     async def delete_backup(self, backup_id: str) -> None:
         """删除备份（委托子模块）"""
         await _db_backups.delete_backup(backup_id)
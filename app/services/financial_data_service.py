@@ -6,7 +6,6 @@
 import logging
 from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional
-import pandas as pd
 from pymongo import ReplaceOne
 
 from app.core.database import get_mongo_db
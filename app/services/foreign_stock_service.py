@@ -17,6 +17,7 @@ from tradingagents.dataflows.cache import get_cache
 
 # 复用现有数据源提供者
 from tradingagents.dataflows.providers.hk.hk_stock import HKStockProvider
+from tradingagents.utils.single_flight import async_data_fetch_flight, async_single_flight
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +57,8 @@ class ForeignStockService:
 
         logger.info("✅ ForeignStockService 初始化完成（已启用请求去重）")
     
+    # 🔥 跨实例的请求合并：路由每次请求都会新建服务实例，实例内的锁无法覆盖并发请求
+    @async_single_flight(async_data_fetch_flight, "foreign_quote")
     async def get_quote(self, market: str, code: str, force_refresh: bool = False) -> Dict:
         """
         获取实时行情
@@ -100,6 +103,7 @@ class ForeignStockService:
         else:
             raise ValueError(f"不支持的市场类型: {market}")
     
+    @async_single_flight(async_data_fetch_flight, "foreign_kline")
     async def get_kline(self, market: str, code: str, period: str = 'day', 
                        limit: int = 120, force_refresh: bool = False) -> List[Dict]:
         """
@@ -130,13 +134,14 @@ class ForeignStockService:
         """
         # 1. 检查缓存（除非强制刷新）
         if not force_refresh:
-            cache_key = self.cache.find_cached_stock_data(
+            cache_key = await asyncio.to_thread(
+                self.cache.find_cached_stock_data,
                 symbol=code,
                 data_source="hk_realtime_quote"
             )
 
             if cache_key:
-                cached_data = self.cache.load_stock_data(cache_key)
+                cached_data = await asyncio.to_thread(self.cache.load_stock_data, cache_key)
                 if cached_data:
                     logger.info(f"⚡ 从缓存获取港股行情: {code}")
                     return self._parse_cached_data(cached_data, 'HK', code)
@@ -148,12 +153,13 @@ class ForeignStockService:
         async with lock:
             # 🔥 再次检查缓存（可能在等待锁的过程中，其他请求已经完成并缓存了数据）
             # 即使 force_refresh=True，也要检查是否有其他并发请求刚刚完成
-            cache_key = self.cache.find_cached_stock_data(
+            cache_key = await asyncio.to_thread(
+                self.cache.find_cached_stock_data,
                 symbol=code,
                 data_source="hk_realtime_quote"
             )
             if cache_key:
-                cached_data = self.cache.load_stock_data(cache_key)
+                cached_data = await asyncio.to_thread(self.cache.load_stock_data, cache_key)
                 if cached_data:
                     # 检查缓存时间，如果是最近1秒内的，说明是并发请求刚刚缓存的
                     try:
@@ -227,7 +233,8 @@ class ForeignStockService:
             formatted_data = self._format_hk_quote(quote_data, code, data_source)
 
             # 6. 保存到缓存
-            self.cache.save_stock_data(
+            await asyncio.to_thread(
+                self.cache.save_stock_data,
                 symbol=code,
                 data=json.dumps(formatted_data, ensure_ascii=False),
                 data_source="hk_realtime_quote"
@@ -301,13 +308,14 @@ class ForeignStockService:
         """
         # 1. 检查缓存（除非强制刷新）
         if not force_refresh:
-            cache_key = self.cache.find_cached_stock_data(
+            cache_key = await asyncio.to_thread(
+                self.cache.find_cached_stock_data,
                 symbol=code,
                 data_source="us_realtime_quote"
             )
 
             if cache_key:
-                cached_data = self.cache.load_stock_data(cache_key)
+                cached_data = await asyncio.to_thread(self.cache.load_stock_data, cache_key)
                 if cached_data:
                     logger.info(f"⚡ 从缓存获取美股行情: {code}")
                     return self._parse_cached_data(cached_data, 'US', code)
@@ -318,12 +326,13 @@ class ForeignStockService:
 
         async with lock:
             # 🔥 再次检查缓存（可能在等待锁的过程中，其他请求已经完成并缓存了数据）
-            cache_key = self.cache.find_cached_stock_data(
+            cache_key = await asyncio.to_thread(
+                self.cache.find_cached_stock_data,
                 symbol=code,
                 data_source="us_realtime_quote"
             )
             if cache_key:
-                cached_data = self.cache.load_stock_data(cache_key)
+                cached_data = await asyncio.to_thread(self.cache.load_stock_data, cache_key)
                 if cached_data:
                     # 检查缓存时间，如果是最近1秒内的，说明是并发请求刚刚缓存的
                     try:
@@ -412,7 +421,8 @@ class ForeignStockService:
             }
 
             # 6. 保存到缓存
-            self.cache.save_stock_data(
+            await asyncio.to_thread(
+                self.cache.save_stock_data,
                 symbol=code,
                 data=json.dumps(formatted_data, ensure_ascii=False),
                 data_source="us_realtime_quote"
@@ -533,13 +543,14 @@ class ForeignStockService:
         """
         # 1. 检查缓存（除非强制刷新）
         if not force_refresh:
-            cache_key = self.cache.find_cached_stock_data(
+            cache_key = await asyncio.to_thread(
+                self.cache.find_cached_stock_data,
                 symbol=code,
                 data_source="hk_basic_info"
             )
 
             if cache_key:
-                cached_data = self.cache.load_stock_data(cache_key)
+                cached_data = await asyncio.to_thread(self.cache.load_stock_data, cache_key)
                 if cached_data:
                     logger.info(f"⚡ 从缓存获取港股基础信息: {code}")
                     return self._parse_cached_data(cached_data, 'HK', code)
@@ -596,7 +607,8 @@ class ForeignStockService:
         formatted_data = self._format_hk_info(info_data, code, data_source)
 
         # 5. 保存到缓存
-        self.cache.save_stock_data(
+        await asyncio.to_thread(
+            self.cache.save_stock_data,
             symbol=code,
             data=json.dumps(formatted_data, ensure_ascii=False),
             data_source="hk_basic_info"
@@ -612,13 +624,14 @@ class ForeignStockService:
         """
         # 1. 检查缓存（除非强制刷新）
         if not force_refresh:
-            cache_key = self.cache.find_cached_stock_data(
+            cache_key = await asyncio.to_thread(
+                self.cache.find_cached_stock_data,
                 symbol=code,
                 data_source="us_basic_info"
             )
 
             if cache_key:
-                cached_data = self.cache.load_stock_data(cache_key)
+                cached_data = await asyncio.to_thread(self.cache.load_stock_data, cache_key)
                 if cached_data:
                     logger.info(f"⚡ 从缓存获取美股基础信息: {code}")
                     return self._parse_cached_data(cached_data, 'US', code)
@@ -699,7 +712,8 @@ class ForeignStockService:
         }
 
         # 5. 保存到缓存
-        self.cache.save_stock_data(
+        await asyncio.to_thread(
+            self.cache.save_stock_data,
             symbol=code,
             data=json.dumps(formatted_data, ensure_ascii=False),
             data_source="us_basic_info"
@@ -716,13 +730,14 @@ class ForeignStockService:
         # 1. 检查缓存（除非强制刷新）
         cache_key_str = f"hk_kline_{period}_{limit}"
         if not force_refresh:
-            cache_key = self.cache.find_cached_stock_data(
+            cache_key = await asyncio.to_thread(
+                self.cache.find_cached_stock_data,
                 symbol=code,
                 data_source=cache_key_str
             )
 
             if cache_key:
-                cached_data = self.cache.load_stock_data(cache_key)
+                cached_data = await asyncio.to_thread(self.cache.load_stock_data, cache_key)
                 if cached_data:
                     logger.info(f"⚡ 从缓存获取港股K线: {code}")
                     return self._parse_cached_kline(cached_data)
@@ -776,7 +791,8 @@ class ForeignStockService:
             raise Exception(f"无法获取港股{code}的K线数据：所有数据源均失败")
 
         # 4. 保存到缓存
-        self.cache.save_stock_data(
+        await asyncio.to_thread(
+            self.cache.save_stock_data,
             symbol=code,
             data=json.dumps(kline_data, ensure_ascii=False),
             data_source=cache_key_str
@@ -793,13 +809,14 @@ class ForeignStockService:
         # 1. 检查缓存（除非强制刷新）
         cache_key_str = f"us_kline_{period}_{limit}"
         if not force_refresh:
-            cache_key = self.cache.find_cached_stock_data(
+            cache_key = await asyncio.to_thread(
+                self.cache.find_cached_stock_data,
                 symbol=code,
                 data_source=cache_key_str
             )
 
             if cache_key:
-                cached_data = self.cache.load_stock_data(cache_key)
+                cached_data = await asyncio.to_thread(self.cache.load_stock_data, cache_key)
                 if cached_data:
                     logger.info(f"⚡ 从缓存获取美股K线: {code}")
                     return self._parse_cached_kline(cached_data)
@@ -853,7 +870,8 @@ class ForeignStockService:
             raise Exception(f"无法获取美股{code}的K线数据：所有数据源均失败")
 
         # 4. 保存到缓存
-        self.cache.save_stock_data(
+        await asyncio.to_thread(
+            self.cache.save_stock_data,
             symbol=code,
             data=json.dumps(kline_data, ensure_ascii=False),
             data_source=cache_key_str
@@ -1219,13 +1237,14 @@ class ForeignStockService:
 
         # 1. 尝试从缓存获取
         cache_key_str = f"hk_news_{days}_{limit}"
-        cache_key = self.cache.find_cached_stock_data(
+        cache_key = await asyncio.to_thread(
+            self.cache.find_cached_stock_data,
             symbol=code,
             data_source=cache_key_str
         )
 
         if cache_key:
-            cached_data = self.cache.load_stock_data(cache_key)
+            cached_data = await asyncio.to_thread(self.cache.load_stock_data, cache_key)
             if cached_data:
                 logger.info(f"⚡ 从缓存获取港股新闻: {code}")
                 return json.loads(cached_data)
@@ -1289,7 +1308,8 @@ class ForeignStockService:
         }
 
         # 5. 缓存数据
-        self.cache.save_stock_data(
+        await asyncio.to_thread(
+            self.cache.save_stock_data,
             symbol=code,
             data=json.dumps(result, ensure_ascii=False),
             data_source=cache_key_str
@@ -1315,13 +1335,14 @@ class ForeignStockService:
 
         # 1. 尝试从缓存获取
         cache_key_str = f"us_news_{days}_{limit}"
-        cache_key = self.cache.find_cached_stock_data(
+        cache_key = await asyncio.to_thread(
+            self.cache.find_cached_stock_data,
             symbol=code,
             data_source=cache_key_str
         )
 
         if cache_key:
-            cached_data = self.cache.load_stock_data(cache_key)
+            cached_data = await asyncio.to_thread(self.cache.load_stock_data, cache_key)
             if cached_data:
                 logger.info(f"⚡ 从缓存获取美股新闻: {code}")
                 return json.loads(cached_data)
@@ -1385,7 +1406,8 @@ class ForeignStockService:
         }
 
         # 5. 缓存数据
-        self.cache.save_stock_data(
+        await asyncio.to_thread(
+            self.cache.save_stock_data,
             symbol=code,
             data=json.dumps(result, ensure_ascii=False),
             data_source=cache_key_str
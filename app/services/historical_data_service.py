@@ -6,12 +6,15 @@
 import asyncio
 import logging
 from datetime import datetime, date
-from typing import Dict, Any, List, Optional, Union
-import pandas as pd
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Union
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from app.core.database import get_database
 
+# 传入的数据本身就是 DataFrame，pandas 无需在路由注册时导入
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = logging.getLogger(__name__)
 
 
@@ -70,10 +73,11 @@ class HistoricalDataService:
     async def save_historical_data(
         self,
         symbol: str,
-        data: pd.DataFrame,
+        data: "pd.DataFrame",
         data_source: str,
         market: str = "CN",
-        period: str = "daily"
+        period: str = "daily",
+        convert_units: bool = True
     ) -> int:
         """
         保存历史数据到数据库
@@ -84,6 +88,7 @@ class HistoricalDataService:
             data_source: 数据源 (tushare/akshare/baostock)
             market: 市场类型 (CN/HK/US)
             period: 数据周期 (daily/weekly/monthly)
+            convert_units: 是否做数据源单位换算；由库中日线派生的数据已是元/股，传 False
 
         Returns:
             保存的记录数量
@@ -104,7 +109,7 @@ class HistoricalDataService:
             # ⏱️ 性能监控：单位转换
             convert_start = datetime.now()
             # 🔥 在 DataFrame 层面做单位转换（向量化操作，比逐行快得多）
-            if data_source == "tushare":
+            if data_source == "tushare" and convert_units:
                 # 成交额：千元 -> 元
                 if 'amount' in data.columns:
                     data['amount'] = data['amount'] * 1000
@@ -248,7 +253,7 @@ class HistoricalDataService:
     def _standardize_record(
         self,
         symbol: str,
-        row: pd.Series,
+        row: "pd.Series",
         data_source: str,
         market: str,
         period: str = "daily",
@@ -266,8 +271,8 @@ class HistoricalDataService:
         # 如果列中有日期，优先使用列中的日期
         if date_from_column is not None:
             trade_date = self._format_date(date_from_column)
-        # 如果列中没有日期，且索引是日期类型，才使用索引
-        elif date_index is not None and isinstance(date_index, (date, datetime, pd.Timestamp)):
+        # 如果列中没有日期，且索引是日期类型，才使用索引（pd.Timestamp 是 datetime 子类）
+        elif date_index is not None and isinstance(date_index, (date, datetime)):
             trade_date = self._format_date(date_index)
         # 否则使用当前日期
         else:
@@ -363,6 +368,7 @@ class HistoricalDataService:
     
     def _safe_float(self, value) -> Optional[float]:
         """安全转换为浮点数"""
+        import pandas as pd
         if value is None or value == '' or pd.isna(value):
             return None
         try:
@@ -5,15 +5,25 @@
 
 import logging
 import os
+import shutil
 import zipfile
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any
 import re
 import json
 
+from app.services.log_reader import LogIndex, iter_lines, read_lines_forward, tail_lines
+
 logger = logging.getLogger("webapi")
 
+# 每次请求最多为索引处理的新增字节数，超大文件的首次索引分摊到多次请求
+INDEX_REFRESH_BYTES = 8 * 1024 * 1024
+# 索引目录（位于日志目录下）
+INDEX_DIR_NAME = ".index"
+
+_TIME_RE = re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}')
+
 
 class LogExportService:
     """日志导出服务"""
@@ -26,6 +36,7 @@ class LogExportService:
             log_dir: 日志文件目录
         """
         self.log_dir = Path(log_dir)
+        self.index = LogIndex(self.log_dir / INDEX_DIR_NAME)
         logger.info(f"🔍 [LogExportService] 初始化日志导出服务")
         logger.info(f"🔍 [LogExportService] 配置的日志目录: {log_dir}")
         logger.info(f"🔍 [LogExportService] 解析后的日志目录: {self.log_dir}")
@@ -125,6 +136,46 @@ class LogExportService:
         else:
             return "other"
 
+    @staticmethod
+    def _build_filter(
+        level: Optional[str] = None,
+        keyword: Optional[str] = None,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None
+    ) -> Optional[Callable[[str], bool]]:
+        """构造逐行过滤函数，没有过滤条件时返回 None"""
+        if not (level or keyword or start_time or end_time):
+            return None
+        level_upper = level.upper() if level else None
+        keyword_lower = keyword.lower() if keyword else None
+
+        def _match(line: str) -> bool:
+            if level_upper and level_upper not in line:
+                return False
+            if keyword_lower and keyword_lower not in line.lower():
+                return False
+            # 时间过滤（简单实现，假设日志格式为 YYYY-MM-DD HH:MM:SS）
+            if start_time or end_time:
+                time_match = _TIME_RE.search(line)
+                if time_match:
+                    log_time = time_match.group()
+                    if start_time and log_time < start_time:
+                        return False
+                    if end_time and log_time > end_time:
+                        return False
+            return True
+
+        return _match
+
+    def _file_summary(self, file_path: Path) -> Dict[str, Any]:
+        """从增量索引获取文件的总行数与级别计数（未索引完时按比例估算总行数）"""
+        entry = self.index.refresh(file_path, max_bytes=INDEX_REFRESH_BYTES)
+        total = entry["lines"]
+        approximate = not entry["complete"]
+        if approximate and entry["indexed_bytes"]:
+            total = int(total * entry["size"] / entry["indexed_bytes"])
+        return {"total_lines": total, "approximate": approximate, "levels": dict(entry["levels"])}
+
     def read_log_file(
         self,
         filename: str,
@@ -132,11 +183,15 @@ class LogExportService:
         level: Optional[str] = None,
         keyword: Optional[str] = None,
         start_time: Optional[str] = None,
-        end_time: Optional[str] = None
+        end_time: Optional[str] = None,
+        before: Optional[int] = None,
+        after: Optional[int] = None
     ) -> Dict[str, Any]:
         """
-        读取日志文件内容（支持过滤）
-        
+        读取日志文件内容（支持过滤与按字节偏移翻页）
+
+        默认从文件末尾向前读取；不会把整个文件读入内存。
+
         Args:
             filename: 日志文件名
             lines: 读取的行数（从末尾开始）
@@ -144,9 +199,11 @@ class LogExportService:
             keyword: 关键词过滤
             start_time: 开始时间（ISO格式）
             end_time: 结束时间（ISO格式）
-            
+            before: 读取该偏移之前的行（上一页，取自 cursor.before）
+            after: 读取该偏移之后的行（下一页/新增内容，取自 cursor.after）
+
         Returns:
-            日志内容和统计信息
+            日志内容、统计信息与翻页游标
         """
         file_path = self.log_dir / filename
         
@@ -154,60 +211,37 @@ class LogExportService:
             raise FileNotFoundError(f"日志文件不存在: {filename}")
         
         try:
-            # 读取文件内容
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                all_lines = f.readlines()
-            
-            # 从末尾开始读取指定行数
-            recent_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
-            
-            # 应用过滤器
-            filtered_lines = []
+            predicate = self._build_filter(level, keyword, start_time, end_time)
+            if after is not None:
+                page = read_lines_forward(file_path, after, lines, predicate)
+            else:
+                page = tail_lines(file_path, lines, predicate, before=before)
+
+            summary = self._file_summary(file_path)
+            scanned = page["scanned"]
+            # 级别计数针对本次扫描过的行；file_levels 为整个文件的计数
             stats = {
-                "total_lines": len(all_lines),
-                "filtered_lines": 0,
-                "error_count": 0,
-                "warning_count": 0,
-                "info_count": 0,
-                "debug_count": 0
+                "total_lines": summary["total_lines"],
+                "total_lines_approximate": summary["approximate"],
+                "filtered_lines": len(page["lines"]),
+                "scanned_lines": scanned.lines,
+                "error_count": scanned.levels["ERROR"],
+                "warning_count": scanned.levels["WARNING"],
+                "info_count": scanned.levels["INFO"],
+                "debug_count": scanned.levels["DEBUG"],
+                "file_levels": summary["levels"],
             }
-            
-            for line in recent_lines:
-                # 统计日志级别
-                if "ERROR" in line:
-                    stats["error_count"] += 1
-                elif "WARNING" in line:
-                    stats["warning_count"] += 1
-                elif "INFO" in line:
-                    stats["info_count"] += 1
-                elif "DEBUG" in line:
-                    stats["debug_count"] += 1
-                
-                # 应用过滤条件
-                if level and level.upper() not in line:
-                    continue
-                
-                if keyword and keyword.lower() not in line.lower():
-                    continue
-                
-                # 时间过滤（简单实现，假设日志格式为 YYYY-MM-DD HH:MM:SS）
-                if start_time or end_time:
-                    time_match = re.search(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}', line)
-                    if time_match:
-                        log_time = time_match.group()
-                        if start_time and log_time < start_time:
-                            continue
-                        if end_time and log_time > end_time:
-                            continue
-                
-                filtered_lines.append(line.rstrip())
-            
-            stats["filtered_lines"] = len(filtered_lines)
-            
+
             return {
                 "filename": filename,
-                "lines": filtered_lines,
-                "stats": stats
+                "lines": page["lines"],
+                "stats": stats,
+                "cursor": {
+                    "before": page["start"],
+                    "after": page["end"],
+                    "has_more_before": page["start"] > 0,
+                    "has_more_after": page.get("has_more_after", False),
+                },
             }
             
         except Exception as e:
@@ -251,6 +285,7 @@ class LogExportService:
             
             # 生成导出文件名
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            predicate = self._build_filter(level=level, start_time=start_time, end_time=end_time)
             
             if format == "zip":
                 export_path = export_dir / f"logs_export_{timestamp}.zip"
@@ -258,21 +293,11 @@ class LogExportService:
                 # 创建ZIP文件
                 with zipfile.ZipFile(export_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
                     for file_path in files_to_export:
-                        # 如果有过滤条件，先过滤再添加
-                        if level or start_time or end_time:
-                            filtered_data = self.read_log_file(
-                                file_path.name,
-                                lines=999999,  # 读取所有行
-                                level=level,
-                                start_time=start_time,
-                                end_time=end_time
-                            )
-                            # 将过滤后的内容写入临时文件
-                            temp_file = export_dir / f"temp_{file_path.name}"
-                            with open(temp_file, 'w', encoding='utf-8') as f:
-                                f.write('\n'.join(filtered_data['lines']))
-                            zipf.write(temp_file, file_path.name)
-                            temp_file.unlink()  # 删除临时文件
+                        # 如果有过滤条件，逐行过滤后直接写入压缩包
+                        if predicate:
+                            with zipf.open(file_path.name, 'w') as zf:
+                                for line in iter_lines(file_path, predicate):
+                                    zf.write((line + '\n').encode('utf-8'))
                         else:
                             zipf.write(file_path, file_path.name)
                 
@@ -289,18 +314,12 @@ class LogExportService:
                         outf.write(f"文件: {file_path.name}\n")
                         outf.write(f"{'='*80}\n\n")
                         
-                        if level or start_time or end_time:
-                            filtered_data = self.read_log_file(
-                                file_path.name,
-                                lines=999999,
-                                level=level,
-                                start_time=start_time,
-                                end_time=end_time
-                            )
-                            outf.write('\n'.join(filtered_data['lines']))
+                        if predicate:
+                            for line in iter_lines(file_path, predicate):
+                                outf.write(line + '\n')
                         else:
                             with open(file_path, 'r', encoding='utf-8', errors='ignore') as inf:
-                                outf.write(inf.read())
+                                shutil.copyfileobj(inf, outf)
                         
                         outf.write('\n\n')
                 
@@ -332,7 +351,9 @@ class LogExportService:
                 "total_size_mb": 0,
                 "error_files": 0,
                 "recent_errors": [],
-                "log_types": {}
+                "log_types": {},
+                "level_counts": {},
+                "level_counts_approximate": False
             }
             
             for file_path in self.log_dir.glob("*.log*"):
@@ -350,16 +371,24 @@ class LogExportService:
                 
                 log_type = self._get_log_type(file_path.name)
                 stats["log_types"][log_type] = stats["log_types"].get(log_type, 0) + 1
+
+                # 各级别行数来自增量索引，只处理上次统计后新增的内容
+                try:
+                    summary = self._file_summary(file_path)
+                    for lvl, count in summary["levels"].items():
+                        stats["level_counts"][lvl] = stats["level_counts"].get(lvl, 0) + count
+                    stats["level_counts_approximate"] |= summary["approximate"]
+                except Exception as e:
+                    logger.debug(f"更新日志索引失败 {file_path.name}: {e}")
                 
                 # 统计错误日志
                 if log_type == "error":
                     stats["error_files"] += 1
-                    # 读取最近的错误
+                    # 读取最近的错误（只读取文件末尾 100 行）
                     try:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            lines = f.readlines()
-                            error_lines = [line for line in lines[-100:] if "ERROR" in line]
-                            stats["recent_errors"].extend(error_lines[-10:])
+                        tail = tail_lines(file_path, 100)
+                        error_lines = [line for line in tail["lines"] if "ERROR" in line]
+                        stats["recent_errors"].extend(error_lines[-10:])
                     except Exception:
                         pass
             
@@ -0,0 +1,318 @@
+"""
+日志文件的按偏移读取与增量索引
+
+日志文件可能有数 GB，这里的读取方式都不会把整个文件读入内存：
+
+- tail_lines: 从文件末尾（或某个行首偏移）向前按块 seek 读取，取最后 N 条匹配的行
+- read_lines_forward: 从某个行首偏移向后读取 N 条匹配的行
+- iter_lines: 顺序流式遍历（导出时使用）
+
+返回的偏移都是行首的字节位置，可作为向前/向后翻页的游标。每次调用最多扫描
+scan_limit 字节；过滤条件很少命中时会提前返回，游标指向扫描停止的位置。
+
+LogIndex 为每个日志文件维护一个很小的 sidecar 索引（总行数、各级别行数、
+约每 CHECKPOINT_BYTES 一个行首偏移检查点），文件增长时只处理新增部分，
+检测到轮转（inode 变化、文件变小或开头内容变化）时重建。
+"""
+
+import bisect
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("webapi")
+
+LEVELS = ("ERROR", "WARNING", "INFO", "DEBUG")
+
+# 反向读取的块大小
+CHUNK_SIZE = 64 * 1024
+# 单次读取最多扫描的字节数（过滤条件很少命中时避免扫描整个文件）
+DEFAULT_SCAN_LIMIT = 16 * 1024 * 1024
+# 索引增量更新时每次读取的块大小，同时也是行首偏移检查点的间隔
+CHECKPOINT_BYTES = 4 * 1024 * 1024
+# 用于识别文件是否被替换的开头字节数
+HEAD_SIGNATURE_BYTES = 256
+
+# 每行第一个出现的级别关键字（匹配后吞掉行的剩余部分，下一次匹配从下一行开始）
+_LEVEL_RE = re.compile(rb"(ERROR|WARNING|INFO|DEBUG)[^\n]*")
+_LEVEL_STR_RE = re.compile("ERROR|WARNING|INFO|DEBUG")
+
+LinePredicate = Callable[[str], bool]
+
+
+def line_level(line: str) -> Optional[str]:
+    """行中最先出现的日志级别关键字"""
+    match = _LEVEL_STR_RE.search(line)
+    return match.group() if match else None
+
+
+def _decode(raw: bytes) -> str:
+    return raw.rstrip(b"\r").decode("utf-8", errors="ignore")
+
+
+def _iter_backward(f, end: int, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[int, bytes]]:
+    """从 end（行首偏移或文件末尾）向前逐行产出 (行首偏移, 行内容)"""
+    pos = end
+    head = b""  # [pos, ...) 中尚未产出的部分，开头可能是被块边界截断的行
+    while pos > 0:
+        size = min(chunk_size, pos)
+        pos -= size
+        f.seek(pos)
+        parts = (f.read(size) + head).split(b"\n")
+        head = parts[0]
+        starts = []
+        offset = pos + len(head) + 1
+        for part in parts[1:]:
+            starts.append(offset)
+            offset += len(part) + 1
+        for start, part in zip(reversed(starts), reversed(parts[1:])):
+            # 以换行结尾时，end 处的空串不是一行
+            if start < end:
+                yield start, part
+    if end > 0:
+        yield 0, head
+
+
+class _ScanStats:
+    """扫描过的行数与级别计数（不保留行内容）"""
+
+    def __init__(self):
+        self.lines = 0
+        self.levels = {level: 0 for level in LEVELS}
+
+    def add(self, line: str) -> None:
+        self.lines += 1
+        level = line_level(line)
+        if level:
+            self.levels[level] += 1
+
+
+def tail_lines(
+    path: Path,
+    count: int,
+    predicate: Optional[LinePredicate] = None,
+    before: Optional[int] = None,
+    scan_limit: int = DEFAULT_SCAN_LIMIT,
+) -> Dict[str, Any]:
+    """
+    读取 before 偏移之前（默认文件末尾）最后 count 条匹配的行
+
+    Returns:
+        lines: 按文件顺序排列的行
+        start: 最早扫描到的行首偏移，作为向前翻页的 before 游标
+        end:   已读完整行的结束偏移，作为向后翻页的 after 游标（末尾未写完的行会被再次读取）
+        scanned: 扫描过的行数与级别计数
+        has_more_before: start 之前是否还有内容
+    """
+    size = path.stat().st_size
+    end = size if before is None or before > size else before
+    matched: List[str] = []
+    stats = _ScanStats()
+    start = end
+    resume = end
+    with open(path, "rb") as f:
+        if end == size and size > 0:
+            f.seek(size - 1)
+            partial = f.read(1) != b"\n"
+        else:
+            partial = False
+        for offset, raw in _iter_backward(f, end):
+            if partial:
+                resume = offset
+                partial = False
+            if end - offset > scan_limit:
+                break
+            start = offset
+            line = _decode(raw)
+            stats.add(line)
+            if predicate is None or predicate(line):
+                matched.append(line)
+                if len(matched) >= count:
+                    break
+    matched.reverse()
+    return {
+        "lines": matched,
+        "start": start,
+        "end": resume,
+        "scanned": stats,
+        "has_more_before": start > 0,
+    }
+
+
+def read_lines_forward(
+    path: Path,
+    after: int,
+    count: int,
+    predicate: Optional[LinePredicate] = None,
+    scan_limit: int = DEFAULT_SCAN_LIMIT,
+) -> Dict[str, Any]:
+    """
+    从 after 行首偏移开始向后读取 count 条匹配的完整行（末尾未写完的行不返回）
+
+    Returns:
+        lines, start（= after）, end（下一页的 after 游标）, scanned, has_more_after
+    """
+    size = path.stat().st_size
+    # 偏移超出文件大小说明文件已轮转，从头开始
+    start = 0 if after > size else after
+    matched: List[str] = []
+    stats = _ScanStats()
+    offset = start
+    with open(path, "rb") as f:
+        f.seek(start)
+        for raw in f:
+            if not raw.endswith(b"\n") or offset - start > scan_limit:
+                break
+            offset += len(raw)
+            line = _decode(raw[:-1])
+            stats.add(line)
+            if predicate is None or predicate(line):
+                matched.append(line)
+                if len(matched) >= count:
+                    break
+    return {
+        "lines": matched,
+        "start": start,
+        "end": offset,
+        "scanned": stats,
+        "has_more_after": offset < size,
+    }
+
+
+def iter_lines(path: Path, predicate: Optional[LinePredicate] = None) -> Iterator[str]:
+    """顺序流式遍历匹配的行"""
+    with open(path, "rb") as f:
+        for raw in f:
+            line = _decode(raw.rstrip(b"\n"))
+            if predicate is None or predicate(line):
+                yield line
+
+
+class LogIndex:
+    """日志文件的 sidecar 索引：行数、各级别行数、行首偏移检查点"""
+
+    def __init__(self, index_dir: Path):
+        self.index_dir = Path(index_dir)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _index_path(self, path: Path) -> Path:
+        return self.index_dir / f"{path.name}.idx.json"
+
+    def _load(self, path: Path) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(path.name)
+        if entry is not None:
+            return entry
+        try:
+            with open(self._index_path(path), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, path: Path, entry: Dict[str, Any]) -> None:
+        self._entries[path.name] = entry
+        try:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self._index_path(path).with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp, self._index_path(path))
+        except OSError as e:
+            # 日志目录只读时只保留内存中的索引
+            logger.debug(f"写入日志索引失败 {path.name}: {e}")
+
+    @staticmethod
+    def _head_signature(f, length: int) -> str:
+        f.seek(0)
+        return hashlib.sha1(f.read(length)).hexdigest()
+
+    def _is_rotated(self, f, entry: Dict[str, Any], stat: os.stat_result) -> bool:
+        return (
+            entry.get("inode") != stat.st_ino
+            or stat.st_size < entry["indexed_bytes"]
+            or (entry["head_len"] > 0 and self._head_signature(f, entry["head_len"]) != entry["head"])
+        )
+
+    def refresh(self, path: Path, max_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """
+        将索引更新到文件当前末尾（最多处理 max_bytes 新增字节）
+
+        Returns:
+            索引条目；complete 表示是否已覆盖文件中所有完整的行
+        """
+        with self._lock:
+            stat = path.stat()
+            entry = self._load(path)
+            with open(path, "rb") as f:
+                if entry is not None and self._is_rotated(f, entry, stat):
+                    logger.info(f"🔄 日志文件已轮转，重建索引: {path.name}")
+                    entry = None
+                created = entry is None
+                if created:
+                    entry = {
+                        "inode": stat.st_ino,
+                        "head": "",
+                        "head_len": 0,
+                        "indexed_bytes": 0,
+                        "lines": 0,
+                        "levels": {level: 0 for level in LEVELS},
+                        "checkpoints": [[0, 0]],
+                    }
+                changed = self._extend(f, entry, stat.st_size, max_bytes)
+                if entry["head_len"] < HEAD_SIGNATURE_BYTES and entry["indexed_bytes"] > entry["head_len"]:
+                    entry["head_len"] = min(entry["indexed_bytes"], HEAD_SIGNATURE_BYTES)
+                    entry["head"] = self._head_signature(f, entry["head_len"])
+            entry["size"] = stat.st_size
+            if changed or created or path.name not in self._entries:
+                self._save(path, entry)
+            return entry
+
+    @staticmethod
+    def _extend(f, entry: Dict[str, Any], size: int, max_bytes: Optional[int]) -> bool:
+        start = entry["indexed_bytes"]
+        limit = size if max_bytes is None else min(size, start + max_bytes)
+        levels = entry["levels"]
+        checkpoints = entry["checkpoints"]
+        pos = start
+        f.seek(pos)
+        carry = b""
+        while pos + len(carry) < limit:
+            block = f.read(min(CHECKPOINT_BYTES, limit - pos - len(carry)))
+            if not block:
+                break
+            data = carry + block
+            cut = data.rfind(b"\n") + 1
+            if cut == 0:
+                # 超长的行（或末尾未写完的行）：继续读取直到换行
+                carry = data
+                continue
+            complete, carry = data[:cut], data[cut:]
+            for level in _LEVEL_RE.findall(complete):
+                levels[level.decode()] += 1
+            entry["lines"] += complete.count(b"\n")
+            pos += cut
+            if pos - checkpoints[-1][1] >= CHECKPOINT_BYTES:
+                checkpoints.append([entry["lines"], pos])
+        entry["indexed_bytes"] = pos
+        # 读到文件末尾时只剩未写完的行，视为已完整索引
+        entry["complete"] = limit >= size
+        return pos > start
+
+    def line_offset(self, path: Path, line_no: int) -> int:
+        """第 line_no 行（从 0 开始）的行首偏移，超出已索引的行数时返回 -1"""
+        entry = self.refresh(path)
+        if line_no >= entry["lines"]:
+            return -1
+        checkpoints = entry["checkpoints"]
+        i = bisect.bisect_right([line for line, _ in checkpoints], line_no) - 1
+        base_line, offset = checkpoints[i]
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for _ in range(line_no - base_line):
+                offset += len(f.readline())
+        return offset
@@ -0,0 +1,171 @@
+"""
+行情/K线异步读取仓库（Motor）
+
+供 async 路由直接使用，避免在事件循环中调用同步 pymongo：
+- K线：投影 + limit 下推到查询（按交易日倒序取最近 N 条后反转），
+  多数据源一次 $in 查询，按交易日保留优先级最高的数据源
+- 行情/基础信息：单次查询 + 投影
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from app.core.database import get_mongo_db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOURCE_PRIORITY = ["tushare", "akshare", "baostock"]
+
+# K线查询只取返回所需字段
+_BAR_PROJECTION = {
+    "_id": 0, "trade_date": 1, "date": 1, "data_source": 1,
+    "open": 1, "high": 1, "low": 1, "close": 1, "volume": 1, "vol": 1, "amount": 1,
+}
+
+
+def bars_to_items(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    将K线文档批量转换为前端格式（time/open/high/low/close/volume/amount）
+
+    使用列运算代替逐行 iterrows；缺失的价格/成交量按 0 处理，没有 amount 字段时返回 None
+    """
+    if not docs:
+        return []
+    df = pd.DataFrame(docs)
+    n = len(df)
+
+    def _num(col: str, fallback: Optional[str] = None) -> pd.Series:
+        if col in df.columns:
+            s = pd.to_numeric(df[col], errors="coerce")
+            if fallback and fallback in df.columns:
+                s = s.fillna(pd.to_numeric(df[fallback], errors="coerce"))
+            return s.fillna(0.0).astype(float)
+        if fallback and fallback in df.columns:
+            return pd.to_numeric(df[fallback], errors="coerce").fillna(0.0).astype(float)
+        return pd.Series([0.0] * n, index=df.index)
+
+    if "trade_date" in df.columns:
+        time_col = df["trade_date"]
+        if "date" in df.columns:
+            time_col = time_col.fillna(df["date"])
+    elif "date" in df.columns:
+        time_col = df["date"]
+    else:
+        time_col = pd.Series([""] * n, index=df.index)
+
+    out = pd.DataFrame({
+        "time": time_col.fillna("").astype(str),
+        "open": _num("open"),
+        "high": _num("high"),
+        "low": _num("low"),
+        "close": _num("close"),
+        "volume": _num("volume", "vol"),
+    })
+    if "amount" in df.columns:
+        out["amount"] = pd.to_numeric(df["amount"], errors="coerce").fillna(0.0).astype(float)
+    else:
+        out["amount"] = None
+    return out.to_dict("records")
+
+
+class MarketDataRepository:
+    """基于 Motor 的K线/行情读取"""
+
+    def __init__(self, db=None):
+        self._db = db
+
+    @property
+    def db(self):
+        return self._db if self._db is not None else get_mongo_db()
+
+    async def get_source_priority(self, market_category: str = "a_shares") -> List[str]:
+        """数据源优先级（进程级快照，刷新时的数据库访问放到线程中执行）"""
+        try:
+            from tradingagents.config.data_source_priority import get_data_source_priority_config
+            priority = await asyncio.to_thread(get_data_source_priority_config().get_priority, market_category)
+        except Exception as e:
+            logger.debug(f"读取数据源优先级失败，使用默认顺序: {e}")
+            priority = []
+        return [s for s in priority if s in DEFAULT_SOURCE_PRIORITY] or list(DEFAULT_SOURCE_PRIORITY)
+
+    async def get_bars(
+        self,
+        code: str,
+        period: str = "daily",
+        limit: int = 120,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        source_priority: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        获取最近 limit 条K线（按交易日升序），每个交易日只保留优先级最高的数据源
+
+        Returns:
+            原始K线文档列表（只含投影字段）
+        """
+        if limit <= 0:
+            return []
+        priority = source_priority or await self.get_source_priority()
+        query: Dict[str, Any] = {
+            "symbol": str(code).zfill(6),
+            "period": period,
+            "data_source": {"$in": priority},
+        }
+        if start_date:
+            query["trade_date"] = {"$gte": start_date}
+        if end_date:
+            query.setdefault("trade_date", {})["$lte"] = end_date
+
+        # 最坏情况下每个交易日每个数据源各一条，按数据源数放大 limit
+        cursor = (
+            self.db["stock_daily_quotes"]
+            .find(query, _BAR_PROJECTION)
+            .sort("trade_date", -1)
+            .limit(limit * len(priority))
+        )
+        docs = await cursor.to_list(length=None)
+        if not docs:
+            return []
+
+        rank = {src: i for i, src in enumerate(priority)}
+        best: Dict[Any, Dict[str, Any]] = {}
+        for doc in docs:
+            key = doc.get("trade_date")
+            current = best.get(key)
+            if current is None or rank.get(doc.get("data_source"), len(rank)) < rank.get(current.get("data_source"), len(rank)):
+                best[key] = doc
+
+        # 结果已按交易日倒序，截取最近 limit 条后反转为升序
+        latest = sorted(best.values(), key=lambda d: d.get("trade_date") or "", reverse=True)[:limit]
+        latest.reverse()
+        return latest
+
+    async def get_quote(self, code: str) -> Optional[Dict[str, Any]]:
+        """获取 market_quotes 中的实时行情"""
+        return await self.db["market_quotes"].find_one({"code": str(code).zfill(6)}, {"_id": 0})
+
+    async def get_basic_info(self, code: str, source_priority: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """按数据源优先级获取基础信息（一次 $in 查询），没有带数据源的记录时兼容旧数据"""
+        code6 = str(code).zfill(6)
+        priority = source_priority or await self.get_source_priority()
+        collection = self.db["stock_basic_info"]
+        candidates = await collection.find(
+            {"code": code6, "source": {"$in": priority}}, {"_id": 0}
+        ).to_list(length=len(priority))
+        if candidates:
+            rank = {src: i for i, src in enumerate(priority)}
+            return min(candidates, key=lambda d: rank.get(d.get("source"), len(rank)))
+        return await collection.find_one({"code": code6}, {"_id": 0})
+
+
+_market_data_repository: Optional[MarketDataRepository] = None
+
+
+def get_market_data_repository() -> MarketDataRepository:
+    """获取行情读取仓库实例"""
+    global _market_data_repository
+    if _market_data_repository is None:
+        _market_data_repository = MarketDataRepository()
+    return _market_data_repository
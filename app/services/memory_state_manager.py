@@ -1,11 +1,24 @@
 """
 内存状态管理器
 类似于 analysis-engine 的实现，提供快速的状态读写
+
+内存占用有上限：
+- 任务状态只保留进度、消息等轻量字段；分析结果写入 TaskResultStore（磁盘 gzip JSON），
+  内存中只缓存最近的少量结果，查询任务详情时按需加载
+- 已结束的任务按完成顺序淘汰：超过 max_tasks 或完成时间超过 max_age_hours 即移出内存
+  （MongoDB 中的记录不受影响，列表与结果查询会回退到 MongoDB）
+- 按用户维护任务索引，用户任务列表只遍历该用户的任务
 """
 
 import asyncio
+import gzip
+import json
+import os
+import re
 import threading
-from typing import Dict, Any, Optional, List
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, Optional, List
 from datetime import datetime
 import logging
 from dataclasses import dataclass, asdict
@@ -13,6 +26,15 @@ from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+# 内存中最多保留的任务数（超出时淘汰最早结束的任务，运行中的任务不淘汰）
+DEFAULT_MAX_TASKS = int(os.getenv("TA_TASK_STATE_MAX_TASKS", "2000"))
+# 已结束任务在内存中的保留时长（小时）
+DEFAULT_MAX_AGE_HOURS = float(os.getenv("TA_TASK_STATE_TTL_HOURS", "24"))
+# 内存中缓存的分析结果数
+DEFAULT_RESULT_CACHE_SIZE = int(os.getenv("TA_TASK_RESULT_CACHE_SIZE", "16"))
+
+_FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
 class TaskStatus(Enum):
     """任务状态枚举"""
     PENDING = "pending"
@@ -21,9 +43,9 @@ class TaskStatus(Enum):
     FAILED = "failed"
     CANCELLED = "cancelled"
 
-@dataclass
+@dataclass(slots=True)
 class TaskState:
-    """任务状态数据类"""
+    """任务状态数据类（分析结果不常驻内存，has_result 表示结果已写入结果存储）"""
     task_id: str
     user_id: str
     stock_code: str
@@ -44,6 +66,8 @@ class TaskState:
     execution_time: Optional[float] = None
     tokens_used: Optional[int] = None
     estimated_duration: Optional[float] = None  # 预估总时长（秒）
+
+    has_result: bool = False
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
@@ -91,21 +115,193 @@ class TaskState:
 
         return data
 
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+
+class TaskResultStore:
+    """任务结果存储：结果写入磁盘（gzip JSON），内存只缓存最近的少量结果"""
+
+    def __init__(self, directory: str, cache_size: int = DEFAULT_RESULT_CACHE_SIZE):
+        self.directory = directory
+        self.cache_size = max(0, cache_size)
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, task_id: str) -> str:
+        return os.path.join(self.directory, re.sub(r"[^\w\-]", "_", task_id) + ".json.gz")
+
+    def _remember(self, task_id: str, result: Dict[str, Any]) -> None:
+        if not self.cache_size:
+            return
+        with self._lock:
+            self._cache[task_id] = result
+            self._cache.move_to_end(task_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def save(self, task_id: str, result: Dict[str, Any]) -> bool:
+        """保存结果；写盘失败时只保留在内存缓存中"""
+        self._remember(task_id, result)
+        path = self._path(task_id)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = path + ".tmp"
+            with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=1) as f:
+                json.dump(result, f, ensure_ascii=False, default=_json_default)
+            os.replace(tmp, path)
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ 写入任务结果失败: {task_id} - {e}")
+            return False
+
+    def load(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            result = self._cache.get(task_id)
+            if result is not None:
+                self._cache.move_to_end(task_id)
+                return result
+        try:
+            with gzip.open(self._path(task_id), "rt", encoding="utf-8") as f:
+                result = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️ 读取任务结果失败: {task_id} - {e}")
+            return None
+        self._remember(task_id, result)
+        return result
+
+    def cached(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """只查内存缓存"""
+        with self._lock:
+            return self._cache.get(task_id)
+
+    def delete(self, task_id: str) -> None:
+        with self._lock:
+            self._cache.pop(task_id, None)
+        try:
+            os.unlink(self._path(task_id))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.debug(f"删除任务结果失败: {task_id} - {e}")
+
+    def purge(self, max_age_seconds: float) -> int:
+        """删除超过保留时长的结果文件（如上次进程遗留的结果）"""
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+
 class MemoryStateManager:
     """内存状态管理器"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_tasks: int = DEFAULT_MAX_TASKS,
+        max_age_hours: float = DEFAULT_MAX_AGE_HOURS,
+        result_dir: Optional[str] = None,
+        result_cache_size: int = DEFAULT_RESULT_CACHE_SIZE,
+    ):
+        # 按创建顺序保存（即按开始时间升序）
         self._tasks: Dict[str, TaskState] = {}
+        # 用户 -> 该用户的任务ID（按创建顺序）
+        self._user_tasks: Dict[str, Dict[str, None]] = {}
+        # 已结束的任务ID -> 结束时间戳（按结束顺序，用于淘汰）
+        self._finished: "OrderedDict[str, float]" = OrderedDict()
+        self._status_counts: Dict[TaskStatus, int] = {status: 0 for status in TaskStatus}
+        self.max_tasks = max(1, max_tasks)
+        self.max_age_seconds = max_age_hours * 3600
+        if result_dir is None:
+            from app.core.config import settings
+            result_dir = os.path.join(settings.TRADINGAGENTS_DATA_DIR, "task_results")
+        self._results = TaskResultStore(result_dir, result_cache_size)
         # 🔧 使用 threading.Lock 代替 asyncio.Lock，避免事件循环冲突
         # 当在线程池中执行分析时，会创建新的事件循环，asyncio.Lock 会导致
         # "is bound to a different event loop" 错误
         self._lock = threading.Lock()
         self._websocket_manager = None
+        self.evicted_count = 0
 
     def set_websocket_manager(self, websocket_manager):
         """设置 WebSocket 管理器"""
         self._websocket_manager = websocket_manager
-        
+
+    # ---- 内部索引维护（调用方持有 self._lock） ----
+
+    def _add_locked(self, task: TaskState) -> None:
+        self._tasks[task.task_id] = task
+        self._user_tasks.setdefault(task.user_id, {})[task.task_id] = None
+        self._status_counts[task.status] += 1
+        if task.status.value in _FINISHED_STATUSES:
+            self._finished[task.task_id] = time.time()
+
+    def _set_status_locked(self, task: TaskState, status: TaskStatus) -> None:
+        self._status_counts[task.status] -= 1
+        self._status_counts[status] += 1
+        task.status = status
+        if status.value in _FINISHED_STATUSES:
+            self._finished[task.task_id] = time.time()
+            self._finished.move_to_end(task.task_id)
+        else:
+            self._finished.pop(task.task_id, None)
+
+    def _drop_locked(self, task_id: str) -> Optional[TaskState]:
+        task = self._tasks.pop(task_id, None)
+        if task is None:
+            return None
+        self._status_counts[task.status] -= 1
+        self._finished.pop(task_id, None)
+        user_ids = self._user_tasks.get(task.user_id)
+        if user_ids is not None:
+            user_ids.pop(task_id, None)
+            if not user_ids:
+                del self._user_tasks[task.user_id]
+        return task
+
+    def _evict_locked(self) -> List[str]:
+        """淘汰超出数量上限或保留时长的已结束任务（最早结束的优先）"""
+        cutoff = time.time() - self.max_age_seconds
+        evicted = []
+        while self._finished:
+            task_id, finished_at = next(iter(self._finished.items()))
+            if len(self._tasks) <= self.max_tasks and finished_at >= cutoff:
+                break
+            task = self._drop_locked(task_id)
+            if task is not None and task.has_result:
+                evicted.append(task_id)
+            self.evicted_count += 1
+        return evicted
+
+    def _discard_results(self, task_ids: Iterable[str]) -> None:
+        for task_id in task_ids:
+            self._results.delete(task_id)
+
+    def evict_expired(self) -> int:
+        """按数量上限与保留时长淘汰已结束的任务，返回淘汰数量"""
+        with self._lock:
+            before = self.evicted_count
+            evicted = self._evict_locked()
+            count = self.evicted_count - before
+        self._discard_results(evicted)
+        return count
+
     async def create_task(
         self,
         task_id: str,
@@ -130,12 +326,15 @@ class MemoryStateManager:
                 estimated_duration=estimated_duration,
                 message="任务已创建，等待执行..."
             )
-            self._tasks[task_id] = task_state
+            self._drop_locked(task_id)
+            self._add_locked(task_state)
+            evicted = self._evict_locked()
             logger.info(f"📝 创建任务状态: {task_id}")
             logger.info(f"⏱️ 预估总时长: {estimated_duration:.1f}秒 ({estimated_duration/60:.1f}分钟)")
             logger.info(f"📊 当前内存中任务数量: {len(self._tasks)}")
             logger.info(f"🔍 内存管理器实例ID: {id(self)}")
-            return task_state
+        self._discard_results(evicted)
+        return task_state
 
     def _calculate_estimated_duration(self, parameters: Dict[str, Any]) -> float:
         """根据分析参数计算预估总时长（秒）"""
@@ -187,14 +386,23 @@ class MemoryStateManager:
         result_data: Optional[Dict[str, Any]] = None,
         error_message: Optional[str] = None
     ) -> bool:
-        """更新任务状态"""
+        """更新任务状态（result_data 写入结果存储，不保留在任务状态中）"""
+        if result_data is not None:
+            if task_id not in self._tasks:
+                logger.warning(f"⚠️ 任务不存在: {task_id}")
+                return False
+            await asyncio.to_thread(self._results.save, task_id, result_data)
+
         with self._lock:
             if task_id not in self._tasks:
                 logger.warning(f"⚠️ 任务不存在: {task_id}")
+                if result_data is not None:
+                    # 保存结果期间任务已被删除
+                    self._results.delete(task_id)
                 return False
             
             task = self._tasks[task_id]
-            task.status = status
+            self._set_status_locked(task, status)
             
             if progress is not None:
                 task.progress = progress
@@ -204,13 +412,13 @@ class MemoryStateManager:
                 task.current_step = current_step
             if result_data is not None:
                 # 🔍 调试：检查保存到内存的result_data
-                logger.info(f"🔍 [MEMORY] 保存result_data到内存: {task_id}")
+                logger.info(f"🔍 [MEMORY] 保存result_data到结果存储: {task_id}")
                 logger.info(f"🔍 [MEMORY] result_data键: {list(result_data.keys()) if result_data else '无'}")
                 logger.info(f"🔍 [MEMORY] result_data中有decision: {bool(result_data.get('decision')) if result_data else False}")
                 if result_data and result_data.get('decision'):
                     logger.info(f"🔍 [MEMORY] decision内容: {result_data['decision']}")
 
-                task.result_data = result_data
+                task.has_result = True
             if error_message is not None:
                 task.error_message = error_message
                 
@@ -221,6 +429,7 @@ class MemoryStateManager:
                     task.execution_time = (task.end_time - task.start_time).total_seconds()
             
             logger.info(f"📊 更新任务状态: {task_id} -> {status.value} ({progress}%)")
+            evicted = self._evict_locked() if status.value in _FINISHED_STATUSES else []
 
             # 推送状态更新到 WebSocket
             if self._websocket_manager:
@@ -241,48 +450,82 @@ class MemoryStateManager:
                 except Exception as e:
                     logger.warning(f"⚠️ WebSocket 推送失败: {e}")
 
-            return True
+        self._discard_results(evicted)
+        return True
     
     async def get_task(self, task_id: str) -> Optional[TaskState]:
         """获取任务状态"""
         with self._lock:
-            logger.debug(f"🔍 查询任务: {task_id}")
-            logger.debug(f"📊 当前内存中任务数量: {len(self._tasks)}")
-            logger.debug(f"🔑 内存中的任务ID列表: {list(self._tasks.keys())}")
             task = self._tasks.get(task_id)
             if task:
                 logger.debug(f"✅ 找到任务: {task_id}")
             else:
-                logger.debug(f"❌ 未找到任务: {task_id}")
+                logger.debug(f"❌ 未找到任务: {task_id} (内存中任务数量: {len(self._tasks)})")
             return task
-    
-    async def get_task_dict(self, task_id: str) -> Optional[Dict[str, Any]]:
+
+    async def load_result(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """从结果存储加载任务的分析结果"""
+        result = self._results.cached(task_id)
+        if result is not None:
+            return result
+        return await asyncio.to_thread(self._results.load, task_id)
+
+    async def attach_results(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """为任务字典补充 result_data（只加载这一页中有结果的任务）"""
+        for item in items:
+            if item.get("has_result") and not item.get("result_data"):
+                item["result_data"] = await self.load_result(item["task_id"])
+        return items
+
+    async def get_task_dict(self, task_id: str, include_result: bool = True) -> Optional[Dict[str, Any]]:
         """获取任务状态（字典格式）"""
         task = await self.get_task(task_id)
-        return task.to_dict() if task else None
-    
+        if not task:
+            return None
+        data = task.to_dict()
+        if include_result:
+            await self.attach_results([data])
+        return data
+
+    @staticmethod
+    def _list_item(task: TaskState) -> Dict[str, Any]:
+        item = task.to_dict()
+        # 兼容前端字段
+        if 'stock_name' not in item or not item.get('stock_name'):
+            item['stock_name'] = None
+        return item
+
+    @classmethod
+    def _page(
+        cls,
+        tasks: Iterable[TaskState],
+        status: Optional[TaskStatus],
+        limit: int,
+        offset: int
+    ) -> List[Dict[str, Any]]:
+        """从按开始时间倒序的任务中取一页，凑满即停止"""
+        items = []
+        skipped = 0
+        for task in tasks:
+            if status is not None and task.status != status:
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            if len(items) >= limit:
+                break
+            items.append(cls._list_item(task))
+        return items
+
     async def list_all_tasks(
         self,
         status: Optional[TaskStatus] = None,
         limit: int = 20,
         offset: int = 0
     ) -> List[Dict[str, Any]]:
-        """获取所有任务列表（不限用户）"""
+        """获取所有任务列表（不限用户，不含分析结果，按开始时间倒序）"""
         with self._lock:
-            tasks = []
-            for task in self._tasks.values():
-                if status is None or task.status == status:
-                    item = task.to_dict()
-                    # 兼容前端字段
-                    if 'stock_name' not in item or not item.get('stock_name'):
-                        item['stock_name'] = None
-                    tasks.append(item)
-
-            # 按开始时间倒序排列
-            tasks.sort(key=lambda x: x.get('start_time', ''), reverse=True)
-
-            # 分页
-            return tasks[offset:offset + limit]
+            return self._page(reversed(self._tasks.values()), status, limit, offset)
 
     async def list_user_tasks(
         self,
@@ -291,49 +534,39 @@ class MemoryStateManager:
         limit: int = 20,
         offset: int = 0
     ) -> List[Dict[str, Any]]:
-        """获取用户的任务列表"""
+        """获取用户的任务列表（不含分析结果，按开始时间倒序，只遍历该用户的任务）"""
         with self._lock:
-            tasks = []
-            for task in self._tasks.values():
-                if task.user_id == user_id:
-                    if status is None or task.status == status:
-                        item = task.to_dict()
-                        # 兼容前端字段
-                        if 'stock_name' not in item or not item.get('stock_name'):
-                            item['stock_name'] = None
-                        tasks.append(item)
-
-            # 按开始时间倒序排列
-            tasks.sort(key=lambda x: x.get('start_time', ''), reverse=True)
-
-            # 分页
-            return tasks[offset:offset + limit]
+            task_ids = self._user_tasks.get(user_id)
+            if not task_ids:
+                return []
+            return self._page((self._tasks[tid] for tid in reversed(task_ids)), status, limit, offset)
     
     async def delete_task(self, task_id: str) -> bool:
         """删除任务"""
         with self._lock:
-            if task_id in self._tasks:
-                del self._tasks[task_id]
-                logger.info(f"🗑️ 删除任务: {task_id}")
-                return True
+            task = self._drop_locked(task_id)
+        if task is None:
             return False
+        self._results.delete(task_id)
+        logger.info(f"🗑️ 删除任务: {task_id}")
+        return True
     
     async def get_statistics(self) -> Dict[str, Any]:
         """获取统计信息"""
         with self._lock:
             total_tasks = len(self._tasks)
-            status_counts = {}
-            
-            for task in self._tasks.values():
-                status = task.status.value
-                status_counts[status] = status_counts.get(status, 0) + 1
+            status_counts = {
+                status.value: count for status, count in self._status_counts.items() if count
+            }
             
             return {
                 "total_tasks": total_tasks,
                 "status_distribution": status_counts,
                 "running_tasks": status_counts.get("running", 0),
                 "completed_tasks": status_counts.get("completed", 0),
-                "failed_tasks": status_counts.get("failed", 0)
+                "failed_tasks": status_counts.get("failed", 0),
+                "user_count": len(self._user_tasks),
+                "evicted_tasks": self.evicted_count
             }
     
     async def cleanup_old_tasks(self, max_age_hours: int = 24) -> int:
@@ -348,10 +581,11 @@ class MemoryStateManager:
                         tasks_to_remove.append(task_id)
 
             for task_id in tasks_to_remove:
-                del self._tasks[task_id]
+                self._drop_locked(task_id)
 
-            logger.info(f"🧹 清理了 {len(tasks_to_remove)} 个旧任务")
-            return len(tasks_to_remove)
+        self._discard_results(tasks_to_remove)
+        logger.info(f"🧹 清理了 {len(tasks_to_remove)} 个旧任务")
+        return len(tasks_to_remove)
 
     async def cleanup_zombie_tasks(self, max_running_hours: int = 2) -> int:
         """清理僵尸任务（长时间处于 running 状态的任务）
@@ -367,6 +601,8 @@ class MemoryStateManager:
             zombie_tasks = []
 
             for task_id, task in self._tasks.items():
+                if task_id in self._finished:
+                    continue
                 # 检查是否是长时间运行的任务
                 if task.status in [TaskStatus.RUNNING, TaskStatus.PENDING]:
                     if task.start_time and task.start_time.timestamp() < cutoff_time:
@@ -375,7 +611,7 @@ class MemoryStateManager:
             # 将僵尸任务标记为失败
             for task_id in zombie_tasks:
                 task = self._tasks[task_id]
-                task.status = TaskStatus.FAILED
+                self._set_status_locked(task, TaskStatus.FAILED)
                 task.end_time = datetime.now()
                 task.error_message = f"任务超时（运行时间超过 {max_running_hours} 小时）"
                 task.message = "任务已超时，自动标记为失败"
@@ -401,20 +637,28 @@ class MemoryStateManager:
             是否成功删除
         """
         with self._lock:
-            if task_id in self._tasks:
-                del self._tasks[task_id]
-                logger.info(f"🗑️ 任务已从内存中删除: {task_id}")
-                return True
-            else:
-                logger.warning(f"⚠️ 任务不存在于内存中: {task_id}")
-                return False
+            task = self._drop_locked(task_id)
+        if task is None:
+            logger.warning(f"⚠️ 任务不存在于内存中: {task_id}")
+            return False
+        self._results.delete(task_id)
+        logger.info(f"🗑️ 任务已从内存中删除: {task_id}")
+        return True
 
 # 全局实例
 _memory_state_manager = None
+_memory_state_manager_lock = threading.Lock()
 
 def get_memory_state_manager() -> MemoryStateManager:
     """获取内存状态管理器实例"""
     global _memory_state_manager
     if _memory_state_manager is None:
-        _memory_state_manager = MemoryStateManager()
+        with _memory_state_manager_lock:
+            if _memory_state_manager is None:
+                manager = MemoryStateManager()
+                # 上次进程遗留、已超过保留时长的结果文件
+                removed = manager._results.purge(manager.max_age_seconds)
+                if removed:
+                    logger.info(f"🧹 清理了 {removed} 个过期的任务结果文件")
+                _memory_state_manager = manager
     return _memory_state_manager
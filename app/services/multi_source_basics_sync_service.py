@@ -19,6 +19,8 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from pymongo import UpdateOne
 
 from app.core.database import get_mongo_db
+from app.services.stock_name_resolver import get_stock_name_resolver
+from app.services.symbol_master import get_symbol_master
 from app.services.basics_sync import add_financial_metrics as _add_financial_metrics_util
 
 
@@ -314,6 +316,9 @@ class MultiSourceBasicsSyncService:
             stats.finished_at = datetime.now().isoformat()
 
             await self._persist_status(db, stats.__dict__.copy())
+            # 股票主索引在下次搜索前增量刷新，股票名称缓存随之失效
+            get_symbol_master().mark_stale("CN")
+            get_stock_name_resolver().invalidate()
             logger.info(
                 f"✅ Multi-source sync finished: total={stats.total} inserted={inserted} "
                 f"updated={updated} errors={errors} sources={stats.data_sources_used}"
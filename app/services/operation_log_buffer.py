@@ -0,0 +1,515 @@
+"""
+操作日志缓冲写入器
+
+请求路径上只做一次内存入队，后台协程按时间间隔或条数阈值批量 insert_many，
+同时按小时预聚合统计计数（operation_log_hourly_stats），供统计接口直接读取。
+
+溢出策略（队列满或写库失败时）：
+- drop_oldest：丢弃最早的一条，保留最新日志（默认）
+- drop_newest：丢弃当前这条
+- spill：由后台协程批量写入本进程的本地 NDJSON 文件，下次启动时回放入库
+"""
+
+import asyncio
+import glob
+import json
+import logging
+import os
+import re
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.core.database import get_mongo_db
+from app.utils.timezone import now_tz
+
+logger = logging.getLogger("webapi")
+
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_DROP_NEWEST = "drop_newest"
+OVERFLOW_SPILL = "spill"
+
+HOURLY_STATS_COLLECTION = "operation_log_hourly_stats"
+# 小时统计集合中的元数据文档：记录首次预聚合时间与历史回填状态
+HOURLY_STATS_META_ID = "__meta__"
+# 回填任务被认领后超过该时长仍未完成，视为进程已退出，允许重新认领
+BACKFILL_STALE_AFTER = timedelta(hours=1)
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+def hour_bucket(ts: datetime) -> datetime:
+    """将时间截断到整点，作为小时统计的桶键"""
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    if isinstance(value, ObjectId):
+        return {"$oid": str(value)}
+    return str(value)
+
+
+def _json_object_hook(obj: Dict[str, Any]):
+    if len(obj) == 1:
+        if "$date" in obj:
+            return datetime.fromisoformat(obj["$date"])
+        if "$oid" in obj:
+            return ObjectId(obj["$oid"])
+    return obj
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except Exception:
+        return False
+
+
+async def record_hourly_stats(db, docs: List[Dict[str, Any]], collection_name: str = HOURLY_STATS_COLLECTION) -> None:
+    """按 (小时, 操作类型, 是否成功) 累加预聚合计数"""
+    counter: Counter = Counter()
+    first_ts: Optional[datetime] = None
+    for doc in docs:
+        ts = doc.get("timestamp")
+        if not isinstance(ts, datetime):
+            continue
+        counter[(hour_bucket(ts), doc.get("action_type"), bool(doc.get("success", True)))] += 1
+        if first_ts is None or ts < first_ts:
+            first_ts = ts
+
+    if not counter:
+        return
+    ops = [
+        UpdateOne(
+            {"hour": hour, "action_type": action_type, "success": success},
+            {"$inc": {"count": count}},
+            upsert=True,
+        )
+        for (hour, action_type, success), count in counter.items()
+    ]
+    # 记录首次预聚合的日志时间，历史回填以此为截止点
+    ops.append(UpdateOne(
+        {"_id": HOURLY_STATS_META_ID},
+        {"$min": {"first_recorded_at": first_ts}},
+        upsert=True,
+    ))
+    await db[collection_name].bulk_write(ops, ordered=False)
+
+
+async def backfill_hourly_stats(
+    db,
+    logs_collection: str = "operation_logs",
+    stats_collection: str = HOURLY_STATS_COLLECTION,
+) -> int:
+    """
+    将预聚合之前写入的历史日志回填到小时统计
+
+    - 通过元数据文档原子认领，多进程只有一个执行；完成后永久标记，不再重复
+    - 截止点为首次预聚合的日志时间（未记录时为认领时间），之前的日志全部计入
+    - 回填结果写入独立字段 backfill_count（$set 幂等），失败后可安全重试
+
+    Returns:
+        回填的日志条数（未执行时为 0）
+    """
+    claim_time = now_tz().replace(tzinfo=None)
+    try:
+        meta = await db[stats_collection].find_one_and_update(
+            {
+                "_id": HOURLY_STATS_META_ID,
+                "$or": [
+                    {"backfill_state": {"$exists": False}},
+                    {"backfill_state": "running", "backfill_claimed_at": {"$lt": claim_time - BACKFILL_STALE_AFTER}},
+                ],
+            },
+            {"$set": {"backfill_state": "running", "backfill_claimed_at": claim_time}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        # 已完成或正由其他进程执行
+        return 0
+
+    cutoff = claim_time
+    first_recorded_at = (meta or {}).get("first_recorded_at")
+    if isinstance(first_recorded_at, datetime) and first_recorded_at < cutoff:
+        cutoff = first_recorded_at
+
+    try:
+        pipeline = [
+            {"$match": {"timestamp": {"$type": "date", "$lt": cutoff}}},
+            {
+                "$group": {
+                    "_id": {
+                        "year": {"$year": "$timestamp"},
+                        "month": {"$month": "$timestamp"},
+                        "day": {"$dayOfMonth": "$timestamp"},
+                        "hour": {"$hour": "$timestamp"},
+                        "action_type": "$action_type",
+                        "success": "$success",
+                    },
+                    "count": {"$sum": 1},
+                }
+            },
+        ]
+        counter: Counter = Counter()
+        async for doc in db[logs_collection].aggregate(pipeline):
+            key = doc["_id"]
+            bucket = datetime(key["year"], key["month"], key["day"], key["hour"])
+            counter[(bucket, key.get("action_type"), bool(key.get("success", True)))] += doc["count"]
+
+        ops = [
+            UpdateOne(
+                {"hour": hour, "action_type": action_type, "success": success},
+                {"$set": {"backfill_count": count}},
+                upsert=True,
+            )
+            for (hour, action_type, success), count in counter.items()
+        ]
+        for i in range(0, len(ops), 1000):
+            await db[stats_collection].bulk_write(ops[i:i + 1000], ordered=False)
+
+        total = sum(counter.values())
+        await db[stats_collection].update_one(
+            {"_id": HOURLY_STATS_META_ID},
+            {"$set": {"backfill_state": "done", "backfill_cutoff": cutoff, "backfilled_logs": total}},
+        )
+        if total:
+            logger.info(f"📊 已回填操作日志小时统计: {total} 条日志, {len(ops)} 个时间桶 (截止 {cutoff})")
+        return total
+    except Exception:
+        # 释放认领，下次启动重试（backfill_count 为 $set，重试不会重复计数）
+        await db[stats_collection].update_one(
+            {"_id": HOURLY_STATS_META_ID},
+            {"$unset": {"backfill_state": "", "backfill_claimed_at": ""}},
+        )
+        raise
+
+
+class OperationLogBuffer:
+    """有界内存队列 + 后台批量刷写"""
+
+    def __init__(
+        self,
+        collection_name: str = "operation_logs",
+        stats_collection_name: str = HOURLY_STATS_COLLECTION,
+        max_size: int = 10000,
+        batch_size: int = 200,
+        flush_interval_ms: int = 500,
+        overflow_policy: str = OVERFLOW_DROP_OLDEST,
+        spill_path: Optional[str] = None,
+    ):
+        self.collection_name = collection_name
+        self.stats_collection_name = stats_collection_name
+        self.max_size = max(1, int(max_size))
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = max(1, int(flush_interval_ms)) / 1000.0
+        if overflow_policy not in (OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST, OVERFLOW_SPILL):
+            logger.warning(f"未知的操作日志溢出策略 {overflow_policy}，改用 {OVERFLOW_DROP_OLDEST}")
+            overflow_policy = OVERFLOW_DROP_OLDEST
+        self.overflow_policy = overflow_policy
+        self.spill_base_path = spill_path
+
+        self._queue: Deque[Dict[str, Any]] = deque()
+        # 待写入溢出文件的日志，由后台协程批量落盘，请求路径不做磁盘 IO
+        self._spill_pending: Deque[Dict[str, Any]] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self._metrics: Dict[str, int] = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "spilled": 0,
+            "flushes": 0,
+            "flush_errors": 0,
+        }
+
+    @property
+    def spill_path(self) -> Optional[str]:
+        """本进程的溢出文件（每个 worker 进程独立，避免并发追加同一文件）"""
+        if not self.spill_base_path:
+            return None
+        stem, ext = os.path.splitext(self.spill_base_path)
+        return f"{stem}.{os.getpid()}{ext or '.ndjson'}"
+
+    # ------------------------------------------------------------------
+    # 生命周期
+    # ------------------------------------------------------------------
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """启动后台刷写协程（幂等）"""
+        if self.running:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        await self._ensure_indexes()
+        # 回填必须在刷写协程启动前完成，以首次预聚合时间为截止点
+        try:
+            await backfill_hourly_stats(get_mongo_db(), self.collection_name, self.stats_collection_name)
+        except Exception as e:
+            logger.warning(f"回填操作日志小时统计失败（下次启动重试）: {e}")
+        await self._replay_spill()
+        self._task = asyncio.create_task(self._run(), name="operation-log-flusher")
+        logger.info(
+            f"📝 操作日志缓冲写入已启动: batch={self.batch_size}, "
+            f"interval={int(self.flush_interval * 1000)}ms, max={self.max_size}, policy={self.overflow_policy}"
+        )
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """停止后台协程并刷写剩余日志"""
+        if self._task is None:
+            return
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"操作日志刷写超时，剩余 {len(self._queue)} 条未写入")
+            self._task.cancel()
+            if self.overflow_policy == OVERFLOW_SPILL and self._queue:
+                self._spill_pending.extend(self._queue)
+                self._queue.clear()
+        except Exception as e:
+            logger.error(f"操作日志刷写协程异常退出: {e}")
+        finally:
+            self._task = None
+        await self._write_spill_pending()
+        logger.info(f"🛑 操作日志缓冲写入已停止: {self.get_metrics()}")
+
+    # ------------------------------------------------------------------
+    # 请求路径
+    # ------------------------------------------------------------------
+    def submit(self, doc: Dict[str, Any]) -> bool:
+        """非阻塞入队；返回 False 表示该条被丢弃或转入溢出文件"""
+        if len(self._queue) >= self.max_size:
+            if self.overflow_policy == OVERFLOW_DROP_OLDEST:
+                self._queue.popleft()
+                self._metrics["dropped"] += 1
+            elif self.overflow_policy == OVERFLOW_DROP_NEWEST:
+                self._metrics["dropped"] += 1
+                return False
+            else:
+                self._defer_spill([doc])
+                return False
+
+        self._queue.append(doc)
+        self._metrics["enqueued"] += 1
+        if len(self._queue) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {**self._metrics, "pending": len(self._queue), "spill_pending": len(self._spill_pending)}
+
+    # ------------------------------------------------------------------
+    # 后台刷写
+    # ------------------------------------------------------------------
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            while self._queue:
+                batch = self._drain(self.batch_size)
+                await self._flush(batch)
+                # 未到阈值且未停止时，剩余部分等待下一个周期
+                if not self._stopping and len(self._queue) < self.batch_size:
+                    break
+
+            if self._spill_pending:
+                await self._write_spill_pending()
+
+            if self._stopping and not self._queue:
+                return
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        batch = []
+        while self._queue and len(batch) < limit:
+            batch.append(self._queue.popleft())
+        return batch
+
+    async def _insert(self, db, docs: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        写入一批日志，返回 (本次新写入的, 写入失败的)
+
+        重复 _id（回放/重试时已写入过）既不算失败，也不重复计入统计。
+        """
+        try:
+            await db[self.collection_name].insert_many(docs, ordered=False)
+            return docs, []
+        except BulkWriteError as e:
+            write_errors = (e.details or {}).get("writeErrors", [])
+            duplicated = {err["index"] for err in write_errors if err.get("code") == DUPLICATE_KEY_ERROR}
+            failed = {err["index"] for err in write_errors if err.get("code") != DUPLICATE_KEY_ERROR}
+            inserted = [doc for i, doc in enumerate(docs) if i not in duplicated and i not in failed]
+            if failed:
+                logger.error(f"批量写入操作日志部分失败({len(failed)}/{len(docs)}条): {write_errors[0].get('errmsg')}")
+            return inserted, [docs[i] for i in sorted(failed)]
+        except Exception as e:
+            logger.error(f"批量写入操作日志失败({len(docs)}条): {e}")
+            return [], docs
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+        db = get_mongo_db()
+        inserted, failed = await self._insert(db, batch)
+        if failed:
+            # 瞬时错误重试一次
+            retried, failed = await self._insert(db, failed)
+            inserted.extend(retried)
+
+        self._metrics["written"] += len(inserted)
+        self._metrics["flushes"] += 1
+        if failed:
+            self._metrics["flush_errors"] += 1
+            if self.overflow_policy == OVERFLOW_SPILL:
+                self._defer_spill(failed)
+            else:
+                self._metrics["dropped"] += len(failed)
+
+        if inserted:
+            try:
+                await record_hourly_stats(db, inserted, self.stats_collection_name)
+            except Exception as e:
+                logger.warning(f"更新操作日志小时统计失败: {e}")
+
+    async def _ensure_indexes(self) -> None:
+        try:
+            db = get_mongo_db()
+            await db[self.stats_collection_name].create_index(
+                [("hour", 1), ("action_type", 1), ("success", 1)], unique=True
+            )
+        except Exception as e:
+            logger.warning(f"创建操作日志小时统计索引失败: {e}")
+
+    # ------------------------------------------------------------------
+    # 溢出文件
+    # ------------------------------------------------------------------
+    def _defer_spill(self, docs: List[Dict[str, Any]]) -> None:
+        """登记待落盘的溢出日志（仅内存操作，同样有上限）"""
+        if not self.spill_path:
+            self._metrics["dropped"] += len(docs)
+            return
+        for doc in docs:
+            if len(self._spill_pending) >= self.max_size:
+                self._metrics["dropped"] += 1
+                continue
+            # 预先分配 _id，回放时可按主键去重
+            doc.setdefault("_id", ObjectId())
+            self._spill_pending.append(doc)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _write_spill_pending(self) -> None:
+        if not self._spill_pending:
+            return
+        docs = list(self._spill_pending)
+        self._spill_pending.clear()
+        try:
+            await asyncio.to_thread(self._append_spill_file, self.spill_path, docs)
+            self._metrics["spilled"] += len(docs)
+        except Exception as e:
+            self._metrics["dropped"] += len(docs)
+            logger.error(f"操作日志溢出文件写入失败: {e}")
+
+    @staticmethod
+    def _append_spill_file(path: str, docs: List[Dict[str, Any]]) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            for doc in docs:
+                f.write(json.dumps(doc, ensure_ascii=False, default=_json_default))
+                f.write("\n")
+
+    def _find_spill_files(self) -> List[str]:
+        """查找可回放的溢出文件：本进程/已退出进程留下的文件，以及未完成的 .replay 文件"""
+        if not self.spill_base_path:
+            return []
+        stem, ext = os.path.splitext(self.spill_base_path)
+        ext = ext or ".ndjson"
+        pattern = re.compile(re.escape(stem) + r"\.(\d+)" + re.escape(ext) + r"(\.replay)?$")
+        own_pid = os.getpid()
+
+        candidates = []
+        if os.path.exists(self.spill_base_path):
+            candidates.append(self.spill_base_path)
+        for path in sorted(glob.glob(f"{glob.escape(stem)}.*{ext}*")):
+            match = pattern.match(path)
+            if not match:
+                continue
+            pid = int(match.group(1))
+            # 仍在运行的其他 worker 正在写自己的文件，不能抢占
+            if pid != own_pid and _pid_alive(pid):
+                continue
+            candidates.append(path)
+        legacy_replay = f"{self.spill_base_path}.replay"
+        if os.path.exists(legacy_replay):
+            candidates.append(legacy_replay)
+        return candidates
+
+    async def _replay_spill(self) -> None:
+        for path in self._find_spill_files():
+            replay_path = path if path.endswith(".replay") else f"{path}.replay"
+            try:
+                if replay_path != path:
+                    os.replace(path, replay_path)
+            except FileNotFoundError:
+                continue  # 已被其他进程认领
+
+            replayed = 0
+            try:
+                with open(replay_path, "r", encoding="utf-8") as f:
+                    batch = []
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        batch.append(json.loads(line, object_hook=_json_object_hook))
+                        if len(batch) >= self.batch_size:
+                            await self._flush(batch)
+                            replayed += len(batch)
+                            batch = []
+                    if batch:
+                        await self._flush(batch)
+                        replayed += len(batch)
+                os.remove(replay_path)
+                logger.info(f"📝 已回放溢出的操作日志 {replayed} 条: {path}")
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                # 保留 .replay 文件，下次启动继续回放（按 _id 去重，不会重复写入）
+                logger.error(f"回放操作日志溢出文件失败: {replay_path}: {e}")
+
+
+# 全局实例
+_operation_log_buffer: Optional[OperationLogBuffer] = None
+
+
+def get_operation_log_buffer() -> OperationLogBuffer:
+    """获取操作日志缓冲写入器（按配置创建）"""
+    global _operation_log_buffer
+    if _operation_log_buffer is None:
+        from app.core.config import settings
+        _operation_log_buffer = OperationLogBuffer(
+            max_size=settings.OPLOG_BUFFER_MAX_SIZE,
+            batch_size=settings.OPLOG_BUFFER_BATCH_SIZE,
+            flush_interval_ms=settings.OPLOG_BUFFER_FLUSH_INTERVAL_MS,
+            overflow_policy=settings.OPLOG_BUFFER_OVERFLOW_POLICY,
+            spill_path=settings.OPLOG_BUFFER_SPILL_FILE or None,
+        )
+    return _operation_log_buffer
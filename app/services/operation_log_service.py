@@ -8,6 +8,14 @@ from typing import Dict, Any, List, Optional, Tuple
 from bson import ObjectId
 
 from app.core.database import get_mongo_db
+from app.services.operation_log_buffer import (
+    HOURLY_STATS_COLLECTION,
+    HOURLY_STATS_META_ID,
+    backfill_hourly_stats,
+    get_operation_log_buffer,
+    hour_bucket,
+    record_hourly_stats,
+)
 from app.models.operation_log import (
     OperationLogCreate,
     OperationLogResponse,
@@ -26,6 +34,8 @@ class OperationLogService:
     
     def __init__(self):
         self.collection_name = "operation_logs"
+        self.stats_collection_name = HOURLY_STATS_COLLECTION
+        self._stats_backfilled = False
     
     async def create_log(
         self,
@@ -37,12 +47,11 @@ class OperationLogService:
     ) -> str:
         """创建操作日志"""
         try:
-            db = get_mongo_db()
-
             # 构建日志文档
             # 🔥 使用 naive datetime（不带时区信息），MongoDB 会按原样存储，不会转换为 UTC
             current_time = now_tz().replace(tzinfo=None)  # 移除时区信息，保留本地时间值
             log_doc = {
+                "_id": ObjectId(),  # 客户端生成ID，缓冲写入时也能立即返回
                 "user_id": user_id,
                 "username": username,
                 "action_type": log_data.action_type,
@@ -58,11 +67,23 @@ class OperationLogService:
                 "created_at": current_time  # naive datetime，MongoDB 按原样存储
             }
             
-            # 插入数据库
-            result = await db[self.collection_name].insert_one(log_doc)
-            
+            # 缓冲写入器运行中：仅入队，由后台协程批量写库
+            buffer = get_operation_log_buffer()
+            if buffer.running:
+                buffer.submit(log_doc)
+                logger.debug(f"📝 操作日志已入队: {username} - {log_data.action}")
+                return str(log_doc["_id"])
+
+            # 未启动缓冲（脚本/Worker 等场景）：直接写库
+            db = get_mongo_db()
+            await db[self.collection_name].insert_one(log_doc)
+            try:
+                await record_hourly_stats(db, [log_doc], self.stats_collection_name)
+            except Exception as e:
+                logger.warning(f"更新操作日志小时统计失败: {e}")
+
             logger.info(f"📝 操作日志已记录: {username} - {log_data.action}")
-            return str(result.inserted_id)
+            return str(log_doc["_id"])
             
         except Exception as e:
             logger.error(f"创建操作日志失败: {e}")
@@ -129,55 +150,46 @@ class OperationLogService:
             raise Exception(f"获取操作日志失败: {str(e)}")
     
     async def get_stats(self, days: int = 30) -> OperationLogStats:
-        """获取操作日志统计"""
+        """获取操作日志统计（读取按小时预聚合的计数，避免扫描原始日志）"""
         try:
             db = get_mongo_db()
-            
-            # 时间范围（使用中国时区）
-            start_date = now_tz() - timedelta(days=days)
-            time_filter = {"timestamp": {"$gte": start_date}}
-            
-            # 基础统计
-            total_logs = await db[self.collection_name].count_documents(time_filter)
-            success_logs = await db[self.collection_name].count_documents({**time_filter, "success": True})
+
+            await self._ensure_hourly_stats_backfilled(db)
+
+            # 时间范围（与日志一致，使用本地 naive 时间；按整点桶对齐）
+            start_hour = hour_bucket(now_tz().replace(tzinfo=None) - timedelta(days=days))
+            cursor = db[self.stats_collection_name].find(
+                {"hour": {"$gte": start_hour}},
+                {"_id": 0, "hour": 1, "action_type": 1, "success": 1, "count": 1, "backfill_count": 1}
+            )
+
+            total_logs = 0
+            success_logs = 0
+            action_type_distribution: Dict[str, int] = {}
+            hourly_data = {i: 0 for i in range(24)}  # 初始化24小时
+
+            async for doc in cursor:
+                count = int(doc.get("count", 0)) + int(doc.get("backfill_count", 0))
+                total_logs += count
+                if doc.get("success"):
+                    success_logs += count
+                action_type = doc.get("action_type")
+                action_type_distribution[action_type] = action_type_distribution.get(action_type, 0) + count
+                hourly_data[doc["hour"].hour] += count
+
             failed_logs = total_logs - success_logs
             success_rate = (success_logs / total_logs * 100) if total_logs > 0 else 0
-            
-            # 操作类型分布
-            action_type_pipeline = [
-                {"$match": time_filter},
-                {"$group": {"_id": "$action_type", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}}
-            ]
-            action_type_cursor = db[self.collection_name].aggregate(action_type_pipeline)
-            action_type_distribution = {}
-            async for doc in action_type_cursor:
-                action_type_distribution[doc["_id"]] = doc["count"]
-            
-            # 小时分布统计
-            hourly_pipeline = [
-                {"$match": time_filter},
-                {
-                    "$group": {
-                        "_id": {"$hour": "$timestamp"},
-                        "count": {"$sum": 1}
-                    }
-                },
-                {"$sort": {"_id": 1}}
+
+            # 操作类型分布按数量降序
+            action_type_distribution = dict(
+                sorted(action_type_distribution.items(), key=lambda item: item[1], reverse=True)
+            )
+
+            hourly_distribution = [
+                {"hour": f"{hour:02d}:00", "count": count}
+                for hour, count in hourly_data.items()
             ]
-            hourly_cursor = db[self.collection_name].aggregate(hourly_pipeline)
-            hourly_distribution = []
-            hourly_data = {i: 0 for i in range(24)}  # 初始化24小时
-            
-            async for doc in hourly_cursor:
-                hourly_data[doc["_id"]] = doc["count"]
-            
-            for hour, count in hourly_data.items():
-                hourly_distribution.append({
-                    "hour": f"{hour:02d}:00",
-                    "count": count
-                })
-            
+
             stats = OperationLogStats(
                 total_logs=total_logs,
                 success_logs=success_logs,
@@ -186,14 +198,25 @@ class OperationLogService:
                 action_type_distribution=action_type_distribution,
                 hourly_distribution=hourly_distribution
             )
-            
+
             logger.info(f"📊 操作日志统计: 总数={total_logs}, 成功率={success_rate:.1f}%")
             return stats
-            
+
         except Exception as e:
             logger.error(f"获取操作日志统计失败: {e}")
             raise Exception(f"获取操作日志统计失败: {str(e)}")
-    
+
+    async def _ensure_hourly_stats_backfilled(self, db) -> None:
+        """确保升级前的历史日志已回填到小时统计（正常情况下启动时已完成，这里只做兜底）"""
+        if self._stats_backfilled:
+            return
+        self._stats_backfilled = True
+        try:
+            await backfill_hourly_stats(db, self.collection_name, self.stats_collection_name)
+        except Exception as e:
+            self._stats_backfilled = False
+            logger.warning(f"回填操作日志小时统计失败: {e}")
+
     async def clear_logs(self, days: Optional[int] = None, action_type: Optional[str] = None) -> Dict[str, Any]:
         """清空操作日志"""
         try:
@@ -213,6 +236,17 @@ class OperationLogService:
             
             # 执行删除
             result = await db[self.collection_name].delete_many(delete_filter)
+
+            # 同步清理小时统计（按整点桶粒度）
+            stats_filter = {"_id": {"$ne": HOURLY_STATS_META_ID}}
+            if days is not None:
+                stats_filter["hour"] = {"$lt": hour_bucket(cutoff_date)}
+            if action_type:
+                stats_filter["action_type"] = action_type
+            try:
+                await db[self.stats_collection_name].delete_many(stats_filter)
+            except Exception as e:
+                logger.warning(f"清理操作日志小时统计失败: {e}")
             
             logger.info(f"🗑️ 清空操作日志: 删除了 {result.deleted_count} 条记录")
             
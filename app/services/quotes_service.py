@@ -60,8 +60,11 @@ class QuotesService:
         不同版本可能有差异，做多列名兼容。
         """
         try:
-            import akshare as ak  # 已在项目中使用，不额外安装
-            df = ak.stock_zh_a_spot_em()
+            # 复用进程级全市场快照，避免与其他行情调用方重复下载
+            from tradingagents.dataflows.providers.china.spot_snapshot import (
+                SOURCE_EASTMONEY, get_spot_snapshot_service,
+            )
+            df = get_spot_snapshot_service().get_snapshot_sync(SOURCE_EASTMONEY).df
             if df is None or getattr(df, "empty", True):
                 logger.warning("AKShare spot 返回空数据")
                 return {}
@@ -0,0 +1,186 @@
+"""
+分析报告检索索引与游标分页
+
+报告列表原先对 stock_symbol / analysis_id / summary 执行三个不区分大小写的 $regex，
+再 count_documents + sort/skip/limit，每页都要扫描两遍全集合，越往后翻越慢。
+MongoDB 自带的 text 索引不会切分中文，这里在写入报告时生成检索词数组 search_terms：
+
+- 中文：按连续汉字切分，保留单字与相邻二字组（bigram）；查询词同样切分后用 $all 匹配
+- 字母/数字：整词；股票代码、分析ID 等标识符额外保留全部子串，兼容按代码片段搜索
+- 检索范围：代码、名称、分析ID、摘要、各模块报告正文（每个模块只取前 MODULE_CONTENT_CHARS 字）
+
+search_terms 上建多键索引，与 (created_at, _id) 组成复合索引；列表按 (created_at, _id)
+倒序做游标分页，总数在超过 TOTAL_COUNT_LIMIT 时只返回近似值。
+
+二字组 $all 匹配是近似的：查询词的各二字组都出现在报告中即视为命中，不要求相邻。
+"""
+import asyncio
+import base64
+import json
+import logging
+import re
+import unicodedata
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+logger = logging.getLogger("webapi")
+
+# 每个模块报告正文参与索引的最大字符数
+MODULE_CONTENT_CHARS = 2000
+# 单个报告最多保留的检索词数
+MAX_TERMS = 4000
+# 标识符子串的最大长度（更长的标识符只索引整词）
+IDENTIFIER_MAX_LEN = 24
+# 带筛选条件时精确计数的上限，超过后返回近似总数
+TOTAL_COUNT_LIMIT = 10000
+
+_CJK_RANGES = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+_TOKEN_RE = re.compile(rf"[{_CJK_RANGES}]+|[0-9a-z]+")
+_CJK_RE = re.compile(rf"[{_CJK_RANGES}]")
+
+_SOURCE_FIELDS = ("stock_symbol", "stock_name", "analysis_id", "summary", "reports")
+
+
+def _normalize(text: Any) -> str:
+    return unicodedata.normalize("NFKC", str(text or "")).lower()
+
+
+def _add_cjk(run: str, terms: Set[str]) -> None:
+    terms.update(run)
+    terms.update(run[i:i + 2] for i in range(len(run) - 1))
+
+
+def _text_terms(text: Any, terms: Set[str], identifier: bool = False) -> None:
+    for token in _TOKEN_RE.findall(_normalize(text)):
+        if _CJK_RE.match(token):
+            _add_cjk(token, terms)
+        elif identifier and len(token) <= IDENTIFIER_MAX_LEN:
+            terms.update(token[i:j] for i in range(len(token)) for j in range(i + 1, len(token) + 1))
+        else:
+            terms.add(token)
+
+
+def build_search_terms(doc: Dict[str, Any]) -> List[str]:
+    """生成报告的检索词（写入 search_terms 字段）"""
+    terms: Set[str] = set()
+    _text_terms(doc.get("stock_symbol"), terms, identifier=True)
+    _text_terms(doc.get("analysis_id"), terms, identifier=True)
+    _text_terms(doc.get("stock_name"), terms)
+    _text_terms(doc.get("summary"), terms)
+    reports = doc.get("reports") or {}
+    if isinstance(reports, dict):
+        for content in reports.values():
+            if isinstance(content, str):
+                _text_terms(content[:MODULE_CONTENT_CHARS], terms)
+    # 超出上限时优先保留短词（单字、二字组、短代码片段）
+    return sorted(terms, key=lambda t: (len(t), t))[:MAX_TERMS]
+
+
+def query_terms(keyword: str) -> List[str]:
+    """将搜索关键词切分为检索词，与 build_search_terms 的切分方式一致"""
+    terms: Set[str] = set()
+    for token in _TOKEN_RE.findall(_normalize(keyword)):
+        if _CJK_RE.match(token) and len(token) > 1:
+            terms.update(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            terms.add(token)
+    return sorted(terms)
+
+
+def search_filter(keyword: str) -> Optional[Dict[str, Any]]:
+    """关键词对应的查询条件，关键词中没有可检索的字符时返回 None"""
+    terms = query_terms(keyword)
+    if not terms:
+        return None
+    return {"search_terms": {"$all": terms}}
+
+
+# ---- 游标分页 ----
+
+def encode_cursor(doc: Dict[str, Any]) -> str:
+    """由一页最后一条报告生成下一页游标"""
+    created_at = doc.get("created_at")
+    oid = doc.get("_id")
+    payload = {
+        "t": created_at.isoformat() if isinstance(created_at, datetime) else created_at,
+        "id": str(oid),
+        "oid": isinstance(oid, ObjectId),
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    """解析游标，返回 (created_at, _id)；格式错误时抛出 ValueError"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        created_at = payload["t"]
+        if isinstance(created_at, str):
+            try:
+                created_at = datetime.fromisoformat(created_at)
+            except ValueError:
+                pass
+        oid = ObjectId(payload["id"]) if payload.get("oid") else payload["id"]
+        return created_at, oid
+    except Exception as e:
+        raise ValueError(f"无效的分页游标: {cursor}") from e
+
+
+def keyset_filter(cursor: str) -> Dict[str, Any]:
+    """(created_at, _id) 倒序排列时，位于游标之后的记录"""
+    created_at, oid = decode_cursor(cursor)
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": oid}},
+    ]}
+
+
+async def approximate_count(collection, query: Dict[str, Any], limit: int = TOTAL_COUNT_LIMIT) -> Tuple[int, bool]:
+    """
+    返回 (总数, 是否为近似值)
+
+    无筛选条件时使用集合元数据计数；有筛选条件时最多精确计数到 limit 条。
+    """
+    if not query:
+        return await collection.estimated_document_count(), True
+    count = await collection.count_documents(query, limit=limit + 1)
+    if count > limit:
+        return limit, True
+    return count, False
+
+
+# ---- 索引维护 ----
+
+async def ensure_report_search_indexes(db) -> None:
+    """创建报告列表与检索所需的索引"""
+    reports = db["analysis_reports"]
+    await reports.create_index([("created_at", -1), ("_id", -1)])
+    await reports.create_index([("search_terms", 1), ("created_at", -1), ("_id", -1)])
+    await reports.create_index([("stock_symbol", 1), ("created_at", -1), ("_id", -1)])
+    await reports.create_index([("market_type", 1), ("created_at", -1), ("_id", -1)])
+
+
+async def backfill_report_search_terms(db, batch_size: int = 500) -> int:
+    """为缺少 search_terms 的报告补建检索词，返回更新条数"""
+    collection = db["analysis_reports"]
+    projection = {field: 1 for field in _SOURCE_FIELDS}
+    updated = 0
+    try:
+        while True:
+            docs = await collection.find(
+                {"search_terms": {"$exists": False}}, projection
+            ).limit(batch_size).to_list(length=batch_size)
+            if not docs:
+                break
+            ops = [UpdateOne({"_id": d["_id"]}, {"$set": {"search_terms": build_search_terms(d)}}) for d in docs]
+            await collection.bulk_write(ops, ordered=False)
+            updated += len(ops)
+            # 让出事件循环，避免长时间占用
+            await asyncio.sleep(0)
+    except Exception as e:
+        logger.warning(f"⚠️ 补建报告检索词中断（已更新 {updated} 份）: {e}")
+    if updated:
+        logger.info(f"🔎 已为 {updated} 份分析报告补建检索词")
+    return updated
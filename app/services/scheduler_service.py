@@ -6,7 +6,10 @@
 """
 
 import asyncio
-from typing import List, Dict, Any, Optional
+import importlib
+import inspect
+import sys
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 from datetime import datetime, timedelta, timezone
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.job import Job
@@ -1043,6 +1046,40 @@ def set_scheduler_instance(scheduler: AsyncIOScheduler):
     logger.info("✅ 调度器实例已设置")
 
 
+def lazy_job(ref: str) -> Callable[..., Awaitable[Any]]:
+    """
+    按 "模块路径:函数名" 引用注册定时任务，任务首次执行时才导入实现模块
+
+    各数据源同步服务会在导入时加载 Tushare/AKShare/BaoStock 等 SDK，
+    注册任务时只保存引用，避免启动阶段导入全部实现。
+    返回的协程函数沿用目标函数的模块名与函数名，任务详情中的 func 显示不变。
+
+    Args:
+        ref: 形如 "app.worker.tushare_sync_service:run_tushare_quotes_sync" 的引用
+
+    Returns:
+        可直接传给 scheduler.add_job 的协程函数
+    """
+    module_name, _, func_name = ref.partition(":")
+    if not module_name or not func_name:
+        raise ValueError(f"无效的任务引用: {ref}（应为 '模块路径:函数名'）")
+
+    async def runner(*args, **kwargs):
+        module = sys.modules.get(module_name)
+        if module is None:
+            # 首次导入可能耗时数秒，放到线程中执行，避免阻塞事件循环
+            module = await asyncio.to_thread(importlib.import_module, module_name)
+        result = getattr(module, func_name)(*args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    runner.__module__ = module_name
+    runner.__name__ = runner.__qualname__ = func_name
+    runner.job_ref = ref
+    return runner
+
+
 def get_scheduler_service() -> SchedulerService:
     """
     获取调度器服务实例
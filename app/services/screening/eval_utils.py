@@ -4,9 +4,12 @@ Extracted from ScreeningService to separate concerns while keeping API unchanged
 """
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Iterable
-import pandas as pd
-import numpy as np
+import math
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Iterable
+
+# pandas 只在评估K线条件时需要，避免路由导入时加载
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def collect_fields_from_conditions(node: Dict[str, Any], allowed_fields: Iterable[str]) -> List[str]:
@@ -81,6 +84,8 @@ def evaluate_conditions(
     allowed_fields: Iterable[str],
     allowed_ops: Iterable[str],
 ) -> bool:
+    import pandas as pd
+
     if not node:
         return True
     # group 节点
@@ -159,7 +164,7 @@ def evaluate_conditions(
 
 def safe_float(v: Any) -> Optional[float]:
     try:
-        if v is None or (isinstance(v, float) and np.isnan(v)):
+        if v is None or (isinstance(v, float) and math.isnan(v)):
             return None
         return float(v)
     except Exception:
@@ -1,17 +1,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 
-import pandas as pd
-import numpy as np
-
-# 统一指标库
-from tradingagents.tools.analysis.indicators import IndicatorSpec, compute_many
-# 统一多数据源DF接口（按优先级降级）
-from tradingagents.dataflows.data_source_manager import get_data_source_manager
-from tradingagents.dataflows.providers.china.fundamentals_snapshot import get_cn_fund_snapshot
+# pandas、指标库与数据源在执行筛选时才导入，避免路由注册时加载数据源 SDK
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 from app.services.screening.eval_utils import (
@@ -75,6 +70,12 @@ class ScreeningService:
 
     # --- 公共入口 ---
     def run(self, conditions: Dict[str, Any], params: ScreeningParams) -> Dict[str, Any]:
+        # 统一指标库
+        from tradingagents.tools.analysis.indicators import IndicatorSpec, compute_many
+        # 统一多数据源DF接口（按优先级降级）
+        from tradingagents.dataflows.data_source_manager import get_data_source_manager
+        from tradingagents.dataflows.providers.china.fundamentals_snapshot import get_cn_fund_snapshot
+
         symbols = self._get_universe()
         # 为控制时长，先限制样本规模（后续用批量/缓存优化）
         symbols = symbols[:120]
@@ -7,7 +7,7 @@ import asyncio
 import uuid
 import logging
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import TYPE_CHECKING, Dict, Any, Optional, List
 from pathlib import Path
 import sys
 
@@ -19,7 +19,9 @@ sys.path.insert(0, str(project_root))
 from tradingagents.utils.logging_init import init_logging
 init_logging()
 
-from tradingagents.graph.trading_graph import TradingAgentsGraph
+# TradingAgentsGraph 会加载全部 LLM SDK 与数据源，延迟到创建分析实例时再导入
+if TYPE_CHECKING:
+    from tradingagents.graph.trading_graph import TradingAgentsGraph
 from tradingagents.default_config import DEFAULT_CONFIG
 from app.models.analysis import (
     AnalysisTask, AnalysisStatus, SingleAnalysisRequest, AnalysisParameters
@@ -34,14 +36,11 @@ from app.services.redis_progress_tracker import RedisProgressTracker, get_progre
 from app.services.progress_log_handler import register_analysis_tracker, unregister_analysis_tracker
 
 # 股票基础信息获取（用于补充显示名称）
-try:
+# 数据源管理器初始化会探测各数据源（可能访问网络/数据库），首次使用时才创建
+def _get_stock_info_safe(stock_code: str):
+    """获取股票基础信息的安全封装"""
     from tradingagents.dataflows.data_source_manager import get_data_source_manager
-    _data_source_manager = get_data_source_manager()
-    def _get_stock_info_safe(stock_code: str):
-        """获取股票基础信息的安全封装"""
-        return _data_source_manager.get_stock_basic_info(stock_code)
-except Exception:
-    _get_stock_info_safe = None
+    return get_data_source_manager().get_stock_basic_info(stock_code)
 
 # 设置日志
 logger = logging.getLogger("app.services.simple_analysis_service")
@@ -704,7 +703,7 @@ class SimpleAnalysisService:
             logger.warning(f"⚠️ 生成新的用户ID: {new_object_id}")
             return PyObjectId(new_object_id)
 
-    def _get_trading_graph(self, config: Dict[str, Any]) -> TradingAgentsGraph:
+    def _get_trading_graph(self, config: Dict[str, Any]) -> "TradingAgentsGraph":
         """获取或创建TradingAgents实例
 
         ⚠️ 注意：为了避免并发执行时的数据混淆，每次都创建新实例
@@ -717,6 +716,8 @@ class SimpleAnalysisService:
         # 不再使用缓存，因为 TradingAgentsGraph 有可变的实例变量
         logger.info(f"🔧 创建新的TradingAgents实例（并发安全模式）...")
 
+        from tradingagents.graph.trading_graph import TradingAgentsGraph
+
         trading_graph = TradingAgentsGraph(
             selected_analysts=config.get("selected_analysts", ["market", "fundamentals"]),
             debug=config.get("debug", False),
@@ -2010,6 +2011,9 @@ class SimpleAnalysisService:
             # 分页
             results = merged_tasks[offset:offset + limit]
 
+            # 内存任务的分析结果不常驻内存，只为当前页按需加载
+            results = await self.memory_manager.attach_results(results)
+
             # 为结果补齐股票名称
             results = self._enrich_stock_names(results)
             logger.info(f"📋 [Tasks] 合并后返回数量: {len(results)} (内存: {len(tasks_in_mem)}, MongoDB: {count})")
@@ -2211,6 +2215,9 @@ class SimpleAnalysisService:
                             if 'T' in value or ' ' in value:
                                 task[time_field] = value.replace(' ', 'T') + '+08:00'
 
+            # 内存任务的分析结果不常驻内存，只为当前页按需加载
+            results = await self.memory_manager.attach_results(results)
+
             # 为结果补齐股票名称
             results = self._enrich_stock_names(results)
             logger.info(f"📋 [Tasks] 合并后返回数量: {len(results)} (内存: {len(tasks_in_mem)}, MongoDB: {count})")
@@ -2621,6 +2628,10 @@ class SimpleAnalysisService:
                 "performance_metrics": result.get("performance_metrics", {})
             }
 
+            # 检索词（报告列表的关键词搜索使用）
+            from app.services.report_search_index import build_search_terms
+            document["search_terms"] = build_search_terms(document)
+
             # 保存到analysis_reports集合（与web目录保持一致）
             result_insert = await db.analysis_reports.insert_one(document)
 
@@ -0,0 +1,161 @@
+"""
+股票名称批量解析（进程内 TTL 缓存）
+
+报告列表/详情原先逐行调用同步的 get_stock_name：缓存未命中时新建配置管理器、
+读取数据源配置，再按数据源依次发起最多三次阻塞的 find_one，一页 50 条报告
+最多 150 次查询，全部在事件循环线程上执行。
+
+StockNameResolver 改为：
+
+- 一页中所有未命中的代码合并为一次 $in 查询（Motor，异步），按数据源优先级取名称，
+  没有 source 字段的旧数据排在最后作为兜底
+- 结果进入有界 LRU 缓存，条目在 TTL 后过期；未找到名称的代码同样缓存（值为代码本身）
+- 基础信息同步完成后整体失效（invalidate），与股票主索引的刷新时机一致
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.database import get_mongo_db
+
+logger = logging.getLogger("webapi")
+
+DEFAULT_TTL_SECONDS = 600.0
+DEFAULT_MAX_ENTRIES = 20000
+
+_PROJECTION = {"_id": 0, "code": 1, "symbol": 1, "name": 1, "source": 1}
+
+
+class StockNameResolver:
+    """按代码批量解析股票名称"""
+
+    def __init__(self, db=None, ttl_seconds: Optional[float] = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self._db = db
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv("TA_STOCK_NAME_CACHE_TTL", DEFAULT_TTL_SECONDS))
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "queries": 0}
+
+    @property
+    def db(self):
+        return self._db if self._db is not None else get_mongo_db()
+
+    @staticmethod
+    def _code6(code: str) -> str:
+        return str(code).strip().zfill(6)
+
+    def _get_cached(self, code: str) -> Optional[str]:
+        with self._lock:
+            item = self._cache.get(code)
+            if item is None:
+                return None
+            name, expires_at = item
+            if expires_at < time.monotonic():
+                del self._cache[code]
+                return None
+            self._cache.move_to_end(code)
+            return name
+
+    def _put(self, code: str, name: str) -> None:
+        with self._lock:
+            self._cache[code] = (name, time.monotonic() + self.ttl_seconds)
+            self._cache.move_to_end(code)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    async def _source_priority(self) -> List[str]:
+        from app.services.market_data_repository import get_market_data_repository
+        return await get_market_data_repository().get_source_priority()
+
+    async def _fetch(self, codes: List[str]) -> Dict[str, str]:
+        """一次 $in 查询取回 codes 的名称（代码为6位），按数据源优先级选取"""
+        code6s = {self._code6(c) for c in codes}
+        priority = await self._source_priority()
+        rank = {src: i for i, src in enumerate(priority)}
+        cursor = self.db["stock_basic_info"].find(
+            {"$or": [{"code": {"$in": sorted(code6s)}}, {"symbol": {"$in": sorted(code6s)}}]}, _PROJECTION
+        )
+        docs = await cursor.to_list(length=None)
+        self.stats["queries"] += 1
+
+        best: Dict[str, Tuple[int, str]] = {}
+        for doc in docs:
+            name = doc.get("name")
+            if not name:
+                continue
+            key = doc.get("code") if doc.get("code") in code6s else doc.get("symbol")
+            # 未启用的数据源与旧数据（无 source 字段）排在最后
+            r = rank.get(doc.get("source"), len(rank))
+            if key not in best or r < best[key][0]:
+                best[key] = (r, name)
+        return {code6: name for code6, (_, name) in best.items()}
+
+    async def resolve_many(self, codes: Iterable[str]) -> Dict[str, str]:
+        """
+        批量解析股票名称
+
+        Returns:
+            {原始代码: 名称}，查不到名称的代码映射为其自身
+        """
+        result: Dict[str, str] = {}
+        missing: List[str] = []
+        for code in codes:
+            if not code or code in result:
+                continue
+            name = self._get_cached(code)
+            if name is None:
+                missing.append(code)
+                result[code] = code
+            else:
+                result[code] = name
+        self.stats["hits"] += len(result) - len(missing)
+        self.stats["misses"] += len(missing)
+        if not missing:
+            return result
+
+        try:
+            names = await self._fetch(missing)
+        except Exception as e:
+            logger.warning(f"⚠️ 批量获取股票名称失败 {missing[:5]}...: {e}")
+            return result
+
+        for code in missing:
+            name = names.get(self._code6(code), code)
+            result[code] = name
+            self._put(code, name)
+        return result
+
+    async def resolve(self, code: str) -> str:
+        """解析单只股票名称，查不到时返回代码"""
+        if not code:
+            return code
+        return (await self.resolve_many([code]))[code]
+
+    def invalidate(self, codes: Optional[Iterable[str]] = None) -> None:
+        """失效缓存：不传 codes 时清空全部"""
+        with self._lock:
+            if codes is None:
+                self._cache.clear()
+            else:
+                for code in codes:
+                    self._cache.pop(code, None)
+
+
+_resolver: Optional[StockNameResolver] = None
+_resolver_lock = threading.Lock()
+
+
+def get_stock_name_resolver() -> StockNameResolver:
+    """获取全局股票名称解析器"""
+    global _resolver
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                _resolver = StockNameResolver()
+    return _resolver
@@ -0,0 +1,323 @@
+"""
+股票代码主索引（进程内）
+
+从 stock_basic_info / stock_basic_info_hk / stock_basic_info_us 加载全部股票，
+搜索时不再对整个集合执行无锚点的 $regex：
+
+- 前缀查找：代码、名称、拼音首字母、全拼、英文名（有序键 + 二分查找）
+- 子串查找：名称中间的字（字符 n-gram 倒排索引），兼容原有的模糊匹配语义
+- 容错查找：编辑距离 ≤1（短词）或 ≤2（长词）的拼写错误
+- 增量刷新：基础信息同步完成后标记市场过期，下次搜索时只重建变化的条目
+
+每只股票只保留优先级最高的数据源记录。
+"""
+import asyncio
+import bisect
+import importlib.util
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger("webapi")
+
+# pypinyin 词典导入约 0.5s，只在首次构建拼音键时才导入
+PYPINYIN_AVAILABLE = importlib.util.find_spec("pypinyin") is not None
+
+MARKET_COLLECTIONS = {
+    "CN": "stock_basic_info",
+    "HK": "stock_basic_info_hk",
+    "US": "stock_basic_info_us",
+}
+
+# 排名：数值越小越靠前
+RANK_CODE_EXACT = 0
+RANK_NAME_EXACT = 1
+RANK_CODE_PREFIX = 2
+RANK_NAME_PREFIX = 3
+RANK_INITIALS_PREFIX = 4
+RANK_PINYIN_PREFIX = 5
+RANK_NAME_EN_PREFIX = 6
+RANK_SUBSTRING = 7
+RANK_FUZZY = 8
+
+_FIELD_RANKS = {
+    "code": RANK_CODE_PREFIX,
+    "name": RANK_NAME_PREFIX,
+    "initials": RANK_INITIALS_PREFIX,
+    "pinyin": RANK_PINYIN_PREFIX,
+    "name_en": RANK_NAME_EN_PREFIX,
+}
+
+# 超过该数量的变更直接重建有序键表
+_INCREMENTAL_LIMIT = 2000
+# 容错匹配最多计算编辑距离的候选数
+_FUZZY_CANDIDATES = 200
+
+
+def _norm(text: Any) -> str:
+    return str(text or "").strip().lower().replace(" ", "")
+
+
+def _pinyin_keys(name: str) -> Tuple[str, str]:
+    """返回 (拼音首字母, 全拼)，未安装 pypinyin 时返回空串"""
+    if not PYPINYIN_AVAILABLE or not name:
+        return "", ""
+    from pypinyin import Style, lazy_pinyin
+    syllables = [s for s in lazy_pinyin(name, style=Style.NORMAL, errors="ignore") if s]
+    initials = "".join(s[0] for s in syllables)
+    return initials.lower(), "".join(syllables).lower()
+
+
+def _bounded_edit_distance(a: str, b: str, limit: int) -> int:
+    """Damerau-Levenshtein（相邻交换）距离，超过 limit 时提前返回 limit+1"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        row_min = cur[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            v = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                v = min(v, prev2[j - 2] + 1)
+            cur[j] = v
+            row_min = min(row_min, v)
+        if row_min > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def _grams(text: str) -> Set[str]:
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+class SymbolMaster:
+    """单个进程内的股票主索引"""
+
+    def __init__(self):
+        # entry_id = (market, code)
+        self._docs: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._keys: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+        # 有序键表：[(key, field, market, code)]
+        self._sorted: List[Tuple[str, str, str, str]] = []
+        # n-gram 倒排：gram -> {entry_id}（用于子串和容错）
+        self._grams: Dict[str, Set[Tuple[str, str]]] = {}
+
+        self._loaded_markets: Set[str] = set()
+        self._stale_markets: Set[str] = set()
+        self._lock = asyncio.Lock()
+        self.stats = {"loads": 0, "changed_entries": 0, "last_refresh_ms": 0.0}
+
+    # ==================== 构建 ====================
+
+    @staticmethod
+    def _entry_keys(doc: Dict[str, Any]) -> List[Tuple[str, str]]:
+        name = str(doc.get("name") or "")
+        initials, full = _pinyin_keys(name)
+        keys = [
+            ("code", _norm(doc.get("code"))),
+            ("name", _norm(name)),
+            ("initials", initials),
+            ("pinyin", full),
+            ("name_en", _norm(doc.get("name_en"))),
+        ]
+        return [(f, k) for f, k in keys if k]
+
+    def _remove(self, entry_id: Tuple[str, str], update_sorted: bool) -> None:
+        for field, key in self._keys.pop(entry_id, []):
+            if update_sorted:
+                item = (key, field) + entry_id
+                i = bisect.bisect_left(self._sorted, item)
+                if i < len(self._sorted) and self._sorted[i] == item:
+                    del self._sorted[i]
+            for g in _grams(key):
+                ids = self._grams.get(g)
+                if ids is not None:
+                    ids.discard(entry_id)
+                    if not ids:
+                        del self._grams[g]
+        self._docs.pop(entry_id, None)
+
+    def _add(self, entry_id: Tuple[str, str], doc: Dict[str, Any], update_sorted: bool) -> None:
+        keys = self._entry_keys(doc)
+        self._docs[entry_id] = doc
+        self._keys[entry_id] = keys
+        for field, key in keys:
+            if update_sorted:
+                bisect.insort(self._sorted, (key, field) + entry_id)
+            for g in _grams(key):
+                self._grams.setdefault(g, set()).add(entry_id)
+
+    def apply_docs(self, market: str, docs: Iterable[Dict[str, Any]], source_priority: Optional[List[str]] = None,
+                   replace: bool = True) -> int:
+        """
+        用一批基础信息文档更新索引（同一代码按数据源优先级取一条）
+
+        Args:
+            market: CN/HK/US
+            docs: 基础信息文档
+            source_priority: 数据源优先级（高 -> 低）
+            replace: True 表示 docs 是该市场的全集，索引中不存在于 docs 的代码会被移除
+
+        Returns:
+            重建索引的条目数
+        """
+        rank = {s: i for i, s in enumerate(source_priority or [])}
+        best: Dict[str, Dict[str, Any]] = {}
+        for doc in docs:
+            code = str(doc.get("code") or "").strip()
+            if not code:
+                continue
+            current = best.get(code)
+            if current is None or rank.get(doc.get("source"), len(rank)) < rank.get(current.get("source"), len(rank)):
+                best[code] = doc
+
+        # 只有索引键（代码/名称/英文名）变化的条目才需要重建索引，其余只替换文档
+        changed: List[Tuple[Tuple[str, str], Optional[Dict[str, Any]]]] = []
+        for code, doc in best.items():
+            entry_id = (market, code)
+            old = self._docs.get(entry_id)
+            if old is not None and all(old.get(f) == doc.get(f) for f in ("code", "name", "name_en")):
+                self._docs[entry_id] = doc
+            else:
+                changed.append((entry_id, doc))
+        if replace:
+            for entry_id in [e for e in self._docs if e[0] == market and e[1] not in best]:
+                changed.append((entry_id, None))
+
+        incremental = len(changed) <= _INCREMENTAL_LIMIT and bool(self._sorted)
+        for entry_id, doc in changed:
+            self._remove(entry_id, update_sorted=incremental)
+            if doc is not None:
+                self._add(entry_id, doc, update_sorted=incremental)
+        if not incremental and changed:
+            self._sorted = sorted(
+                (key, field) + entry_id for entry_id, keys in self._keys.items() for field, key in keys
+            )
+
+        self.stats["changed_entries"] += len(changed)
+        return len(changed)
+
+    def mark_stale(self, market: Optional[str] = None) -> None:
+        """基础信息同步完成后调用，下次搜索前刷新该市场"""
+        self._stale_markets.update([market] if market else MARKET_COLLECTIONS.keys())
+
+    @property
+    def size(self) -> int:
+        return len(self._docs)
+
+    # ==================== 加载 ====================
+
+    async def ensure_loaded(self, db, market: str, source_priority: Optional[List[str]] = None) -> None:
+        """首次使用或被标记过期时，从数据库（增量）刷新该市场"""
+        if market in self._loaded_markets and market not in self._stale_markets:
+            return
+        async with self._lock:
+            if market in self._loaded_markets and market not in self._stale_markets:
+                return
+            start = time.perf_counter()
+            collection = db[MARKET_COLLECTIONS[market]]
+            projection = {"_id": 0}
+            docs = await collection.find({}, projection).to_list(length=None)
+            changed = self.apply_docs(market, docs, source_priority, replace=True)
+            self._loaded_markets.add(market)
+            self._stale_markets.discard(market)
+            elapsed = (time.perf_counter() - start) * 1000
+            self.stats["loads"] += 1
+            self.stats["last_refresh_ms"] = round(elapsed, 1)
+            logger.info(f"🔎 股票主索引已刷新: 市场={market}, 变更={changed}, 总数={self.size}, 耗时={elapsed:.0f}ms")
+
+    # ==================== 搜索 ====================
+
+    def search(self, query: str, market: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        排名搜索：精确 > 代码前缀 > 名称前缀 > 拼音首字母 > 全拼 > 英文名 > 子串 > 容错
+
+        Returns:
+            基础信息文档列表（每个代码一条）
+        """
+        q = _norm(query)
+        if not q or limit <= 0:
+            return []
+
+        scores: Dict[Tuple[str, str], Tuple[int, int, str]] = {}
+
+        def _offer(entry_id, rank, key_len):
+            if market and entry_id[0] != market:
+                return
+            score = (rank, key_len, entry_id[1])
+            if entry_id not in scores or score < scores[entry_id]:
+                scores[entry_id] = score
+
+        # 1. 前缀
+        i = bisect.bisect_left(self._sorted, (q,))
+        while i < len(self._sorted):
+            key, field, m, code = self._sorted[i]
+            if not key.startswith(q):
+                break
+            rank = _FIELD_RANKS[field]
+            if key == q and field in ("code", "name"):
+                rank = RANK_CODE_EXACT if field == "code" else RANK_NAME_EXACT
+            _offer((m, code), rank, len(key))
+            i += 1
+
+        # 2. 子串（代码/名称/拼音/英文名中间位置）
+        if len(scores) < limit:
+            # 从最小的倒排集合开始求交集
+            postings = sorted((self._grams.get(g, set()) for g in {q[j:j + 2] for j in range(len(q) - 1)} or {q}),
+                              key=len)
+            candidates: Set[Tuple[str, str]] = set(postings[0])
+            for ids in postings[1:]:
+                candidates &= ids
+                if not candidates:
+                    break
+            for entry_id in candidates or ():
+                if entry_id in scores:
+                    continue
+                for field, key in self._keys.get(entry_id, []):
+                    if q in key:
+                        _offer(entry_id, RANK_SUBSTRING, len(key))
+                        break
+
+        # 3. 容错（仅在结果不足时，且查询至少3个字符、不是纯数字代码）
+        if len(scores) < limit and len(q) >= 3 and not q.isdigit():
+            max_dist = 1 if len(q) <= 5 else 2
+            grams = {q[j:j + 2] for j in range(len(q) - 1)}
+            hits: Dict[Tuple[str, str], int] = {}
+            for g in grams:
+                for entry_id in self._grams.get(g, ()):
+                    hits[entry_id] = hits.get(entry_id, 0) + 1
+            # 每处编辑（含相邻交换）最多破坏3个 bigram；只校验共享 bigram 最多的候选
+            need = max(1, len(grams) - 3 * max_dist)
+            pool = [(n, entry_id) for entry_id, n in hits.items() if n >= need and entry_id not in scores]
+            pool.sort(key=lambda item: -item[0])
+            for _n, entry_id in pool[:_FUZZY_CANDIDATES]:
+                best = None
+                for field, key in self._keys.get(entry_id, []):
+                    if field == "code":
+                        continue
+                    for target in (key, key[:len(q)]):
+                        d = _bounded_edit_distance(q, target, max_dist)
+                        if d <= max_dist and (best is None or d < best):
+                            best = d
+                if best is not None:
+                    _offer(entry_id, RANK_FUZZY + best, len(q))
+
+        ranked = sorted(scores.items(), key=lambda kv: kv[1])[:limit]
+        return [self._docs[entry_id] for entry_id, _ in ranked]
+
+
+_symbol_master: Optional[SymbolMaster] = None
+
+
+def get_symbol_master() -> SymbolMaster:
+    """获取进程内股票主索引"""
+    global _symbol_master
+    if _symbol_master is None:
+        _symbol_master = SymbolMaster()
+    return _symbol_master
@@ -173,6 +173,19 @@ class UnifiedStockService:
         Returns:
             股票列表
         """
+        source_priority = await self._get_source_priority(market)
+
+        # 🔥 优先使用进程内股票主索引（前缀/拼音/容错匹配，已按优先级去重）
+        try:
+            from app.services.symbol_master import get_symbol_master
+            master = get_symbol_master()
+            await master.ensure_loaded(self.db, market, source_priority)
+            result_list = master.search(query, market=market, limit=limit)
+            logger.info(f"🔍 搜索 {market} 市场: '{query}' -> {len(result_list)} 条结果（主索引）")
+            return result_list
+        except Exception as e:
+            logger.warning(f"⚠️ 股票主索引不可用，回退到正则查询: {e}")
+
         collection_name = self.collection_map[market]["basic_info"]
         collection = self.db[collection_name]
 
@@ -193,7 +206,6 @@ class UnifiedStockService:
             return []
         
         # 按 code 分组，每个 code 只保留优先级最高的数据源
-        source_priority = await self._get_source_priority(market)
         unique_results = {}
         
         for doc in all_results:
@@ -15,8 +15,13 @@ import tempfile
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+from tradingagents.utils.render_pool import get_render_pool
+
 logger = logging.getLogger(__name__)
 
+# 渲染缓存命名空间（与 Web 端导出的渲染参数不同，缓存不互通）
+RENDER_NAMESPACE = "api"
+
 # 检查依赖是否可用
 try:
     import markdown
@@ -281,16 +286,34 @@ pre, code {
 </style>
 """
     
-    def generate_docx_report(self, report_doc: Dict[str, Any]) -> bytes:
-        """生成 Word 文档格式报告"""
-        logger.info("📄 开始生成 Word 文档...")
-
-        if not self.pandoc_available:
+    def _check_available(self, fmt: str) -> None:
+        """检查目标格式的转换工具是否可用"""
+        if fmt == "docx" and not self.pandoc_available:
             raise Exception("Pandoc 不可用，无法生成 Word 文档。请安装 pandoc 或使用 Markdown 格式导出。")
 
-        # 生成 Markdown 内容
+        # 检查 pdfkit 是否可用
+        if fmt == "pdf" and not self.pdfkit_available:
+            error_msg = (
+                "pdfkit 不可用，无法生成 PDF。\n\n"
+                "安装方法:\n"
+                "1. 安装 pdfkit: pip install pdfkit\n"
+                "2. 安装 wkhtmltopdf: https://wkhtmltopdf.org/downloads.html\n"
+            )
+            if PDFKIT_ERROR:
+                error_msg += f"\n错误详情: {PDFKIT_ERROR}"
+
+            logger.error(f"❌ {error_msg}")
+            raise Exception(error_msg)
+
+    def generate_docx_report(self, report_doc: Dict[str, Any]) -> bytes:
+        """生成 Word 文档格式报告（经共享渲染池，相同内容直接命中缓存）"""
+        logger.info("📄 开始生成 Word 文档...")
+        self._check_available("docx")
         md_content = self.generate_markdown_report(report_doc)
+        return get_render_pool().render(md_content, "docx", self._render_docx, namespace=RENDER_NAMESPACE)
 
+    def _render_docx(self, md_content: str) -> bytes:
+        """调用 pandoc 将 Markdown 转换为 Word（在渲染池线程中执行）"""
         try:
             # 创建临时文件
             with tempfile.NamedTemporaryFile(suffix='.docx', delete=False) as tmp_file:
@@ -635,25 +658,12 @@ pre, code {
     def generate_pdf_report(self, report_doc: Dict[str, Any]) -> bytes:
         """生成 PDF 格式报告（使用 pdfkit + wkhtmltopdf）"""
         logger.info("📊 开始生成 PDF 文档...")
-
-        # 检查 pdfkit 是否可用
-        if not self.pdfkit_available:
-            error_msg = (
-                "pdfkit 不可用，无法生成 PDF。\n\n"
-                "安装方法:\n"
-                "1. 安装 pdfkit: pip install pdfkit\n"
-                "2. 安装 wkhtmltopdf: https://wkhtmltopdf.org/downloads.html\n"
-            )
-            if PDFKIT_ERROR:
-                error_msg += f"\n错误详情: {PDFKIT_ERROR}"
-
-            logger.error(f"❌ {error_msg}")
-            raise Exception(error_msg)
-
-        # 生成 Markdown 内容
+        self._check_available("pdf")
         md_content = self.generate_markdown_report(report_doc)
+        return get_render_pool().render(md_content, "pdf", self._render_pdf, namespace=RENDER_NAMESPACE)
 
-        # 使用 pdfkit 生成 PDF
+    def _render_pdf(self, md_content: str) -> bytes:
+        """使用 pdfkit 将 Markdown 转换为 PDF（在渲染池线程中执行）"""
         try:
             html_content = self._markdown_to_html(md_content)
             return self._generate_pdf_with_pdfkit(html_content)
@@ -662,6 +672,18 @@ pre, code {
             logger.error(f"❌ {error_msg}")
             raise Exception(error_msg)
 
+    async def generate_report_async(self, report_doc: Dict[str, Any], fmt: str) -> bytes:
+        """异步生成 Word / PDF 报告，等待渲染期间不阻塞事件循环
+
+        渲染池繁忙时抛出 RenderQueueFull，等待超时抛出 RenderTimeout。
+        """
+        renderers = {"docx": self._render_docx, "pdf": self._render_pdf}
+        if fmt not in renderers:
+            raise ValueError(f"不支持的导出格式: {fmt}")
+        self._check_available(fmt)
+        md_content = self.generate_markdown_report(report_doc)
+        return await get_render_pool().render_async(md_content, fmt, renderers[fmt], namespace=RENDER_NAMESPACE)
+
 
 # 创建全局导出器实例
 report_exporter = ReportExporter()
@@ -11,9 +11,6 @@ from dataclasses import dataclass, field
 
 from app.core.database import get_mongo_db
 from app.services.financial_data_service import get_financial_data_service
-from tradingagents.dataflows.providers.china.tushare import get_tushare_provider
-from tradingagents.dataflows.providers.china.akshare import get_akshare_provider
-from tradingagents.dataflows.providers.china.baostock import get_baostock_provider
 
 logger = logging.getLogger(__name__)
 
@@ -59,7 +56,11 @@ class FinancialDataSyncService:
             self.db = get_mongo_db()
             self.financial_service = await get_financial_data_service()
             
-            # 初始化数据源提供者
+            # 初始化数据源提供者（导入时会加载对应 SDK，延迟到首次初始化）
+            from tradingagents.dataflows.providers.china.tushare import get_tushare_provider
+            from tradingagents.dataflows.providers.china.akshare import get_akshare_provider
+            from tradingagents.dataflows.providers.china.baostock import get_baostock_provider
+
             self.providers = {
                 "tushare": get_tushare_provider(),
                 "akshare": get_akshare_provider(),
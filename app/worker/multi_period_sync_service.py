@@ -2,20 +2,30 @@
 """
 多周期历史数据同步服务
 支持日线、周线、月线数据的统一同步
+
+周线、月线默认由库中已同步的（前复权）日线派生（tradingagents.dataflows.bar_resampler），
+每只股票只需请求一次日线接口；库中没有日线的股票仍向数据源请求周期K线。
+设置 TA_DERIVE_PERIOD_BARS=false 恢复逐周期请求数据源。
 """
 import asyncio
 import logging
+import os
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 
 from app.services.historical_data_service import get_historical_data_service
-from app.worker.tushare_sync_service import TushareSyncService
-from app.worker.akshare_sync_service import AKShareSyncService
-from app.worker.baostock_sync_service import BaoStockSyncService
 
 logger = logging.getLogger(__name__)
 
+DERIVE_PERIOD_BARS = os.getenv("TA_DERIVE_PERIOD_BARS", "true").lower() in ("1", "true", "yes")
+
+# 派生周期K线需要的日线字段
+_DAILY_FIELDS = {
+    "_id": 0, "symbol": 1, "trade_date": 1, "open": 1, "high": 1, "low": 1, "close": 1,
+    "pre_close": 1, "volume": 1, "amount": 1, "turnover_rate": 1, "tradestatus": 1,
+}
+
 
 @dataclass
 class MultiPeriodSyncStats:
@@ -24,6 +34,7 @@ class MultiPeriodSyncStats:
     daily_records: int = 0
     weekly_records: int = 0
     monthly_records: int = 0
+    derived_symbols: int = 0
     success_count: int = 0
     error_count: int = 0
     errors: List[str] = None
@@ -47,7 +58,11 @@ class MultiPeriodSyncService:
         try:
             self.historical_service = await get_historical_data_service()
             
-            # 初始化各数据源服务
+            # 初始化各数据源服务（各同步服务导入时会加载对应 SDK，延迟到首次使用）
+            from app.worker.tushare_sync_service import TushareSyncService
+            from app.worker.akshare_sync_service import AKShareSyncService
+            from app.worker.baostock_sync_service import BaoStockSyncService
+
             self.tushare_service = TushareSyncService()
             await self.tushare_service.initialize()
             
@@ -70,7 +85,8 @@ class MultiPeriodSyncService:
         data_sources: List[str] = None,
         start_date: str = None,
         end_date: str = None,
-        all_history: bool = False
+        all_history: bool = False,
+        derive_from_daily: Optional[bool] = None
     ) -> MultiPeriodSyncStats:
         """
         同步多周期历史数据
@@ -82,6 +98,7 @@ class MultiPeriodSyncService:
             start_date: 开始日期
             end_date: 结束日期
             all_history: 是否同步所有历史数据（忽略时间范围）
+            derive_from_daily: 周/月线是否由库中日线派生，默认取 TA_DERIVE_PERIOD_BARS
         """
         if self.historical_service is None:
             await self.initialize()
@@ -101,6 +118,9 @@ class MultiPeriodSyncService:
 
         stats = MultiPeriodSyncStats()
         stats.total_symbols = len(symbols)
+        derive = DERIVE_PERIOD_BARS if derive_from_daily is None else derive_from_daily
+        # 日线先同步，派生的周/月线才能用上最新日线
+        periods = sorted(periods, key=lambda p: p != "daily")
 
         logger.info(f"🔄 开始多周期数据同步: {len(symbols)}只股票, "
                    f"周期{periods}, 数据源{data_sources}, "
@@ -110,9 +130,15 @@ class MultiPeriodSyncService:
             # 按数据源和周期组合同步
             for data_source in data_sources:
                 for period in periods:
-                    period_stats = await self._sync_period_data(
-                        data_source, period, symbols, start_date, end_date
-                    )
+                    if derive and period != "daily":
+                        period_stats = await self._derive_period_data(
+                            data_source, period, symbols, end_date
+                        )
+                        stats.derived_symbols += period_stats.get("derived", 0)
+                    else:
+                        period_stats = await self._sync_period_data(
+                            data_source, period, symbols, start_date, end_date
+                        )
                     
                     # 累计统计
                     if period == "daily":
@@ -242,6 +268,156 @@ class MultiPeriodSyncService:
         
         return stats
     
+    async def _derive_period_data(
+        self,
+        data_source: str,
+        period: str,
+        symbols: List[str],
+        end_date: str = None
+    ) -> Dict[str, Any]:
+        """由库中日线派生周期K线；没有日线的股票回退到数据源请求"""
+        from tradingagents.dataflows.trading_calendar import get_trading_calendar
+
+        stats = {"records": 0, "success": 0, "errors": 0, "derived": 0}
+        try:
+            logger.info(f"📈 开始由日线派生{data_source}-{period}数据: {len(symbols)}只股票")
+            calendar = await asyncio.to_thread(get_trading_calendar, "CN")
+            service = {
+                "tushare": self.tushare_service,
+                "akshare": self.akshare_service,
+                "baostock": self.baostock_service,
+            }.get(data_source)
+
+            batch_size = 50
+            for i in range(0, len(symbols), batch_size):
+                batch = symbols[i:i + batch_size]
+                batch_stats, missing = await self._derive_batch_period_data(
+                    data_source, period, batch, end_date, calendar
+                )
+                for key in stats:
+                    stats[key] += batch_stats.get(key, 0)
+
+                if missing and service is not None:
+                    logger.info(f"📡 {len(missing)}只股票库中无{data_source}日线，改为请求数据源{period}数据")
+                    fallback_stats = await self._sync_batch_period_data(
+                        service, data_source, period, missing, None, end_date
+                    )
+                    for key in fallback_stats:
+                        stats[key] += fallback_stats[key]
+                    # 只有请求了数据源时才需要限流
+                    await asyncio.sleep(0.5)
+
+                progress = min(i + batch_size, len(symbols))
+                logger.info(f"📊 {data_source}-{period}派生进度: {progress}/{len(symbols)}")
+
+            return stats
+
+        except Exception as e:
+            logger.error(f"❌ {data_source}-{period}派生失败: {e}")
+            stats["errors"] += 1
+            return stats
+
+    async def _derive_batch_period_data(
+        self,
+        data_source: str,
+        period: str,
+        symbols: List[str],
+        end_date: Optional[str],
+        calendar
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        派生一批股票的周期K线
+
+        已有周期K线的股票只读取上一周期起的日线，重算最后一根（可能未走完的）K线并补上新周期。
+        若库中日线在最后一根K线日期上的收盘价与该K线不一致（复权基准变化或日线被修正），
+        该股票按全部日线重新派生。
+
+        Returns:
+            (统计, 需要回退到数据源请求的股票列表)
+        """
+        import pandas as pd
+        from tradingagents.dataflows.bar_resampler import incremental_start, period_start, resample_bars
+
+        stats = {"records": 0, "success": 0, "errors": 0, "derived": 0}
+        collection = self.historical_service.collection
+        scope = {"data_source": data_source}
+
+        # 1. 每只股票已有的最后一根周期K线
+        last_bars = await asyncio.gather(*[
+            collection.find_one(
+                {"symbol": symbol, "period": period, **scope},
+                {"_id": 0, "trade_date": 1, "close": 1},
+                sort=[("trade_date", -1)],
+            )
+            for symbol in symbols
+        ])
+        last_bar = {symbol: bar for symbol, bar in zip(symbols, last_bars) if bar}
+
+        # 2. 一次查询读取整批需要的日线
+        async def _load_daily(targets: List[str], incremental: bool) -> pd.DataFrame:
+            clauses = [
+                {"symbol": s, "trade_date": {"$gte": incremental_start(last_bar[s]["trade_date"], period)}}
+                if incremental and s in last_bar else {"symbol": s}
+                for s in targets
+            ]
+            query = {"$or": clauses, "period": "daily", **scope}
+            if end_date:
+                query["trade_date"] = {"$lte": end_date}
+            docs = await collection.find(query, _DAILY_FIELDS).to_list(length=None)
+            return pd.DataFrame(docs)
+
+        daily = await _load_daily(symbols, incremental=True)
+        present = set(daily["symbol"]) if not daily.empty else set()
+        # 只有从未生成过周期K线且库中没有日线的股票才回退到数据源；已有K线但增量窗口内
+        # 没有日线的股票（长期停牌、此前由数据源回退生成）本次跳过，避免每次都逐只请求
+        missing = [s for s in symbols if s not in present and s not in last_bar]
+
+        # 3. 复权基准检查：日线在最后一根K线日期上的收盘价应与该K线一致
+        rebuild = []
+        if not daily.empty and last_bar:
+            anchors = pd.DataFrame(
+                [(s, bar["trade_date"], bar.get("close")) for s, bar in last_bar.items() if s in present],
+                columns=["symbol", "trade_date", "bar_close"],
+            )
+            checked = anchors.merge(daily[["symbol", "trade_date", "close"]], on=["symbol", "trade_date"], how="left")
+            drift = (checked["close"] - checked["bar_close"]).abs() > 1e-6 * checked["bar_close"].abs().clip(lower=1)
+            rebuild = checked.loc[drift | checked["close"].isna() | checked["bar_close"].isna(), "symbol"].tolist()
+        if rebuild:
+            logger.info(f"🔁 {len(rebuild)}只股票日线复权基准变化，重新派生{period}数据")
+            daily = pd.concat([daily[~daily["symbol"].isin(rebuild)], await _load_daily(rebuild, incremental=False)])
+
+        if daily.empty:
+            return stats, missing
+
+        bars = resample_bars(daily, period, calendar=calendar, as_of=end_date)
+
+        # 4. 按股票写回：先删除将被重算的K线（未走完周期的K线日期会后移），再保存
+        for symbol, symbol_bars in bars.groupby("symbol", sort=False):
+            try:
+                delete_filter = {"symbol": symbol, "period": period, **scope}
+                if symbol in last_bar and symbol not in rebuild:
+                    keep_from = str(period_start(last_bar[symbol]["trade_date"], period))
+                    symbol_bars = symbol_bars[symbol_bars["trade_date"] >= keep_from]
+                    delete_filter["trade_date"] = {"$gte": keep_from}
+                await collection.delete_many(delete_filter)
+
+                saved = await self.historical_service.save_historical_data(
+                    symbol=symbol,
+                    data=symbol_bars.drop(columns=["symbol", "trade_days", "period_end", "is_complete"]),
+                    data_source=data_source,
+                    market="CN",
+                    period=period,
+                    convert_units=False
+                )
+                stats["records"] += saved
+                stats["success"] += 1
+                stats["derived"] += 1
+            except Exception as e:
+                logger.error(f"❌ {symbol}-{period}派生失败: {e}")
+                stats["errors"] += 1
+
+        return stats, missing
+
     async def _get_all_symbols(self) -> List[str]:
         """获取所有股票代码"""
         try:
@@ -9,9 +9,6 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 
 from app.services.news_data_service import get_news_data_service
-from tradingagents.dataflows.providers.china.tushare import get_tushare_provider
-from tradingagents.dataflows.providers.china.akshare import get_akshare_provider
-from tradingagents.dataflows.news.realtime_news import RealtimeNewsAggregator
 
 logger = logging.getLogger(__name__)
 
@@ -58,13 +55,6 @@ class NewsDataSyncService:
             self._news_service = await get_news_data_service()
         return self._news_service
     
-    async def _get_tushare_provider(self):
-        """获取Tushare提供者"""
-        if self._tushare_provider is None:
-            self._tushare_provider = get_tushare_provider()
-            await self._tushare_provider.connect()
-        return self._tushare_provider
-    
     async def _get_tushare_provider(self):
         """获取Tushare提供者"""
         if self._tushare_provider is None:
@@ -76,6 +66,7 @@ class NewsDataSyncService:
     async def _get_akshare_provider(self):
         """获取AKShare提供者"""
         if self._akshare_provider is None:
+            from tradingagents.dataflows.providers.china.akshare import get_akshare_provider
             self._akshare_provider = get_akshare_provider()
             await self._akshare_provider.connect()
         return self._akshare_provider
@@ -83,6 +74,7 @@ class NewsDataSyncService:
     async def _get_realtime_aggregator(self):
         """获取实时新闻聚合器"""
         if self._realtime_aggregator is None:
+            from tradingagents.dataflows.news.realtime_news import RealtimeNewsAggregator
             self._realtime_aggregator = RealtimeNewsAggregator()
         return self._realtime_aggregator
     
@@ -417,7 +409,7 @@ class NewsDataSyncService:
         return keywords[:10]  # 最多返回10个关键词
     
     def _deduplicate_news(self, news_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """去重新闻"""
+        """去重新闻（精确的标题+URL去重，再合并转载产生的近似重复标题）"""
         seen = set()
         unique_news = []
         
@@ -428,7 +420,12 @@ class NewsDataSyncService:
                 seen.add(key)
                 unique_news.append(news)
         
-        return unique_news
+        # 近似重复：不同来源转载的同一新闻，每个聚类保留最先出现的一条
+        from tradingagents.utils.news_dedup import deduplicate_near_duplicates
+        deduped, clusters = deduplicate_near_duplicates(unique_news, lambda news: news.get("title", ""))
+        if clusters:
+            self.logger.info(f"🧹 近似重复新闻合并: {len(unique_news)} → {len(deduped)} 条")
+        return deduped
     
     async def sync_market_news(
         self,
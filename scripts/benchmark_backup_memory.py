@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+数据库备份内存基准：整表读入 + json.dump（旧实现） vs 流式分批写入
+
+使用按需生成文档的模拟集合（字段与 stock_daily_quotes 相近），每种方式在独立子进程中运行，
+记录耗时、峰值 RSS 与备份文件大小：
+
+- legacy: 读入全部文档并 serialize_document，再 json.dump(indent=2) 写入 gzip（旧 create_backup）
+- stream: streaming.stream_backup（按 _id 分批读取，gzip NDJSON 分片）
+- bson:   streaming.stream_backup(fmt="bson")
+- restore: streaming.stream_restore 读取 stream 的备份（写入目标只计数）
+
+用法:
+    python scripts/benchmark_backup_memory.py [--docs 500000] [--mode legacy --mode stream]
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+MODES = ["legacy", "stream", "bson", "restore"]
+
+
+class SyntheticQuotes:
+    """按需生成日线行情文档的只读集合"""
+
+    def __init__(self, total):
+        self.total = total
+
+    async def estimated_document_count(self):
+        return self.total
+
+    def find(self, flt=None, projection=None):
+        start = flt["_id"]["$gt"] + 1 if flt and "_id" in flt else 0
+        return _Cursor(self.total, start)
+
+
+class _Cursor:
+    _base = datetime(2015, 1, 1)
+
+    def __init__(self, total, start):
+        self._total = total
+        self._next = start
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        i = self._next
+        if i >= self._total:
+            raise StopAsyncIteration
+        self._next += 1
+        return {
+            "_id": i, "code": f"{i % 5000:06d}", "trade_date": (self._base + timedelta(days=i // 5000)).strftime("%Y%m%d"),
+            "open": 10.0 + i % 7, "high": 11.0 + i % 7, "low": 9.5 + i % 7, "close": 10.5 + i % 7,
+            "volume": 1_000_000 + i, "amount": 1.05e7 + i, "source": "tushare", "updated_at": self._base,
+        }
+
+
+class _CountingSink:
+    def __init__(self):
+        self.count = 0
+
+    async def insert_many(self, docs, ordered=False):
+        self.count += len(docs)
+
+
+async def _legacy(db, out_dir):
+    from app.services.database.serialization import serialize_document
+    documents = []
+    async for doc in db["stock_daily_quotes"].find():
+        documents.append(serialize_document(doc))
+    path = os.path.join(out_dir, "backup.json.gz")
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump({"data": {"stock_daily_quotes": documents}}, f, ensure_ascii=False, indent=2)
+
+
+async def _stream(db, out_dir, fmt):
+    from app.services.database import streaming
+    await streaming.stream_backup(db, out_dir, ["stock_daily_quotes"], backup_id="bench", name="bench", fmt=fmt)
+
+
+async def _restore(db, out_dir):
+    from app.services.database import streaming
+    await _stream(db, out_dir, "ndjson")
+    start = time.perf_counter()
+    await streaming.stream_restore({"stock_daily_quotes": _CountingSink()}, out_dir)
+    return time.perf_counter() - start
+
+
+def child(mode, docs):
+    db = {"stock_daily_quotes": SyntheticQuotes(docs)}
+    with tempfile.TemporaryDirectory() as out_dir:
+        start = time.perf_counter()
+        if mode == "legacy":
+            asyncio.run(_legacy(db, out_dir))
+        elif mode == "restore":
+            elapsed = asyncio.run(_restore(db, out_dir))
+        else:
+            asyncio.run(_stream(db, out_dir, "bson" if mode == "bson" else "ndjson"))
+        if mode != "restore":
+            elapsed = time.perf_counter() - start
+        size = sum(f.stat().st_size for f in Path(out_dir).iterdir())
+    print("__BENCH__" + json.dumps({
+        "seconds": elapsed,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "size_mb": size / 1024 / 1024,
+    }))
+
+
+def measure(mode, docs):
+    proc = subprocess.run([sys.executable, __file__, "--child", mode, "--docs", str(docs)],
+                          cwd=ROOT, capture_output=True, text=True)
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith("__BENCH__"):
+            return json.loads(line[len("__BENCH__"):])
+    raise RuntimeError(f"{mode} 运行失败 (exit={proc.returncode}):\n{proc.stderr[-2000:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=500_000, help="模拟集合的文档数（默认 50 万）")
+    parser.add_argument("--mode", action="append", choices=MODES, help="只测量指定方式（可重复）")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.docs)
+        return 0
+
+    print(f"📊 备份内存基准（{args.docs} 条文档）")
+    for mode in args.mode or MODES:
+        r = measure(mode, args.docs)
+        print(f"  {mode:>8}: 耗时 {r['seconds']:6.1f}s，峰值 RSS {r['rss_mb']:7.0f}MB，文件 {r['size_mb']:6.1f}MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
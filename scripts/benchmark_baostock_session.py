@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+BaoStock 会话基准：每次查询 login/logout（旧实现） vs 长连接会话
+
+使用本地模拟的 baostock 模块（登录、登出、查询耗时可配置，不访问网络），
+按全市场历史同步的方式逐只股票获取日线，输出每只股票的平均同步延迟。
+
+- before: 每次查询前 login、查询后 logout（旧 BaoStockProvider 的行为）
+- after:  BaoStockProvider 通过 BaoStockSessionBroker 复用一个登录会话
+
+用法:
+    python scripts/benchmark_baostock_session.py [--symbols 50] [--login-latency 0.15] [--query-latency 0.03]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tradingagents.dataflows.providers.china.baostock import BaoStockProvider  # noqa: E402
+from tradingagents.dataflows.providers.china.baostock_session import BaoStockSessionBroker  # noqa: E402
+
+
+class _ResultSet:
+    def __init__(self, rows, fields):
+        self._rows = list(rows)
+        self.fields = fields
+        self.error_code = '0'
+        self.error_msg = ''
+        self._current = None
+
+    def next(self):
+        if not self._rows:
+            return False
+        self._current = self._rows.pop(0)
+        return True
+
+    def get_row_data(self):
+        return self._current
+
+
+def make_simulated_bs(login_latency, logout_latency, query_latency, days=60):
+    bs = types.SimpleNamespace(logins=0)
+
+    def login():
+        time.sleep(login_latency)
+        bs.logins += 1
+        return types.SimpleNamespace(error_code='0', error_msg='')
+
+    def logout():
+        time.sleep(logout_latency)
+
+    def query_history_k_data_plus(code, fields, start_date, end_date, frequency, adjustflag):
+        time.sleep(query_latency)
+        cols = fields.split(",")
+        return _ResultSet([[f"day{i}", code] + ["10.0"] * (len(cols) - 2) for i in range(days)], cols)
+
+    bs.login = login
+    bs.logout = logout
+    bs.query_history_k_data_plus = query_history_k_data_plus
+    return bs
+
+
+async def run_before(bs, codes):
+    """旧实现：每次查询都在线程中 login -> query -> logout"""
+    def fetch(code):
+        lg = bs.login()
+        if lg.error_code != '0':
+            raise Exception(lg.error_msg)
+        try:
+            rs = bs.query_history_k_data_plus(code=code, fields="date,code,open,high,low,close,volume",
+                                              start_date="2024-01-01", end_date="2024-03-31",
+                                              frequency="d", adjustflag="2")
+            rows = []
+            while (rs.error_code == '0') & rs.next():
+                rows.append(rs.get_row_data())
+            return rows
+        finally:
+            bs.logout()
+
+    for code in codes:
+        await asyncio.to_thread(fetch, code)
+
+
+async def run_after(bs, codes):
+    provider = BaoStockProvider.__new__(BaoStockProvider)
+    provider.bs = bs
+    provider.connected = True
+    provider._session = BaoStockSessionBroker(bs)
+    for code in codes:
+        await provider.get_historical_data(code, "2024-01-01", "2024-03-31")
+    provider.session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--login-latency", type=float, default=0.15, help="模拟登录耗时（秒）")
+    parser.add_argument("--logout-latency", type=float, default=0.05, help="模拟登出耗时（秒）")
+    parser.add_argument("--query-latency", type=float, default=0.03, help="模拟单次查询耗时（秒）")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)
+
+    codes = [f"{600000 + i:06d}" for i in range(args.symbols)]
+    print(f"模拟 baostock：登录 {args.login_latency:.2f}s，登出 {args.logout_latency:.2f}s，"
+          f"查询 {args.query_latency:.2f}s，{args.symbols} 只股票")
+
+    results = {}
+    for mode, runner in (("before", run_before), ("after", run_after)):
+        bs = make_simulated_bs(args.login_latency, args.logout_latency, args.query_latency)
+        start = time.perf_counter()
+        asyncio.run(runner(bs, codes))
+        elapsed = time.perf_counter() - start
+        results[mode] = elapsed
+        print(f"{mode:>6}: 总耗时 {elapsed:.2f}s，每只股票 {elapsed / args.symbols * 1000:.0f}ms，登录 {bs.logins} 次")
+
+    print(f"📉 每只股票同步延迟降低 {(1 - results['after'] / results['before']) * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+数据完整性检查基准：逐只股票解析字符串 + 逐日循环（旧实现） vs 股票池向量化检查 + 增量水位
+
+生成 --symbols 只股票、--years 年的日线日期（随机上市日、随机缺失约 --missing-pct%），
+交易日历使用工作日日历（不访问网络）：
+
+- before:      每只股票把格式化数据字符串解析为 DataFrame，逐日比较相邻日期找缺口，
+               逐日回溯探测最新交易日（旧 DataCompletenessChecker）
+- universe:    CompletenessEngine.check_universe 一次检查整个股票池并写入水位
+- incremental: 新实例从文件载入水位，只检查每只股票新增的一个交易日
+
+用法:
+    python scripts/benchmark_completeness.py [--symbols 5000] [--years 10] [--missing-pct 2]
+"""
+
+import argparse
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from io import StringIO
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def make_universe(calendar, symbols, missing_pct, seed=0):
+    rng = np.random.default_rng(seed)
+    days = calendar.days[:-1]  # 最后一个交易日留给增量检查
+    data = {}
+    for i in range(symbols):
+        listed = days[rng.integers(0, len(days) // 5):]
+        data[f"{i:06d}"] = listed[rng.random(len(listed)) >= missing_pct / 100]
+    return data
+
+
+def _legacy_check(data_str):
+    # 旧实现：解析字符串、逐日找缺口、逐日回溯最新交易日
+    df = pd.read_csv(StringIO(data_str))
+    df["date"] = pd.to_datetime(df["date"])
+    df = df.sort_values("date")
+    dates = df["date"].tolist()
+    missing = []
+    for i in range(len(dates) - 1):
+        if (dates[i + 1] - dates[i]).days > 3:
+            missing.append(f"{dates[i].strftime('%Y-%m-%d')} 到 {dates[i + 1].strftime('%Y-%m-%d')}")
+    today = datetime.now()
+    for delta in range(0, 5):
+        if (today - timedelta(days=delta)).weekday() < 5:
+            break
+    return len(df), missing
+
+
+def run_legacy(data):
+    elapsed = 0.0
+    for days in data.values():
+        # 构造数据字符串不计入耗时
+        text = "date,close\n" + "\n".join(f"{d},10.0" for d in np.datetime_as_string(days))
+        start = time.perf_counter()
+        _legacy_check(text)
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=5000, help="股票数量")
+    parser.add_argument("--years", type=int, default=10, help="历史年数")
+    parser.add_argument("--missing-pct", type=float, default=2.0, help="随机缺失的交易日比例（%%）")
+    parser.add_argument("--skip-before", action="store_true", help="跳过旧实现（耗时较长）")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    from tradingagents.dataflows.data_completeness_checker import CompletenessEngine
+    from tradingagents.dataflows.trading_calendar import TradingCalendar
+
+    end = datetime(2024, 12, 31)
+    calendar = TradingCalendar.weekdays("CN", f"{end.year - args.years + 1}-01-01", end.date())
+    data = make_universe(calendar, args.symbols, args.missing_pct)
+    rows = sum(len(v) for v in data.values())
+    print(f"📊 完整性检查基准（{args.symbols} 只股票，{args.years} 年，{len(calendar)} 个交易日，{rows} 行）")
+
+    if not args.skip_before:
+        elapsed = run_legacy(data)
+        print(f"  {'before':>11}: {elapsed * 1000:9.1f}ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        state = os.path.join(tmp, "completeness_CN.json")
+        engine = CompletenessEngine(calendar=calendar, state_path=state)
+        start = time.perf_counter()
+        report = engine.check_universe(data, end=calendar.days[-2])
+        elapsed = time.perf_counter() - start
+        print(f"  {'universe':>11}: {elapsed * 1000:9.1f}ms，缺失交易日 {int(report['missing_days'].sum())}，"
+              f"水位文件 {os.path.getsize(state) / 1024 / 1024:.1f}MB")
+
+        new_day = {symbol: calendar.days[-1:] for symbol in data}
+        start = time.perf_counter()
+        engine = CompletenessEngine(calendar=calendar, state_path=state)
+        loaded = time.perf_counter()
+        report = engine.check_universe(new_day, end=calendar.days[-1])
+        elapsed = time.perf_counter() - start
+        print(f"  {'incremental':>11}: {elapsed * 1000:9.1f}ms（载入水位 {(loaded - start) * 1000:.1f}ms），"
+              f"包含最新交易日 {int(report['has_latest_trade_date'].sum())} 只")
+
+    print(f"  峰值 RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f}MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+日志读取基准：readlines 读取整个文件（旧实现） vs 按偏移 seek 读取
+
+生成一个指定大小的日志文件（默认 2GB，格式与 tradingagents.log 相同），每种方式在独立
+子进程中运行，记录耗时与峰值 RSS：
+
+- legacy:  f.readlines() 后取最后 N 行并统计级别（旧 read_log_file）
+- tail:    LogExportService.read_log_file 读取最后 N 行（索引已建好）
+- page:    按 cursor.before 向前翻 10 页
+- filter:  按 ERROR 级别 + 关键词过滤读取最后 N 行
+- rare:    关键词极少命中，扫描到单次上限（16MB）后返回游标
+- index:   首次为整个文件建立索引（行数、级别计数、偏移检查点）
+- append:  追加 1 万行后增量更新索引并读取新增内容
+
+用法:
+    python scripts/benchmark_log_tail.py [--size-mb 2048] [--lines 1000] [--mode legacy --mode tail]
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+MODES = ["legacy", "tail", "page", "filter", "rare", "index", "append"]
+LOG_NAME = "tradingagents.log"
+_LEVELS = ["INFO", "INFO", "INFO", "DEBUG", "DEBUG", "WARNING", "INFO", "ERROR"]
+
+
+def _lines(start, count):
+    for i in range(start, start + count):
+        level = _LEVELS[i % len(_LEVELS)]
+        yield (f"2024-01-{i % 28 + 1:02d} 12:{i % 60:02d}:{i % 59:02d} | {level:<8} | "
+               f"tradingagents.dataflows | 📊 [数据源] 获取 {i % 5000:06d} 日线行情完成，共 {i % 250} 条记录\n")
+
+
+def generate(path, size_mb):
+    target = size_mb * 1024 * 1024
+    i = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while f.tell() < target:
+            f.write("".join(_lines(i, 50_000)))
+            i += 50_000
+    return i
+
+
+def _legacy(path, count):
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        all_lines = f.readlines()
+    recent = all_lines[-count:]
+    stats = {"total_lines": len(all_lines),
+             "error_count": sum(1 for line in recent if "ERROR" in line)}
+    return [line.rstrip("\n") for line in recent], stats
+
+
+def child(mode, log_dir, count):
+    from app.services.log_export_service import LogExportService
+
+    service = LogExportService(log_dir)
+    path = Path(log_dir) / LOG_NAME
+    if mode == "index":
+        shutil.rmtree(service.index.index_dir, ignore_errors=True)
+    elif mode != "legacy":
+        # 预热：索引在基准外建好，测量的是常规请求
+        service.index.refresh(path)
+
+    start = time.perf_counter()
+    if mode == "legacy":
+        _legacy(path, count)
+    elif mode == "tail":
+        service.read_log_file(LOG_NAME, lines=count)
+    elif mode == "page":
+        cursor = None
+        for _ in range(10):
+            result = service.read_log_file(LOG_NAME, lines=count, before=cursor)
+            cursor = result["cursor"]["before"]
+    elif mode == "filter":
+        service.read_log_file(LOG_NAME, lines=count, level="ERROR", keyword="日线")
+    elif mode == "rare":
+        service.read_log_file(LOG_NAME, lines=count, level="ERROR", keyword="000047")
+    elif mode == "index":
+        service.index.refresh(path)
+    elif mode == "append":
+        after = service.read_log_file(LOG_NAME, lines=1)["cursor"]["after"]
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("".join(_lines(10**9, 10_000)))
+        start = time.perf_counter()
+        service.read_log_file(LOG_NAME, lines=count, after=after)
+    elapsed = time.perf_counter() - start
+    print("__BENCH__" + json.dumps({
+        "ms": elapsed * 1000,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def measure(mode, log_dir, count):
+    proc = subprocess.run([sys.executable, __file__, "--child", mode, "--log-dir", log_dir, "--lines", str(count)],
+                          cwd=ROOT, capture_output=True, text=True)
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith("__BENCH__"):
+            return json.loads(line[len("__BENCH__"):])
+    raise RuntimeError(f"{mode} 运行失败 (exit={proc.returncode}):\n{proc.stderr[-2000:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=2048, help="生成的日志文件大小（MB，默认 2048）")
+    parser.add_argument("--lines", type=int, default=1000, help="每次读取的行数")
+    parser.add_argument("--mode", action="append", choices=MODES, help="只测量指定方式（可重复）")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--log-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.log_dir, args.lines)
+        return 0
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        print(f"📝 生成 {args.size_mb}MB 日志文件...")
+        total = generate(os.path.join(log_dir, LOG_NAME), args.size_mb)
+        print(f"📊 日志读取基准（{total} 行，每次 {args.lines} 行）")
+        for mode in args.mode or MODES:
+            r = measure(mode, log_dir, args.lines)
+            print(f"  {mode:>7}: 耗时 {r['ms']:9.1f}ms，峰值 RSS {r['rss_mb']:7.0f}MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
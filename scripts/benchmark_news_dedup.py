@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+新闻近似重复检测基准：MinHash LSH 聚类 vs 精确标题去重
+
+生成合成新闻（默认 100,000 条）：先随机生成若干“原始稿件”（中文与英文各半），
+再为每条稿件生成若干转载变体（改标点、加来源标签/后缀、替换个别词）。
+输出耗时、吞吐量、剩余条数，以及相对真实聚类的精确率/召回率。
+
+用法:
+    python scripts/benchmark_news_dedup.py [--articles 100000] [--stories 25000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tradingagents.utils.news_dedup import NearDuplicateDetector  # noqa: E402
+
+_VOCAB_RNG = random.Random(3)
+# 常用汉字区间内取 1500 个字、3000 个伪英文单词，接近真实标题的用词分布
+_CN_CHARS = "".join(chr(0x4E00 + _VOCAB_RNG.randrange(0x3000)) for _ in range(1500))
+_EN_WORDS = ["".join(_VOCAB_RNG.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(_VOCAB_RNG.randint(3, 9)))
+             for _ in range(3000)]
+_CN_TAGS = ["【财联社】", "【新浪财经】", "【证券时报】", ""]
+_CN_SUFFIX = [" - 东方财富网", "｜财联社", "（来源：新浪财经）", "_证券之星", ""]
+_EN_SUFFIX = [" - Reuters", " | Bloomberg", " - CNBC", ""]
+
+
+def _make_story(rnd: random.Random, cn: bool) -> str:
+    if cn:
+        return "".join(rnd.choice(_CN_CHARS) for _ in range(rnd.randint(16, 30)))
+    return " ".join(rnd.choice(_EN_WORDS) for _ in range(rnd.randint(8, 14))).capitalize()
+
+
+def _make_variant(rnd: random.Random, story: str, cn: bool) -> str:
+    text = story
+    if cn:
+        chars = list(text)
+        # 替换一个字、插入标点
+        chars[rnd.randrange(len(chars))] = rnd.choice(_CN_CHARS)
+        chars.insert(rnd.randrange(len(chars)), rnd.choice("，、！"))
+        return rnd.choice(_CN_TAGS) + "".join(chars) + rnd.choice(_CN_SUFFIX)
+    words = text.split()
+    words[rnd.randrange(len(words))] = rnd.choice(_EN_WORDS)
+    text = " ".join(words)
+    if rnd.random() < 0.5:
+        text = text.upper()
+    return text + rnd.choice([",", ".", "!", ""]) + rnd.choice(_EN_SUFFIX)
+
+
+def make_articles(n_articles: int, n_stories: int, seed: int = 7):
+    rnd = random.Random(seed)
+    stories = [(_make_story(rnd, i % 2 == 0), i % 2 == 0) for i in range(n_stories)]
+    texts, labels = [], []
+    for i in range(n_articles):
+        story_id = i % n_stories if i < n_stories else rnd.randrange(n_stories)
+        story, cn = stories[story_id]
+        texts.append(story if i < n_stories else _make_variant(rnd, story, cn))
+        labels.append(story_id)
+    order = list(range(n_articles))
+    rnd.shuffle(order)
+    return [texts[i] for i in order], [labels[i] for i in order]
+
+
+def pair_metrics(clusters, labels):
+    """按“同聚类的文档对”计算精确率与召回率"""
+    def pairs(counter):
+        return sum(c * (c - 1) // 2 for c in counter.values())
+
+    true_pairs = pairs(Counter(labels))
+    predicted_pairs = sum(len(g) * (len(g) - 1) // 2 for g in clusters)
+    correct_pairs = sum(pairs(Counter(labels[i] for i in g)) for g in clusters)
+    precision = correct_pairs / predicted_pairs if predicted_pairs else 1.0
+    recall = correct_pairs / true_pairs if true_pairs else 1.0
+    return precision, recall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=100_000)
+    parser.add_argument("--stories", type=int, default=25_000)
+    args = parser.parse_args()
+
+    texts, labels = make_articles(args.articles, args.stories)
+    print(f"合成新闻: {len(texts):,} 条，原始稿件: {args.stories:,} 篇")
+
+    start = time.perf_counter()
+    exact = len({t.strip().lower() for t in texts})
+    exact_time = time.perf_counter() - start
+    print(f"精确标题去重: 剩余 {exact:,} 条，耗时 {exact_time:.2f}s")
+
+    detector = NearDuplicateDetector()
+    start = time.perf_counter()
+    clusters = detector.cluster(texts)
+    elapsed = time.perf_counter() - start
+    precision, recall = pair_metrics(clusters, labels)
+    print(f"MinHash LSH 聚类: 剩余 {len(clusters):,} 条，耗时 {elapsed:.2f}s "
+          f"({len(texts) / elapsed:,.0f} 条/秒)，精确率 {precision:.3f}，召回率 {recall:.3f}")
+
+    # 线性扩展性：规模减半时耗时应约减半
+    half = len(texts) // 2
+    start = time.perf_counter()
+    detector.cluster(texts[:half])
+    print(f"规模 {half:,} 条耗时 {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
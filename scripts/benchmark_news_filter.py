@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+增强新闻过滤器基准：共享模型注册表 + 批量编码 + 向量缓存 vs 旧实现
+
+- before: 每个过滤器实例各自加载模型，逐条编码新闻（旧实现的行为）
+- after:  EnhancedNewsFilter（模型由注册表共享，整批编码，重复标题命中缓存）
+
+每种模式在独立子进程中运行，依次创建 --requests 个过滤器实例、各过滤 --news 条新闻
+（实例保持存活，模拟并发分析），输出冷启动（第一个请求）与热请求（其余请求中位数）延迟，
+以及进程峰值 RSS。
+
+安装了 sentence-transformers 时使用真实模型；否则使用合成模型
+（加载耗时与权重内存、单次调用开销可配置），用于比较加载/批处理策略本身。
+
+用法:
+    python scripts/benchmark_news_filter.py [--requests 5] [--news 50] [--synthetic]
+"""
+
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+
+class SyntheticSentenceModel:
+    """合成模型：加载时分配权重并模拟读盘耗时，每次 encode 调用有固定开销"""
+
+    def __init__(self, load_seconds=1.0, weight_mb=120, call_overhead=0.004, dim=384):
+        time.sleep(load_seconds)
+        rows = weight_mb * 1024 * 1024 // (dim * 4)
+        self.weights = np.random.default_rng(0).standard_normal((rows, dim), dtype=np.float32)
+        self.call_overhead = call_overhead
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False):
+        out = []
+        for start in range(0, len(texts), batch_size):
+            time.sleep(self.call_overhead)
+            for text in texts[start:start + batch_size]:
+                ids = [hash(ch) % len(self.weights) for ch in text]
+                out.append(self.weights[ids].mean(axis=0))
+        return np.stack(out)
+
+
+def _make_news(n, request_index):
+    rows = []
+    for i in range(n):
+        # 约一半新闻在不同请求之间重复（热门转载标题）
+        key = i if i % 2 == 0 else f"{request_index}-{i}"
+        rows.append({'新闻标题': f"招商银行第{key}条新闻标题：业绩与分红公告", '新闻内容': f"新闻内容 {key} " * 20})
+    return pd.DataFrame(rows)
+
+
+def run_mode(mode, requests, news, synthetic):
+    from tradingagents.utils import embedding_registry
+    from tradingagents.utils.enhanced_news_filter import EnhancedNewsFilter
+
+    loader = None
+    if synthetic:
+        def loader(name):
+            return SyntheticSentenceModel()
+        embedding_registry._registry = embedding_registry.ModelRegistry(loaders={"sentence": loader})
+    else:
+        loader = embedding_registry._load_sentence_model
+
+    latencies = []
+    alive = []  # 模拟并发分析：各请求的过滤器实例同时存活
+    for r in range(requests):
+        df = _make_news(news, r)
+        start = time.perf_counter()
+        if mode == "after":
+            news_filter = EnhancedNewsFilter('600036', '招商银行', use_semantic=True)
+            news_filter.filter_news_enhanced(df, min_score=0)
+            alive.append(news_filter)
+        else:
+            # 旧实现：每个实例加载模型，公司文本与每条新闻分别编码
+            model = loader(embedding_registry.DEFAULT_SENTENCE_MODEL)
+            company = model.encode(['招商银行', '招商银行股票', '招商银行公司', '600036', '招商银行业绩', '招商银行财报'])
+            for _, row in df.iterrows():
+                emb = model.encode([f"{row['新闻标题']} {row['新闻内容'][:200]}"])
+                _ = max(float(np.dot(emb[0], c) / (np.linalg.norm(emb[0]) * np.linalg.norm(c))) for c in company)
+            alive.append(model)
+        latencies.append(time.perf_counter() - start)
+
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"cold": latencies[0], "warm": statistics.median(latencies[1:]) if requests > 1 else None,
+            "peak_rss_mb": peak_rss_mb}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5)
+    parser.add_argument("--news", type=int, default=50)
+    parser.add_argument("--synthetic", action="store_true", help="强制使用合成模型")
+    parser.add_argument("--mode", choices=["before", "after"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    synthetic = args.synthetic
+    if not synthetic:
+        try:
+            import sentence_transformers  # noqa: F401
+        except ImportError:
+            synthetic = True
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.requests, args.news, synthetic)))
+        return
+
+    print(f"模型: {'合成模型' if synthetic else 'sentence-transformers'}，"
+          f"{args.requests} 个请求 × {args.news} 条新闻")
+    for mode in ("before", "after"):
+        cmd = [sys.executable, __file__, "--mode", mode, "--requests", str(args.requests), "--news", str(args.news)]
+        if synthetic:
+            cmd.append("--synthetic")
+        out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout.strip().splitlines()[-1]
+        result = json.loads(out)
+        warm = f"{result['warm'] * 1000:.0f}ms" if result["warm"] is not None else "-"
+        print(f"{mode:>6}: 冷启动 {result['cold'] * 1000:.0f}ms，热请求中位数 {warm}，峰值RSS {result['peak_rss_mb']:.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+模拟交易持仓估值基准：逐只取价（旧实现） vs 整个组合批量取价
+
+使用内存模拟的 MongoDB（每次往返固定延迟 --rtt-ms）与模拟的港美股行情服务
+（每次调用延迟 --quote-ms），持仓 80% A股（其中 1/8 需回退到 stock_basic_info）、
+港股/美股各 10%，分别测量 10 / 100 / 1000 只持仓时 /api/paper/positions 处理函数的延迟：
+
+- before: 每只持仓依次 find_one market_quotes -> stock_basic_info，港美股逐只串行查询
+- after:  list_positions（每个集合一次 $in 查询，港美股并发获取）
+- cached: 价格快照有效期内再次请求
+
+/api/paper/account 与 /api/paper/positions 使用同一取价路径。
+
+用法:
+    python scripts/benchmark_paper_account.py [--rtt-ms 2] [--quote-ms 30] [--positions 10 --positions 100]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app.routers.paper as paper_mod  # noqa: E402
+
+
+def _match(doc, flt):
+    for key, cond in flt.items():
+        if key == "$or":
+            if not any(_match(doc, sub) for sub in cond):
+                return False
+        elif isinstance(cond, dict) and "$in" in cond:
+            if doc.get(key) not in cond["$in"]:
+                return False
+        elif doc.get(key) != cond:
+            return False
+    return True
+
+
+class _Cursor:
+    def __init__(self, docs, rtt):
+        self._docs = docs
+        self._rtt = rtt
+
+    async def to_list(self, length=None):
+        await asyncio.sleep(self._rtt)
+        return list(self._docs)
+
+
+class SimulatedCollection:
+    def __init__(self, docs, rtt):
+        self.docs = docs
+        self.rtt = rtt
+        self.round_trips = 0
+
+    def find(self, flt=None, projection=None):
+        self.round_trips += 1
+        return _Cursor([d for d in self.docs if _match(d, flt or {})], self.rtt)
+
+    async def find_one(self, flt=None, projection=None):
+        self.round_trips += 1
+        await asyncio.sleep(self.rtt)
+        return next((d for d in self.docs if _match(d, flt or {})), None)
+
+
+class SimulatedDB:
+    def __init__(self, collections):
+        self.collections = collections
+
+    def __getitem__(self, name):
+        return self.collections[name]
+
+    def round_trips(self):
+        return sum(c.round_trips for c in self.collections.values())
+
+
+def build_db(n, rtt):
+    positions, quotes, basics = [], [], []
+    for i in range(n):
+        bucket = i % 10
+        if bucket == 8:
+            market, code, currency = "HK", f"{i:05d}", "HKD"
+        elif bucket == 9:
+            market, code, currency = "US", f"T{i}", "USD"
+        else:
+            market, code, currency = "CN", f"{i:06d}", "CNY"
+            if bucket == 7:
+                basics.append({"code": code, "current_price": 10.0 + bucket})
+            else:
+                quotes.append({"code": code, "close": 10.0 + bucket})
+        positions.append({"user_id": "bench", "code": code, "market": market, "currency": currency,
+                          "quantity": 100, "avg_cost": 10.0})
+    return SimulatedDB({
+        "paper_positions": SimulatedCollection(positions, rtt),
+        "market_quotes": SimulatedCollection(quotes, rtt),
+        "stock_basic_info": SimulatedCollection(basics, rtt),
+    })
+
+
+def install_foreign_service(quote_latency, counter):
+    class SimulatedForeignStockService:
+        def __init__(self, db=None):
+            pass
+
+        async def get_quote(self, market, code, force_refresh=False):
+            counter["quotes"] += 1
+            await asyncio.sleep(quote_latency)
+            return {"price": 50.0}
+
+    module = types.ModuleType("app.services.foreign_stock_service")
+    module.ForeignStockService = SimulatedForeignStockService
+    sys.modules["app.services.foreign_stock_service"] = module
+    return SimulatedForeignStockService
+
+
+async def legacy_last_price(db, service_cls, code, market):
+    """旧实现：逐只 find_one，港美股每只新建服务并串行查询"""
+    if market == "CN":
+        q = await db["market_quotes"].find_one({"$or": [{"code": code}, {"symbol": code}]}, {"_id": 0, "close": 1})
+        if q and q.get("close") is not None and float(q["close"]) > 0:
+            return float(q["close"])
+        basic = await db["stock_basic_info"].find_one({"$or": [{"code": code}, {"symbol": code}]},
+                                                      {"_id": 0, "current_price": 1})
+        if basic and basic.get("current_price") is not None and float(basic["current_price"]) > 0:
+            return float(basic["current_price"])
+        return None
+    quote = await service_cls(db=db).get_quote(market, code, force_refresh=False)
+    return float(quote.get("price")) if quote else None
+
+
+async def legacy_list_positions(db, service_cls):
+    items = await db["paper_positions"].find({"user_id": "bench"}).to_list(None)
+    enriched = []
+    for p in items:
+        last = await legacy_last_price(db, service_cls, p["code"], p["market"])
+        enriched.append({"code": p["code"], "last_price": last,
+                         "market_value": round((last or 0.0) * p["quantity"], 2)})
+    return enriched
+
+
+async def timed(coro_factory):
+    start = time.perf_counter()
+    result = await coro_factory()
+    return (time.perf_counter() - start) * 1000, result
+
+
+async def run(n, rtt, quote_latency):
+    counter = {"quotes": 0}
+    service_cls = install_foreign_service(quote_latency, counter)
+    user = {"id": "bench"}
+
+    db = build_db(n, rtt)
+    before_ms, before = await timed(lambda: legacy_list_positions(db, service_cls))
+    before_trips, before_quotes = db.round_trips(), counter["quotes"]
+
+    db = build_db(n, rtt)
+    paper_mod.get_mongo_db = lambda: db
+    paper_mod._price_snapshot.clear()
+    counter["quotes"] = 0
+    after_ms, resp = await timed(lambda: paper_mod.list_positions(current_user=user))
+    after_trips, after_quotes = db.round_trips(), counter["quotes"]
+    cached_ms, _ = await timed(lambda: paper_mod.list_positions(current_user=user))
+
+    after = resp["data"]["items"]
+    assert [p["market_value"] for p in after] == [p["market_value"] for p in before], "估值结果不一致"
+    return {
+        "before": (before_ms, before_trips, before_quotes),
+        "after": (after_ms, after_trips, after_quotes),
+        "cached_ms": cached_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rtt-ms", type=float, default=2.0, help="模拟的数据库往返延迟（毫秒）")
+    parser.add_argument("--quote-ms", type=float, default=30.0, help="模拟的港美股行情查询延迟（毫秒）")
+    parser.add_argument("--positions", type=int, action="append", help="持仓数量（可重复，默认 10/100/1000）")
+    args = parser.parse_args()
+
+    sizes = args.positions or [10, 100, 1000]
+    # 预热：首次调用包含处理函数依赖的导入开销，不计入结果
+    asyncio.run(run(10, 0, 0))
+    print(f"📊 持仓估值基准（数据库往返 {args.rtt_ms}ms，港美股行情 {args.quote_ms}ms）")
+    for n in sizes:
+        r = asyncio.run(run(n, args.rtt_ms / 1000, args.quote_ms / 1000))
+        b_ms, b_trips, b_quotes = r["before"]
+        a_ms, a_trips, a_quotes = r["after"]
+        print(f"  {n:>5} 只持仓: 逐只 {b_ms:8.1f}ms（DB {b_trips} 次，行情 {b_quotes} 次） -> "
+              f"批量 {a_ms:7.1f}ms（DB {a_trips} 次，行情 {a_quotes} 次），快照命中 {r['cached_ms']:.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+周/月线同步基准：逐股票请求数据源（旧实现） vs 由库中日线派生
+
+全市场 --symbols 只股票、--years 年日线，按同步服务的批次（每批 50 只）计算：
+
+- before: 每只股票每个周期调用一次数据源接口，每批之后限流 sleep 0.5s（_sync_period_data）。
+          接口耗时按 --api-ms 每次估算（模型值，未访问网络）
+- derive: 每批日线交给 resample_bars 一次性派生周线、月线，耗时为实测值；
+          首次全量派生和增量派生（只读取上一周期起的日线）分别计时
+
+两种方式写回的K线条数相同，写库耗时不计入；派生方式读取日线的数据库耗时也不计入。
+
+用法:
+    python scripts/benchmark_period_sync.py [--symbols 5300] [--years 10] [--api-ms 300]
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+BATCH_SIZE = 50
+PERIODS = ["weekly", "monthly"]
+
+
+def _batch_daily(calendar, codes, rng):
+    """一批股票的日线长表（部分股票中途上市）"""
+    frames = []
+    for code in codes:
+        days = calendar.days[rng.integers(0, len(calendar.days) // 4):]
+        close = 10 * np.cumprod(1 + rng.normal(0, 0.02, len(days)))
+        frames.append(pd.DataFrame({
+            "symbol": code, "trade_date": days, "open": close, "high": close * 1.01, "low": close * 0.99,
+            "close": close, "pre_close": np.r_[close[0], close[:-1]],
+            "volume": rng.integers(1_000, 100_000, len(days)) * 100.0, "amount": close * 1e6,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=5300, help="股票数量（全A约 5300 只）")
+    parser.add_argument("--years", type=int, default=10, help="日线年数")
+    parser.add_argument("--api-ms", type=float, default=300.0, help="数据源单次周期K线请求耗时估算（毫秒）")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    from tradingagents.dataflows.bar_resampler import incremental_start, resample_bars
+    from tradingagents.dataflows.trading_calendar import TradingCalendar
+
+    end = pd.Timestamp("2024-12-31")
+    calendar = TradingCalendar.weekdays("CN", str((end - pd.DateOffset(years=args.years)).date()), str(end.date()))
+    rng = np.random.default_rng(0)
+    batches = (args.symbols + BATCH_SIZE - 1) // BATCH_SIZE
+
+    full_seconds = incremental_seconds = 0.0
+    rows = bars = 0
+    for b in range(batches):
+        codes = [f"{i:06d}" for i in range(b * BATCH_SIZE, min((b + 1) * BATCH_SIZE, args.symbols))]
+        daily = _batch_daily(calendar, codes, rng)
+        rows += len(daily)
+
+        start = time.perf_counter()
+        for period in PERIODS:
+            bars += len(resample_bars(daily, period, calendar=calendar))
+        full_seconds += time.perf_counter() - start
+
+        # 日常增量：已派生到上一交易日，只读取上一周期起的日线
+        last = calendar.days[-2]
+        start = time.perf_counter()
+        for period in PERIODS:
+            recent = daily[daily["trade_date"] >= np.datetime64(incremental_start(last, period))]
+            resample_bars(recent, period, calendar=calendar)
+        incremental_seconds += time.perf_counter() - start
+
+    api_calls = args.symbols * len(PERIODS)
+    before_seconds = api_calls * args.api_ms / 1000 + batches * len(PERIODS) * 0.5
+
+    print(f"📊 周/月线同步基准（{args.symbols} 只股票，{args.years} 年，日线 {rows:,} 行，派生K线 {bars:,} 根）")
+    print(f"  before（模型）: {api_calls} 次数据源请求 × {args.api_ms:.0f}ms + {batches * len(PERIODS)} 次限流 0.5s"
+          f" = {before_seconds:8.1f}s")
+    print(f"  derive 全量（实测）: {full_seconds:8.1f}s，数据源请求 0 次")
+    print(f"  derive 增量（实测）: {incremental_seconds:8.1f}s")
+    print(f"  节省: 全量 {before_seconds - full_seconds:.1f}s（{before_seconds / max(full_seconds, 1e-9):.0f}x），"
+          f"每日增量 {before_seconds - incremental_seconds:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+交易复盘基准：reflect_and_remember 串行 vs 并发
+
+- sequential: 依次调用五个 reflect_* 方法（旧实现，每个组件各自向量化并写入）
+- parallel:   Reflector.reflect_all（有界线程池并发调用 LLM，写回时只向量化一次）
+
+LLM 与嵌入接口用固定延迟模拟（--llm-latency / --embed-latency），
+记忆库为内存实现，只比较调度策略本身的墙钟耗时。
+
+用法:
+    python scripts/benchmark_reflection.py [--llm-latency 2.0] [--embed-latency 0.3] [--workers 5]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tradingagents.graph.reflection import Reflector  # noqa: E402
+
+COMPONENTS = ("bull", "bear", "trader", "invest_judge", "risk_manager")
+
+
+class SimulatedLLM:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def invoke(self, messages):
+        time.sleep(self.latency)
+        return SimpleNamespace(content="复盘结论")
+
+
+class SimulatedMemory:
+    def __init__(self, embed_latency):
+        self.embed_latency = embed_latency
+        self.records = []
+
+    def embedding_key(self):
+        return ("simulated", "embedding", False)
+
+    def get_embedding(self, text):
+        time.sleep(self.embed_latency)
+        return [0.0] * 8
+
+    def add_situations(self, situations_and_advice, embeddings=None):
+        if embeddings is None:
+            embeddings = [self.get_embedding(s) for s, _ in situations_and_advice]
+        self.records.extend(zip(situations_and_advice, embeddings))
+
+
+def _state():
+    return {
+        "market_report": "市场报告", "sentiment_report": "情绪报告",
+        "news_report": "新闻报告", "fundamentals_report": "基本面报告",
+        "investment_debate_state": {"bull_history": "看涨", "bear_history": "看跌", "judge_decision": "研究经理决策"},
+        "trader_investment_plan": "交易计划",
+        "risk_debate_state": {"judge_decision": "风险经理决策"},
+    }
+
+
+def run_sequential(reflector, state, memories):
+    reflector.reflect_bull_researcher(state, 0.03, memories["bull"])
+    reflector.reflect_bear_researcher(state, 0.03, memories["bear"])
+    reflector.reflect_trader(state, 0.03, memories["trader"])
+    reflector.reflect_invest_judge(state, 0.03, memories["invest_judge"])
+    reflector.reflect_risk_manager(state, 0.03, memories["risk_manager"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-latency", type=float, default=2.0, help="单次复盘 LLM 调用耗时（秒）")
+    parser.add_argument("--embed-latency", type=float, default=0.3, help="单次向量化耗时（秒）")
+    parser.add_argument("--workers", type=int, default=5)
+    args = parser.parse_args()
+
+    reflector = Reflector(SimulatedLLM(args.llm_latency))
+    state = _state()
+    print(f"LLM 延迟 {args.llm_latency:.2f}s，向量化延迟 {args.embed_latency:.2f}s，并发数 {args.workers}")
+
+    memories = {name: SimulatedMemory(args.embed_latency) for name in COMPONENTS}
+    start = time.perf_counter()
+    run_sequential(reflector, state, memories)
+    sequential = time.perf_counter() - start
+    print(f"  串行: {sequential:.2f}s")
+
+    memories = {name: SimulatedMemory(args.embed_latency) for name in COMPONENTS}
+    start = time.perf_counter()
+    status = reflector.reflect_all(state, 0.03, memories, max_workers=args.workers)
+    parallel = time.perf_counter() - start
+    ok = sum(1 for item in status.values() if item["status"] == "ok")
+    print(f"  并发: {parallel:.2f}s（成功 {ok}/{len(COMPONENTS)}）")
+    print(f"📉 墙钟耗时减少 {(1 - parallel / sequential) * 100:.0f}%（{sequential / parallel:.1f}x）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+报告导出吞吐基准：处理函数内同步转换（旧实现） vs 共享渲染池 + 导出缓存
+
+使用模拟转换器（sleep --render-ms 模拟一次 pandoc 子进程）代替真实的 pandoc，
+并发发起 --requests 个 Word 导出请求，请求分布在 --reports 份不同报告上，
+测量 /api/reports/{id}/download?format=docx 处理流程的吞吐与延迟：
+
+- before: 每个请求在事件循环中直接调用转换器（旧 generate_docx_report，阻塞事件循环）
+- pool:   ReportExporter.generate_report_async（有界线程池，相同内容合并为一次渲染）
+- cached: 同一批请求再次发起（全部命中导出缓存）
+
+用法:
+    python scripts/benchmark_report_export.py [--requests 200] [--reports 20] [--render-ms 300] [--workers 4]
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class StubConverter:
+    """模拟 pandoc：固定耗时，返回与内容相关的字节"""
+
+    def __init__(self, render_ms):
+        self.delay = render_ms / 1000
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, markdown):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return markdown.encode("utf-8")[:64]
+
+
+def make_reports(n):
+    return [{
+        "stock_symbol": f"{i:06d}", "analysis_date": "2024-06-01", "summary": f"摘要 {i}",
+        "analysts": ["market", "fundamentals"], "research_depth": 3,
+        "reports": {"market_report": f"行情分析 {i}\n" * 200, "fundamentals_report": f"基本面 {i}\n" * 200},
+    } for i in range(n)]
+
+
+async def _timed(coro, arrived):
+    # 延迟从请求到达（整批同时到达）算起，包含在事件循环上排队等待的时间
+    await coro
+    return (time.perf_counter() - arrived) * 1000
+
+
+async def _legacy_download(exporter, convert, doc):
+    # 旧实现：在 async 处理函数中同步生成 Markdown 并调用 pandoc
+    md_content = exporter.generate_markdown_report(doc)
+    return convert(md_content)
+
+
+async def run_batch(factory, docs):
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*[_timed(factory(doc), start) for doc in docs])
+    return time.perf_counter() - start, sorted(latencies)
+
+
+def summarize(label, elapsed, latencies, calls):
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"  {label:>6}: {len(latencies) / elapsed:8.1f} 请求/秒，p50 {statistics.median(latencies):8.1f}ms，"
+          f"p95 {p95:8.1f}ms，转换 {calls} 次")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="并发导出请求数")
+    parser.add_argument("--reports", type=int, default=20, help="不同报告的数量")
+    parser.add_argument("--render-ms", type=float, default=300.0, help="模拟一次转换的耗时（毫秒）")
+    parser.add_argument("--workers", type=int, default=4, help="渲染池并发数")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    from app.utils.report_exporter import ReportExporter
+    from tradingagents.utils import render_pool as render_pool_mod
+
+    reports = make_reports(args.reports)
+    docs = [reports[i % args.reports] for i in range(args.requests)]
+    exporter = ReportExporter()
+    exporter.pandoc_available = True
+
+    print(f"📊 报告导出基准（{args.requests} 个并发请求，{args.reports} 份报告，单次转换 {args.render_ms:g}ms）")
+
+    convert = StubConverter(args.render_ms)
+    elapsed, latencies = asyncio.run(run_batch(lambda doc: _legacy_download(exporter, convert, doc), docs))
+    summarize("before", elapsed, latencies, convert.calls)
+
+    convert = StubConverter(args.render_ms)
+    exporter._render_docx = convert
+    render_pool_mod._render_pool = render_pool_mod.RenderPool(workers=args.workers, queue_size=args.requests)
+    for label in ("pool", "cached"):
+        calls_before = convert.calls
+        elapsed, latencies = asyncio.run(run_batch(lambda doc: exporter.generate_report_async(doc, "docx"), docs))
+        summarize(label, elapsed, latencies, convert.calls - calls_before)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+报告列表股票名称解析基准：逐行同步查询（旧实现） vs 整页批量解析
+
+使用内存模拟的 MongoDB（每次往返固定延迟 --rtt-ms），报告均未保存 stock_name，
+分别测量 20 / 100 / 500 行时 /api/reports/list 处理函数的冷缓存延迟：
+
+- before: 每行调用同步 get_stock_name，按数据源依次 find_one（阻塞事件循环）
+- after:  get_reports_list（StockNameResolver 一次 $in 查询）
+
+旧实现每次未命中还会新建 UnifiedConfigManager 读取配置，该开销未计入。
+
+用法:
+    python scripts/benchmark_report_names.py [--rtt-ms 2] [--rows 20 --rows 100 --rows 500]
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app.routers.reports as reports_mod  # noqa: E402
+import app.services.stock_name_resolver as resolver_mod  # noqa: E402
+
+SOURCES = ["tushare", "akshare", "baostock"]
+
+
+def _match(doc, flt):
+    for key, cond in flt.items():
+        if key == "$or":
+            if not any(_match(doc, sub) for sub in cond):
+                return False
+        elif isinstance(cond, dict) and "$in" in cond:
+            if doc.get(key) not in cond["$in"]:
+                return False
+        elif doc.get(key) != cond:
+            return False
+    return True
+
+
+class _Cursor:
+    def __init__(self, docs, rtt):
+        self._docs = docs
+        self._rtt = rtt
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def skip(self, n):
+        self._docs = self._docs[n:]
+        return self
+
+    def limit(self, n):
+        self._docs = self._docs[:n]
+        return self
+
+    async def to_list(self, length=None):
+        await asyncio.sleep(self._rtt)
+        return list(self._docs)
+
+
+class SimulatedCollection:
+    def __init__(self, docs, rtt):
+        self.docs = docs
+        self.rtt = rtt
+        self.round_trips = 0
+
+    # 异步接口（Motor）
+    def find(self, flt=None, projection=None):
+        self.round_trips += 1
+        return _Cursor([d for d in self.docs if _match(d, flt or {})], self.rtt)
+
+    async def estimated_document_count(self):
+        self.round_trips += 1
+        await asyncio.sleep(self.rtt)
+        return len(self.docs)
+
+    # 同步接口（pymongo，旧实现使用）
+    def find_one_sync(self, flt):
+        self.round_trips += 1
+        time.sleep(self.rtt)
+        return next((d for d in self.docs if _match(d, flt)), None)
+
+
+class SimulatedDB:
+    def __init__(self, rows, rtt):
+        codes = [f"{i:06d}" for i in range(1, rows + 1)]
+        self.stock_basic_info = SimulatedCollection(
+            [{"code": c, "symbol": c, "name": f"股票{c}", "source": "akshare"} for c in codes], rtt)
+        self.analysis_reports = SimulatedCollection(
+            [{"_id": f"r{i}", "stock_symbol": c, "market_type": "A股", "created_at": datetime(2025, 1, 1)}
+             for i, c in enumerate(codes)], rtt)
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+def legacy_get_stock_name(db, cache, stock_code):
+    """旧 get_stock_name 的查询路径：按数据源依次 find_one，最后不带 source 兜底"""
+    if stock_code in cache:
+        return cache[stock_code]
+    code6 = str(stock_code).zfill(6)
+    stock_info = None
+    for data_source in SOURCES:
+        stock_info = db.stock_basic_info.find_one_sync(
+            {"$or": [{"symbol": code6}, {"code": code6}], "source": data_source})
+        if stock_info:
+            break
+    if not stock_info:
+        stock_info = db.stock_basic_info.find_one_sync({"$or": [{"symbol": code6}, {"code": code6}]})
+    name = stock_info["name"] if stock_info and stock_info.get("name") else stock_code
+    cache[stock_code] = name
+    return name
+
+
+async def run_before(db, rows):
+    cache = {}
+    await db.analysis_reports.estimated_document_count()
+    docs = await db.analysis_reports.find({}).limit(rows).to_list()
+    return [doc.get("stock_name") or legacy_get_stock_name(db, cache, doc["stock_symbol"]) for doc in docs]
+
+
+async def run_after(db, rows):
+    resolver = resolver_mod.StockNameResolver(db=db)
+
+    async def priority():
+        return SOURCES
+
+    resolver._source_priority = priority
+    resolver_mod._resolver = resolver
+    reports_mod.get_mongo_db = lambda: db
+    result = await reports_mod.get_reports_list(
+        page=1, page_size=rows, search_keyword=None, market_filter=None,
+        start_date=None, end_date=None, stock_code=None, cursor=None, user={"id": "bench"})
+    return [r["stock_name"] for r in result["data"]["reports"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rtt-ms", type=float, default=2.0, help="模拟 MongoDB 单次往返耗时（毫秒）")
+    parser.add_argument("--rows", type=int, action="append", help="每页行数（可重复，默认 20/100/500）")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    rtt = args.rtt_ms / 1000
+    # 预热：处理函数内的按需导入不计入结果
+    asyncio.run(run_after(SimulatedDB(1, 0), 1))
+    print(f"模拟 MongoDB 往返 {args.rtt_ms:.1f}ms（冷缓存）")
+    for rows in args.rows or [20, 100, 500]:
+        line = [f"{rows:>4} 行:"]
+        for mode, runner in (("before", run_before), ("after", run_after)):
+            db = SimulatedDB(rows, rtt)
+            start = time.perf_counter()
+            names = asyncio.run(runner(db, rows))
+            elapsed = time.perf_counter() - start
+            assert len(names) == rows and names[0] == "股票000001"
+            line.append(f"{mode} {elapsed * 1000:7.1f}ms（{db.stock_basic_info.round_trips} 次名称查询）")
+        print("  ".join(line))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+报告列表检索基准：$regex + count + skip（旧实现） vs 检索词索引 + 游标分页
+
+需要可访问的 MongoDB（--mongo-uri，默认读取 MONGODB_URL/MONGO_URI 环境变量），
+在独立的数据库（--db，默认 ta_bench_reports）中生成 --reports 份合成报告
+（默认 100 万份，已存在且数量一致时复用），建立索引后分别测量：
+
+- 无关键词列表：第 1 / 100 / 1000 页
+- 关键词检索（股票名称、代码片段、正文短语）：第 1 / 20 页
+
+旧实现：三个不区分大小写的 $regex + count_documents + sort/skip/limit
+新实现：search_terms $all + 近似总数 + (created_at, _id) 游标分页（逐页翻到目标页，只计目标页耗时）
+
+用法:
+    python scripts/benchmark_report_search.py [--reports 1000000] [--repeat 3] [--drop]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+
+from app.services.report_search_index import (  # noqa: E402
+    approximate_count,
+    build_search_terms,
+    encode_cursor,
+    ensure_report_search_indexes,
+    keyset_filter,
+    search_filter,
+)
+
+PAGE_SIZE = 20
+_NAMES = ["招商银行", "平安银行", "贵州茅台", "宁德时代", "比亚迪", "中国平安", "万科A", "隆基绿能", "药明康德", "紫金矿业"]
+_PHRASES = ["均线多头排列", "放量突破前高", "估值处于历史低位", "业绩超预期", "北向资金持续流入", "短期存在回调风险"]
+KEYWORDS = ["宁德时代", "0036", "放量突破"]
+
+
+def _make_report(i, rnd, base):
+    code = f"{rnd.randint(1, 699999):06d}"
+    created_at = base + timedelta(seconds=i * 3)
+    doc = {
+        "stock_symbol": code,
+        "stock_name": rnd.choice(_NAMES),
+        "analysis_id": f"{code}_{created_at:%Y%m%d_%H%M%S}",
+        "market_type": "A股",
+        "summary": f"{rnd.choice(_PHRASES)}，{rnd.choice(_PHRASES)}",
+        "reports": {m: "；".join(rnd.choice(_PHRASES) for _ in range(20)) for m in ("market_report", "news_report")},
+        "created_at": created_at,
+    }
+    doc["search_terms"] = build_search_terms(doc)
+    return doc
+
+
+async def seed(coll, n):
+    if await coll.estimated_document_count() == n:
+        print(f"♻️ 复用已有的 {n:,} 份合成报告")
+        return
+    await coll.drop()
+    rnd = random.Random(42)
+    base = datetime(2023, 1, 1)
+    start = time.perf_counter()
+    batch = []
+    for i in range(n):
+        batch.append(_make_report(i, rnd, base))
+        if len(batch) == 5000:
+            await coll.insert_many(batch, ordered=False)
+            batch = []
+            print(f"\r📝 已写入 {i + 1:,}/{n:,}", end="", flush=True)
+    if batch:
+        await coll.insert_many(batch, ordered=False)
+    print(f"\n✅ 生成完成，耗时 {time.perf_counter() - start:.0f}s")
+
+
+def _old_query(keyword):
+    if not keyword:
+        return {}
+    return {"$or": [
+        {"stock_symbol": {"$regex": keyword, "$options": "i"}},
+        {"analysis_id": {"$regex": keyword, "$options": "i"}},
+        {"summary": {"$regex": keyword, "$options": "i"}},
+    ]}
+
+
+async def old_page(coll, keyword, page):
+    query = _old_query(keyword)
+    start = time.perf_counter()
+    await coll.count_documents(query)
+    await coll.find(query, {"reports": 0}).sort("created_at", -1).skip((page - 1) * PAGE_SIZE).limit(PAGE_SIZE).to_list(PAGE_SIZE)
+    return time.perf_counter() - start
+
+
+async def new_page(coll, keyword, page):
+    query = search_filter(keyword) if keyword else {}
+    sort = [("created_at", -1), ("_id", -1)]
+    cursor = None
+    elapsed = 0.0
+    for _ in range(page):
+        start = time.perf_counter()
+        page_query = query
+        if cursor:
+            after = keyset_filter(cursor)
+            page_query = {"$and": [query, after]} if query else after
+        if cursor is None:
+            await approximate_count(coll, query)
+        docs = await coll.find(page_query, {"reports": 0, "search_terms": 0}).sort(sort).limit(PAGE_SIZE + 1).to_list(PAGE_SIZE + 1)
+        elapsed = time.perf_counter() - start
+        if len(docs) <= PAGE_SIZE:
+            break
+        cursor = encode_cursor(docs[PAGE_SIZE - 1])
+    return elapsed
+
+
+async def main_async(args):
+    client = AsyncIOMotorClient(args.mongo_uri, serverSelectionTimeoutMS=5000)
+    db = client[args.db]
+    coll = db["analysis_reports"]
+    await seed(coll, args.reports)
+    await ensure_report_search_indexes(db)
+
+    scenarios = [(None, p) for p in (1, 100, 1000)] + [(kw, p) for kw in KEYWORDS for p in (1, 20)]
+    print(f"{'场景':<24}{'旧实现':>12}{'新实现':>12}")
+    for keyword, page in scenarios:
+        old = statistics.median([await old_page(coll, keyword, page) for _ in range(args.repeat)])
+        new = statistics.median([await new_page(coll, keyword, page) for _ in range(args.repeat)])
+        label = f"{keyword or '（无关键词）'} 第{page}页"
+        print(f"{label:<24}{old * 1000:>10.1f}ms{new * 1000:>10.1f}ms")
+
+    if args.drop:
+        await client.drop_database(args.db)
+        print(f"🗑️ 已删除基准数据库 {args.db}")
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGODB_URL") or os.getenv("MONGO_URI") or "mongodb://localhost:27017")
+    parser.add_argument("--db", default="ta_bench_reports")
+    parser.add_argument("--reports", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--drop", action="store_true", help="结束后删除基准数据库")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
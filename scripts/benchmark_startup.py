@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+启动开销基准：记录各入口的导入耗时与 RSS，超出基线即失败
+
+入口（每个入口在独立子进程中测量，重复 --repeat 次取中位数）:
+- api:       import app.main（FastAPI 应用，含全部路由注册）
+- worker:    import app.worker.analysis_worker（分析 Worker）
+- cli:       python -m cli.main --help
+- dataflows: import tradingagents.dataflows
+
+同时检查入口导入后不应加载的重量级库（数据源 SDK、pandas、LLM SDK 等），
+这些库应在首次使用时才导入；出现即视为回归。
+
+基线保存在 scripts/startup_baseline.json，耗时超出基线 (1 + --time-tolerance) 倍
+或 RSS 超出基线 (1 + --rss-tolerance) 倍时以非零状态退出。
+
+用法:
+    python scripts/benchmark_startup.py [--repeat 3] [--entry api --entry cli]
+    python scripts/benchmark_startup.py --update-baseline   # 重新记录基线
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+BASELINE_FILE = Path(__file__).resolve().parent / "startup_baseline.json"
+
+# 入口导入后不应出现的模块（应在首次使用时再加载）
+HEAVY_MODULES = [
+    "akshare", "tushare", "baostock", "yfinance", "chromadb", "pandas", "pypinyin",
+    "langchain_openai", "langchain_anthropic", "langchain_google_genai", "langgraph",
+]
+
+ENTRY_POINTS = {
+    "api": "import app.main",
+    "worker": "import app.worker.analysis_worker",
+    "cli": (
+        "import runpy\n"
+        "sys.argv = ['cli.main', '--help']\n"
+        "try:\n"
+        "    runpy.run_module('cli.main', run_name='__main__', alter_sys=True)\n"
+        "except SystemExit:\n"
+        "    pass"
+    ),
+    "dataflows": "import tradingagents.dataflows",
+}
+
+_CHILD_TEMPLATE = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+_start = time.perf_counter()
+{code}
+_elapsed = time.perf_counter() - _start
+sys.stdout.flush()
+print("\\n__STARTUP__" + json.dumps({{
+    "seconds": _elapsed,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy_modules": sorted(m for m in {heavy!r} if m in sys.modules),
+}}))
+"""
+
+
+def measure_once(entry: str) -> dict:
+    code = _CHILD_TEMPLATE.format(root=str(ROOT), code=ENTRY_POINTS[entry], heavy=HEAVY_MODULES)
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=300)
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith("__STARTUP__"):
+            return json.loads(line[len("__STARTUP__"):])
+    raise RuntimeError(f"入口 {entry} 运行失败 (exit={proc.returncode}):\n{proc.stderr[-2000:]}")
+
+
+def measure(entry: str, repeat: int) -> dict:
+    # 先运行一次预热字节码缓存，不计入结果
+    measure_once(entry)
+    runs = [measure_once(entry) for _ in range(repeat)]
+    return {
+        "seconds": statistics.median(r["seconds"] for r in runs),
+        "rss_mb": statistics.median(r["rss_mb"] for r in runs),
+        "heavy_modules": runs[-1]["heavy_modules"],
+    }
+
+
+def check(entry: str, result: dict, baseline: dict, time_tol: float, rss_tol: float) -> list:
+    problems = []
+    if result["heavy_modules"]:
+        problems.append(f"导入了应延迟加载的模块: {', '.join(result['heavy_modules'])}")
+    base = baseline.get(entry)
+    if not base:
+        return problems
+    time_limit = base["seconds"] * (1 + time_tol)
+    rss_limit = base["rss_mb"] * (1 + rss_tol)
+    if result["seconds"] > time_limit:
+        problems.append(f"导入耗时 {result['seconds']:.2f}s 超出基线 {base['seconds']:.2f}s（上限 {time_limit:.2f}s）")
+    if result["rss_mb"] > rss_limit:
+        problems.append(f"RSS {result['rss_mb']:.0f}MB 超出基线 {base['rss_mb']:.0f}MB（上限 {rss_limit:.0f}MB）")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entry", action="append", choices=sorted(ENTRY_POINTS), help="只测量指定入口（可重复）")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--time-tolerance", type=float, default=0.5, help="耗时允许超出基线的比例（默认 0.5）")
+    parser.add_argument("--rss-tolerance", type=float, default=0.25, help="RSS 允许超出基线的比例（默认 0.25）")
+    parser.add_argument("--update-baseline", action="store_true", help="将本次结果写入基线文件")
+    args = parser.parse_args()
+
+    entries = args.entry or list(ENTRY_POINTS)
+    baseline = json.loads(BASELINE_FILE.read_text(encoding="utf-8")) if BASELINE_FILE.exists() else {}
+
+    results = {}
+    failed = False
+    for entry in entries:
+        result = measure(entry, args.repeat)
+        results[entry] = result
+        problems = check(entry, result, {} if args.update_baseline else baseline, args.time_tolerance, args.rss_tolerance)
+        status = "❌" if problems else "✅"
+        base = baseline.get(entry)
+        base_text = f"（基线 {base['seconds']:.2f}s / {base['rss_mb']:.0f}MB）" if base else ""
+        print(f"{status} {entry:>9}: 导入 {result['seconds']:.2f}s，RSS {result['rss_mb']:.0f}MB {base_text}")
+        for problem in problems:
+            print(f"    - {problem}")
+        failed = failed or bool(problems)
+
+    if args.update_baseline:
+        baseline.update({entry: {"seconds": round(r["seconds"], 3), "rss_mb": round(r["rss_mb"], 1)}
+                         for entry, r in results.items()})
+        BASELINE_FILE.write_text(json.dumps(baseline, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"📝 基线已更新: {BASELINE_FILE}")
+        return 0
+
+    if failed:
+        print("❌ 启动开销出现回归")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
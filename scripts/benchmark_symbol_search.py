@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+股票搜索性能对比：进程内主索引 vs 无锚点正则扫描
+
+生成 10,000 只合成股票，分别用 SymbolMaster.search 和逐条 re.search
+（等价于 MongoDB 对整个集合执行 {"$regex": kw, "$options": "i"}）执行同一批查询，
+输出 p50 / p99 延迟。
+
+用法:
+    python scripts/benchmark_symbol_search.py [--symbols 10000] [--queries 2000]
+"""
+
+import argparse
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.symbol_master import SymbolMaster  # noqa: E402
+
+_CHARS = "平安银行招商中国万科比亚迪科技医药电子能源股份控股集团新材料华东西南北方"
+_WORDS = ["tech", "bank", "energy", "pharma", "china", "group", "holdings", "motor", "digital"]
+
+
+def _make_docs(n: int, seed: int = 7):
+    rnd = random.Random(seed)
+    docs = []
+    for i in range(n):
+        name = "".join(rnd.choice(_CHARS) for _ in range(rnd.randint(3, 5)))
+        name_en = " ".join(rnd.choice(_WORDS) for _ in range(2))
+        docs.append({"code": f"{i:06d}", "name": name, "name_en": name_en, "source": "tushare"})
+    return docs
+
+
+def _make_queries(docs, n: int, seed: int = 11):
+    rnd = random.Random(seed)
+    queries = []
+    for _ in range(n):
+        doc = rnd.choice(docs)
+        kind = rnd.random()
+        if kind < 0.3:
+            queries.append(doc["code"][: rnd.randint(3, 6)])
+        elif kind < 0.7:
+            queries.append(doc["name"][:2])
+        else:
+            start = rnd.randint(0, len(doc["name"]) - 2)
+            queries.append(doc["name"][start:start + 2])
+    return queries
+
+
+def _regex_search(docs, keyword: str, limit: int):
+    pattern = re.compile(re.escape(keyword), re.IGNORECASE)
+    results = []
+    for doc in docs:
+        if pattern.search(doc["code"]) or pattern.search(doc["name"]) or pattern.search(doc["name_en"]):
+            results.append(doc)
+            if len(results) >= limit:
+                break
+    return results
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return p50 * 1000, p99 * 1000
+
+
+def _time(fn, queries):
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        samples.append(time.perf_counter() - start)
+    return _percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="股票搜索性能对比")
+    parser.add_argument("--symbols", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    docs = _make_docs(args.symbols)
+    queries = _make_queries(docs, args.queries)
+
+    master = SymbolMaster()
+    start = time.perf_counter()
+    master.apply_docs("CN", docs, ["tushare"])
+    build_ms = (time.perf_counter() - start) * 1000
+
+    index_p50, index_p99 = _time(lambda q: master.search(q, market="CN", limit=args.limit), queries)
+    regex_p50, regex_p99 = _time(lambda q: _regex_search(docs, q, args.limit), queries)
+
+    print(f"股票数: {args.symbols}, 查询数: {args.queries}, 索引构建: {build_ms:.0f}ms")
+    print(f"{'方式':<12}{'p50(ms)':>10}{'p99(ms)':>10}")
+    print(f"{'主索引':<12}{index_p50:>10.3f}{index_p99:>10.3f}")
+    print(f"{'正则扫描':<12}{regex_p50:>10.3f}{regex_p99:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
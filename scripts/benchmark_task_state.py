@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+内存任务状态基准：全部常驻内存（旧实现） vs 有界淘汰 + 结果落盘
+
+模拟 --tasks 个分析任务依次创建、运行、完成（每个完成的任务带一份约 --result-kb KB 的分析结果），
+任务分布在 --users 个用户上。每种方式在独立子进程中运行，记录耗时、峰值 RSS
+以及某个用户任务列表的查询耗时：
+
+- before:  所有任务与 result_data 保存在一个 dict 中，列表查询遍历全部任务（旧 MemoryStateManager）
+- bounded: MemoryStateManager（最多保留 --max-tasks 个已结束任务，结果写入 gzip 文件，按用户建立索引）
+
+用法:
+    python scripts/benchmark_task_state.py [--tasks 100000] [--users 500] [--result-kb 8] [--max-tasks 2000]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+MODES = ["before", "bounded"]
+
+
+def _result(i, kb):
+    return {"stock_symbol": f"{i % 5000:06d}", "decision": {"action": "持有", "confidence": 0.7},
+            "summary": f"任务 {i} 分析摘要", "reports": {"market_report": f"{i}" + "行" * (kb * 1024 // 3)}}
+
+
+async def _legacy(args):
+    # 旧实现：任务（含 result_data）永久保存在 dict 中，列表查询遍历并排序全部任务
+    tasks = {}
+    for i in range(args.tasks):
+        tasks[f"task-{i}"] = {"task_id": f"task-{i}", "user_id": f"user-{i % args.users}", "status": "running",
+                              "start_time": datetime.now(), "result_data": None}
+        task = tasks[f"task-{i}"]
+        task.update(status="completed", end_time=datetime.now(), result_data=_result(i, args.result_kb))
+
+    start = time.perf_counter()
+    mine = [t for t in tasks.values() if t["user_id"] == "user-0"]
+    mine.sort(key=lambda t: t["start_time"], reverse=True)
+    return (time.perf_counter() - start) * 1000, len(tasks)
+
+
+async def _bounded(args, result_dir):
+    from app.services.memory_state_manager import MemoryStateManager, TaskStatus
+
+    mgr = MemoryStateManager(max_tasks=args.max_tasks, result_dir=result_dir)
+    for i in range(args.tasks):
+        await mgr.create_task(f"task-{i}", f"user-{i % args.users}", f"{i % 5000:06d}")
+        await mgr.update_task_status(f"task-{i}", TaskStatus.COMPLETED, progress=100,
+                                     result_data=_result(i, args.result_kb))
+
+    start = time.perf_counter()
+    await mgr.list_user_tasks("user-0", limit=20)
+    return (time.perf_counter() - start) * 1000, len(mgr._tasks)
+
+
+def child(mode, args):
+    logging.disable(logging.WARNING)
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as result_dir:
+        if mode == "before":
+            list_ms, kept = asyncio.run(_legacy(args))
+        else:
+            list_ms, kept = asyncio.run(_bounded(args, result_dir))
+    print("__BENCH__" + json.dumps({
+        "seconds": time.perf_counter() - start,
+        "list_ms": list_ms,
+        "kept": kept,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def measure(mode, argv):
+    proc = subprocess.run([sys.executable, __file__, "--child", mode, *argv], cwd=ROOT, capture_output=True, text=True)
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith("__BENCH__"):
+            return json.loads(line[len("__BENCH__"):])
+    raise RuntimeError(f"{mode} 运行失败 (exit={proc.returncode}):\n{proc.stderr[-2000:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=100_000, help="模拟的任务数")
+    parser.add_argument("--users", type=int, default=500, help="用户数")
+    parser.add_argument("--result-kb", type=int, default=8, help="每个分析结果的大小（KB）")
+    parser.add_argument("--max-tasks", type=int, default=2000, help="有界模式最多保留的已结束任务数")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args)
+        return 0
+
+    argv = ["--tasks", str(args.tasks), "--users", str(args.users),
+            "--result-kb", str(args.result_kb), "--max-tasks", str(args.max_tasks)]
+    print(f"📊 内存任务状态基准（{args.tasks} 个任务，{args.users} 个用户，结果约 {args.result_kb}KB）")
+    for mode in MODES:
+        r = measure(mode, argv)
+        print(f"  {mode:>7}: 总耗时 {r['seconds']:6.1f}s，峰值 RSS {r['rss_mb']:7.0f}MB，"
+              f"保留任务 {r['kept']:6d}，用户列表查询 {r['list_ms']:7.2f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
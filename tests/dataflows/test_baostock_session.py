@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import types
+
+from tradingagents.dataflows.providers.china.baostock import BaoStockProvider
+from tradingagents.dataflows.providers.china.baostock_session import BaoStockSessionBroker
+
+
+class FakeResultSet:
+    def __init__(self, rows, fields, error_code='0', error_msg=''):
+        self._rows = list(rows)
+        self.fields = fields
+        self.error_code = error_code
+        self.error_msg = error_msg
+        self._current = None
+
+    def next(self):
+        if not self._rows:
+            return False
+        self._current = self._rows.pop(0)
+        return True
+
+    def get_row_data(self):
+        return self._current
+
+
+def make_fake_bs():
+    bs = types.SimpleNamespace(calls=[], threads=set(), session_valid=False, expire_after=None)
+
+    def login():
+        bs.calls.append("login")
+        bs.session_valid = True
+        return types.SimpleNamespace(error_code='0', error_msg='')
+
+    def logout():
+        bs.calls.append("logout")
+        bs.session_valid = False
+
+    def query_history_k_data_plus(code, fields, start_date, end_date, frequency, adjustflag):
+        bs.threads.add(threading.get_ident())
+        bs.calls.append(f"k:{code}")
+        if bs.expire_after is not None and bs.calls.count("login") == 1 and len(bs.calls) > bs.expire_after:
+            bs.session_valid = False
+        if not bs.session_valid:
+            return FakeResultSet([], [], error_code='10001001', error_msg='用户未登陆')
+        cols = fields.split(",")
+        return FakeResultSet([[f"2024-01-0{i}", code] + ["10.0"] * (len(cols) - 2) for i in (2, 3)], cols)
+
+    def query_profit_data(code, year, quarter):
+        bs.calls.append(f"profit:{code}")
+        return FakeResultSet([[code, "0.12"]], ["code", "roeAvg"])
+
+    def query_growth_data(code, year, quarter):
+        bs.calls.append(f"growth:{code}")
+        return FakeResultSet([], [], error_code='10004011', error_msg='无效的证券代码')
+
+    bs.login = login
+    bs.logout = logout
+    bs.query_history_k_data_plus = query_history_k_data_plus
+    bs.query_profit_data = query_profit_data
+    bs.query_growth_data = query_growth_data
+    for name in ("query_operation_data", "query_balance_data", "query_cash_flow_data"):
+        setattr(bs, name, lambda code, year, quarter: FakeResultSet([], []))
+    return bs
+
+
+def make_provider(bs):
+    provider = BaoStockProvider.__new__(BaoStockProvider)
+    provider.bs = bs
+    provider.connected = True
+    provider._session = BaoStockSessionBroker(bs)
+    return provider
+
+
+def test_provider_reuses_one_session_on_dedicated_thread():
+    bs = make_fake_bs()
+    provider = make_provider(bs)
+
+    async def sync_all():
+        return await asyncio.gather(*[
+            provider.get_historical_data(code, "2024-01-01", "2024-01-05") for code in ("600000", "000001", "600036")
+        ])
+
+    frames = asyncio.run(sync_all())
+    assert all(len(df) == 2 for df in frames)
+    assert bs.calls.count("login") == 1 and "logout" not in bs.calls
+    assert len(bs.threads) == 1 and threading.get_ident() not in bs.threads
+    provider.session.close()
+    assert bs.calls[-1] == "logout"
+
+
+def test_session_relogins_when_expired():
+    bs = make_fake_bs()
+    bs.expire_after = 3
+    provider = make_provider(bs)
+
+    for code in ("600000", "000001", "600036"):
+        df = asyncio.run(provider.get_historical_data(code, "2024-01-01", "2024-01-05"))
+        assert df is not None and len(df) == 2
+    assert bs.calls.count("login") == 2
+    assert provider.session.stats["relogins"] == 1
+
+
+def test_financial_data_is_one_batch_with_per_query_errors():
+    bs = make_fake_bs()
+    provider = make_provider(bs)
+
+    data = asyncio.run(provider.get_financial_data("600036", 2024, 3))
+    assert data == {"profit_data": {"code": "sh.600036", "roeAvg": "0.12"}}
+    assert bs.calls[0] == "login" and bs.calls[1:3] == ["profit:sh.600036", "growth:sh.600036"]
+    assert provider.session.stats["queries"] == 5
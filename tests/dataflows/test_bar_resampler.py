@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tradingagents.dataflows.bar_resampler import compare_bars, incremental_start, period_start, resample_bars
+from tradingagents.dataflows.trading_calendar import TradingCalendar
+
+# 2024 年工作日日历，去掉劳动节（05-01~05-03）、端午节（06-10）和 09-30 前后的国庆假期
+_HOLIDAYS = {"2024-05-01", "2024-05-02", "2024-05-03", "2024-06-10",
+             "2024-10-01", "2024-10-02", "2024-10-03", "2024-10-04", "2024-10-07"}
+CALENDAR = TradingCalendar("CN", [d for d in TradingCalendar.weekdays("CN", "2024-01-01", "2024-12-31").days
+                                  if str(d) not in _HOLIDAYS])
+
+
+def make_daily(start="2024-04-01", end="2024-10-31", seed=0, symbol=None):
+    days = CALENDAR.sessions(start, end)
+    rng = np.random.default_rng(seed)
+    close = np.round(10 * np.cumprod(1 + rng.normal(0, 0.02, len(days))), 2)
+    open_ = np.round(close * (1 + rng.normal(0, 0.01, len(days))), 2)
+    df = pd.DataFrame({
+        "trade_date": np.datetime_as_string(days),
+        "open": open_,
+        "high": np.maximum(open_, close) + 0.05,
+        "low": np.minimum(open_, close) - 0.05,
+        "close": close,
+        "pre_close": np.r_[10.0, close[:-1]],
+        "volume": rng.integers(1_000, 5_000, len(days)) * 100.0,
+        "amount": rng.integers(10_000, 50_000, len(days)) * 1000.0,
+    })
+    if symbol is not None:
+        df.insert(0, "symbol", symbol)
+    return df
+
+
+def provider_style_bars(daily, rule):
+    """按数据源口径独立计算的周期K线：pandas 按自然周/月聚合，日期取周期内最后一个交易日"""
+    df = daily.assign(dt=pd.to_datetime(daily["trade_date"])).set_index("dt")
+    bars = df.resample(rule).agg({"trade_date": "last", "open": "first", "high": "max", "low": "min",
+                                  "close": "last", "volume": "sum", "amount": "sum"})
+    return bars.dropna().reset_index(drop=True)
+
+
+def test_weekly_and_monthly_bars_follow_calendar_boundaries():
+    daily = make_daily()
+    weekly = resample_bars(daily, "weekly", calendar=CALENDAR)
+
+    # 劳动节所在周只有 05-06 之前的 04-29、04-30 两个交易日，K线日期为 04-30
+    labour_day_week = weekly[weekly["trade_date"] == "2024-04-30"].iloc[0]
+    assert labour_day_week["trade_days"] == 2 and labour_day_week["period_end"] == "2024-04-30"
+    rows = daily[daily["trade_date"].isin(["2024-04-29", "2024-04-30"])]
+    assert labour_day_week["open"] == rows["open"].iloc[0] and labour_day_week["close"] == rows["close"].iloc[-1]
+    assert labour_day_week["high"] == rows["high"].max() and labour_day_week["volume"] == rows["volume"].sum()
+
+    # 前收盘衔接上一周期收盘，涨跌幅据此计算
+    assert np.allclose(weekly["pre_close"].iloc[1:].values, weekly["close"].iloc[:-1].values)
+    assert weekly["pre_close"].iloc[0] == daily["pre_close"].iloc[0]
+    assert np.allclose(weekly["pct_chg"], (weekly["close"] / weekly["pre_close"] - 1) * 100)
+
+    monthly = resample_bars(daily, "monthly", calendar=CALENDAR)
+    assert monthly["trade_date"].tolist()[:3] == ["2024-04-30", "2024-05-31", "2024-06-28"]
+    # 9 月最后一个交易日是 09-30，10 月从 10-08 开始
+    assert monthly.set_index("trade_date").loc["2024-10-31", "trade_days"] == 18
+
+    for period, rule in (("weekly", "W-SUN"), ("monthly", "ME")):
+        report = compare_bars(resample_bars(daily, period, calendar=CALENDAR), provider_style_bars(daily, rule))
+        assert report["compared"] > 0 and report["matched"] == report["compared"]
+        assert not report["missing_in_derived"] and not report["missing_in_reference"]
+
+
+def test_unfinished_period_is_flagged():
+    daily = make_daily(end="2024-06-12")
+    weekly = resample_bars(daily, "weekly", calendar=CALENDAR)
+    last = weekly.iloc[-1]
+    # 端午周（06-11~06-14）只到 06-12，周期尚未结束
+    assert (last["trade_date"], last["period_end"], bool(last["is_complete"])) == ("2024-06-12", "2024-06-14", False)
+    assert weekly["is_complete"].iloc[:-1].all()
+    assert resample_bars(daily, "weekly", calendar=CALENDAR, as_of="2024-06-14")["is_complete"].iloc[-1]
+
+
+def test_incremental_update_matches_full_history():
+    daily = make_daily()
+    for period in ("weekly", "monthly"):
+        full = resample_bars(daily, period, calendar=CALENDAR)
+        # 已派生到 08-14，新日线到达后只读取上一周期起的日线
+        since = incremental_start("2024-08-14", period)
+        keep_from = str(period_start("2024-08-14", period))
+        tail = resample_bars(daily[daily["trade_date"] >= since], period, calendar=CALENDAR)
+        tail = tail[tail["trade_date"] >= keep_from].reset_index(drop=True)
+        expected = full[full["trade_date"] >= keep_from].reset_index(drop=True)
+        pd.testing.assert_frame_equal(tail, expected)
+
+    assert incremental_start("2024-08-14", "weekly") == "2024-08-05"
+    assert incremental_start("2024-08-14", "monthly") == "2024-07-01"
+
+
+def test_universe_long_frame_matches_per_symbol():
+    frames = [make_daily(seed=i, symbol=f"{i:06d}") for i in range(5)]
+    # 个别股票中途上市、停牌
+    frames[1] = frames[1][frames[1]["trade_date"] >= "2024-07-10"]
+    frames[2] = frames[2][(frames[2]["trade_date"] < "2024-06-03") | (frames[2]["trade_date"] > "2024-06-21")]
+    universe = pd.concat(frames).sample(frac=1.0, random_state=0)
+
+    bars = resample_bars(universe, "weekly", calendar=CALENDAR)
+    for frame in frames:
+        symbol = frame["symbol"].iloc[0]
+        expected = resample_bars(frame.drop(columns=["symbol"]), "weekly", calendar=CALENDAR)
+        got = bars[bars["symbol"] == symbol].drop(columns=["symbol"]).reset_index(drop=True)
+        pd.testing.assert_frame_equal(got, expected)
+
+
+def test_adjustment_factors_and_suspended_days():
+    daily = make_daily(end="2024-07-31")
+    # 06-17 除权：之前的原始价格是复权后价格的 1.25 倍
+    factor = np.where(daily["trade_date"] < "2024-06-17", 1.0, 1.25)
+    raw = daily.copy()
+    for column in ("open", "high", "low", "close", "pre_close"):
+        raw[column] = daily[column] * 1.25 / factor
+    raw["adj_factor"] = factor
+
+    qfq = resample_bars(raw, "weekly", calendar=CALENDAR, adjust="qfq")
+    pd.testing.assert_frame_equal(qfq, resample_bars(daily, "weekly", calendar=CALENDAR))
+    hfq = resample_bars(raw, "weekly", calendar=CALENDAR, adjust="hfq")
+    assert np.allclose(hfq["close"], qfq["close"] * 1.25) and np.allclose(hfq["pct_chg"], qfq["pct_chg"])
+    with pytest.raises(ValueError):
+        resample_bars(daily, "weekly", calendar=CALENDAR, adjust="qfq")
+
+    suspended = daily.assign(tradestatus=np.where(daily["trade_date"] == "2024-07-31", 0, 1))
+    monthly = resample_bars(suspended, "monthly", calendar=CALENDAR)
+    assert monthly["trade_date"].iloc[-1] == "2024-07-30"
+    assert resample_bars(daily, "quarterly", calendar=CALENDAR)["trade_date"].tolist() == ["2024-06-28", "2024-07-31"]
+    with pytest.raises(ValueError):
+        resample_bars(daily, "hourly", calendar=CALENDAR)
+
+
+def test_compare_bars_reports_differences():
+    daily = make_daily(end="2024-05-31")
+    derived = resample_bars(daily, "weekly", calendar=CALENDAR)
+    provider = provider_style_bars(daily, "W-SUN")
+    provider.loc[2, "high"] += 0.05
+    provider.loc[3, "volume"] *= 1.01
+    provider = provider.drop(index=0)
+
+    report = compare_bars(derived, provider)
+    assert report["missing_in_reference"] == [derived["trade_date"].iloc[0]]
+    assert report["mismatches"]["trade_date"].tolist() == provider["trade_date"].iloc[1:3].tolist()
+    assert report["matched"] == report["compared"] - 2
@@ -0,0 +1,138 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tradingagents.dataflows import trading_calendar as cal_mod
+from tradingagents.dataflows.data_completeness_checker import CompletenessEngine, DataCompletenessChecker
+from tradingagents.dataflows.trading_calendar import TradingCalendar, get_trading_calendar
+
+# 2024-06 的工作日日历，去掉端午节（06-10）
+CALENDAR = TradingCalendar("CN", [d for d in TradingCalendar.weekdays("CN", "2024-06-01", "2024-06-30").days
+                                  if str(d) != "2024-06-10"])
+
+
+def _days(*values):
+    return np.array(values, dtype="datetime64[D]")
+
+
+def test_calendar_queries():
+    assert CALENDAR.latest_trade_date("2024-06-10") == "2024-06-07"
+    assert CALENDAR.latest_trade_date("2024-06-11") == "2024-06-11"
+    assert CALENDAR.count("2024-06-08", "2024-06-14") == 4
+    assert CALENDAR.is_trading_day("20240611") and not CALENDAR.is_trading_day("2024-06-10")
+    idx, valid = CALENDAR.locate(_days("2024-06-07", "2024-06-08", "2024-07-01"))
+    assert valid.tolist() == [True, False, False]
+    assert CALENDAR.latest_trade_date("2024-05-01") is None
+
+
+def test_calendar_is_cached_locally(tmp_path, monkeypatch):
+    calls = []
+
+    def _fetch(end):
+        calls.append(end)
+        return CALENDAR.days
+
+    monkeypatch.setattr(cal_mod, "_FETCHERS", {"CN": [("stub", _fetch)]})
+    monkeypatch.setattr(cal_mod, "_calendars", {})
+    monkeypatch.setattr(TradingCalendar, "is_stale", lambda self, today=None: self.updated_at is None)
+
+    first = get_trading_calendar("CN", cache_dir=tmp_path)
+    assert first.source == "stub" and len(calls) == 1
+    assert json.loads((tmp_path / "trade_calendar_CN.json").read_text())["days"][0] == "2024-06-03"
+
+    # 新进程：直接读本地缓存，不访问数据源
+    monkeypatch.setattr(cal_mod, "_calendars", {})
+    again = get_trading_calendar("CN", cache_dir=tmp_path)
+    assert len(calls) == 1 and np.array_equal(again.days, CALENDAR.days)
+
+    # 没有数据源的市场退化为工作日日历
+    weekday = get_trading_calendar("US", cache_dir=tmp_path)
+    assert weekday.source == "weekday" and not (tmp_path / "trade_calendar_US.json").exists()
+
+
+def test_universe_check_reports_missing_days_and_coverage(tmp_path):
+    engine = CompletenessEngine(calendar=CALENDAR, state_path=tmp_path / "state.json")
+    data = pd.DataFrame({
+        "symbol": ["000001"] * 4 + ["600519"] * 2 + ["000002"],
+        # 000001 缺 06-05；600519 只到 06-04；06-08 是周末，不计入
+        "trade_date": ["2024-06-03", "2024-06-04", "2024-06-06", "2024-06-07",
+                       "2024-06-03", "2024-06-04", "2024-06-08"],
+    })
+
+    report = engine.check_universe(data, end="2024-06-09", symbols=["000001", "600519", "000002", "300750"])
+
+    row = report.loc["000001"]
+    assert (row.expected_days, row.present_days, row.missing_days, row.stale_days) == (5, 4, 1, 0)
+    assert row.has_latest_trade_date and row.coverage == pytest.approx(0.8)
+    assert not row.is_complete  # 覆盖率低于 90%
+    assert engine.missing_dates("000001", "2024-06-09") == ["2024-06-05"]
+
+    row = report.loc["600519"]
+    assert (row.missing_days, row.stale_days, bool(row.has_latest_trade_date)) == (3, 3, False)
+    assert engine.missing_dates("600519", "2024-06-09") == ["2024-06-05", "2024-06-06", "2024-06-07"]
+
+    for symbol in ("000002", "300750"):
+        assert report.loc[symbol, "coverage"] == 0 and not report.loc[symbol, "is_complete"]
+    assert engine.watermark("000002") is None
+
+
+def test_matches_per_symbol_set_difference(tmp_path):
+    rng = np.random.default_rng(7)
+    calendar = TradingCalendar.weekdays("CN", "2015-01-01", "2024-12-31")
+    data = {}
+    for i in range(200):
+        days = calendar.days[rng.integers(0, 400):]
+        data[f"{i:06d}"] = days[rng.random(len(days)) > rng.uniform(0, 0.2)]
+
+    engine = CompletenessEngine(calendar=calendar, state_path=tmp_path / "state.json")
+    report = engine.check_universe(data, end="2024-12-31", persist=False)
+
+    for symbol, days in data.items():
+        expected = np.setdiff1d(calendar.sessions(days.min(), "2024-12-31"), days)
+        assert report.loc[symbol, "missing_days"] == len(expected)
+        assert engine.missing_dates(symbol, "2024-12-31") == np.datetime_as_string(expected).tolist()
+
+
+def test_watermark_persists_and_repeat_checks_only_see_new_dates(tmp_path):
+    state = tmp_path / "state.json"
+    full = {"000001": CALENDAR.sessions("2024-06-03", "2024-06-20"),
+            "600519": np.setdiff1d(CALENDAR.sessions("2024-06-05", "2024-06-20"), _days("2024-06-12", "2024-06-18"))}
+    baseline = CompletenessEngine(calendar=CALENDAR, state_path=tmp_path / "full.json").check_universe(full, end="2024-06-20")
+
+    first = CompletenessEngine(calendar=CALENDAR, state_path=state)
+    first.check_universe({k: v[v <= np.datetime64("2024-06-13")] for k, v in full.items()}, end="2024-06-13")
+    assert first.watermark("600519") == {"first": "2024-06-05", "through": "2024-06-13", "present": 5, "gaps": 1}
+
+    # 新实例从文件恢复水位；水位之前的数据（包括错误数据）不会被重新检查
+    second = CompletenessEngine(calendar=CALENDAR, state_path=state)
+    stale_rows = {k: np.concatenate([_days("2024-05-31"), v]) for k, v in full.items()}
+    report = second.check_universe(stale_rows, end="2024-06-20")
+    pd.testing.assert_frame_equal(report, baseline)
+    assert second.missing_dates("600519", "2024-06-20") == ["2024-06-12", "2024-06-18"]
+
+    # 没有新数据时，滞后天数随最新交易日增加；补上数据后消失
+    lagging = second.check_universe({}, end="2024-06-25")
+    assert lagging.loc["000001", "stale_days"] == 3
+    caught_up = second.check_universe({"000001": CALENDAR.sessions("2024-06-21", "2024-06-25")}, end="2024-06-25")
+    assert caught_up.loc["000001", "is_complete"] and caught_up.loc["000001", "missing_days"] == 0
+
+    second.reset(["600519"])
+    assert second.watermark("600519") is None and second.watermark("000001") is not None
+
+
+def test_checker_uses_calendar(monkeypatch):
+    import tradingagents.dataflows.data_completeness_checker as checker_mod
+
+    monkeypatch.setattr(checker_mod, "get_trading_calendar", lambda market="CN": CALENDAR)
+    checker = DataCompletenessChecker()
+    assert checker._get_latest_trade_date("CN") == str(CALENDAR.days[-1])
+
+    df = pd.DataFrame({"date": pd.to_datetime(["2024-06-03", "2024-06-04", "2024-06-11", "2024-06-12", "2024-06-20"])})
+    assert checker._check_data_gaps(df, "date") == ["2024-06-04 到 2024-06-11", "2024-06-12 到 2024-06-20"]
+
+    csv = "date,close\n" + "\n".join(f"{d},1.0" for d in CALENDAR.sessions("2024-06-03", "2024-06-28"))
+    ok, message, details = checker.check_data_completeness("000001", csv, "2024-06-01", "2024-06-30")
+    assert ok, message
+    assert details["expected_rows"] == len(CALENDAR) and details["completeness_ratio"] == 1.0
@@ -0,0 +1,106 @@
+from tradingagents.config.data_source_priority import DataSourcePriorityConfig
+
+
+class _SyncCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.find_one_calls = 0
+        self.find_calls = []
+
+    def find_one(self, flt=None, projection=None, sort=None):
+        self.find_one_calls += 1
+        for d in sorted(self.docs, key=lambda d: -d.get("version", 0)):
+            if all(d.get(k) == v for k, v in (flt or {}).items()):
+                return dict(d)
+        return None
+
+    def find(self, flt=None, projection=None):
+        self.find_calls.append(flt)
+        sources = flt["data_source"]["$in"]
+        rows = [dict(d) for d in self.docs if d["symbol"] == flt["symbol"] and d["data_source"] in sources]
+        return _Cursor(rows)
+
+
+class _Cursor(list):
+    def sort(self, key, direction=1):
+        return _Cursor(sorted(self, key=lambda d: d[key]))
+
+
+class _DB:
+    def __init__(self, **colls):
+        self.__dict__.update(colls)
+
+
+def _config(version, tushare_priority):
+    return {
+        "_id": f"cfg-{version}", "is_active": True, "version": version, "updated_at": version,
+        "data_source_configs": [
+            {"type": "Tushare", "enabled": True, "priority": tushare_priority, "market_categories": ["a_shares"]},
+            {"type": "AKShare", "enabled": True, "priority": 2, "market_categories": ["a_shares"]},
+            {"type": "BaoStock", "enabled": False, "priority": 9, "market_categories": ["a_shares"]},
+            {"type": "yfinance", "enabled": True, "priority": 5, "market_categories": ["us_stocks"]},
+        ],
+    }
+
+
+def test_priority_snapshot_polls_version_stamp_and_invalidates():
+    configs = _SyncCollection([_config(1, 3)])
+    snapshot = DataSourcePriorityConfig(db_getter=lambda: _DB(system_configs=configs), poll_interval=3600)
+    snapshot._listener_started = True
+
+    assert snapshot.get_priority("a_shares") == ["tushare", "akshare"]
+    assert snapshot.get_priority("us_stocks") == ["yfinance"]
+    calls = configs.find_one_calls
+    for _ in range(10):
+        snapshot.get_priority("a_shares")
+    # 轮询间隔内不访问数据库
+    assert configs.find_one_calls == calls
+
+    configs.docs[0] = _config(2, 1)
+    snapshot.invalidate()
+    assert snapshot.get_priority("a_shares") == ["akshare", "tushare"]
+    assert snapshot.stats["loads"] == 2
+
+    # 版本戳未变化时只做轻量检查，不重新加载
+    snapshot.invalidate()
+    snapshot.get_priority("a_shares")
+    assert snapshot.stats["loads"] == 2
+
+
+def test_priority_snapshot_keeps_last_good_config_on_failure():
+    configs = _SyncCollection([_config(1, 3)])
+    state = {"down": False}
+
+    def _getter():
+        if state["down"]:
+            raise ConnectionError("mongo down")
+        return _DB(system_configs=configs)
+
+    snapshot = DataSourcePriorityConfig(db_getter=_getter, poll_interval=0)
+    snapshot._listener_started = True
+    assert snapshot.get_priority("a_shares") == ["tushare", "akshare"]
+    state["down"] = True
+    assert snapshot.get_priority("a_shares") == ["tushare", "akshare"]
+
+
+def test_historical_data_single_query_picks_best_source_per_day(monkeypatch):
+    from tradingagents.dataflows.cache.mongodb_cache_adapter import MongoDBCacheAdapter
+
+    quotes = _SyncCollection([
+        {"symbol": "000001", "trade_date": "2025-01-02", "data_source": "akshare", "close": 10.0},
+        {"symbol": "000001", "trade_date": "2025-01-02", "data_source": "tushare", "close": 10.1},
+        {"symbol": "000001", "trade_date": "2025-01-03", "data_source": "akshare", "close": 10.2},
+        {"symbol": "000001", "trade_date": "2025-01-06", "data_source": "baostock", "close": 10.3},
+    ])
+    adapter = MongoDBCacheAdapter.__new__(MongoDBCacheAdapter)
+    adapter.use_app_cache = True
+    adapter.db = _DB(stock_daily_quotes=quotes)
+    monkeypatch.setattr(adapter, "_get_data_source_priority", lambda symbol: ["tushare", "akshare", "baostock"])
+
+    df = adapter.get_historical_data("000001", "2025-01-01", "2025-01-31")
+
+    assert len(quotes.find_calls) == 1
+    assert quotes.find_calls[0]["data_source"] == {"$in": ["tushare", "akshare", "baostock"]}
+    assert list(df["trade_date"]) == ["2025-01-02", "2025-01-03", "2025-01-06"]
+    assert list(df["data_source"]) == ["tushare", "akshare", "baostock"]
+    assert "_source_rank" not in df.columns
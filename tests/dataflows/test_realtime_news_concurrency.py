@@ -0,0 +1,121 @@
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from tradingagents.config.runtime_settings import get_timezone_name
+from tradingagents.dataflows.news import realtime_news
+from tradingagents.dataflows.news.realtime_news import RealtimeNewsAggregator, get_news_source_metrics
+
+
+class StubNewsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    delays = {}
+    clients = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        self.clients.append((path, self.client_address))
+        time.sleep(self.delays.get(path, 0))
+        now = datetime.now(ZoneInfo(get_timezone_name()))
+        if path == "/finnhub":
+            body = json.dumps([{"headline": "AAPL earnings beat expectations", "summary": "...",
+                                "datetime": int(time.time()), "url": "u1"}])
+        elif path == "/av":
+            body = json.dumps({"feed": [{"title": "Apple launches new product line", "summary": "...",
+                                         "time_published": now.strftime("%Y%m%dT%H%M%S"), "url": "u2"}]})
+        elif path == "/rss":
+            body = "<rss><channel><item><title>AAPL rss headline here</title></item></channel></rss>"
+        else:
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        data = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # 客户端超时断开后写回响应会 BrokenPipe，属于预期情况
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    StubNewsHandler.delays = {}
+    StubNewsHandler.clients = []
+    server = QuietServer(("127.0.0.1", 0), StubNewsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def make_aggregator(base, monkeypatch, **kwargs):
+    monkeypatch.setenv("FINNHUB_API_KEY", "k")
+    monkeypatch.setenv("ALPHA_VANTAGE_API_KEY", "k")
+    monkeypatch.setenv("NEWSAPI_KEY", "k")
+    aggregator = RealtimeNewsAggregator(**kwargs)
+    aggregator.FINNHUB_URL = f"{base}/finnhub"
+    aggregator.ALPHA_VANTAGE_URL = f"{base}/av"
+    aggregator.NEWSAPI_URL = f"{base}/broken"
+    aggregator.RSS_SOURCES = [f"{base}/rss"]
+    aggregator._get_eastmoney_news = lambda ticker, hours_back: []
+    return aggregator
+
+
+def test_sources_fetched_concurrently_with_partial_results_at_deadline(stub_server, monkeypatch):
+    realtime_news.reset_news_source_metrics()
+    StubNewsHandler.delays = {"/finnhub": 0.4, "/av": 0.4, "/rss": 1.6}
+    aggregator = make_aggregator(stub_server, monkeypatch, deadline=1.0)
+
+    start = time.perf_counter()
+    news = aggregator.get_realtime_stock_news("AAPL", hours_back=6, max_news=10)
+    elapsed = time.perf_counter() - start
+
+    # 并发：总耗时受截止时间约束，而不是各源耗时之和
+    assert elapsed < 1.5
+    assert {n.url for n in news} == {"u1", "u2"}
+    metrics = aggregator.last_metrics
+    assert metrics["finnhub"]["status"] == "ok" and 0.35 < metrics["finnhub"]["latency"] < 0.9
+    assert metrics["alpha_vantage"]["status"] == "ok"
+    assert metrics["newsapi"]["status"] == "error"
+    assert metrics[f"rss:{stub_server[len('http://'):]}"]["status"] == "timeout"
+    assert metrics["eastmoney"]["status"] == "empty"
+
+    totals = get_news_source_metrics()
+    assert totals["newsapi"]["errors"] == 1 and "500" in totals["newsapi"]["last_error"]
+    assert totals["finnhub"]["items"] == 1
+
+
+def test_per_source_timeout_and_keep_alive_reuse(stub_server, monkeypatch):
+    StubNewsHandler.delays = {"/finnhub": 0.8}
+    aggregator = make_aggregator(stub_server, monkeypatch, deadline=5.0, source_timeouts={"finnhub": 0.2})
+
+    start = time.perf_counter()
+    aggregator.get_realtime_stock_news("AAPL")
+    assert time.perf_counter() - start < 0.7
+    assert aggregator.last_metrics["finnhub"]["status"] == "error"
+
+    # 第二次聚合复用连接池中的 keep-alive 连接（超时断开的连接除外）
+    first_count = len(StubNewsHandler.clients)
+    first_round = {client for _, client in StubNewsHandler.clients}
+    aggregator.get_realtime_stock_news("AAPL")
+    second_round = [client for path, client in StubNewsHandler.clients[first_count:] if path != "/finnhub"]
+    assert len(second_round) == 3
+    # 第二轮 4 个并发请求、池中 3 条存活连接：至少 2 个非 FinnHub 请求走复用连接
+    assert len([client for client in second_round if client in first_round]) >= 2
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from tradingagents.dataflows.providers.china.spot_snapshot import SpotSnapshotService, normalize_spot_code
+
+
+def _spot_df(price=10.0):
+    return pd.DataFrame({
+        "代码": ["000001", "sh600000", "bj830799"],
+        "名称": ["平安银行", "浦发银行", "艾融软件"],
+        "最新价": [price, price + 1, price + 2],
+    })
+
+
+def test_normalize_spot_code():
+    assert normalize_spot_code("sz000001") == "000001"
+    assert normalize_spot_code(1) == "000001"
+    assert normalize_spot_code("600000") == "600000"
+    assert normalize_spot_code("") is None
+
+
+def test_snapshot_lookup_and_max_age():
+    calls = []
+
+    def _fetch(source):
+        calls.append(source)
+        return _spot_df(price=10.0 + len(calls))
+
+    svc = SpotSnapshotService(fetcher=_fetch, max_age_seconds=60)
+    snap = svc.get_snapshot_sync("eastmoney")
+    assert snap.get_row("600000")["名称"] == "浦发银行"
+    assert snap.get_row("830799")["最新价"] == 13.0
+    assert snap.get_row("999999") is None
+    assert set(snap.get_rows(["000001", "999999"])) == {"000001"}
+
+    # 有效期内不重复拉取
+    for _ in range(5):
+        svc.get_snapshot_sync("eastmoney")
+    assert calls == ["eastmoney"]
+
+    # 调用方可以要求更新的快照
+    assert svc.get_snapshot_sync("eastmoney", max_age=0).get_row("000001")["最新价"] == 12.0
+    assert calls == ["eastmoney", "eastmoney"]
+
+
+def test_concurrent_async_callers_share_one_fetch():
+    calls = []
+
+    def _slow_fetch(source):
+        calls.append(source)
+        time.sleep(0.1)
+        return _spot_df()
+
+    svc = SpotSnapshotService(fetcher=_slow_fetch, max_age_seconds=60)
+
+    async def _run():
+        snaps = await asyncio.gather(*[svc.get_snapshot("eastmoney") for _ in range(20)])
+        assert len({id(s) for s in snaps}) == 1
+
+    asyncio.run(_run())
+    assert calls == ["eastmoney"]
+
+
+def test_concurrent_threads_share_one_fetch():
+    calls = []
+
+    def _slow_fetch(source):
+        calls.append(source)
+        time.sleep(0.1)
+        return _spot_df()
+
+    svc = SpotSnapshotService(fetcher=_slow_fetch, max_age_seconds=60)
+    threads = [threading.Thread(target=svc.get_snapshot_sync, args=("sina",)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == ["sina"]
+    assert svc.stats["shared_waits"] == 7
+
+
+def test_failed_refresh_serves_recent_snapshot_then_raises():
+    state = {"fail": False}
+
+    def _fetch(source):
+        if state["fail"]:
+            raise ConnectionError("upstream down")
+        return _spot_df()
+
+    svc = SpotSnapshotService(fetcher=_fetch, max_age_seconds=0.05)
+    first = svc.get_snapshot_sync("eastmoney")
+    state["fail"] = True
+    time.sleep(0.06)
+    assert svc.get_snapshot_sync("eastmoney") is first
+
+    time.sleep(0.15)
+    with pytest.raises(ConnectionError):
+        svc.get_snapshot_sync("eastmoney")
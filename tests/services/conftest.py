@@ -0,0 +1,269 @@
+import copy
+from collections import defaultdict
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+
+_MISSING = object()
+
+
+def _get(doc, key):
+    cur = doc
+    for part in key.split("."):
+        if not isinstance(cur, dict) or part not in cur:
+            return _MISSING
+        cur = cur[part]
+    return cur
+
+
+def _sort_key(value):
+    # 缺失字段与 None 排在一起（MongoDB 中 null 小于其他值），避免与其他类型比较
+    if value is _MISSING or value is None:
+        return (0, "")
+    return (1, value)
+
+
+def _match_value(value, cond):
+    if isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+        for op, arg in cond.items():
+            if op == "$exists":
+                if (value is not _MISSING) != bool(arg):
+                    return False
+                continue
+            if value is _MISSING:
+                if op == "$ne":
+                    continue
+                if op == "$in":
+                    return False
+                return False
+            if op == "$gte" and not value >= arg:
+                return False
+            if op == "$gt" and not value > arg:
+                return False
+            if op == "$lte" and not value <= arg:
+                return False
+            if op == "$lt" and not value < arg:
+                return False
+            if op == "$ne" and value == arg:
+                return False
+            if op == "$in" and value not in arg:
+                return False
+            if op == "$all" and not (isinstance(value, list) and all(a in value for a in arg)):
+                return False
+            if op == "$type" and arg == "date" and not isinstance(value, datetime):
+                return False
+        return True
+    if value is _MISSING:
+        return cond is None
+    return value == cond
+
+
+def match(doc, flt):
+    for key, cond in (flt or {}).items():
+        if key == "$or":
+            if not any(match(doc, sub) for sub in cond):
+                return False
+            continue
+        if key == "$and":
+            if not all(match(doc, sub) for sub in cond):
+                return False
+            continue
+        if not _match_value(_get(doc, key), cond):
+            return False
+    return True
+
+
+def _apply_update(doc, update):
+    for op, fields in update.items():
+        for key, val in fields.items():
+            if op == "$set":
+                doc[key] = val
+            elif op == "$inc":
+                doc[key] = doc.get(key, 0) + val
+            elif op == "$min":
+                if key not in doc or val < doc[key]:
+                    doc[key] = val
+            elif op == "$unset":
+                doc.pop(key, None)
+            elif op == "$setOnInsert":
+                pass
+
+
+class FakeCollection:
+    """只实现被测代码用到的 Motor 集合接口"""
+
+    def __init__(self):
+        self.docs = []
+        self.insert_calls = 0
+
+    # ---- 写入 ----
+    async def insert_one(self, doc):
+        doc.setdefault("_id", ObjectId())
+        self.docs.append(copy.deepcopy(doc))
+
+    async def insert_many(self, docs, ordered=False):
+        self.insert_calls += 1
+        existing = {d.get("_id") for d in self.docs}
+        write_errors = []
+        for i, doc in enumerate(docs):
+            doc.setdefault("_id", ObjectId())
+            if doc["_id"] in existing:
+                write_errors.append({"index": i, "code": 11000, "errmsg": "E11000 duplicate key"})
+                continue
+            existing.add(doc["_id"])
+            self.docs.append(copy.deepcopy(doc))
+        if write_errors:
+            raise BulkWriteError({"writeErrors": write_errors})
+
+    def _upsert_one(self, flt, update, upsert):
+        for doc in self.docs:
+            if match(doc, flt):
+                _apply_update(doc, update)
+                return doc
+        if not upsert:
+            return None
+        if "_id" in flt and not isinstance(flt["_id"], dict):
+            if any(d.get("_id") == flt["_id"] for d in self.docs):
+                raise DuplicateKeyError("E11000 duplicate key")
+        new_doc = {k: v for k, v in flt.items() if not k.startswith("$") and not isinstance(v, dict)}
+        new_doc.setdefault("_id", ObjectId())
+        _apply_update(new_doc, {k: v for k, v in update.items() if k != "$unset"})
+        for field, val in update.get("$setOnInsert", {}).items():
+            new_doc[field] = val
+        self.docs.append(new_doc)
+        return new_doc
+
+    async def update_one(self, flt, update, upsert=False):
+        self._upsert_one(flt, update, upsert)
+
+    async def bulk_write(self, ops, ordered=False):
+        result = SimpleNamespace(upserted_count=0, modified_count=0)
+        for op in ops:
+            if any(k.startswith("$") for k in op._doc):
+                self._upsert_one(op._filter, op._doc, op._upsert)
+                continue
+            # ReplaceOne：整篇替换
+            for i, doc in enumerate(self.docs):
+                if match(doc, op._filter):
+                    self.docs[i] = {"_id": doc["_id"], **copy.deepcopy(op._doc)}
+                    result.modified_count += 1
+                    break
+            else:
+                if op._upsert:
+                    self.docs.append({"_id": ObjectId(), **copy.deepcopy(op._doc)})
+                    result.upserted_count += 1
+        return result
+
+    async def find_one_and_update(self, flt, update, upsert=False, return_document=None):
+        doc = self._upsert_one(flt, update, upsert)
+        return copy.deepcopy(doc) if doc is not None else None
+
+    async def delete_many(self, flt):
+        before = len(self.docs)
+        self.docs = [d for d in self.docs if not match(d, flt)]
+
+        class _Result:
+            deleted_count = before - len(self.docs)
+
+        return _Result()
+
+    async def delete_one(self, flt):
+        for i, d in enumerate(self.docs):
+            if match(d, flt):
+                del self.docs[i]
+                break
+
+    # ---- 读取 ----
+    def find(self, flt=None, projection=None):
+        return _FakeCursor([copy.deepcopy(d) for d in self.docs if match(d, flt)])
+
+    async def find_one(self, flt=None, projection=None, sort=None):
+        docs = [d for d in self.docs if match(d, flt)]
+        for key, order in reversed(sort or []):
+            docs.sort(key=lambda d: _sort_key(_get(d, key)), reverse=order == -1)
+        return copy.deepcopy(docs[0]) if docs else None
+
+    async def estimated_document_count(self):
+        return len(self.docs)
+
+    async def count_documents(self, flt, limit=None):
+        count = sum(1 for d in self.docs if match(d, flt))
+        return count if limit is None else min(count, limit)
+
+    def aggregate(self, pipeline):
+        docs = [d for d in self.docs if match(d, pipeline[0].get("$match", {}))]
+        group = pipeline[1]["$group"]["_id"]
+        counts = defaultdict(int)
+        for d in docs:
+            ts = d["timestamp"]
+            key = (ts.year, ts.month, ts.day, ts.hour, d.get(group["action_type"][1:]), d.get(group["success"][1:]))
+            counts[key] += 1
+        results = [
+            {"_id": {"year": y, "month": m, "day": dd, "hour": h, "action_type": a, "success": s}, "count": c}
+            for (y, m, dd, h, a, s), c in counts.items()
+        ]
+        return _FakeCursor(results)
+
+    async def create_index(self, *args, **kwargs):
+        return "ok"
+
+
+class _FakeCursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    def skip(self, n):
+        self._docs = self._docs[n:]
+        return self
+
+    def limit(self, n):
+        self._docs = self._docs[:n]
+        return self
+
+    async def to_list(self, length=None):
+        return list(self._docs if length is None else self._docs[:length])
+
+    def __aiter__(self):
+        self._iter = iter(self._docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeDB:
+    def __init__(self):
+        self.colls = {}
+
+    def __getitem__(self, name: str):
+        return self.colls.setdefault(name, FakeCollection())
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+
+@pytest.fixture
+def fake_mongo(monkeypatch):
+    """内存版 MongoDB，替换操作日志相关模块中的 get_mongo_db"""
+    import app.services.operation_log_buffer as buf_mod
+    import app.services.operation_log_service as svc_mod
+
+    db = FakeDB()
+    monkeypatch.setattr(buf_mod, "get_mongo_db", lambda: db, raising=True)
+    monkeypatch.setattr(svc_mod, "get_mongo_db", lambda: db, raising=True)
+    return db
@@ -0,0 +1,157 @@
+import os
+import zipfile
+
+from app.services import log_reader
+from app.services.log_export_service import LogExportService
+from app.services.log_reader import LogIndex, read_lines_forward, tail_lines
+
+
+def _write_log(path, n, start=0):
+    levels = ["INFO", "DEBUG", "WARNING", "ERROR"]
+    with open(path, "a", encoding="utf-8") as f:
+        for i in range(start, start + n):
+            f.write(f"2024-01-01 00:00:{i % 60:02d} | {levels[i % 4]:<7} | app | line {i}\n")
+
+
+def test_tail_pages_backward_and_forward(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_reader, "CHUNK_SIZE", 97)  # 强制行跨越读取块
+    path = tmp_path / "app.log"
+    _write_log(path, 1000)
+    expected = path.read_text(encoding="utf-8").splitlines()
+
+    page = tail_lines(path, 10)
+    assert page["lines"] == expected[-10:]
+    assert page["end"] == path.stat().st_size
+
+    collected = list(page["lines"])
+    while page["has_more_before"]:
+        page = tail_lines(path, 37, before=page["start"])
+        collected[:0] = page["lines"]
+    assert collected == expected
+
+    first = tail_lines(path, 1, before=len(expected[0]) + 1)
+    assert first["lines"] == expected[:1]
+
+    forward = read_lines_forward(path, 0, 5)
+    assert forward["lines"] == expected[:5]
+    nxt = read_lines_forward(path, forward["end"], 5)
+    assert nxt["lines"] == expected[5:10]
+
+
+def test_partial_trailing_line_is_resumed(tmp_path):
+    path = tmp_path / "app.log"
+    _write_log(path, 3)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("2024-01-01 00:00:03 | ERROR   | app | half")
+
+    page = tail_lines(path, 10)
+    assert page["lines"][-1].endswith("half")
+    assert read_lines_forward(path, page["end"], 10)["lines"] == []
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(" written\n")
+    page = read_lines_forward(path, page["end"], 10)
+    assert page["lines"] == ["2024-01-01 00:00:03 | ERROR   | app | half written"]
+    assert not page["has_more_after"]
+
+
+def test_filtered_tail_stops_at_scan_limit(tmp_path):
+    path = tmp_path / "app.log"
+    _write_log(path, 2000)
+    page = tail_lines(path, 10, predicate=lambda line: "nothing" in line, scan_limit=4096)
+    assert page["lines"] == []
+    assert page["has_more_before"]
+    assert path.stat().st_size - page["start"] <= 4096
+
+
+def test_index_updates_incrementally_and_resets_on_rotation(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_reader, "CHECKPOINT_BYTES", 1024)
+    path = tmp_path / "app.log"
+    _write_log(path, 400)
+    index = LogIndex(tmp_path / ".index")
+
+    entry = index.refresh(path, max_bytes=4096)
+    assert not entry["complete"] and 0 < entry["lines"] < 400
+    entry = index.refresh(path)
+    assert entry["complete"]
+    assert entry["lines"] == 400
+    assert entry["levels"] == {"ERROR": 100, "WARNING": 100, "INFO": 100, "DEBUG": 100}
+
+    _write_log(path, 40, start=400)
+    entry = index.refresh(path)
+    assert entry["lines"] == 440 and entry["levels"]["ERROR"] == 110
+
+    lines = path.read_bytes().splitlines(keepends=True)
+    for n in (0, 1, 123, 439):
+        assert index.line_offset(path, n) == sum(len(line) for line in lines[:n])
+    assert index.line_offset(path, 440) == -1
+
+    # 新实例从 sidecar 文件恢复索引
+    assert LogIndex(tmp_path / ".index").refresh(path)["lines"] == 440
+
+    os.replace(path, tmp_path / "app.log.1")
+    _write_log(path, 5, start=1000)
+    entry = index.refresh(path)
+    assert entry["lines"] == 5 and entry["levels"]["INFO"] == 2
+
+
+def test_index_detects_same_size_replacement(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"2024 INFO a\n")
+    index = LogIndex(tmp_path / ".index")
+    assert index.refresh(path)["levels"]["INFO"] == 1
+
+    with open(path, "r+b") as f:
+        f.write(b"2024 WARN")
+    with open(path, "ab") as f:
+        f.write(b"2024 ERROR b\n")
+    entry = index.refresh(path)
+    assert entry["levels"]["INFO"] == 0 and entry["levels"]["ERROR"] == 1
+
+
+def test_service_read_returns_cursor_and_file_stats(tmp_path):
+    _write_log(tmp_path / "tradingagents.log", 200)
+    service = LogExportService(str(tmp_path))
+
+    result = service.read_log_file("tradingagents.log", lines=20, level="ERROR")
+    assert len(result["lines"]) == 20
+    assert all("ERROR" in line for line in result["lines"])
+    stats = result["stats"]
+    assert stats["total_lines"] == 200 and not stats["total_lines_approximate"]
+    assert stats["filtered_lines"] == 20
+    assert stats["error_count"] == 20 and stats["scanned_lines"] == 77
+    assert stats["file_levels"]["ERROR"] == 50
+
+    older = service.read_log_file("tradingagents.log", lines=50, level="ERROR",
+                                  before=result["cursor"]["before"])
+    assert len(older["lines"]) == 30
+    assert not older["cursor"]["has_more_before"]
+
+    _write_log(tmp_path / "tradingagents.log", 3, start=200)
+    newer = service.read_log_file("tradingagents.log", lines=50, after=result["cursor"]["after"])
+    assert [line.rsplit(" ", 1)[1] for line in newer["lines"]] == ["200", "201", "202"]
+
+    # 索引目录不会出现在日志文件列表中
+    assert [f["name"] for f in service.list_log_files()] == ["tradingagents.log"]
+
+
+def test_filtered_export_streams_matching_lines(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write_log(tmp_path / "tradingagents.log", 100)
+    _write_log(tmp_path / "error.log", 8)
+    service = LogExportService(str(tmp_path))
+
+    zip_path = service.export_logs(level="WARNING", format="zip")
+    with zipfile.ZipFile(zip_path) as zf:
+        content = zf.read("tradingagents.log").decode("utf-8").splitlines()
+    assert len(content) == 25 and all("WARNING" in line for line in content)
+
+    txt_path = service.export_logs(filenames=["error.log"], format="txt")
+    with open(txt_path, encoding="utf-8") as f:
+        assert f.read().count("line ") == 8
+
+    stats = service.get_log_statistics()
+    assert stats["level_counts"]["ERROR"] == 27
+    assert stats["recent_errors"] == [
+        line for line in (tmp_path / "error.log").read_text().splitlines() if "ERROR" in line
+    ]
@@ -0,0 +1,109 @@
+import asyncio
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = docs
+        self.limit_value = None
+
+    def sort(self, key, direction=1):
+        self._docs = sorted(self._docs, key=lambda d: d[key], reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self.limit_value = n
+        self._docs = self._docs[:n]
+        return self
+
+    async def to_list(self, length=None):
+        return list(self._docs)
+
+
+class _Collection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.queries = []
+        self.cursors = []
+
+    def find(self, flt, projection=None):
+        self.queries.append((flt, projection))
+        rows = []
+        for d in self.docs:
+            if d.get("symbol", d.get("code")) not in (flt.get("symbol"), flt.get("code")):
+                continue
+            src_field = "data_source" if "data_source" in flt else "source"
+            if d.get(src_field) not in flt[src_field]["$in"]:
+                continue
+            td = flt.get("trade_date", {})
+            if "$lte" in td and d["trade_date"] > td["$lte"]:
+                continue
+            rows.append(dict(d))
+        cursor = _Cursor(rows)
+        self.cursors.append(cursor)
+        return cursor
+
+    async def find_one(self, flt, projection=None):
+        for d in self.docs:
+            if d.get("code") == flt.get("code"):
+                return dict(d)
+        return None
+
+
+def _bar(day, source, close):
+    return {"symbol": "000001", "period": "daily", "trade_date": f"2025-01-{day:02d}",
+            "data_source": source, "open": close, "high": close, "low": close, "close": close, "vol": 100}
+
+
+def test_get_bars_pushes_limit_and_picks_best_source_per_day():
+    from app.services.market_data_repository import MarketDataRepository
+
+    quotes = _Collection([
+        _bar(2, "akshare", 1.0), _bar(3, "akshare", 2.0), _bar(3, "tushare", 2.1),
+        _bar(6, "tushare", 3.0), _bar(7, "akshare", 4.0), _bar(8, "tushare", 5.0),
+    ])
+    repo = MarketDataRepository(db={"stock_daily_quotes": quotes})
+
+    bars = asyncio.run(repo.get_bars("1", limit=3, end_date="2025-01-07",
+                                     source_priority=["tushare", "akshare"]))
+
+    flt, projection = quotes.queries[0]
+    assert flt["data_source"] == {"$in": ["tushare", "akshare"]}
+    assert projection["_id"] == 0
+    assert quotes.cursors[0].limit_value == 6
+    assert [(b["trade_date"], b["data_source"]) for b in bars] == [
+        ("2025-01-03", "tushare"), ("2025-01-06", "tushare"), ("2025-01-07", "akshare"),
+    ]
+
+
+def test_bars_to_items_matches_previous_row_format():
+    from app.services.market_data_repository import bars_to_items
+
+    items = bars_to_items([
+        {"trade_date": "2025-01-02", "open": "1.5", "high": 2, "low": 1, "close": 1.8, "vol": 300},
+        {"trade_date": "2025-01-03", "open": 1.8, "high": 2, "low": 1, "close": None, "volume": 500},
+    ])
+    assert items == [
+        {"time": "2025-01-02", "open": 1.5, "high": 2.0, "low": 1.0, "close": 1.8, "volume": 300.0, "amount": None},
+        {"time": "2025-01-03", "open": 1.8, "high": 2.0, "low": 1.0, "close": 0.0, "volume": 500.0, "amount": None},
+    ]
+    assert bars_to_items([]) == []
+
+
+def test_get_basic_info_single_query_with_legacy_fallback():
+    from app.services.market_data_repository import MarketDataRepository
+
+    basics = _Collection([
+        {"code": "000001", "source": "akshare", "name": "平安银行A"},
+        {"code": "000001", "source": "tushare", "name": "平安银行T"},
+        {"code": "000002", "name": "万科A"},
+    ])
+    repo = MarketDataRepository(db={"stock_basic_info": basics})
+
+    async def _run():
+        info = await repo.get_basic_info("000001", source_priority=["tushare", "akshare"])
+        assert info["name"] == "平安银行T"
+        assert len(basics.queries) == 1
+        legacy = await repo.get_basic_info("000002", source_priority=["tushare", "akshare"])
+        assert legacy["name"] == "万科A"
+
+    asyncio.run(_run())
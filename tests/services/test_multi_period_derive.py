@@ -0,0 +1,147 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import tradingagents.dataflows.trading_calendar as cal_mod
+from app.services.historical_data_service import HistoricalDataService
+from app.worker.multi_period_sync_service import MultiPeriodSyncService
+from tradingagents.dataflows.bar_resampler import resample_bars
+from tradingagents.dataflows.trading_calendar import TradingCalendar
+
+# 2024-05~07 工作日日历，去掉劳动节和端午节
+CALENDAR = TradingCalendar("CN", [d for d in TradingCalendar.weekdays("CN", "2024-05-01", "2024-07-31").days
+                                  if str(d) not in {"2024-05-01", "2024-05-02", "2024-05-03", "2024-06-10"}])
+
+
+class _StubProvider:
+    def __init__(self):
+        self.calls = []
+
+    async def get_historical_data(self, symbol, start_date, end_date, period):
+        self.calls.append((symbol, period))
+        # Tushare 周线：成交量单位为手，成交额单位为千元
+        return pd.DataFrame({"trade_date": ["20240524", "20240531"], "open": [8.0, 8.2], "high": [8.5, 8.6],
+                             "low": [7.9, 8.0], "close": [8.2, 8.4], "pre_close": [8.0, 8.2],
+                             "vol": [1000.0, 1200.0], "amount": [820.0, 1000.0]})
+
+
+def _daily_docs(symbol, start, end, seed, scale=1.0):
+    days = CALENDAR.sessions(start, end)
+    rng = np.random.default_rng(seed)
+    close = np.round(10 * np.cumprod(1 + rng.normal(0, 0.02, len(days))), 2)
+    return [
+        {"symbol": symbol, "trade_date": str(day), "period": "daily", "data_source": "tushare",
+         "open": c * scale, "high": (c + 0.1) * scale, "low": (c - 0.1) * scale, "close": c * scale,
+         "pre_close": (close[i - 1] if i else 10.0) * scale, "volume": 100000.0 + i, "amount": 1e6 + i}
+        for i, (day, c) in enumerate(zip(days, close))
+    ]
+
+
+@pytest.fixture
+def sync(fake_mongo, monkeypatch):
+    monkeypatch.setattr(cal_mod, "get_trading_calendar", lambda market="CN": CALENDAR)
+    historical = HistoricalDataService()
+    historical.collection = fake_mongo.stock_daily_quotes
+    service = MultiPeriodSyncService()
+    service.historical_service = historical
+    service.tushare_service = SimpleNamespace(provider=_StubProvider())
+    return service
+
+
+def _stored(collection, symbol, period="weekly"):
+    docs = [d for d in collection.docs if d["symbol"] == symbol and d["period"] == period]
+    return pd.DataFrame(docs).sort_values("trade_date").reset_index(drop=True)
+
+
+def _daily_frame(collection, symbol):
+    return pd.DataFrame([d for d in collection.docs if d["symbol"] == symbol and d["period"] == "daily"])
+
+
+def _run(sync, end_date, periods=("weekly",), symbols=("000001", "600519", "300750")):
+    return asyncio.run(sync.sync_multi_period_data(symbols=list(symbols), periods=list(periods),
+                                                   data_sources=["tushare"], end_date=end_date,
+                                                   derive_from_daily=True))
+
+
+def _assert_matches_daily(collection, symbol, period="weekly"):
+    expected = resample_bars(_daily_frame(collection, symbol), period, calendar=CALENDAR)
+    stored = _stored(collection, symbol, period)
+    assert stored["trade_date"].tolist() == expected["trade_date"].tolist()
+    for column in ("open", "high", "low", "close", "pre_close", "volume", "amount"):
+        assert np.allclose(stored[column], expected[column]), column
+    return stored
+
+
+def test_period_bars_are_derived_from_stored_daily(sync, fake_mongo):
+    coll = fake_mongo.stock_daily_quotes
+    coll.docs.extend(_daily_docs("000001", "2024-05-06", "2024-06-28", seed=1))
+    coll.docs.extend(_daily_docs("600519", "2024-05-20", "2024-06-28", seed=2))
+
+    stats = _run(sync, "2024-06-28", periods=("weekly", "monthly"))
+
+    # 300750 库中没有日线：只有它向数据源请求，且按 Tushare 单位换算
+    assert sync.tushare_service.provider.calls == [("300750", "weekly"), ("300750", "monthly")]
+    assert _stored(coll, "300750")["volume"].tolist() == [100000.0, 120000.0]
+    assert stats.derived_symbols == 4 and stats.error_count == 0
+
+    for symbol in ("000001", "600519"):
+        weekly = _assert_matches_daily(coll, symbol)
+        # 派生自库中日线（已是股/元），不能再次乘以 100/1000
+        daily = _daily_frame(coll, symbol)
+        assert weekly["volume"].sum() == pytest.approx(daily["volume"].sum())
+        _assert_matches_daily(coll, symbol, "monthly")
+    assert _stored(coll, "000001", "monthly")["trade_date"].tolist() == ["2024-05-31", "2024-06-28"]
+
+
+def test_incremental_run_replaces_unfinished_bar(sync, fake_mongo):
+    coll = fake_mongo.stock_daily_quotes
+    docs = _daily_docs("000001", "2024-05-06", "2024-07-10", seed=3)
+    coll.docs.extend(d for d in docs if d["trade_date"] <= "2024-06-26")
+    _run(sync, "2024-06-26", symbols=["000001"])
+    assert _stored(coll, "000001")["trade_date"].iloc[-1] == "2024-06-26"
+    early = {d["trade_date"]: d["updated_at"] for d in coll.docs if d["period"] == "weekly"}
+
+    # 新日线到达：06-26 的未完成周线被 06-28 的完整周线替换，并补上新的一周
+    coll.docs.extend(d for d in docs if d["trade_date"] > "2024-06-26")
+    _run(sync, "2024-07-10", symbols=["000001"])
+
+    stored = _assert_matches_daily(coll, "000001")
+    assert "2024-06-26" not in stored["trade_date"].tolist()
+    assert stored["trade_date"].tolist()[-3:] == ["2024-06-28", "2024-07-05", "2024-07-10"]
+    # 更早的周线没有被重写
+    rewritten = [d["trade_date"] for d in coll.docs
+                 if d["period"] == "weekly" and early.get(d["trade_date"]) != d["updated_at"]]
+    assert sorted(rewritten) == ["2024-06-28", "2024-07-05", "2024-07-10"]
+    assert sync.tushare_service.provider.calls == []
+
+
+def test_adjustment_rebase_rebuilds_symbol(sync, fake_mongo):
+    coll = fake_mongo.stock_daily_quotes
+    coll.docs.extend(_daily_docs("000001", "2024-05-06", "2024-06-28", seed=4))
+    _run(sync, "2024-06-28", symbols=["000001"])
+    before = _stored(coll, "000001")
+
+    # 除权后前复权日线整体重算（这里按 0.8 缩放），已派生的周线需要全部更新
+    coll.docs[:] = [d for d in coll.docs if d["period"] != "daily"]
+    coll.docs.extend(_daily_docs("000001", "2024-05-06", "2024-07-05", seed=4, scale=0.8))
+    _run(sync, "2024-07-05", symbols=["000001"])
+
+    after = _assert_matches_daily(coll, "000001")
+    assert np.allclose(after["close"].iloc[:len(before)], before["close"] * 0.8)
+    assert np.allclose(after["pct_chg"].iloc[1:len(before)], before["pct_chg"].iloc[1:])
+
+
+
+def test_symbols_with_bars_but_no_daily_are_not_requested_again(sync, fake_mongo):
+    coll = fake_mongo.stock_daily_quotes
+    _run(sync, "2024-05-31", symbols=["300750"])
+    assert sync.tushare_service.provider.calls == [("300750", "weekly")]
+    before = _stored(coll, "300750")
+
+    # 已有周线、库中仍没有日线（如长期停牌）：后续同步跳过，不再逐只请求数据源
+    stats = _run(sync, "2024-07-10", symbols=["300750"])
+    assert sync.tushare_service.provider.calls == [("300750", "weekly")] and stats.error_count == 0
+    pd.testing.assert_frame_equal(_stored(coll, "300750"), before)
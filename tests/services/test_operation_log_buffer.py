@@ -0,0 +1,188 @@
+import asyncio
+import os
+from datetime import datetime
+
+from pymongo.errors import BulkWriteError
+
+
+def _doc(i, action_type="stock_analysis", success=True, hour=10):
+    ts = datetime(2025, 1, 2, hour, i % 60, 0)
+    return {"action_type": action_type, "success": success, "timestamp": ts, "created_at": ts, "n": i}
+
+
+def _counts(fake_mongo):
+    return {
+        (d["hour"].hour, d["action_type"], d["success"]): d.get("count", 0)
+        for d in fake_mongo["operation_log_hourly_stats"].docs
+        if "hour" in d
+    }
+
+
+def test_buffer_batches_inserts_and_flushes_on_stop(fake_mongo):
+    from app.services.operation_log_buffer import OperationLogBuffer
+
+    async def _run():
+        buf = OperationLogBuffer(batch_size=10, flush_interval_ms=10_000)
+        await buf.start()
+        for i in range(25):
+            assert buf.submit(_doc(i)) is True
+        # 达到 batch 阈值时立即唤醒刷写
+        await asyncio.sleep(0.05)
+        assert fake_mongo["operation_logs"].insert_calls >= 2
+        await buf.stop()
+
+        logs = fake_mongo["operation_logs"]
+        assert [d["n"] for d in logs.docs] == list(range(25))
+        assert buf.get_metrics()["written"] == 25
+        assert buf.get_metrics()["pending"] == 0
+
+    asyncio.run(_run())
+
+
+def test_buffer_aggregates_hourly_counters(fake_mongo):
+    from app.services.operation_log_buffer import OperationLogBuffer
+
+    async def _run():
+        buf = OperationLogBuffer(batch_size=100, flush_interval_ms=10)
+        await buf.start()
+        for i in range(3):
+            buf.submit(_doc(i, hour=9))
+        buf.submit(_doc(3, hour=9, success=False))
+        buf.submit(_doc(4, action_type="screening", hour=14))
+        await buf.stop()
+
+        assert _counts(fake_mongo) == {
+            (9, "stock_analysis", True): 3,
+            (9, "stock_analysis", False): 1,
+            (14, "screening", True): 1,
+        }
+
+    asyncio.run(_run())
+
+
+def test_partial_bulk_write_error_only_retries_failed_docs(fake_mongo):
+    from app.services.operation_log_buffer import OperationLogBuffer
+
+    logs = fake_mongo["operation_logs"]
+    original_insert_many = logs.insert_many
+    calls = []
+
+    async def _flaky_insert_many(docs, ordered=False):
+        calls.append([d["n"] for d in docs])
+        if len(calls) == 1:
+            # 第0条写入成功，第1条主键重复（之前已写入），第2条瞬时失败
+            await original_insert_many([docs[0]])
+            raise BulkWriteError({
+                "writeErrors": [
+                    {"index": 1, "code": 11000, "errmsg": "E11000 duplicate key"},
+                    {"index": 2, "code": 91, "errmsg": "shutdown in progress"},
+                ]
+            })
+        await original_insert_many(docs)
+
+    logs.insert_many = _flaky_insert_many
+
+    async def _run():
+        buf = OperationLogBuffer(batch_size=100, flush_interval_ms=10_000)
+        await buf._flush([_doc(0), _doc(1), _doc(2)])
+
+        assert calls == [[0, 1, 2], [2]]
+        assert [d["n"] for d in logs.docs] == [0, 2]
+        assert buf.get_metrics()["written"] == 2
+        assert buf.get_metrics()["dropped"] == 0
+        # 重复的那条不重复计入统计
+        assert _counts(fake_mongo) == {(10, "stock_analysis", True): 2}
+
+    asyncio.run(_run())
+
+
+def test_failed_docs_dropped_after_one_retry(fake_mongo):
+    from app.services.operation_log_buffer import OperationLogBuffer
+
+    attempts = []
+
+    async def _down(docs, ordered=False):
+        attempts.append(len(docs))
+        raise ConnectionError("mongo down")
+
+    fake_mongo["operation_logs"].insert_many = _down
+
+    async def _run():
+        buf = OperationLogBuffer(overflow_policy="drop_newest")
+        await buf._flush([_doc(0), _doc(1)])
+        assert attempts == [2, 2]
+        assert buf.get_metrics()["dropped"] == 2
+        assert _counts(fake_mongo) == {}
+
+    asyncio.run(_run())
+
+
+def test_buffer_overflow_policies(fake_mongo, tmp_path):
+    from app.services.operation_log_buffer import OperationLogBuffer
+
+    oldest = OperationLogBuffer(max_size=3, overflow_policy="drop_oldest")
+    for i in range(5):
+        oldest.submit(_doc(i))
+    assert [d["n"] for d in oldest._queue] == [2, 3, 4]
+    assert oldest.get_metrics()["dropped"] == 2
+
+    newest = OperationLogBuffer(max_size=3, overflow_policy="drop_newest")
+    results = [newest.submit(_doc(i)) for i in range(5)]
+    assert results == [True, True, True, False, False]
+    assert [d["n"] for d in newest._queue] == [0, 1, 2]
+
+
+def test_spill_is_written_by_flusher_not_on_submit(fake_mongo, tmp_path):
+    from app.services.operation_log_buffer import OperationLogBuffer
+
+    base = tmp_path / "spill.ndjson"
+
+    async def _run():
+        buf = OperationLogBuffer(max_size=2, overflow_policy="spill", spill_path=str(base), flush_interval_ms=10_000)
+        # 溢出文件按进程区分
+        assert buf.spill_path == str(tmp_path / f"spill.{os.getpid()}.ndjson")
+
+        for i in range(4):
+            buf.submit(_doc(i))
+        # 请求路径上不做磁盘 IO
+        assert not os.path.exists(buf.spill_path)
+        assert buf.get_metrics()["spill_pending"] == 2
+
+        await buf._write_spill_pending()
+        with open(buf.spill_path, encoding="utf-8") as f:
+            assert len(f.read().splitlines()) == 2
+        assert buf.get_metrics()["spilled"] == 2
+
+    asyncio.run(_run())
+
+
+def test_spill_files_and_leftover_replay_picked_up_on_start(fake_mongo, tmp_path):
+    from app.services.operation_log_buffer import OperationLogBuffer
+
+    base = tmp_path / "spill.ndjson"
+
+    async def _run():
+        first = OperationLogBuffer(max_size=1, overflow_policy="spill", spill_path=str(base))
+        first.submit(_doc(0))
+        first.submit(_doc(1))  # 溢出
+        await first._write_spill_pending()
+
+        # 已退出进程遗留的、回放到一半的 .replay 文件（其中第一条已入库）
+        dead_pid = 999999
+        leftover = tmp_path / f"spill.{dead_pid}.ndjson.replay"
+        half = OperationLogBuffer(overflow_policy="spill", spill_path=str(tmp_path / "other.ndjson"))
+        docs = [_doc(7), _doc(8)]
+        half._defer_spill(docs)
+        half._append_spill_file(str(leftover), list(half._spill_pending))
+        await fake_mongo["operation_logs"].insert_one(dict(docs[0]))
+
+        second = OperationLogBuffer(overflow_policy="spill", spill_path=str(base))
+        await second.start()
+        await second.stop()
+
+        inserted = fake_mongo["operation_logs"].docs
+        assert sorted(d["n"] for d in inserted) == [1, 7, 8]
+        assert isinstance(inserted[0]["timestamp"], datetime)
+        assert not any(p.name.startswith("spill.") for p in tmp_path.iterdir())
+
+    asyncio.run(_run())
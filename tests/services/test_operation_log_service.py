@@ -0,0 +1,186 @@
+import asyncio
+from datetime import timedelta
+
+from app.utils.timezone import now_tz
+
+
+def _local_now():
+    return now_tz().replace(tzinfo=None)
+
+
+def _log(ts, action_type="stock_analysis", success=True):
+    return {"user_id": "admin", "username": "admin", "action": "x", "action_type": action_type,
+            "success": success, "timestamp": ts, "created_at": ts}
+
+
+def _stats_docs(fake_mongo):
+    return [d for d in fake_mongo["operation_log_hourly_stats"].docs if "hour" in d]
+
+
+def test_create_log_writes_directly_when_buffer_not_running(fake_mongo):
+    from app.models.operation_log import OperationLogCreate
+    from app.services.operation_log_service import OperationLogService
+
+    async def _run():
+        svc = OperationLogService()
+        log_id = await svc.create_log("admin", "admin", OperationLogCreate(action_type="screening", action="筛选"))
+
+        logs = fake_mongo["operation_logs"].docs
+        assert [str(d["_id"]) for d in logs] == [log_id]
+        stats = _stats_docs(fake_mongo)
+        assert [(d["action_type"], d["count"]) for d in stats] == [("screening", 1)]
+
+    asyncio.run(_run())
+
+
+def test_create_log_enqueues_when_buffer_running(fake_mongo, monkeypatch):
+    from app.models.operation_log import OperationLogCreate
+    import app.services.operation_log_service as svc_mod
+
+    submitted = []
+
+    class _RunningBuffer:
+        running = True
+
+        def submit(self, doc):
+            submitted.append(doc)
+            return True
+
+    monkeypatch.setattr(svc_mod, "get_operation_log_buffer", lambda: _RunningBuffer(), raising=True)
+
+    async def _run():
+        log_id = await svc_mod.OperationLogService().create_log(
+            "admin", "admin", OperationLogCreate(action_type="screening", action="筛选")
+        )
+        assert [str(d["_id"]) for d in submitted] == [log_id]
+        # 请求路径不碰数据库
+        assert fake_mongo["operation_logs"].docs == []
+        assert _stats_docs(fake_mongo) == []
+
+    asyncio.run(_run())
+
+
+def test_get_stats_reads_pre_aggregated_counters(fake_mongo):
+    from app.services.operation_log_buffer import record_hourly_stats
+    from app.services.operation_log_service import OperationLogService
+
+    base = _local_now().replace(hour=9, minute=30) - timedelta(days=1)
+
+    async def _run():
+        await record_hourly_stats(fake_mongo, [
+            _log(base),
+            _log(base + timedelta(minutes=5)),
+            _log(base, success=False),
+            _log(base + timedelta(hours=5), action_type="screening"),
+            _log(base - timedelta(days=60)),  # 超出统计窗口
+        ])
+        # 统计不应扫描原始日志
+        fake_mongo["operation_logs"].count_documents = None
+
+        stats = await OperationLogService().get_stats(days=30)
+        assert stats.total_logs == 4
+        assert stats.success_logs == 3
+        assert stats.failed_logs == 1
+        assert stats.action_type_distribution == {"stock_analysis": 3, "screening": 1}
+        hourly = {h["hour"]: h["count"] for h in stats.hourly_distribution}
+        assert hourly["09:00"] == 3
+        assert hourly["14:00"] == 1
+        assert sum(hourly.values()) == 4
+
+    asyncio.run(_run())
+
+
+def test_backfill_covers_pre_upgrade_logs_after_first_flush(fake_mongo):
+    from app.services.operation_log_buffer import OperationLogBuffer, backfill_hourly_stats
+    from app.services.operation_log_service import OperationLogService
+
+    now = _local_now()
+    old_ts = now - timedelta(days=2)
+    same_hour_old = now.replace(minute=0, second=0, microsecond=0)
+
+    async def _run():
+        # 升级前写入的日志：没有任何小时统计
+        fake_mongo["operation_logs"].docs.extend([_log(old_ts), _log(old_ts), _log(same_hour_old)])
+
+        # 升级后第一条日志先于任何统计请求被刷写
+        buf = OperationLogBuffer(flush_interval_ms=10_000)
+        first = _log(now + timedelta(seconds=1), action_type="screening")
+        await buf._flush([first])
+        assert _stats_docs(fake_mongo)  # 小时统计已非空
+
+        stats = await OperationLogService().get_stats(days=30)
+        assert stats.total_logs == 4
+        assert stats.action_type_distribution == {"stock_analysis": 3, "screening": 1}
+
+        # 回填只执行一次，再次启动/调用不会重复计数
+        assert await backfill_hourly_stats(fake_mongo) == 0
+        await buf.start()
+        await buf.stop()
+        stats = await OperationLogService().get_stats(days=30)
+        assert stats.total_logs == 4
+
+    asyncio.run(_run())
+
+
+def test_backfill_runs_at_buffer_start_and_retries_after_failure(fake_mongo):
+    from app.services.operation_log_buffer import HOURLY_STATS_META_ID, OperationLogBuffer
+
+    old_ts = _local_now() - timedelta(days=1)
+    logs = fake_mongo["operation_logs"]
+    logs.docs.append(_log(old_ts))
+
+    original_aggregate = logs.aggregate
+
+    def _broken_aggregate(pipeline):
+        raise RuntimeError("aggregate failed")
+
+    async def _run():
+        logs.aggregate = _broken_aggregate
+        buf = OperationLogBuffer()
+        await buf.start()
+        await buf.stop()
+        meta = await fake_mongo["operation_log_hourly_stats"].find_one({"_id": HOURLY_STATS_META_ID})
+        assert "backfill_state" not in meta  # 释放认领，等待重试
+
+        logs.aggregate = original_aggregate
+        await buf.start()
+        await buf.stop()
+        stats = _stats_docs(fake_mongo)
+        assert [d.get("backfill_count") for d in stats] == [1]
+        meta = await fake_mongo["operation_log_hourly_stats"].find_one({"_id": HOURLY_STATS_META_ID})
+        assert meta["backfill_state"] == "done"
+
+    asyncio.run(_run())
+
+
+def test_clear_logs_keeps_hourly_stats_in_sync(fake_mongo):
+    from app.services.operation_log_buffer import HOURLY_STATS_META_ID, record_hourly_stats
+    from app.services.operation_log_service import OperationLogService
+
+    now = _local_now()
+    recent = now - timedelta(hours=1)
+    old = now - timedelta(days=10)
+
+    async def _run():
+        svc = OperationLogService()
+        docs = [_log(recent), _log(old), _log(recent, action_type="screening"), _log(old, action_type="screening")]
+        fake_mongo["operation_logs"].docs.extend(docs)
+        await record_hourly_stats(fake_mongo, docs)
+
+        await svc.clear_logs(days=7)
+        stats = await svc.get_stats(days=30)
+        assert stats.total_logs == 2
+
+        await svc.clear_logs(action_type="screening")
+        stats = await svc.get_stats(days=30)
+        assert stats.total_logs == 1
+        assert stats.action_type_distribution == {"stock_analysis": 1}
+
+        await svc.clear_logs()
+        stats = await svc.get_stats(days=30)
+        assert stats.total_logs == 0
+        assert fake_mongo["operation_logs"].docs == []
+        # 元数据（回填标记）保留，清空后不会把新日志再次回填
+        assert await fake_mongo["operation_log_hourly_stats"].find_one({"_id": HOURLY_STATS_META_ID})
+
+    asyncio.run(_run())
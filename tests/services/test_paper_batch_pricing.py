@@ -0,0 +1,126 @@
+import asyncio
+import sys
+import types
+
+import pytest
+
+import app.routers.paper as paper_mod
+
+
+@pytest.fixture
+def db(fake_mongo, monkeypatch):
+    """内存版 MongoDB，统计行情集合的查询次数"""
+    fake_mongo.finds = {"market_quotes": 0, "stock_basic_info": 0}
+    for name in fake_mongo.finds:
+        coll = fake_mongo[name]
+        original = coll.find
+
+        def find(flt=None, projection=None, _name=name, _original=original):
+            fake_mongo.finds[_name] += 1
+            return _original(flt, projection)
+
+        coll.find = find
+    monkeypatch.setattr(paper_mod, "get_mongo_db", lambda: fake_mongo)
+    monkeypatch.setattr(paper_mod, "_price_snapshot", {})
+    return fake_mongo
+
+
+@pytest.fixture
+def foreign_quotes(monkeypatch):
+    """替换 ForeignStockService，记录并发度"""
+    calls = {"count": 0, "active": 0, "peak": 0}
+    quotes = {("HK", "00700"): {"price": 320.0}, ("US", "AAPL"): {"close": 190.5}}
+
+    class FakeForeignStockService:
+        def __init__(self, db=None):
+            pass
+
+        async def get_quote(self, market, code, force_refresh=False):
+            calls["count"] += 1
+            calls["active"] += 1
+            calls["peak"] = max(calls["peak"], calls["active"])
+            await asyncio.sleep(0.01)
+            calls["active"] -= 1
+            if code == "BOOM":
+                raise RuntimeError("boom")
+            return quotes.get((market, code))
+
+    module = types.ModuleType("app.services.foreign_stock_service")
+    module.ForeignStockService = FakeForeignStockService
+    monkeypatch.setitem(sys.modules, "app.services.foreign_stock_service", module)
+    return calls
+
+
+def seed(db):
+    db["market_quotes"].docs.extend([
+        {"code": "000001", "close": 11.5},
+        {"symbol": "600519", "close": 1500.0},
+        {"code": "000002", "close": 0},  # 无效价格，回退到基础信息
+    ])
+    db["stock_basic_info"].docs.extend([
+        {"code": "000002", "current_price": 8.2},
+        {"code": "300750", "current_price": 180.0},
+    ])
+
+
+def test_cn_prices_use_one_query_per_collection(db):
+    seed(db)
+    keys = [("000001", "CN"), ("600519", "CN"), ("000002", "CN"), ("300750", "CN"), ("999999", "CN")]
+
+    prices = asyncio.run(paper_mod._get_last_prices(keys))
+
+    assert prices == {
+        ("CN", "000001"): 11.5,
+        ("CN", "600519"): 1500.0,
+        ("CN", "000002"): 8.2,
+        ("CN", "300750"): 180.0,
+        ("CN", "999999"): None,
+    }
+    assert db.finds == {"market_quotes": 1, "stock_basic_info": 1}
+
+
+def test_snapshot_is_shared_across_calls(db):
+    seed(db)
+    asyncio.run(paper_mod._get_last_prices([("000001", "CN")]))
+    prices = asyncio.run(paper_mod._get_last_prices([("000001", "CN")]))
+
+    assert prices[("CN", "000001")] == 11.5
+    assert db.finds["market_quotes"] == 1
+
+
+def test_single_price_bypasses_snapshot(db):
+    seed(db)
+    asyncio.run(paper_mod._get_last_prices([("000001", "CN")]))
+    db["market_quotes"].docs[0]["close"] = 12.0
+
+    assert asyncio.run(paper_mod._get_last_price("000001", "CN")) == 12.0
+
+
+def test_foreign_prices_fetched_concurrently(db, foreign_quotes):
+    keys = [("00700", "HK"), ("AAPL", "US"), ("BOOM", "US")] + [(f"X{i}", "US") for i in range(20)]
+
+    prices = asyncio.run(paper_mod._get_last_prices(keys))
+
+    assert prices[("HK", "00700")] == 320.0
+    assert prices[("US", "AAPL")] == 190.5
+    assert prices[("US", "BOOM")] is None
+    assert foreign_quotes["count"] == len(keys)
+    assert 1 < foreign_quotes["peak"] <= paper_mod._FOREIGN_QUOTE_CONCURRENCY
+    assert db.finds == {"market_quotes": 0, "stock_basic_info": 0}
+
+
+def test_list_positions_prices_portfolio_in_batch(db):
+    seed(db)
+    db["paper_positions"].docs.extend([
+        {"user_id": "u1", "code": "000001", "market": "CN", "currency": "CNY", "quantity": 100, "avg_cost": 10.0},
+        {"user_id": "u1", "code": "000002", "market": "CN", "currency": "CNY", "quantity": 200, "avg_cost": 9.0},
+        {"user_id": "u1", "code": "999999", "market": "CN", "currency": "CNY", "quantity": 300, "avg_cost": 5.0},
+    ])
+
+    resp = asyncio.run(paper_mod.list_positions(current_user={"id": "u1"}))
+
+    items = {p["code"]: p for p in resp["data"]["items"]}
+    assert items["000001"]["market_value"] == pytest.approx(1150.0)
+    assert items["000002"]["unrealized_pnl"] == pytest.approx(200 * 8.2 - 200 * 9.0)
+    assert items["999999"]["last_price"] is None
+    assert db.finds == {"market_quotes": 1, "stock_basic_info": 1}
@@ -0,0 +1,145 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+
+from app.services.report_search_index import (
+    approximate_count,
+    backfill_report_search_terms,
+    build_search_terms,
+    decode_cursor,
+    encode_cursor,
+    query_terms,
+)
+
+
+def test_cjk_terms_match_substrings_of_names_and_content():
+    terms = set(build_search_terms({
+        "stock_symbol": "600036",
+        "stock_name": "招商银行",
+        "analysis_id": "600036_20250101_093000",
+        "summary": "建议买入，Buy on dips",
+        "reports": {"market_report": "技术面：均线多头排列"},
+    }))
+    for keyword in ["招商银行", "银行", "商", "买入", "均线多头", "0036", "20250101", "BUY"]:
+        assert set(query_terms(keyword)) <= terms, keyword
+    assert not set(query_terms("平安银行")) <= terms
+    assert query_terms("，。") == []
+
+
+def test_cursor_roundtrip_and_invalid_cursor():
+    oid = ObjectId()
+    created_at = datetime(2025, 1, 2, 3, 4, 5)
+    assert decode_cursor(encode_cursor({"_id": oid, "created_at": created_at})) == (created_at, oid)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def _seed_reports(db, n):
+    base = datetime(2025, 1, 1)
+    # 按 (created_at, _id) 倒序插入（内存集合的 sort 不生效），每两条共享同一 created_at
+    for i in reversed(range(n)):
+        doc = {
+            "_id": ObjectId(), "stock_symbol": f"{600000 + i:06d}", "market_type": "A股",
+            "stock_name": "招商银行" if i % 2 else "贵州茅台",
+            "summary": f"第{i}份报告", "created_at": base + timedelta(minutes=i // 2),
+        }
+        doc["search_terms"] = build_search_terms(doc)
+        db["analysis_reports"].docs.append(doc)
+    docs = db["analysis_reports"].docs
+    docs.sort(key=lambda d: (d["created_at"], d["_id"]), reverse=True)
+
+
+def _list(reports_mod, **kwargs):
+    params = dict(page=1, page_size=3, search_keyword=None, market_filter=None, start_date=None,
+                  end_date=None, stock_code=None, cursor=None, user={"id": "u1"})
+    params.update(kwargs)
+    return asyncio.run(reports_mod.get_reports_list(**params))["data"]
+
+
+def test_reports_list_keyset_pages_and_keyword_search(fake_mongo, monkeypatch):
+    import app.routers.reports as reports_mod
+
+    monkeypatch.setattr(reports_mod, "get_mongo_db", lambda: fake_mongo)
+    _seed_reports(fake_mongo, 8)
+
+    seen = []
+    data = _list(reports_mod)
+    while True:
+        seen.extend(r["stock_code"] for r in data["reports"])
+        if not data["has_more"]:
+            break
+        data = _list(reports_mod, cursor=data["next_cursor"])
+    expected = [d["stock_symbol"] for d in fake_mongo["analysis_reports"].docs]
+    assert seen == expected and len(set(seen)) == 8
+
+    data = _list(reports_mod, search_keyword="招商", page_size=10)
+    assert sorted(r["stock_code"] for r in data["reports"]) == ["600001", "600003", "600005", "600007"]
+    assert data["total"] == 4 and data["total_approximate"] is False
+    assert all("search_terms" not in r for r in data["reports"])
+
+
+def test_approximate_count_caps_filtered_totals(fake_mongo):
+    _seed_reports(fake_mongo, 8)
+    reports = fake_mongo["analysis_reports"]
+    assert asyncio.run(approximate_count(reports, {"market_type": "A股"}, limit=5)) == (5, True)
+    assert asyncio.run(approximate_count(reports, {"market_type": "A股"})) == (8, False)
+
+
+def test_backfill_adds_terms_to_old_reports(fake_mongo):
+    fake_mongo["analysis_reports"].docs.append({"_id": ObjectId(), "stock_symbol": "000001", "stock_name": "平安银行"})
+    assert asyncio.run(backfill_report_search_terms(fake_mongo)) == 1
+    assert "平安" in fake_mongo["analysis_reports"].docs[0]["search_terms"]
+    assert asyncio.run(backfill_report_search_terms(fake_mongo)) == 0
+
+
+class _SyncCollection:
+    """把内存集合包装成 pymongo 同步接口（web 端报告管理器使用）"""
+
+    def __init__(self, coll):
+        self.coll = coll
+
+    def insert_one(self, doc):
+        oid = ObjectId()
+        self.coll.docs.append({"_id": oid, **doc})
+        return SimpleNamespace(inserted_id=oid)
+
+    def replace_one(self, flt, doc, upsert=False):
+        existing = next((d for d in self.coll.docs if all(d.get(k) == v for k, v in flt.items())), None)
+        if existing is not None:
+            self.coll.docs[self.coll.docs.index(existing)] = {"_id": existing["_id"], **doc}
+            return SimpleNamespace(upserted_id=None, modified_count=1)
+        if not upsert:
+            return SimpleNamespace(upserted_id=None, modified_count=0)
+        oid = ObjectId()
+        self.coll.docs.append({"_id": oid, **doc})
+        return SimpleNamespace(upserted_id=oid, modified_count=0)
+
+
+def test_reports_saved_by_web_manager_are_searchable(fake_mongo, monkeypatch):
+    import app.routers.reports as reports_mod
+    from web.utils.mongodb_report_manager import MongoDBReportManager
+
+    monkeypatch.setattr(reports_mod, "get_mongo_db", lambda: fake_mongo)
+    manager = MongoDBReportManager.__new__(MongoDBReportManager)
+    manager.connected = True
+    manager.collection = _SyncCollection(fake_mongo["analysis_reports"])
+
+    assert manager.save_analysis_report("AAPL", {"summary": "估值偏高，建议观望"},
+                                        {"market_report": "均线空头排列"})
+    assert manager.save_report({"analysis_id": "TSLA_20250101_093000", "stock_symbol": "TSLA",
+                                "stock_name": "特斯拉", "summary": "交付量超预期",
+                                "created_at": datetime(2025, 1, 1)})
+
+    def _codes(keyword):
+        return [r["stock_code"] for r in _list(reports_mod, search_keyword=keyword, page_size=10)["reports"]]
+
+    assert _codes("苹果") == ["AAPL"] and _codes("均线空头") == ["AAPL"]
+    assert _codes("交付量") == ["TSLA"]
+
+    # 整篇替换后检索词随内容更新
+    manager.save_report({"analysis_id": "TSLA_20250101_093000", "stock_symbol": "TSLA",
+                         "stock_name": "特斯拉", "summary": "毛利率下滑", "created_at": datetime(2025, 1, 1)})
+    assert _codes("毛利率") == ["TSLA"] and _codes("交付量") == []
@@ -0,0 +1,25 @@
+import asyncio
+import sys
+
+from app.services.scheduler_service import lazy_job
+
+
+def test_lazy_job_imports_target_on_first_run(tmp_path, monkeypatch):
+    (tmp_path / "fake_sync_service.py").write_text(
+        "calls = []\n"
+        "async def run_fake_sync(force_update=False):\n"
+        "    calls.append(force_update)\n"
+        "    return 'ok'\n",
+        encoding="utf-8",
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "fake_sync_service", raising=False)
+
+    job = lazy_job("fake_sync_service:run_fake_sync")
+    assert "fake_sync_service" not in sys.modules
+    # 任务详情中的 func 仍显示为实现函数
+    assert f"{job.__module__}.{job.__name__}" == "fake_sync_service.run_fake_sync"
+    assert asyncio.iscoroutinefunction(job)
+
+    assert asyncio.run(job(force_update=True)) == "ok"
+    assert sys.modules["fake_sync_service"].calls == [True]
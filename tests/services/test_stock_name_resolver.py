@@ -0,0 +1,90 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.services.stock_name_resolver import StockNameResolver
+
+
+@pytest.fixture
+def db(fake_mongo):
+    """内存版 MongoDB，统计 stock_basic_info 的查询次数"""
+    fake_mongo.finds = 0
+    basics = fake_mongo["stock_basic_info"]
+    original = basics.find
+
+    def find(flt=None, projection=None):
+        fake_mongo.finds += 1
+        return original(flt, projection)
+
+    basics.find = find
+    return fake_mongo
+
+
+def make_resolver(db, **kwargs):
+    resolver = StockNameResolver(db=db, **kwargs)
+
+    async def priority():
+        return ["tushare", "akshare", "baostock"]
+
+    resolver._source_priority = priority
+    return resolver
+
+
+def seed(db):
+    db["stock_basic_info"].docs.extend([
+        {"code": "000001", "name": "平安银行(akshare)", "source": "akshare"},
+        {"code": "000001", "name": "平安银行", "source": "tushare"},
+        {"symbol": "600036", "name": "招商银行"},  # 旧数据：无 source 字段
+        {"code": "600519", "name": "贵州茅台", "source": "baostock"},
+    ])
+
+
+def test_resolve_many_uses_one_query_and_caches(db):
+    seed(db)
+    resolver = make_resolver(db)
+
+    names = asyncio.run(resolver.resolve_many(["000001", "600036", "600519", "999999", "000001"]))
+    assert names == {"000001": "平安银行", "600036": "招商银行", "600519": "贵州茅台", "999999": "999999"}
+    assert db.finds == 1
+
+    assert asyncio.run(resolver.resolve("600519")) == "贵州茅台"
+    assert db.finds == 1 and resolver.stats["hits"] == 1
+
+    # 基础信息同步后失效，下一次重新查询
+    db["stock_basic_info"].docs.append({"code": "999999", "name": "新股", "source": "tushare"})
+    resolver.invalidate()
+    assert asyncio.run(resolver.resolve("999999")) == "新股"
+    assert db.finds == 2
+
+
+def test_cache_is_bounded_and_expires(db):
+    seed(db)
+    resolver = make_resolver(db, ttl_seconds=0.0, max_entries=2)
+
+    asyncio.run(resolver.resolve_many(["000001", "600036", "600519"]))
+    assert len(resolver._cache) == 2
+    asyncio.run(resolver.resolve("600519"))
+    assert db.finds == 2  # TTL 为 0，立即过期
+
+
+def test_reports_list_resolves_missing_names_in_one_batch(db, monkeypatch):
+    import app.routers.reports as reports_mod
+    import app.services.stock_name_resolver as resolver_mod
+
+    seed(db)
+    for i, code in enumerate(["000001", "600036", "600519", "000001"]):
+        db["analysis_reports"].docs.append({
+            "_id": f"r{i}", "analysis_id": f"a{i}", "stock_symbol": code, "market_type": "A股",
+            "created_at": datetime(2025, 1, 1), **({"stock_name": "已保存名称"} if i == 2 else {}),
+        })
+    monkeypatch.setattr(reports_mod, "get_mongo_db", lambda: db)
+    monkeypatch.setattr(resolver_mod, "_resolver", make_resolver(db))
+
+    result = asyncio.run(reports_mod.get_reports_list(
+        page=1, page_size=20, search_keyword=None, market_filter=None,
+        start_date=None, end_date=None, stock_code=None, cursor=None, user={"id": "u1"},
+    ))
+    names = [r["stock_name"] for r in result["data"]["reports"]]
+    assert names == ["平安银行", "招商银行", "已保存名称", "平安银行"]
+    assert db.finds == 1
@@ -0,0 +1,224 @@
+import asyncio
+import gzip
+import json
+import os
+import sys
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+import app.services.database.backups as backups_mod
+from app.services.database import streaming
+
+
+class SyntheticCollection:
+    """按需生成文档的只读集合：文档不驻留内存，用于验证备份的内存上限"""
+
+    def __init__(self, total, fail_after=None):
+        self.total = total
+        self.fail_after = fail_after
+
+    async def estimated_document_count(self):
+        return self.total
+
+    def find(self, flt=None, projection=None):
+        start = 0
+        if flt and "_id" in flt:
+            start = flt["_id"]["$gt"] + 1
+        return _SyntheticCursor(self, start)
+
+
+class _SyntheticCursor:
+    def __init__(self, coll, start):
+        self._coll = coll
+        self._next = start
+        self._served = 0
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._next >= self._coll.total:
+            raise StopAsyncIteration
+        if self._coll.fail_after is not None and self._served >= self._coll.fail_after:
+            raise ConnectionError("cursor killed")
+        doc = {"_id": self._next, "code": f"{self._next % 5000:06d}", "close": self._next * 0.01}
+        self._next += 1
+        self._served += 1
+        return doc
+
+
+class CountingSink:
+    """只计数、不保存文档的写入目标"""
+
+    def __init__(self):
+        self.count = 0
+        self.last_id = -1
+        self.ordered = []
+
+    async def delete_many(self, flt):
+        self.count = 0
+
+    async def insert_many(self, docs, ordered=False):
+        self.ordered.append(ordered)
+        assert docs[0]["_id"] == self.last_id + 1
+        self.last_id = docs[-1]["_id"]
+        self.count += len(docs)
+
+
+def _rss_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _manifest_base(fmt="ndjson"):
+    return dict(backup_id="b1", name="test", fmt=fmt)
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "bson"])
+def test_round_trip_preserves_types(fake_mongo, tmp_path, fmt):
+    created = datetime(2024, 5, 6, 7, 8, 9, 123000)
+    docs = [
+        {"_id": ObjectId(), "code": "000001", "name": "平安银行", "created_at": created,
+         "nested": {"ref": ObjectId(), "tags": ["a", {"at": created}]}, "price": 11.5},
+        {"_id": ObjectId(), "code": "600519", "name": "贵州茅台", "created_at": None, "price": 1500},
+    ]
+    fake_mongo["reports"].docs.extend(docs)
+
+    manifest = asyncio.run(streaming.stream_backup(
+        fake_mongo, str(tmp_path), ["reports"], batch_size=1, chunk_docs=1, **_manifest_base(fmt)))
+
+    state = manifest["collections"]["reports"]
+    assert manifest["status"] == "completed"
+    assert state["documents"] == 2 and len(state["chunks"]) == 2
+
+    target = type(fake_mongo)()
+    restored = asyncio.run(streaming.stream_restore(target, str(tmp_path), batch_size=1))
+    assert restored == {"reports": 2}
+    assert target["reports"].docs == docs
+
+
+def test_resume_continues_from_checkpoint(tmp_path):
+    db = {"quotes": SyntheticCollection(10_000, fail_after=4_500)}
+    with pytest.raises(ConnectionError):
+        asyncio.run(streaming.stream_backup(
+            db, str(tmp_path), ["quotes"], batch_size=500, chunk_docs=1_000, **_manifest_base()))
+
+    manifest = streaming.read_manifest(str(tmp_path))
+    state = manifest["collections"]["quotes"]
+    assert state["status"] == "in_progress"
+    assert state["documents"] == 4_000 and len(state["chunks"]) == 4
+    # 第五个分片写了一半，续传时应被删除重写
+    assert os.path.exists(tmp_path / "quotes.00004.ndjson.gz")
+
+    db["quotes"].fail_after = None
+    manifest = asyncio.run(streaming.stream_backup(
+        db, str(tmp_path), ["quotes"], resume=True, batch_size=500, chunk_docs=1_000, **_manifest_base()))
+    assert manifest["collections"]["quotes"]["documents"] == 10_000
+
+    sink = CountingSink()
+    restored = asyncio.run(streaming.stream_restore({"quotes": sink}, str(tmp_path), overwrite=True, batch_size=700))
+    assert restored == {"quotes": 10_000}
+    assert sink.last_id == 9_999
+    assert all(sink.ordered)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="RSS 通过 /proc 读取")
+def test_multi_million_backup_and_restore_memory_is_bounded(tmp_path):
+    total = 2_000_000
+    baseline = _rss_bytes()
+    peak = [baseline]
+
+    def progress(collection, done, expected):
+        if done % 50_000 == 0:
+            peak[0] = max(peak[0], _rss_bytes())
+
+    db = {"stock_daily_quotes": SyntheticCollection(total)}
+    manifest = asyncio.run(streaming.stream_backup(
+        db, str(tmp_path), ["stock_daily_quotes"], batch_size=2_000, progress=progress,
+        **_manifest_base()))
+    assert manifest["collections"]["stock_daily_quotes"]["documents"] == total
+
+    sink = CountingSink()
+    restored = asyncio.run(streaming.stream_restore(
+        {"stock_daily_quotes": sink}, str(tmp_path), batch_size=2_000, progress=progress))
+    assert restored == {"stock_daily_quotes": total}
+    assert sink.last_id == total - 1
+
+    # 两百万条文档全部驻留内存需要数百 MB，流式处理只保留一批
+    assert peak[0] - baseline < 64 * 1024 * 1024
+
+
+def _patch_db(monkeypatch, db):
+    monkeypatch.setattr(backups_mod, "get_mongo_db", lambda: db)
+
+
+def test_json_export_streams_legacy_structure(fake_mongo, monkeypatch, tmp_path):
+    _patch_db(monkeypatch, fake_mongo)
+    oid = ObjectId()
+    fake_mongo["system_configs"].docs.append({"_id": oid, "llm": {"api_key": "sk-x", "max_tokens": 10}})
+    fake_mongo["api_tokens"].docs.append({"_id": ObjectId(), "value": "t"})
+    fake_mongo["users"].docs.append({"_id": ObjectId(), "username": "admin"})
+
+    path = asyncio.run(backups_mod.export_data(
+        ["system_configs", "api_tokens", "users", "empty"], export_dir=str(tmp_path), sanitize=True))
+
+    with open(path, encoding="utf-8") as f:
+        exported = json.load(f)
+    assert exported["export_info"]["collections"] == ["system_configs", "api_tokens", "users", "empty"]
+    assert exported["data"]["system_configs"] == [{"_id": str(oid), "llm": {"api_key": "", "max_tokens": 10}}]
+    assert exported["data"]["api_tokens"] == []
+    assert exported["data"]["users"] == []
+    assert exported["data"]["empty"] == []
+
+
+def test_ndjson_export_imports_back(fake_mongo, monkeypatch, tmp_path):
+    _patch_db(monkeypatch, fake_mongo)
+    created = datetime(2024, 1, 2, 3, 4, 5)
+    docs = [{"_id": ObjectId(), "code": f"{i:06d}", "created_at": created} for i in range(2_500)]
+    fake_mongo["analysis_reports"].docs.extend(docs)
+
+    path = asyncio.run(backups_mod.export_data(["analysis_reports"], export_dir=str(tmp_path), format="ndjson"))
+    assert path.endswith(".ndjson.gz")
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert "export_info" in json.loads(f.readline())
+
+    target = type(fake_mongo)()
+    _patch_db(monkeypatch, target)
+    with open(path, "rb") as f:
+        result = asyncio.run(backups_mod.import_data(f.read(), "", format="ndjson", overwrite=True))
+
+    assert result["total_inserted"] == 2_500
+    assert target["analysis_reports"].docs == docs
+    assert target["analysis_reports"].insert_calls == 3
+
+
+def test_failed_backup_can_be_resumed_and_restored(fake_mongo, monkeypatch, tmp_path):
+    _patch_db(monkeypatch, fake_mongo)
+    fake_mongo.colls["quotes"] = SyntheticCollection(5_000, fail_after=2_600)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(backups_mod.create_backup("nightly", str(tmp_path), ["quotes"], batch_size=500, chunk_docs=1_000))
+    meta = fake_mongo["database_backups"].docs[0]
+    assert meta["status"] == "failed"
+    assert meta["progress"] == {"quotes": 2_000}
+
+    fake_mongo.colls["quotes"].fail_after = None
+    info = asyncio.run(backups_mod.resume_backup(str(meta["_id"]), chunk_docs=1_000))
+    assert info["status"] == "completed" and info["size"] > 0
+
+    sink = CountingSink()
+    fake_mongo.colls["quotes"] = sink
+    result = asyncio.run(backups_mod.restore_backup(str(meta["_id"]), overwrite=True))
+    assert result["total_inserted"] == 5_000
+    assert sink.last_id == 4_999
+
+    asyncio.run(backups_mod.delete_backup(str(meta["_id"])))
+    assert not os.path.exists(meta["file_path"])
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from app.services.symbol_master import PYPINYIN_AVAILABLE, SymbolMaster
+
+
+def _docs():
+    return [
+        {"code": "000001", "name": "平安银行", "name_en": "Ping An Bank", "source": "tushare"},
+        {"code": "000001", "name": "平安银行(AK)", "source": "akshare"},
+        {"code": "601318", "name": "中国平安", "name_en": "Ping An Insurance", "source": "tushare"},
+        {"code": "600036", "name": "招商银行", "name_en": "China Merchants Bank", "source": "tushare"},
+        {"code": "000002", "name": "万科A", "name_en": "Vanke", "source": "tushare"},
+        {"code": "002594", "name": "比亚迪", "name_en": "BYD", "source": "akshare"},
+    ]
+
+
+def _codes(results):
+    return [d["code"] for d in results]
+
+
+def _master():
+    master = SymbolMaster()
+    master.apply_docs("CN", _docs(), ["tushare", "akshare"])
+    return master
+
+
+def test_ranking_code_and_name():
+    master = _master()
+    assert master.size == 5
+    # 同一代码只保留高优先级数据源
+    assert master.search("000001")[0]["source"] == "tushare"
+    assert _codes(master.search("0000")) == ["000001", "000002"]
+    # 名称前缀优先于名称中间位置
+    assert _codes(master.search("平安")) == ["000001", "601318"]
+    assert _codes(master.search("银行")) == ["000001", "600036"]
+    assert _codes(master.search("china mer")) == ["600036"]
+
+
+@pytest.mark.skipif(not PYPINYIN_AVAILABLE, reason="pypinyin 未安装")
+def test_pinyin_and_typo_tolerance():
+    master = _master()
+    assert _codes(master.search("payh")) == ["000001"]
+    assert _codes(master.search("byd"))[0] == "002594"
+    assert _codes(master.search("zhaoshang")) == ["600036"]
+    # 拼写错误（相邻交换 / 错一个字母）
+    assert "002594" in _codes(master.search("biyadi"))
+    assert "600036" in _codes(master.search("zhaoshnag"))
+    assert "000002" in _codes(master.search("vnake"))
+
+
+def test_incremental_apply_and_removal():
+    master = _master()
+    # 只有名称变化的条目重建索引
+    docs = _docs()
+    docs[4] = dict(docs[4], name="万科B")
+    docs[3] = dict(docs[3], total_mv=123.0)
+    assert master.apply_docs("CN", docs, ["tushare", "akshare"]) == 1
+    assert master.search("600036")[0]["total_mv"] == 123.0
+    assert [d["name"] for d in master.search("万科")] == ["万科B"]
+
+    # 全量替换时移除已退市的代码
+    assert master.apply_docs("CN", docs[:4], ["tushare", "akshare"]) == 2
+    assert master.search("002594") == []
+    assert master.search("万科") == []
+
+
+class _FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        return list(self.docs)
+
+
+class _FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.finds = 0
+
+    def find(self, query, projection=None):
+        self.finds += 1
+        return _FakeCursor(self.docs)
+
+
+def test_ensure_loaded_refreshes_only_when_stale():
+    collection = _FakeCollection(_docs())
+    db = {"stock_basic_info": collection}
+    master = SymbolMaster()
+
+    async def _run():
+        await asyncio.gather(*[master.ensure_loaded(db, "CN", ["tushare"]) for _ in range(5)])
+        assert collection.finds == 1
+        assert _codes(master.search("600036", market="CN")) == ["600036"]
+        assert master.search("600036", market="HK") == []
+
+        collection.docs = _docs() + [{"code": "688981", "name": "中芯国际", "source": "tushare"}]
+        await master.ensure_loaded(db, "CN", ["tushare"])
+        assert collection.finds == 1
+
+        master.mark_stale("CN")
+        await master.ensure_loaded(db, "CN", ["tushare"])
+        assert collection.finds == 2
+        assert _codes(master.search("中芯")) == ["688981"]
+
+    asyncio.run(_run())
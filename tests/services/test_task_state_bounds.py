@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import os
+import sys
+
+import pytest
+
+import app.services.memory_state_manager as msm
+from app.services.memory_state_manager import MemoryStateManager, TaskState, TaskStatus
+
+
+def _result(i, size=2_000):
+    return {"stock_symbol": f"{i:06d}", "decision": {"action": "买入"}, "summary": "x" * size,
+            "reports": {"market_report": "行情" * (size // 4)}}
+
+
+async def _run_task(mgr, i, user="u1", result=True):
+    task_id = f"task-{i}"
+    await mgr.create_task(task_id, user, f"{i:06d}", {"research_depth": "标准"})
+    await mgr.update_task_status(task_id, TaskStatus.RUNNING, progress=50, message="分析中")
+    await mgr.update_task_status(task_id, TaskStatus.COMPLETED, progress=100, message="分析完成",
+                                 result_data=_result(i) if result else None)
+    return task_id
+
+
+def test_results_are_kept_out_of_task_state(tmp_path):
+    mgr = MemoryStateManager(result_dir=str(tmp_path), result_cache_size=1)
+
+    async def _main():
+        first = await _run_task(mgr, 1)
+        await _run_task(mgr, 2)
+        task = await mgr.get_task(first)
+        assert task.has_result and task.result_data is None
+        assert msm.TaskResultStore(str(tmp_path)).load(first) == _result(1)
+
+        # 缓存只保留最近一个结果，第一个结果从磁盘加载
+        assert mgr._results.cached(first) is None
+        data = await mgr.get_task_dict(first)
+        assert data["result_data"] == _result(1)
+        listed = await mgr.list_user_tasks("u1")
+        assert [t["task_id"] for t in listed] == ["task-2", "task-1"]
+        assert all(t["result_data"] is None for t in listed)
+
+    asyncio.run(_main())
+    assert not hasattr(TaskState(task_id="t", user_id="u", stock_code="c", status=TaskStatus.PENDING), "__dict__")
+
+
+def test_finished_tasks_are_evicted_by_count_and_results_deleted(tmp_path):
+    mgr = MemoryStateManager(max_tasks=5, result_dir=str(tmp_path))
+
+    async def _main():
+        await mgr.create_task("running", "u1", "600519")
+        await mgr.update_task_status("running", TaskStatus.RUNNING, progress=10)
+        for i in range(10):
+            await _run_task(mgr, i)
+
+    asyncio.run(_main())
+    stats = asyncio.run(mgr.get_statistics())
+    assert stats["total_tasks"] == 5 and stats["evicted_tasks"] == 6
+    assert stats["status_distribution"] == {"running": 1, "completed": 4}
+    assert "running" in mgr._tasks
+    assert sorted(os.listdir(tmp_path)) == [f"task-{i}.json.gz" for i in range(6, 10)]
+    assert asyncio.run(mgr.get_task_dict("task-0")) is None
+
+
+def test_finished_tasks_are_evicted_by_age(tmp_path, monkeypatch):
+    clock = [1_000_000.0]
+    monkeypatch.setattr(msm.time, "time", lambda: clock[0])
+    mgr = MemoryStateManager(max_age_hours=1, result_dir=str(tmp_path))
+
+    async def _main():
+        await _run_task(mgr, 1)
+        clock[0] += 1800
+        await _run_task(mgr, 2)
+        clock[0] += 2400
+        await mgr.create_task("new", "u1", "000001")
+
+    asyncio.run(_main())
+    assert set(mgr._tasks) == {"task-2", "new"}
+
+    clock[0] += 7200
+    assert mgr.evict_expired() == 1
+    assert set(mgr._tasks) == {"new"}
+    assert os.listdir(tmp_path) == []
+
+
+def test_user_listing_only_touches_that_users_tasks(tmp_path, monkeypatch):
+    mgr = MemoryStateManager(max_tasks=100_000, result_dir=str(tmp_path))
+
+    async def _main():
+        for i in range(3_000):
+            await mgr.create_task(f"other-{i}", f"user-{i % 100}", "000001")
+        for i in range(30):
+            await mgr.create_task(f"mine-{i}", "me", "600519")
+            if i % 3 == 0:
+                await mgr.update_task_status(f"mine-{i}", TaskStatus.FAILED, error_message="x")
+
+    asyncio.run(_main())
+
+    calls = []
+    original = TaskState.to_dict
+    monkeypatch.setattr(TaskState, "to_dict", lambda self: calls.append(self.task_id) or original(self))
+
+    page = asyncio.run(mgr.list_user_tasks("me", limit=5, offset=5))
+    assert [t["task_id"] for t in page] == [f"mine-{i}" for i in range(24, 19, -1)]
+    assert len(calls) == 5
+
+    failed = asyncio.run(mgr.list_user_tasks("me", status=TaskStatus.FAILED, limit=3))
+    assert [t["task_id"] for t in failed] == ["mine-27", "mine-24", "mine-21"]
+    assert asyncio.run(mgr.list_user_tasks("nobody")) == []
+
+    asyncio.run(mgr.remove_task("mine-0"))
+    assert len(mgr._user_tasks["me"]) == 29
+
+
+def test_service_listing_loads_results_for_the_page(tmp_path, monkeypatch, fake_mongo):
+    import app.services.simple_analysis_service as sas
+
+    mgr = MemoryStateManager(result_dir=str(tmp_path), result_cache_size=0)
+    monkeypatch.setattr(sas, "get_mongo_db", lambda: fake_mongo)
+    monkeypatch.setattr(sas, "get_memory_state_manager", lambda: mgr)
+    monkeypatch.setattr(sas, "get_progress_by_id", lambda task_id: None)
+    service = sas.SimpleAnalysisService.__new__(sas.SimpleAnalysisService)
+    service.memory_manager = mgr
+    service._stock_name_cache = {f"{i:06d}": f"股票{i}" for i in range(3)}
+    service._progress_trackers = {}
+
+    async def _main():
+        for i in range(3):
+            await _run_task(mgr, i, user="admin")
+        tasks = await service.list_user_tasks("admin", limit=2)
+        status = await service.get_task_status("task-0")
+        return tasks, status
+
+    tasks, status = asyncio.run(_main())
+    assert [t["task_id"] for t in tasks] == ["task-2", "task-1"]
+    assert [t["result_data"] for t in tasks] == [_result(2), _result(1)]
+    assert status["result_data"] == _result(0)
+
+
+def _rss_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="RSS 通过 /proc 读取")
+def test_soak_100k_tasks_keeps_rss_flat(tmp_path, monkeypatch):
+    # 每个任务会打印多条 INFO 日志，pytest 会保留所有日志记录，这里只测量状态本身
+    monkeypatch.setattr(msm.logger, "disabled", True)
+    mgr = MemoryStateManager(max_tasks=1_000, result_dir=str(tmp_path), result_cache_size=16)
+    samples = {}
+
+    async def _main():
+        for i in range(100_000):
+            await _run_task(mgr, i, user=f"user-{i % 500}", result=i % 10 == 0)
+            if i in (20_000, 99_999):
+                samples[i] = _rss_bytes()
+
+    asyncio.run(_main())
+    stats = asyncio.run(mgr.get_statistics())
+    assert stats["total_tasks"] == 1_000
+    assert stats["evicted_tasks"] == 99_000
+    assert len(os.listdir(tmp_path)) == 100
+    # 保留全部任务（每个结果约 8KB）需要数百 MB，有界状态下 RSS 基本不变
+    assert samples[99_999] - samples[20_000] < 16 * 1024 * 1024
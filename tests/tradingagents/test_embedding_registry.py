@@ -0,0 +1,98 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from tradingagents.utils import embedding_registry
+from tradingagents.utils.embedding_registry import EmbeddingCache, ModelRegistry, encode_texts
+from tradingagents.utils.enhanced_news_filter import EnhancedNewsFilter
+
+
+class FakeSentenceModel:
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False):
+        self.batches.append(list(texts))
+        # 按字符哈希得到稳定向量：包含公司名的文本与公司文本更相似
+        vectors = np.zeros((len(texts), 16), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for ch in text:
+                vectors[i, ord(ch) % 16] += 1
+        return vectors
+
+
+def install_fake(monkeypatch, load_delay=0.0):
+    model = FakeSentenceModel()
+    loads = []
+
+    def loader(name):
+        loads.append(name)
+        time.sleep(load_delay)
+        return model
+
+    monkeypatch.setattr(embedding_registry, "_registry", ModelRegistry(loaders={"sentence": loader}))
+    monkeypatch.setattr(embedding_registry, "_cache", EmbeddingCache(max_entries=100))
+    return model, loads
+
+
+def test_registry_loads_once_under_concurrency(monkeypatch):
+    _, loads = install_fake(monkeypatch, load_delay=0.1)
+    registry = embedding_registry.get_model_registry()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("sentence", "m"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert loads == ["m"] and len({id(r) for r in results}) == 1
+
+    # 加载失败会被记住，不再重复尝试
+    calls = []
+
+    def broken(name):
+        calls.append(name)
+        raise ImportError("sentence-transformers未安装")
+
+    failing = ModelRegistry(loaders={"sentence": broken})
+    for _ in range(3):
+        try:
+            failing.get("sentence", "m")
+        except ImportError:
+            pass
+    assert calls == ["m"]
+
+
+def test_encode_texts_dedupes_batches_and_caches(monkeypatch):
+    model, _ = install_fake(monkeypatch)
+    vectors = encode_texts(["a 标题", "b 标题", "a 标题"], "m")
+    assert vectors.shape == (3, 16)
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-6)
+    np.testing.assert_array_equal(vectors[0], vectors[2])
+    assert model.batches == [["a 标题", "b 标题"]]
+
+    encode_texts(["b 标题", "c 标题"], "m")
+    assert model.batches[-1] == ["c 标题"]
+    assert embedding_registry.get_embedding_cache().hits == 1
+
+
+def test_filter_instances_share_model_and_score_request_in_one_batch(monkeypatch):
+    model, loads = install_fake(monkeypatch)
+    news = pd.DataFrame([
+        {'新闻标题': '招商银行发布2024年第三季度业绩报告', '新闻内容': '招商银行净利润同比增长8%'},
+        {'新闻标题': '银行ETF指数多只成分股上涨', '新闻内容': '银行板块今日表现强势'},
+        {'新闻标题': '招商银行发布2024年第三季度业绩报告', '新闻内容': '招商银行净利润同比增长8%'},
+    ])
+
+    first = EnhancedNewsFilter('600036', '招商银行', use_semantic=True)
+    result = first.filter_news_enhanced(news, min_score=0)
+    second = EnhancedNewsFilter('600036', '招商银行', use_semantic=True)
+    second.filter_news_enhanced(news, min_score=0)
+
+    assert loads == ["paraphrase-multilingual-MiniLM-L12-v2"]
+    # 公司文本一批 + 新闻一批（重复标题只编码一次）；第二个实例全部命中缓存
+    assert [len(batch) for batch in model.batches] == [6, 2]
+    assert len(result) == 3
+    single = first.calculate_semantic_similarity('招商银行发布2024年第三季度业绩报告', '招商银行净利润同比增长8%')
+    assert abs(result['semantic_score'].max() - single) < 1e-6
@@ -0,0 +1,65 @@
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+from tradingagents.utils.lazy_exports import lazy_exports
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def _make_package(tmp_path, monkeypatch):
+    pkg = tmp_path / "lazy_pkg"
+    pkg.mkdir()
+    (pkg / "heavy.py").write_text("LOADED = True\nclass Provider:\n    pass\n", encoding="utf-8")
+    (pkg / "broken.py").write_text("raise ImportError('sdk missing')\n", encoding="utf-8")
+    (pkg / "__init__.py").write_text(textwrap.dedent("""
+        from tradingagents.utils.lazy_exports import lazy_exports
+        __getattr__, __dir__ = lazy_exports(__name__, globals(), {
+            "Provider": [(".heavy", "Provider")],
+            "Missing": [(".broken", "Missing"), (".heavy", "Missing")],
+            "Strict": [(".broken", "Strict")],
+        }, flags={"PROVIDER_AVAILABLE": "Provider", "MISSING_AVAILABLE": "Missing"}, required=["Strict"])
+    """), encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for name in ("lazy_pkg", "lazy_pkg.heavy", "lazy_pkg.broken"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+
+
+def test_names_load_on_first_access(tmp_path, monkeypatch):
+    _make_package(tmp_path, monkeypatch)
+    import lazy_pkg
+
+    assert "lazy_pkg.heavy" not in sys.modules
+    assert lazy_pkg.PROVIDER_AVAILABLE is True
+    assert "lazy_pkg.heavy" in sys.modules
+    assert lazy_pkg.Provider is sys.modules["lazy_pkg.heavy"].Provider
+    # 候选全部失败时为 None，对应标记为 False（与原先 try/except ImportError 的语义一致）
+    assert lazy_pkg.Missing is None and lazy_pkg.MISSING_AVAILABLE is False
+    assert {"Provider", "PROVIDER_AVAILABLE"} <= set(dir(lazy_pkg))
+
+    from lazy_pkg import heavy  # 子模块导入不受影响
+    assert heavy.LOADED
+
+    for name, error in (("Strict", ImportError), ("nope", AttributeError)):
+        try:
+            getattr(lazy_pkg, name)
+        except error:
+            pass
+        else:
+            raise AssertionError(f"{name} 应抛出 {error.__name__}")
+
+
+def test_dataflows_packages_do_not_import_provider_sdks():
+    code = textwrap.dedent("""
+        import sys
+        import tradingagents.dataflows as dataflows
+        import tradingagents.dataflows.providers.china
+        import tradingagents.dataflows.news
+        heavy = [m for m in ("pandas", "tushare", "akshare", "baostock", "yfinance", "stockstats") if m in sys.modules]
+        assert not heavy, heavy
+        assert callable(dataflows.get_china_stock_data_unified)
+        assert "tradingagents.dataflows.interface" in sys.modules
+    """)
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=120)
+    assert proc.returncode == 0, proc.stderr[-2000:]
@@ -0,0 +1,79 @@
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from tradingagents.llm_adapters.response_cache import (
+    FileSystemResponseStore,
+    LLMCacheMissError,
+    LLMResponseCache,
+    SQLiteResponseStore,
+)
+
+
+class CountingChatModel(BaseChatModel):
+    model_name: str = "fake-model"
+    temperature: float = 0.7
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "counting-fake"
+
+    @property
+    def _identifying_params(self):
+        return {"model_name": self.model_name, "temperature": self.temperature}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        message = AIMessage(
+            content=f"回答#{self.calls}: {messages[-1].content}",
+            tool_calls=[{"name": "get_stock_market_data_unified", "args": {"ticker": "000001"}, "id": f"call_{self.calls}"}],
+            response_metadata={"latency": self.calls},
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def _messages(question="分析 000001"):
+    return [SystemMessage(content="你是分析师"), HumanMessage(content=question)]
+
+
+@pytest.mark.parametrize("store_cls, name", [(SQLiteResponseStore, "cache.sqlite"), (FileSystemResponseStore, "cache")])
+def test_readwrite_cache_keys_on_messages_params_and_tools(tmp_path, store_cls, name):
+    cache = LLMResponseCache(store_cls(str(tmp_path / name)), mode="readwrite")
+    model = CountingChatModel(cache=cache)
+
+    first = model.invoke(_messages())
+    again = model.invoke(_messages())
+    assert model.calls == 1
+    assert again.content == first.content
+    assert again.tool_calls == first.tool_calls
+
+    # 消息 id 不同仍命中；消息内容、采样参数、工具 schema 不同则不命中
+    model.invoke([SystemMessage(content="你是分析师", id="x1"), HumanMessage(content="分析 000001", id="x2")])
+    assert model.calls == 1
+    model.invoke(_messages("分析 600519"))
+    CountingChatModel(cache=cache, temperature=0.1).invoke(_messages())
+    model.invoke(_messages(), tools=[{"type": "function", "function": {"name": "get_news"}}])
+    assert model.calls == 3
+    assert cache.summary()["hits"] == 2
+
+
+def test_record_then_replay_offline(tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    recorder = CountingChatModel(cache=LLMResponseCache(SQLiteResponseStore(path), mode="record"))
+    recorded = recorder.invoke(_messages())
+    recorder.invoke(_messages())
+    # 录制模式总是调用真实模型，并以最新响应覆盖
+    assert recorder.calls == 2
+
+    replay_cache = LLMResponseCache(SQLiteResponseStore(path), mode="replay")
+    player = CountingChatModel(cache=replay_cache)
+    replayed = player.invoke(_messages())
+    assert player.calls == 0
+    assert replayed.content == "回答#2: 分析 000001" != recorded.content
+
+    with pytest.raises(LLMCacheMissError):
+        player.invoke(_messages("没有录制过的问题"))
+    assert player.calls == 0
+    assert replay_cache.summary() == {"lookups": 2, "hits": 1, "misses": 1, "writes": 0, "mode": "replay"}
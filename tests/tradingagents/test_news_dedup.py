@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from tradingagents.alpha.scrapers.store import NewsItem, NewsStore
+from tradingagents.utils.news_dedup import (
+    NearDuplicateDetector,
+    cluster_near_duplicates,
+    deduplicate_near_duplicates,
+    normalize_news_text,
+)
+
+
+def test_clusters_reworded_cjk_and_english_reposts():
+    titles = [
+        "【财联社】贵州茅台发布2024年年报，净利润同比增长15%",
+        "Apple beats earnings expectations as iPhone sales surge - Reuters",
+        "贵州茅台发布2024年年报,净利润同比增长15% - 新浪财经",
+        "宁德时代与特斯拉签署新供货协议",
+        "贵州茅台公布2024年年报，净利润同比增长约15%（来源：东方财富）",
+        "APPLE BEATS EARNINGS EXPECTATIONS AS IPHONE SALES SURGE | Bloomberg",
+        "美联储宣布维持利率不变",
+        "",
+    ]
+    assert normalize_news_text(titles[0]) == normalize_news_text(titles[2])
+    assert cluster_near_duplicates(titles) == [[0, 2, 4], [1, 5], [3], [6], [7]]
+
+
+def test_keeps_first_representative_in_input_order():
+    items = [{"t": "央行宣布下调存款准备金率0.5个百分点", "src": "a"},
+             {"t": "无关新闻：某公司召开股东大会审议议案", "src": "b"},
+             {"t": "央行宣布下调存款准备金率0.5个百分点 - 证券时报", "src": "c"}]
+    kept, clusters = deduplicate_near_duplicates(items, lambda x: x["t"])
+    assert [x["src"] for x in kept] == ["a", "b"]
+    assert [[x["src"] for x in c] for c in clusters] == [["a", "c"]]
+
+    kept, _ = deduplicate_near_duplicates(items, lambda x: x["t"], prefer=lambda x: x["src"])
+    assert [x["src"] for x in kept] == ["b", "c"]
+
+
+def test_hot_bucket_stays_linear():
+    # 1000 条完全相同的标题落在同一批桶中：候选对数应与文档数成线性，而不是 n^2/2
+    detector = NearDuplicateDetector()
+    texts = ["完全相同的转载新闻标题用于测试热门桶"] * 1000
+    sets = [frozenset({"a"})] * 1000
+    pairs = detector._candidate_pairs(detector._band_keys(detector.signatures(sets)), np.ones(1000, dtype=bool))
+    assert len(pairs) < 2 * 1000
+    assert detector.cluster(texts) == [list(range(1000))]
+
+
+def test_news_store_query_dedupe(tmp_path):
+    now = datetime.now(tz=timezone.utc)
+    with NewsStore(str(tmp_path / "news.db")) as store:
+        for i, (source, title) in enumerate([
+            ("jin10", "美联储宣布维持联邦基金利率区间不变"),
+            ("bubbleseek", "【快讯】美联储宣布维持联邦基金利率区间不变！"),
+            ("jin10", "国际油价大幅上涨，布伦特原油突破90美元"),
+        ]):
+            store.save(NewsItem(source=source, category="macro", title=title, content=title, ticker="",
+                                published_at=now - timedelta(minutes=i), scraped_at=now, importance="high"))
+
+        assert len(store.query(hours_back=1)) == 3
+        deduped = store.query(hours_back=1, dedupe=True)
+        assert [item.source for item in deduped] == ["jin10", "jin10"]
+        assert len(store.query(hours_back=1, limit=1, dedupe=True)) == 1
@@ -0,0 +1,83 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from tradingagents.graph.reflection import Reflector
+
+
+class SlowLLM:
+    def __init__(self, delay=0.1, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, messages):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if self.fail_on and self.fail_on in messages[1][1]:
+                raise RuntimeError("LLM 超时")
+            return SimpleNamespace(content=f"lesson for {messages[1][1].split('Analysis/Decision: ')[1][:6]}")
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class FakeMemory:
+    embed_calls = 0
+
+    def __init__(self):
+        self.added = []
+
+    def embedding_key(self):
+        return ("fake", "m", False)
+
+    def get_embedding(self, text):
+        FakeMemory.embed_calls += 1
+        return [1.0, 0.0]
+
+    def add_situations(self, situations_and_advice, embeddings=None):
+        self.added.append((situations_and_advice, embeddings))
+
+
+def _state():
+    return {
+        "market_report": "m", "sentiment_report": "s", "news_report": "n", "fundamentals_report": "f",
+        "investment_debate_state": {"bull_history": "BULL-h", "bear_history": "BEAR-h", "judge_decision": "JUDGE1"},
+        "trader_investment_plan": "TRADER",
+        "risk_debate_state": {"judge_decision": "RISK-j"},
+    }
+
+
+def test_reflect_all_runs_concurrently_and_embeds_once():
+    FakeMemory.embed_calls = 0
+    llm = SlowLLM(delay=0.2)
+    memories = {name: FakeMemory() for name in ("bull", "bear", "trader", "invest_judge", "risk_manager")}
+
+    start = time.perf_counter()
+    status = Reflector(llm).reflect_all(_state(), 0.05, memories, max_workers=5)
+    elapsed = time.perf_counter() - start
+
+    assert all(item["status"] == "ok" for item in status.values())
+    assert llm.peak == 5 and elapsed < 0.6
+    assert FakeMemory.embed_calls == 1
+    (pairs, embeddings), = memories["trader"].added
+    assert pairs == [("m\n\ns\n\nn\n\nf", "lesson for TRADER")] and embeddings == [[1.0, 0.0]]
+
+
+def test_reflect_all_isolates_failures_and_bounds_workers():
+    llm = SlowLLM(delay=0.05, fail_on="BEAR-h")
+    memories = {name: FakeMemory() for name in ("bull", "bear", "trader", "invest_judge")}
+    memories["risk_manager"] = None
+
+    status = Reflector(llm).reflect_all(_state(), -0.02, memories, max_workers=2)
+
+    assert llm.peak <= 2
+    assert status["bear"]["status"] == "failed" and "LLM 超时" in status["bear"]["error"]
+    assert status["risk_manager"]["status"] == "skipped"
+    assert [status[n]["status"] for n in ("bull", "trader", "invest_judge")] == ["ok"] * 3
+    assert memories["bear"].added == [] and len(memories["bull"].added) == 1
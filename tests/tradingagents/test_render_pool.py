@@ -0,0 +1,225 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from tradingagents.utils import render_pool as render_pool_mod
+from tradingagents.utils.render_pool import RenderPool, RenderQueueFull, RenderTimeout, render_key
+
+
+class StubConverter:
+    """记录调用次数的模拟转换器，可用事件阻塞以控制渲染时长"""
+
+    def __init__(self, delay=0.0, gate=None):
+        self.calls = []
+        self.delay = delay
+        self.gate = gate
+        self._lock = threading.Lock()
+
+    def __call__(self, markdown):
+        with self._lock:
+            self.calls.append(markdown)
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.delay:
+            time.sleep(self.delay)
+        return f"rendered:{markdown}".encode("utf-8")
+
+
+def test_identical_exports_hit_cache():
+    pool = RenderPool(workers=2, queue_size=2)
+    convert = StubConverter()
+
+    assert pool.render("# 报告", "docx", convert) == "rendered:# 报告".encode("utf-8")
+    assert pool.render("# 报告", "docx", convert) == "rendered:# 报告".encode("utf-8")
+    pool.render("# 报告", "pdf", convert)
+    pool.render("# 报告", "docx", convert, namespace="web")
+    pool.render("# 报告 v2", "docx", convert)
+
+    assert len(convert.calls) == 4
+    assert pool.stats["hits"] == 1 and pool.stats["renders"] == 4
+    assert render_key("a", "docx") != render_key("a", "pdf") != render_key("a", "docx", "web")
+
+
+def test_concurrent_identical_exports_render_once():
+    pool = RenderPool(workers=2, queue_size=0)
+    gate = threading.Event()
+    convert = StubConverter(gate=gate)
+    results = []
+
+    def _export():
+        results.append(pool.render("same", "pdf", convert))
+
+    threads = [threading.Thread(target=_export) for _ in range(6)]
+    for t in threads:
+        t.start()
+    while pool.stats["coalesced"] < 5:
+        time.sleep(0.01)
+    gate.set()
+    for t in threads:
+        t.join()
+
+    assert convert.calls == ["same"]
+    assert results == [b"rendered:same"] * 6
+    assert pool.pending == 0
+
+
+def test_bounded_queue_rejects_overflow():
+    pool = RenderPool(workers=1, queue_size=1)
+    gate = threading.Event()
+    convert = StubConverter(gate=gate)
+
+    running = pool.submit("a", "docx", convert)
+    queued = pool.submit("b", "docx", convert)
+    with pytest.raises(RenderQueueFull):
+        pool.submit("c", "docx", convert)
+    # 与排队中的任务内容相同的请求不占用新的名额
+    assert pool.submit("b", "docx", convert) is queued
+
+    gate.set()
+    assert running.result(5) == b"rendered:a" and queued.result(5) == b"rendered:b"
+    assert pool.pending == 0
+    assert pool.render("c", "docx", convert) == b"rendered:c"
+    assert pool.stats["rejected"] == 1
+
+
+def test_timeout_keeps_rendering_and_fills_cache():
+    pool = RenderPool(workers=1, queue_size=0)
+    gate = threading.Event()
+    convert = StubConverter(gate=gate)
+
+    with pytest.raises(RenderTimeout):
+        pool.render("slow", "pdf", convert, timeout=0.05)
+    gate.set()
+    while pool.pending:
+        time.sleep(0.01)
+
+    assert pool.render("slow", "pdf", convert, timeout=0.05) == b"rendered:slow"
+    assert len(convert.calls) == 1
+    assert pool.stats["timeouts"] == 1
+
+
+def test_errors_are_not_cached():
+    pool = RenderPool(workers=1, queue_size=0)
+    attempts = []
+
+    def _flaky(markdown):
+        attempts.append(markdown)
+        if len(attempts) == 1:
+            raise RuntimeError("pandoc crashed")
+        return b"ok"
+
+    with pytest.raises(RuntimeError):
+        pool.render("x", "docx", _flaky)
+    assert pool.render("x", "docx", _flaky) == b"ok"
+    assert pool.stats["errors"] == 1
+
+    with pytest.raises(TypeError):
+        pool.render("y", "docx", lambda md: md)
+
+
+def test_cache_is_bounded_by_bytes():
+    pool = RenderPool(workers=1, queue_size=0, cache_bytes=100)
+    convert = StubConverter()
+    for i in range(10):
+        pool.render("x" * 30 + str(i), "docx", convert)
+    assert pool.cache.size <= 100 and len(pool.cache) == 2
+
+    pool.render("x" * 30 + "9", "docx", convert)
+    pool.render("x" * 30 + "0", "docx", convert)
+    assert len(convert.calls) == 11
+
+
+def test_async_render_does_not_block_loop_and_shields_shared_job():
+    pool = RenderPool(workers=2, queue_size=4)
+    convert = StubConverter(delay=0.2)
+
+    async def _main():
+        ticks = 0
+
+        async def _ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(_ticker())
+        with pytest.raises(RenderTimeout):
+            await pool.render_async("report", "docx", convert, timeout=0.05)
+        results = await asyncio.gather(*[pool.render_async("report", "docx", convert) for _ in range(5)])
+        ticker.cancel()
+        return ticks, results
+
+    ticks, results = asyncio.run(_main())
+    assert results == [b"rendered:report"] * 5
+    assert convert.calls == ["report"]
+    assert ticks >= 10
+
+
+def test_api_exporter_shares_pool_across_downloads(monkeypatch):
+    from app.utils.report_exporter import ReportExporter
+
+    pool = RenderPool(workers=2, queue_size=2)
+    monkeypatch.setattr(render_pool_mod, "_render_pool", pool)
+    exporter = ReportExporter()
+    exporter.pandoc_available = True
+    exporter.pdfkit_available = True
+    convert = StubConverter()
+    monkeypatch.setattr(exporter, "_render_docx", convert)
+    monkeypatch.setattr(exporter, "_render_pdf", convert)
+
+    doc = {"stock_symbol": "000001", "analysis_date": "2024-06-01", "summary": "摘要",
+           "reports": {"market_report": "行情分析"}}
+
+    async def _download():
+        return await asyncio.gather(
+            exporter.generate_report_async(doc, "docx"),
+            exporter.generate_report_async(doc, "docx"),
+            exporter.generate_report_async(doc, "pdf"),
+        )
+
+    docx_a, docx_b, pdf = asyncio.run(_download())
+    assert docx_a == docx_b and docx_a.startswith(b"rendered:")
+    assert exporter.generate_docx_report(doc) == docx_a
+    assert len(convert.calls) == 2
+
+    with pytest.raises(ValueError):
+        asyncio.run(exporter.generate_report_async(doc, "html"))
+
+
+def test_web_exporter_reuses_cache_across_generation_times(monkeypatch):
+    from datetime import datetime, timedelta
+
+    import web.utils.report_exporter as web_exporter_mod
+
+    class _Clock(datetime):
+        current = datetime(2024, 6, 1, 10, 0, 0)
+
+        @classmethod
+        def now(cls, tz=None):
+            cls.current += timedelta(seconds=5)
+            return cls.current
+
+    pool = RenderPool(workers=2, queue_size=2)
+    monkeypatch.setattr(render_pool_mod, "_render_pool", pool)
+    monkeypatch.setattr(web_exporter_mod, "get_render_pool", lambda: pool)
+    monkeypatch.setattr(web_exporter_mod, "datetime", _Clock)
+    exporter = web_exporter_mod.ReportExporter()
+    exporter.pandoc_available = True
+    convert = StubConverter()
+    monkeypatch.setattr(exporter, "_render_docx", convert)
+
+    results = {"stock_symbol": "000001", "decision": {"action": "buy", "confidence": 0.8},
+               "state": {"market_report": "行情分析"}, "analysts": ["market"]}
+    first = exporter.generate_docx_report(results)
+    # 相隔数秒再次导出：Markdown 中的生成时间不同，但报告内容相同
+    assert exporter.generate_markdown_report(results) != exporter.generate_markdown_report(results)
+    second = exporter.generate_docx_report(results)
+
+    assert first == second and len(convert.calls) == 1
+    assert "2024-06-01 10:00:05" in convert.calls[0]
+    assert pool.stats["hits"] == 1
+
+    exporter.generate_docx_report({**results, "state": {"market_report": "新的行情分析"}})
+    assert len(convert.calls) == 2
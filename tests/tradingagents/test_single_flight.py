@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from tradingagents.utils.single_flight import (
+    AsyncSingleFlight,
+    SingleFlight,
+    async_single_flight,
+    make_flight_key,
+)
+
+
+def test_concurrent_identical_sync_calls_execute_once():
+    group = SingleFlight("test")
+    calls = []
+    start = threading.Barrier(8)
+
+    def _fetch(symbol):
+        calls.append(symbol)
+        time.sleep(0.1)
+        return f"data-{symbol}"
+
+    results = []
+
+    def _worker():
+        start.wait()
+        results.append(group.do(make_flight_key("get_stock_data", "000001"), _fetch, "000001"))
+
+    threads = [threading.Thread(target=_worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == ["000001"]
+    assert results == ["data-000001"] * 8
+    assert group.stats == {"executions": 1, "coalesced": 7}
+
+    # 完成后再次调用会重新执行
+    group.do(make_flight_key("get_stock_data", "000001"), _fetch, "000001")
+    assert len(calls) == 2
+
+
+def test_sync_waiters_receive_leader_exception():
+    group = SingleFlight("test")
+    started = threading.Event()
+
+    def _fail():
+        started.set()
+        time.sleep(0.05)
+        raise ConnectionError("upstream down")
+
+    errors = []
+
+    def _waiter():
+        started.wait()
+        try:
+            group.do("k", lambda: "unused")
+        except ConnectionError as e:
+            errors.append(e)
+
+    t = threading.Thread(target=_waiter)
+    t.start()
+    with pytest.raises(ConnectionError):
+        group.do("k", _fail)
+    t.join()
+    assert len(errors) == 1
+
+
+def test_async_decorator_coalesces_across_instances():
+    group = AsyncSingleFlight("test")
+    calls = []
+
+    class _Service:
+        @async_single_flight(group, "quote")
+        async def get_quote(self, market, code, force_refresh=False):
+            calls.append((market, code))
+            await asyncio.sleep(0.05)
+            return {"code": code}
+
+    async def _run():
+        results = await asyncio.gather(
+            *[_Service().get_quote("HK", "00700") for _ in range(5)],
+            _Service().get_quote("US", "AAPL"),
+        )
+        assert results[:5] == [{"code": "00700"}] * 5
+        assert results[5] == {"code": "AAPL"}
+
+    asyncio.run(_run())
+    assert sorted(calls) == [("HK", "00700"), ("US", "AAPL")]
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store = {}
+        self.lock = threading.Lock()
+
+    def set(self, key, value, nx=False, px=None):
+        with self.lock:
+            if nx and key in self.store:
+                return None
+            self.store[key] = value
+            return True
+
+    def exists(self, key):
+        return key in self.store
+
+    def eval(self, script, numkeys, key, token):
+        with self.lock:
+            if self.store.get(key) == token:
+                del self.store[key]
+
+
+def test_redis_gate_serializes_across_groups():
+    redis = _FakeRedis()
+    # 两个组模拟两个进程
+    first = SingleFlight("p1", redis_client_getter=lambda: redis)
+    second = SingleFlight("p2", redis_client_getter=lambda: redis)
+    cache = {}
+    upstream = []
+
+    def _fetch():
+        if "v" in cache:
+            return cache["v"]
+        upstream.append(1)
+        time.sleep(0.1)
+        cache["v"] = "value"
+        return cache["v"]
+
+    out = []
+    t = threading.Thread(target=lambda: out.append(first.do("k", _fetch)))
+    t.start()
+    time.sleep(0.02)
+    out.append(second.do("k", _fetch))
+    t.join()
+
+    assert out == ["value", "value"]
+    assert upstream == [1]
+    assert redis.store == {}
@@ -0,0 +1,78 @@
+import threading
+import time
+
+from langchain_core.tools import tool
+
+from tradingagents.utils.tool_memo import ToolMemo, activate_tool_memo, memoize_tool
+
+
+def test_memo_is_run_scoped_and_normalizes_args():
+    calls = []
+
+    @memoize_tool("market")
+    def get_market(ticker, start_date, end_date=None):
+        calls.append(ticker)
+        return f"data-{ticker}"
+
+    # 没有活动 memo 时不缓存
+    get_market("000001", "2025-01-02")
+    get_market("000001", "2025-01-02")
+    assert len(calls) == 2
+
+    memo = ToolMemo()
+    with activate_tool_memo(memo):
+        assert get_market("000001", "2025-01-02") == "data-000001"
+        # 关键字参数、默认值、空格与大小写差异视为同一调用
+        assert get_market(ticker=" 000001 ", start_date="2025-01-02", end_date=None) == "data-000001"
+        get_market("aapl", "2025-01-02")
+        get_market("AAPL", "2025-01-02")
+    assert len(calls) == 4
+    assert memo.stats["hits"] == 2 and memo.stats["misses"] == 2
+
+    # 新的运行不复用上一次的结果
+    with activate_tool_memo(ToolMemo()):
+        get_market("000001", "2025-01-02")
+    assert len(calls) == 5
+
+
+def test_errors_are_not_memoized():
+    results = iter(["❌ 数据源不可用", "ok"])
+
+    @memoize_tool("news")
+    def get_news(ticker):
+        return next(results)
+
+    with activate_tool_memo(ToolMemo()):
+        assert get_news("000001").startswith("❌")
+        assert get_news("000001") == "ok"
+        assert get_news("000001") == "ok"
+
+
+def test_prefetch_shares_in_flight_result_and_reports_savings():
+    calls = []
+
+    @tool
+    @memoize_tool("get_stock_market_data_unified")
+    def market_tool(ticker: str, start_date: str, end_date: str) -> str:
+        """市场数据"""
+        calls.append(ticker)
+        time.sleep(0.2)
+        return "bars"
+
+    memo = ToolMemo()
+    with activate_tool_memo(memo):
+        prefetch = threading.Thread(target=memo.prefetch, args=([
+            ("market", market_tool.func, {"ticker": "000001", "start_date": "2025-01-02", "end_date": "2025-01-02"}),
+        ],))
+        prefetch.start()
+        time.sleep(0.05)
+        # 分析师在预取进行中调用同一工具：等待预取结果而不是重复取数
+        assert market_tool.invoke({"ticker": "000001", "start_date": "2025-01-02", "end_date": "2025-01-02"}) == "bars"
+        prefetch.join()
+        market_tool.invoke({"ticker": "000001", "start_date": "2025-01-02", "end_date": "2025-01-02"})
+
+    assert calls == ["000001"]
+    summary = memo.summary()
+    assert summary["prefetched"] == 1
+    assert summary["by_tool"]["get_stock_market_data_unified"]["hits"] == 2
+    assert summary["saved_seconds"] > 0.2
@@ -0,0 +1,66 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from tradingagents.tools.analysis.incremental import DEFAULT_SPECS, IncrementalIndicatorEngine
+from tradingagents.tools.analysis.indicators import IndicatorSpec, compute_many, rsi
+
+
+def make_ohlc(n=300, seed=7):
+    rng = np.random.default_rng(seed)
+    close = pd.Series(np.cumsum(rng.normal(0, 1, n)) + 100)
+    high = close + rng.uniform(0, 2, n)
+    low = close - rng.uniform(0, 2, n)
+    # 缺失值、停牌（价格不变）与一字板
+    high.iloc[[5, n // 4]] = np.nan
+    close.iloc[n // 3] = np.nan
+    flat = slice(n // 2, n // 2 + 8)
+    close.iloc[flat] = 10.0
+    high.iloc[flat] = 10.0
+    low.iloc[flat] = 10.0
+    return pd.DataFrame({'open': close, 'high': high, 'low': low, 'close': close})
+
+
+def assert_same(actual, expected, label):
+    np.testing.assert_array_equal(np.asarray(actual, dtype=float), np.asarray(expected, dtype=float), err_msg=label)
+
+
+def test_bar_by_bar_replay_matches_batch():
+    specs = DEFAULT_SPECS + [IndicatorSpec('ma', {'n': 60}), IndicatorSpec('boll', {'n': 1})]
+    for seed in range(3):
+        df = make_ohlc(seed=seed)
+        batch = compute_many(df, specs)
+
+        engine = IncrementalIndicatorEngine(specs)
+        rows = []
+        for i, bar in enumerate(df.to_dict('records')):
+            # 中途序列化/反序列化，模拟随K线缓存保存后继续追加
+            if i % 97 == 0:
+                engine = IncrementalIndicatorEngine.from_json(engine.to_json())
+            rows.append(engine.update(bar))
+        replay = pd.DataFrame(rows)
+
+        assert engine.bars == len(df)
+        for col in replay.columns:
+            assert_same(replay[col], batch[col], f"seed={seed} {col}")
+
+
+def test_rsi_methods_match_batch():
+    df = make_ohlc(200)
+    for method in ('ema', 'sma', 'china'):
+        engine = IncrementalIndicatorEngine([IndicatorSpec('rsi', {'n': 6, 'method': method})])
+        assert_same(engine.update_many(df)['rsi6'], rsi(df['close'], 6, method=method), method)
+
+
+def test_state_is_json_serializable_and_resumes():
+    df = make_ohlc(120)
+    history, new_bars = df.iloc[:100], df.iloc[100:]
+    state = IncrementalIndicatorEngine.from_history(history).to_dict()
+
+    restored = IncrementalIndicatorEngine.from_dict(json.loads(json.dumps(state, allow_nan=False)))
+    appended = restored.update_many(new_bars)
+
+    batch = compute_many(df, DEFAULT_SPECS).iloc[100:]
+    for col in appended.columns:
+        assert_same(appended[col], batch[col], col)
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+from tradingagents.tools.analysis.indicators import (
+    IndicatorSpec,
+    compute_many,
+    compute_panel,
+    kdj,
+)
+
+
+SPECS = [
+    IndicatorSpec('ma', {'n': 5}),
+    IndicatorSpec('ema', {'n': 12}),
+    IndicatorSpec('macd'),
+    IndicatorSpec('rsi', {'n': 14}),
+    IndicatorSpec('boll', {'n': 20, 'k': 2}),
+    IndicatorSpec('atr', {'n': 14}),
+    IndicatorSpec('kdj', {'n': 9, 'm1': 3, 'm2': 3}),
+]
+
+
+def make_ohlc(n=300, seed=7):
+    rng = np.random.default_rng(seed)
+    close = pd.Series(np.cumsum(rng.normal(0, 1, n)) + 100)
+    high = close + rng.uniform(0, 2, n)
+    low = close - rng.uniform(0, 2, n)
+    # 缺失值与一字板（最高=最低，RSV 除零）
+    high.iloc[[5, n // 4]] = np.nan
+    close.iloc[n // 3] = np.nan
+    flat = slice(n // 2, n // 2 + 5)
+    high.iloc[flat] = close.iloc[flat]
+    low.iloc[flat] = close.iloc[flat]
+    return pd.DataFrame({'open': close, 'high': high, 'low': low, 'close': close})
+
+
+def legacy_kdj(high, low, close, n=9, m1=3, m2=3):
+    """原逐元素循环实现，作为数值基准"""
+    lowest_low = low.rolling(window=n, min_periods=n).min()
+    highest_high = high.rolling(window=n, min_periods=n).max()
+    rsv = ((close - lowest_low) / (highest_high - lowest_low) * 100).replace([np.inf, -np.inf], np.nan)
+    k = pd.Series(np.nan, index=close.index)
+    d = pd.Series(np.nan, index=close.index)
+    alpha_k, alpha_d = 1 / float(m1), 1 / float(m2)
+    last_k = last_d = 50.0
+    for i in range(len(close)):
+        rv = rsv.iloc[i]
+        if np.isnan(rv):
+            continue
+        curr_k = (1 - alpha_k) * last_k + alpha_k * rv
+        curr_d = (1 - alpha_d) * last_d + alpha_d * curr_k
+        k.iloc[i], d.iloc[i] = curr_k, curr_d
+        last_k, last_d = curr_k, curr_d
+    return k, d, 3 * k - 2 * d
+
+
+def test_vectorized_kdj_is_bitwise_identical():
+    df = make_ohlc()
+    for m1, m2 in [(3, 3), (5, 2)]:
+        out = kdj(df['high'], df['low'], df['close'], n=9, m1=m1, m2=m2)
+        k, d, j = legacy_kdj(df['high'], df['low'], df['close'], n=9, m1=m1, m2=m2)
+        np.testing.assert_array_equal(out['kdj_k'].to_numpy(), k.to_numpy())
+        np.testing.assert_array_equal(out['kdj_d'].to_numpy(), d.to_numpy())
+        np.testing.assert_array_equal(out['kdj_j'].to_numpy(), j.to_numpy())
+
+
+def test_compute_many_matches_single_indicator_path():
+    df = make_ohlc()
+    out = compute_many(df, SPECS)
+    k, d, j = legacy_kdj(df['high'], df['low'], df['close'])
+    np.testing.assert_array_equal(out['kdj_k'].to_numpy(), k.to_numpy())
+    # MACD 复用 EMA 缓存后结果不变
+    ema12 = df['close'].ewm(span=12, adjust=False).mean()
+    ema26 = df['close'].ewm(span=26, adjust=False).mean()
+    np.testing.assert_array_equal(out['dif'].to_numpy(), (ema12 - ema26).to_numpy())
+    np.testing.assert_array_equal(out['ema12'].to_numpy(), ema12.to_numpy())
+    # 输入未被修改
+    assert 'kdj_k' not in df.columns
+
+
+def test_panel_matches_per_symbol_results():
+    frames = {f"{i:06d}": make_ohlc(n=120, seed=i) for i in range(6)}
+    close = pd.DataFrame({c: f['close'] for c, f in frames.items()})
+    high = pd.DataFrame({c: f['high'] for c, f in frames.items()})
+    low = pd.DataFrame({c: f['low'] for c, f in frames.items()})
+
+    panel = compute_panel(close, SPECS, high=high, low=low)
+    for code, frame in frames.items():
+        single = compute_many(frame, SPECS)
+        for col, wide in panel.items():
+            np.testing.assert_array_equal(wide[code].to_numpy(), single[col].to_numpy(), err_msg=f"{code} {col}")
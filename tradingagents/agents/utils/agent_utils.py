@@ -17,6 +17,7 @@ from langchain_core.messages import HumanMessage
 # 导入统一日志系统和工具日志装饰器
 from tradingagents.utils.logging_init import get_logger
 from tradingagents.utils.tool_logging import log_tool_call, log_analysis_step
+from tradingagents.utils.tool_memo import memoize_tool
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
@@ -691,6 +692,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool("get_stock_fundamentals_unified")
     @log_tool_call(tool_name="get_stock_fundamentals_unified", log_args=True)
     def get_stock_fundamentals_unified(
         ticker: Annotated[str, "股票代码（支持A股、港股、美股）"],
@@ -1040,6 +1042,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool("get_stock_market_data_unified")
     @log_tool_call(tool_name="get_stock_market_data_unified", log_args=True)
     def get_stock_market_data_unified(
         ticker: Annotated[str, "股票代码（支持A股、港股、美股）"],
@@ -1152,6 +1155,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool("get_stock_news_unified")
     @log_tool_call(tool_name="get_stock_news_unified", log_args=True)
     def get_stock_news_unified(
         ticker: Annotated[str, "股票代码（支持A股、港股、美股）"],
@@ -1286,6 +1290,7 @@ class Toolkit:
 
     @staticmethod
     @tool
+    @memoize_tool("get_stock_sentiment_unified")
     @log_tool_call(tool_name="get_stock_sentiment_unified", log_args=True)
     def get_stock_sentiment_unified(
         ticker: Annotated[str, "股票代码（支持A股、港股、美股）"],
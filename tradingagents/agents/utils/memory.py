@@ -556,13 +556,23 @@ class FinancialSituationMemory:
         """获取最后处理的文本信息"""
         return getattr(self, '_last_text_info', None)
 
-    def add_situations(self, situations_and_advice):
-        """Add financial situations and their corresponding advice. Parameter is a list of tuples (situation, rec)"""
+    def embedding_key(self):
+        """嵌入模型标识：标识相同的记忆库对同一文本得到相同向量，可共享一次向量化结果"""
+        return (self.llm_provider, getattr(self, 'embedding', None), self.client == "DISABLED")
+
+    def add_situations(self, situations_and_advice, embeddings=None):
+        """Add financial situations and their corresponding advice. Parameter is a list of tuples (situation, rec)
+
+        embeddings: 可选，与 situations_and_advice 一一对应的已计算向量（批量写回时复用，避免重复调用嵌入接口）
+        """
 
         situations = []
         advice = []
         ids = []
-        embeddings = []
+        if embeddings is None:
+            embeddings = [self.get_embedding(situation) for situation, _ in situations_and_advice]
+        elif len(embeddings) != len(situations_and_advice):
+            raise ValueError("embeddings 数量与 situations_and_advice 不一致")
 
         offset = self.situation_collection.count()
 
@@ -570,7 +580,6 @@ class FinancialSituationMemory:
             situations.append(situation)
             advice.append(recommendation)
             ids.append(str(offset + i))
-            embeddings.append(self.get_embedding(situation))
 
         self.situation_collection.add(
             documents=situations,
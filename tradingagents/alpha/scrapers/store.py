@@ -9,6 +9,8 @@ from dataclasses import asdict, dataclass, field
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+from tradingagents.utils.news_dedup import deduplicate_near_duplicates
+
 logger = logging.getLogger(__name__)
 
 _DEFAULT_DB_DIR = Path.home() / ".tradingagents"
@@ -117,12 +119,16 @@ class NewsStore:
         limit: int = 50,
         *,
         filter_ticker: bool = False,
+        dedupe: bool = False,
     ) -> list[NewsItem]:
         """Filter news items by ticker, source, and recency.
 
         When filter_ticker is True, the ticker value is used as an exact
         match (including empty string for macro-only news).
         When False (default), an empty ticker skips the filter.
+        When dedupe is True, near-duplicate reposts (same story from
+        different sources, reworded titles) are collapsed to the newest
+        item of each cluster.
         """
         cutoff = (
             datetime.now(tz=timezone.utc) - timedelta(hours=hours_back)
@@ -139,7 +145,8 @@ class NewsStore:
             params.append(source)
 
         where = " AND ".join(clauses)
-        params.append(limit)
+        # Over-fetch when deduplicating so the result still fills `limit`.
+        params.append(limit * 3 if dedupe else limit)
 
         cur = self._conn.cursor()
         cur.execute(
@@ -147,7 +154,13 @@ class NewsStore:
             "ORDER BY published_at DESC LIMIT ?",
             params,
         )
-        return [self._row_to_item(row) for row in cur.fetchall()]
+        items = [self._row_to_item(row) for row in cur.fetchall()]
+        if dedupe:
+            items, _ = deduplicate_near_duplicates(
+                items, lambda item: item.title or item.content,
+            )
+            items = items[:limit]
+        return items
 
     def query_macro(self, hours_back: int = 24) -> list[NewsItem]:
         """Shortcut to query macro news (items with empty ticker)."""
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+数据源优先级配置快照（进程级）
+
+数据源优先级保存在 system_configs.data_source_configs 中。此前每次取数都会
+find_one 一次，这里改为进程内缓存一份快照：
+
+- 首次使用时加载；之后最多每 TA_DS_PRIORITY_POLL_SECONDS 秒（默认30秒）
+  用一次仅含版本戳的轻量查询检查 (_id, version, updated_at) 是否变化，变化才重新加载
+- 后端保存配置后调用 notify_data_source_config_changed()：本进程立即失效，
+  并通过 Redis 频道通知其他进程（Redis 不可用时依赖版本戳轮询）
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from tradingagents.utils.logging_manager import get_logger
+
+logger = get_logger('agents')
+
+# 配置变更通知频道
+DATA_SOURCE_CONFIG_CHANNEL = "tradingagents:config:data_source_changed"
+
+DEFAULT_POLL_SECONDS = 30.0
+
+
+def _default_db_getter():
+    """优先使用后端的同步 MongoDB 连接，不可用时回退到 TradingAgents 自身的连接"""
+    try:
+        from app.core.database import get_mongo_db_sync
+        return get_mongo_db_sync()
+    except ImportError:
+        from tradingagents.config.database_manager import get_database_manager
+        return get_database_manager().get_mongodb_db()
+
+
+class DataSourcePriorityConfig:
+    """system_configs 中数据源配置的进程级快照"""
+
+    def __init__(self, db_getter: Optional[Callable[[], Any]] = None, poll_interval: Optional[float] = None):
+        self._db_getter = db_getter or _default_db_getter
+        if poll_interval is None:
+            try:
+                poll_interval = float(os.getenv("TA_DS_PRIORITY_POLL_SECONDS", DEFAULT_POLL_SECONDS))
+            except ValueError:
+                poll_interval = DEFAULT_POLL_SECONDS
+        self.poll_interval = max(0.0, poll_interval)
+
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._configs: Optional[List[Dict[str, Any]]] = None
+        self._stamp = None
+        self._checked_at: Optional[float] = None
+        self._priority_cache: Dict[Optional[str], List[str]] = {}
+        self._listener_started = False
+
+        self.stats = {"loads": 0, "stamp_checks": 0, "invalidations": 0}
+
+    def invalidate(self) -> None:
+        """使快照失效，下次访问时重新检查版本戳"""
+        with self._lock:
+            self._checked_at = None
+            self.stats["invalidations"] += 1
+
+    def get_data_source_configs(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        获取当前激活配置中的 data_source_configs
+
+        Returns:
+            配置列表；数据库中没有配置时返回空列表；读取失败且从未加载成功时返回 None
+        """
+        self._refresh_if_needed()
+        return self._configs
+
+    def get_priority(self, market_category: Optional[str] = None) -> List[str]:
+        """
+        获取某市场已启用数据源的类型列表（小写），按优先级从高到低排序
+
+        Args:
+            market_category: 市场分类（a_shares/us_stocks/hk_stocks），None 表示不过滤
+
+        Returns:
+            数据源类型列表；没有可用配置时返回空列表（由调用方决定默认顺序）
+        """
+        self._refresh_if_needed()
+        cached = self._priority_cache.get(market_category)
+        if cached is not None:
+            return list(cached)
+
+        enabled = []
+        for ds in self._configs or []:
+            if not ds.get('enabled', True):
+                continue
+            categories = ds.get('market_categories', [])
+            if categories and market_category and market_category not in categories:
+                continue
+            enabled.append(ds)
+
+        # 按优先级排序（数字越大优先级越高）
+        enabled.sort(key=lambda x: x.get('priority', 0), reverse=True)
+        result = [ds.get('type', '').lower() for ds in enabled if ds.get('type')]
+        self._priority_cache[market_category] = result
+        return list(result)
+
+    def _is_fresh(self) -> bool:
+        checked_at = self._checked_at
+        return checked_at is not None and time.monotonic() - checked_at < self.poll_interval
+
+    def _refresh_if_needed(self) -> None:
+        if self._is_fresh():
+            return
+
+        with self._lock:
+            if self._is_fresh():
+                return
+            try:
+                db = self._db_getter()
+                if db is None:
+                    raise RuntimeError("MongoDB不可用")
+                collection = db.system_configs
+
+                self.stats["stamp_checks"] += 1
+                stamp_doc = collection.find_one(
+                    {"is_active": True},
+                    {"_id": 1, "version": 1, "updated_at": 1},
+                    sort=[("version", -1)]
+                )
+                stamp = (
+                    (stamp_doc.get("_id"), stamp_doc.get("version"), stamp_doc.get("updated_at"))
+                    if stamp_doc else None
+                )
+
+                if not self._loaded or stamp != self._stamp:
+                    configs: List[Dict[str, Any]] = []
+                    if stamp_doc:
+                        full = collection.find_one({"_id": stamp_doc["_id"]}, {"data_source_configs": 1})
+                        configs = list((full or {}).get("data_source_configs") or [])
+                    self._configs = configs
+                    self._stamp = stamp
+                    self._priority_cache = {}
+                    self._loaded = True
+                    self.stats["loads"] += 1
+                    logger.info(f"📊 [数据源优先级] 已加载配置快照: 版本={stamp[1] if stamp else None}, 数据源={len(configs)}个")
+            except Exception as e:
+                # 读取失败时保留旧快照；若从未加载成功，调用方使用默认顺序
+                logger.warning(f"⚠️ [数据源优先级] 读取配置失败: {e}")
+            finally:
+                # 无论成功与否都按轮询间隔退避，避免数据库不可用时每次请求都重试
+                self._checked_at = time.monotonic()
+
+        self._start_listener()
+
+    def _start_listener(self) -> None:
+        """订阅 Redis 配置变更通知（最佳努力，失败时仅依赖轮询）"""
+        if self._listener_started:
+            return
+        self._listener_started = True
+        try:
+            from tradingagents.config.database_manager import get_redis_client
+            client = get_redis_client()
+        except Exception:
+            client = None
+        if client is None:
+            return
+
+        def _listen():
+            try:
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(DATA_SOURCE_CONFIG_CHANNEL)
+                for message in pubsub.listen():
+                    if message and message.get("type") == "message":
+                        logger.info("📊 [数据源优先级] 收到配置变更通知，快照已失效")
+                        self.invalidate()
+            except Exception as e:
+                logger.debug(f"数据源配置变更订阅结束: {e}")
+
+        threading.Thread(target=_listen, name="ds-priority-listener", daemon=True).start()
+
+
+# 全局实例
+_priority_config: Optional[DataSourcePriorityConfig] = None
+_priority_config_lock = threading.Lock()
+
+
+def get_data_source_priority_config() -> DataSourcePriorityConfig:
+    """获取进程级数据源优先级快照"""
+    global _priority_config
+    if _priority_config is None:
+        with _priority_config_lock:
+            if _priority_config is None:
+                _priority_config = DataSourcePriorityConfig()
+    return _priority_config
+
+
+def notify_data_source_config_changed(redis_client=None) -> None:
+    """
+    配置保存后调用：使本进程快照失效，并尽力广播给其他进程
+
+    Args:
+        redis_client: 可选的同步 Redis 客户端；异步场景请自行 publish 到 DATA_SOURCE_CONFIG_CHANNEL
+    """
+    get_data_source_priority_config().invalidate()
+    if redis_client is None:
+        return
+    try:
+        redis_client.publish(DATA_SOURCE_CONFIG_CHANNEL, str(time.time()))
+    except Exception as e:
+        logger.debug(f"发布数据源配置变更通知失败: {e}")
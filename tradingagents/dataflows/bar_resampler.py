@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+由日线派生周线、月线等周期K线
+
+周/月线完全由同一复权口径的日线决定，无需再向数据源单独请求：
+
+- 开盘 = 周期内首个交易日开盘，收盘 = 最后一个交易日收盘，最高/最低取极值，
+  成交量、成交额、换手率求和
+- 前收盘 = 上一周期收盘（首个周期取首日 pre_close），涨跌额、涨跌幅据此计算
+- K线日期为周期内最后一个有数据的交易日（与 Tushare/BaoStock 一致）；
+  按交易日历判断周期是否已经结束（is_complete），节假日调休不影响周期边界
+- 支持多只股票的长表一次计算：按 (股票, 周期) 分组后用 ufunc.reduceat 聚合，没有逐行循环
+- 日线带 adj_factor 列时可按 qfq/hfq 先复权再聚合；库中日线已是前复权时不需要
+
+增量更新：incremental_start() 给出需要重新读取日线的起始日（上一周期的第一天），
+重新计算最后一根（可能未走完的）K线并补上新周期，前一周期只用作前收盘。
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from tradingagents.dataflows.trading_calendar import DateLike, TradingCalendar, get_trading_calendar, to_day, to_days
+from tradingagents.utils.logging_manager import get_logger
+
+logger = get_logger('agents')
+
+PERIODS = ("weekly", "monthly", "quarterly", "yearly")
+
+_PRICE_COLUMNS = ["open", "high", "low", "close"]
+_SUM_COLUMNS = ["volume", "amount", "turnover_rate"]
+_ALIASES = {"date": "trade_date", "vol": "volume", "turnover": "amount", "turn": "turnover_rate",
+            "preclose": "pre_close", "code": "symbol"}
+
+
+def period_keys(days, period: str) -> np.ndarray:
+    """每个日期所属周期的整数键（周以周一为起点）"""
+    d = to_days(days)
+    if period == "weekly":
+        # 1970-01-01 是周四，+3 后整除 7 即以周一为界
+        return (d.astype(np.int64) + 3) // 7
+    if period == "monthly":
+        return d.astype("datetime64[M]").astype(np.int64)
+    if period == "quarterly":
+        return d.astype("datetime64[M]").astype(np.int64) // 3
+    if period == "yearly":
+        return d.astype("datetime64[Y]").astype(np.int64)
+    raise ValueError(f"不支持的周期: {period}")
+
+
+def period_start(day: DateLike, period: str) -> np.datetime64:
+    """日期所在周期的第一个自然日"""
+    key = int(period_keys([to_day(day)], period)[0])
+    if period == "weekly":
+        return np.datetime64(key * 7 - 3, "D")
+    if period == "monthly":
+        return np.datetime64(key, "M").astype("datetime64[D]")
+    if period == "quarterly":
+        return np.datetime64(key * 3, "M").astype("datetime64[D]")
+    return np.datetime64(key, "Y").astype("datetime64[D]")
+
+
+def incremental_start(last_bar_date: DateLike, period: str) -> str:
+    """增量派生需要读取的日线起始日：最后一根K线的上一个周期的第一天"""
+    return str(period_start(period_start(last_bar_date, period) - 1, period))
+
+
+def _normalize(daily: pd.DataFrame) -> pd.DataFrame:
+    df = daily.rename(columns={k: v for k, v in _ALIASES.items() if k in daily.columns and v not in daily.columns})
+    if "trade_date" not in df.columns:
+        if isinstance(df.index, pd.DatetimeIndex):
+            df = df.rename_axis("trade_date").reset_index()
+        else:
+            raise ValueError("日线数据缺少日期列（trade_date/date）")
+    missing = [c for c in _PRICE_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"日线数据缺少列: {missing}")
+    df = df[df["close"].notna()]
+    # BaoStock 日线包含停牌日（tradestatus=0，价格为前收盘），不计入周期K线
+    if "tradestatus" in df.columns:
+        df = df[pd.to_numeric(df["tradestatus"], errors="coerce").fillna(1) != 0]
+    return df
+
+
+def _adjust(df: pd.DataFrame, codes: np.ndarray, adjust: str) -> Dict[str, np.ndarray]:
+    if "adj_factor" not in df.columns:
+        raise ValueError("按 qfq/hfq 复权需要 adj_factor 列")
+    factor = df["adj_factor"].to_numpy(dtype=float)
+    if adjust == "qfq":
+        # 前复权以每只股票最新一日的复权因子为基准（已按股票、日期升序）
+        last_row = np.flatnonzero(np.r_[codes[1:] != codes[:-1], True])
+        group = np.cumsum(np.r_[0, codes[1:] != codes[:-1]])
+        factor = factor / factor[last_row][group]
+    elif adjust != "hfq":
+        raise ValueError(f"不支持的复权方式: {adjust}")
+    columns = _PRICE_COLUMNS + (["pre_close"] if "pre_close" in df.columns else [])
+    return {c: df[c].to_numpy(dtype=float) * factor for c in columns}
+
+
+def resample_bars(
+    daily: pd.DataFrame,
+    period: str,
+    calendar: Optional[TradingCalendar] = None,
+    as_of: Optional[DateLike] = None,
+    adjust: Optional[str] = None,
+    market: str = "CN",
+) -> pd.DataFrame:
+    """
+    由日线派生周期K线
+
+    Args:
+        daily: 日线，列 trade_date/open/high/low/close/volume/amount，可选 pre_close、
+               turnover_rate、adj_factor、tradestatus；含 symbol 列时按股票分组
+        period: weekly/monthly/quarterly/yearly
+        calendar: 交易日历，默认取本地缓存的 market 日历
+        as_of: 日线已同步到的日期，默认为数据中的最大日期；用于判断周期是否走完
+        adjust: None（日线已复权）/qfq/hfq（需要 adj_factor 列）
+
+    Returns:
+        每个周期一行：[symbol], trade_date, open, high, low, close, pre_close, change,
+        pct_chg, volume, amount, [turnover_rate], trade_days, period_end, is_complete
+    """
+    if period not in PERIODS:
+        raise ValueError(f"不支持的周期: {period}")
+    df = _normalize(daily)
+    has_symbol = "symbol" in df.columns
+    empty_columns = (["symbol"] if has_symbol else []) + [
+        "trade_date", "open", "high", "low", "close", "pre_close", "change", "pct_chg",
+        "volume", "amount", "trade_days", "period_end", "is_complete"]
+    if df.empty:
+        return pd.DataFrame(columns=empty_columns)
+
+    days = to_days(df["trade_date"])
+    if has_symbol:
+        codes, symbols = pd.factorize(df["symbol"].astype(str))
+    else:
+        codes, symbols = np.zeros(len(df), dtype=np.int64), pd.Index([None])
+    order = np.lexsort((days, codes))
+    df, days, codes = df.iloc[order], days[order], codes[order]
+
+    # 同一股票同一日重复的记录只保留最后一条
+    dup = np.r_[(codes[1:] == codes[:-1]) & (days[1:] == days[:-1]), False]
+    if dup.any():
+        df, days, codes = df[~dup], days[~dup], codes[~dup]
+
+    prices = _adjust(df, codes, adjust) if adjust else {
+        c: df[c].to_numpy(dtype=float) for c in _PRICE_COLUMNS + (["pre_close"] if "pre_close" in df.columns else [])}
+
+    keys = period_keys(days, period)
+    boundary = np.r_[True, (codes[1:] != codes[:-1]) | (keys[1:] != keys[:-1])]
+    starts = np.flatnonzero(boundary)
+    ends = np.r_[starts[1:], len(days)] - 1
+    bar_codes = codes[starts]
+
+    bars = {
+        "trade_date": np.datetime_as_string(days[ends]),
+        "open": prices["open"][starts],
+        "high": np.fmax.reduceat(prices["high"], starts),
+        "low": np.fmin.reduceat(prices["low"], starts),
+        "close": prices["close"][ends],
+    }
+    # 前收盘：同一股票的上一周期收盘；每只股票的首个周期取首日 pre_close
+    first_of_symbol = np.r_[True, bar_codes[1:] != bar_codes[:-1]]
+    pre_close = np.r_[np.nan, bars["close"][:-1]]
+    pre_close[first_of_symbol] = prices["pre_close"][starts[first_of_symbol]] if "pre_close" in prices else np.nan
+    bars["pre_close"] = pre_close
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bars["change"] = bars["close"] - pre_close
+        bars["pct_chg"] = np.where(pre_close > 0, bars["change"] / pre_close * 100, np.nan)
+    for column in _SUM_COLUMNS:
+        if column in df.columns:
+            values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float)
+            bars[column] = np.add.reduceat(np.nan_to_num(values), starts)
+    bars["trade_days"] = ends - starts + 1
+
+    # 周期边界以交易日历为准：周期内最后一个交易日（节假日前一日）
+    calendar = calendar or get_trading_calendar(market)
+    cal_keys = period_keys(calendar.days, period)
+    last_pos = np.searchsorted(cal_keys, keys[starts], "right") - 1
+    in_calendar = (last_pos >= 0) & (cal_keys[np.maximum(last_pos, 0)] == keys[starts])
+    period_end = np.where(in_calendar, calendar.days[np.maximum(last_pos, 0)], days[ends])
+    as_of_day = to_day(as_of) if as_of is not None else days.max()
+    bars["period_end"] = np.datetime_as_string(period_end)
+    bars["is_complete"] = period_end <= as_of_day
+
+    result = pd.DataFrame(bars)
+    if has_symbol:
+        result.insert(0, "symbol", np.asarray(symbols, dtype=object)[bar_codes])
+    return result
+
+
+def compare_bars(
+    derived: pd.DataFrame,
+    reference: pd.DataFrame,
+    price_tol: float = 0.011,
+    volume_rtol: float = 1e-4,
+) -> Dict:
+    """
+    派生K线与数据源K线逐根比对（价格按绝对误差，量额按相对误差）
+
+    Returns:
+        {"compared", "matched", "missing_in_derived", "missing_in_reference", "mismatches"}，
+        mismatches 为不一致的K线及各字段差值
+    """
+    on = ["symbol", "trade_date"] if "symbol" in derived.columns and "symbol" in reference.columns else ["trade_date"]
+    ref = _normalize(reference).copy()
+    ref["trade_date"] = np.datetime_as_string(to_days(ref["trade_date"]))
+    merged = derived.merge(ref, on=on, how="outer", suffixes=("", "_ref"), indicator=True)
+    both = merged[merged["_merge"] == "both"]
+
+    bad = np.zeros(len(both), dtype=bool)
+    diffs = {}
+    for column in _PRICE_COLUMNS:
+        diff = (both[column] - both[f"{column}_ref"]).abs()
+        diffs[f"{column}_diff"] = diff
+        bad |= diff.to_numpy() > price_tol
+    for column in ("volume", "amount"):
+        if column in both.columns and f"{column}_ref" in both.columns:
+            ref_values = both[f"{column}_ref"].abs().clip(lower=1)
+            diff = (both[column] - both[f"{column}_ref"]).abs() / ref_values
+            diffs[f"{column}_rdiff"] = diff
+            bad |= diff.to_numpy() > volume_rtol
+
+    mismatches = pd.concat([both[on], pd.DataFrame(diffs)], axis=1)[bad]
+    return {
+        "compared": len(both),
+        "matched": int(len(both) - bad.sum()),
+        "missing_in_derived": merged.loc[merged["_merge"] == "right_only", "trade_date"].tolist(),
+        "missing_in_reference": merged.loc[merged["_merge"] == "left_only", "trade_date"].tolist(),
+        "mismatches": mismatches.reset_index(drop=True),
+    }
@@ -351,6 +351,41 @@ class StockDataCache:
             logger.error(f"⚠️ 加载缓存数据失败: {e}")
             return None
     
+    def save_indicator_state(self, cache_key: str, state: Dict[str, Any]) -> Optional[Path]:
+        """
+        保存增量指标引擎状态（IncrementalIndicatorEngine.to_dict()），与K线缓存放在一起
+
+        后续追加新K线时加载该状态即可增量更新指标，无需对整段历史重新计算。
+        """
+        metadata = self._load_metadata(cache_key)
+        if not metadata:
+            logger.warning(f"⚠️ 缓存不存在，无法保存指标状态: {cache_key}")
+            return None
+
+        state_path = Path(metadata['file_path']).with_suffix('.indicators.json')
+        with open(state_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+
+        # 直接写回元数据，保留原 cached_at（不延长K线缓存的有效期）
+        metadata['indicator_state_path'] = str(state_path)
+        with open(self._get_metadata_path(cache_key), 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        return state_path
+
+    def load_indicator_state(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """加载与K线缓存一起保存的增量指标状态，不存在时返回 None"""
+        metadata = self._load_metadata(cache_key)
+        state_path = metadata.get('indicator_state_path') if metadata else None
+        if not state_path or not Path(state_path).exists():
+            return None
+
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"⚠️ 加载指标状态失败: {e}")
+            return None
+
     def find_cached_stock_data(self, symbol: str, start_date: str = None,
                               end_date: str = None, data_source: str = None,
                               max_age_hours: int = None) -> Optional[str]:
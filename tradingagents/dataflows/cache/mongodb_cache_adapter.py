@@ -56,13 +56,14 @@ class MongoDBCacheAdapter:
             # 🔥 获取数据源优先级
             source_priority = self._get_data_source_priority(symbol)
 
-            # 🔥 按优先级查询
+            # 🔥 一次查询取回所有候选数据源，按优先级选择
             doc = None
-            for src in source_priority:
-                doc = collection.find_one({"code": code6, "source": src}, {"_id": 0})
-                if doc:
-                    logger.debug(f"✅ 从MongoDB获取基础信息: {symbol}, 数据源: {src}")
-                    return doc
+            candidates = list(collection.find({"code": code6, "source": {"$in": source_priority}}, {"_id": 0}))
+            if candidates:
+                rank = {src: i for i, src in enumerate(source_priority)}
+                doc = min(candidates, key=lambda d: rank.get(d.get("source"), len(rank)))
+                logger.debug(f"✅ 从MongoDB获取基础信息: {symbol}, 数据源: {doc.get('source')}")
+                return doc
 
             # 如果所有数据源都没有，尝试不带 source 条件查询（兼容旧数据）
             if not doc:
@@ -99,64 +100,46 @@ class MongoDBCacheAdapter:
                 StockMarket.HONG_KONG: 'hk_stocks',
             }
             market_category = market_mapping.get(market)
-            logger.info(f"📊 [数据源优先级] 股票代码: {symbol}, 市场分类: {market_category}")
-
-            # 2. 从数据库读取配置
-            if self.db is not None:
-                config_collection = self.db.system_configs
-                config_data = config_collection.find_one(
-                    {"is_active": True},
-                    sort=[("version", -1)]
-                )
-
-                if config_data and config_data.get('data_source_configs'):
-                    configs = config_data['data_source_configs']
-                    logger.info(f"📊 [数据源优先级] 从数据库读取到 {len(configs)} 个数据源配置")
-
-                    # 3. 过滤启用的数据源
-                    enabled = []
-                    for ds in configs:
-                        ds_type = ds.get('type', '')
-                        ds_enabled = ds.get('enabled', True)
-                        ds_priority = ds.get('priority', 0)
-                        ds_categories = ds.get('market_categories', [])
-
-                        logger.info(f"📊 [数据源配置] 类型: {ds_type}, 启用: {ds_enabled}, 优先级: {ds_priority}, 市场: {ds_categories}")
-
-                        if not ds_enabled:
-                            logger.info(f"⚠️ [数据源优先级] {ds_type} 未启用，跳过")
-                            continue
-
-                        # 检查市场分类
-                        if ds_categories and market_category:
-                            if market_category not in ds_categories:
-                                logger.info(f"⚠️ [数据源优先级] {ds_type} 不支持市场 {market_category}，跳过")
-                                continue
-
-                        enabled.append(ds)
-
-                    logger.info(f"📊 [数据源优先级] 过滤后启用的数据源: {len(enabled)} 个")
-
-                    # 4. 按优先级排序（数字越大优先级越高）
-                    enabled.sort(key=lambda x: x.get('priority', 0), reverse=True)
-
-                    # 5. 返回数据源类型列表
-                    result = [ds.get('type', '').lower() for ds in enabled if ds.get('type')]
-                    if result:
-                        logger.info(f"✅ [数据源优先级] {symbol} ({market_category}): {result}")
-                        return result
-                    else:
-                        logger.warning(f"⚠️ [数据源优先级] 没有可用的数据源配置，使用默认顺序")
-                else:
-                    logger.warning(f"⚠️ [数据源优先级] 数据库中没有找到数据源配置")
+
+            # 2. 从进程级配置快照读取（按版本戳刷新，不再每次查询 system_configs）
+            from tradingagents.config.data_source_priority import get_data_source_priority_config
+            result = get_data_source_priority_config().get_priority(market_category)
+            if result:
+                logger.debug(f"📊 [数据源优先级] {symbol} ({market_category}): {result}")
+                return result
 
         except Exception as e:
             logger.error(f"❌ 获取数据源优先级失败: {e}", exc_info=True)
 
         # 默认顺序：Tushare > AKShare > BaoStock
-        logger.info(f"📊 [数据源优先级] 使用默认顺序: ['tushare', 'akshare', 'baostock']")
+        logger.debug(f"📊 [数据源优先级] 使用默认顺序: ['tushare', 'akshare', 'baostock']")
         return ['tushare', 'akshare', 'baostock']
 
+    @staticmethod
+    def _pick_best_source_rows(data: List[Dict[str, Any]], key: str, source_field: str,
+                               priority_order: List[str]) -> pd.DataFrame:
+        """
+        同一 key（如交易日）存在多个数据源的记录时，保留优先级最高的那一条
+
+        Args:
+            data: 查询结果（已按 key 升序）
+            key: 去重字段
+            source_field: 数据源字段名
+            priority_order: 数据源优先级（高 -> 低）
+        """
+        df = pd.DataFrame(data)
+        if df.empty or source_field not in df.columns or key not in df.columns:
+            return df
+        rank = {src: i for i, src in enumerate(priority_order)}
+        df["_source_rank"] = df[source_field].map(rank).fillna(len(priority_order))
+        df = (
+            df.sort_values([key, "_source_rank"], kind="mergesort")
+            .drop_duplicates(subset=[key], keep="first")
+            .drop(columns=["_source_rank"])
+            .reset_index(drop=True)
+        )
+        return df
+
     def get_historical_data(self, symbol: str, start_date: str = None, end_date: str = None,
                           period: str = "daily") -> Optional[pd.DataFrame]:
         """
@@ -181,34 +164,25 @@ class MongoDBCacheAdapter:
             # 获取数据源优先级
             priority_order = self._get_data_source_priority(symbol)
 
-            # 按优先级查询
-            for data_source in priority_order:
-                # 构建查询条件
-                query = {
-                    "symbol": code6,
-                    "period": period,
-                    "data_source": data_source  # 指定数据源
-                }
+            # 一次查询取回所有候选数据源，再按交易日保留优先级最高的数据源
+            query = {
+                "symbol": code6,
+                "period": period,
+                "data_source": {"$in": priority_order}
+            }
+            if start_date:
+                query["trade_date"] = {"$gte": start_date}
+            if end_date:
+                query.setdefault("trade_date", {})["$lte"] = end_date
 
-                if start_date:
-                    query["trade_date"] = {"$gte": start_date}
-                if end_date:
-                    if "trade_date" in query:
-                        query["trade_date"]["$lte"] = end_date
-                    else:
-                        query["trade_date"] = {"$lte": end_date}
-
-                # 查询数据
-                logger.debug(f"🔍 [MongoDB查询] 尝试数据源: {data_source}, symbol={code6}, period={period}")
-                cursor = collection.find(query, {"_id": 0}).sort("trade_date", 1)
-                data = list(cursor)
-
-                if data:
-                    df = pd.DataFrame(data)
-                    logger.info(f"✅ [数据来源: MongoDB-{data_source}] {symbol}, {len(df)}条记录 (period={period})")
-                    return df
-                else:
-                    logger.debug(f"⚠️ [MongoDB-{data_source}] 未找到{period}数据: {symbol}")
+            logger.debug(f"🔍 [MongoDB查询] 数据源: {priority_order}, symbol={code6}, period={period}")
+            data = list(collection.find(query, {"_id": 0}).sort("trade_date", 1))
+
+            if data:
+                df = self._pick_best_source_rows(data, "trade_date", "data_source", priority_order)
+                sources = sorted(set(df["data_source"]), key=priority_order.index) if "data_source" in df.columns else []
+                logger.info(f"✅ [数据来源: MongoDB-{'+'.join(sources)}] {symbol}, {len(df)}条记录 (period={period})")
+                return df
 
             # 所有数据源都没有数据
             logger.warning(f"⚠️ [数据来源: MongoDB] 所有数据源({', '.join(priority_order)})都没有{period}数据: {symbol}，降级到其他数据源")
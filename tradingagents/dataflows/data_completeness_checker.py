@@ -2,13 +2,33 @@
 """
 数据完整性检查器
 用于检查历史数据是否完整、是否包含最新交易日，并在需要时自动重新拉取
+
+- DataCompletenessChecker: 检查单只股票的格式化数据字符串（原有接口）
+- CompletenessEngine: 按本地缓存的交易日历批量检查整个股票池，
+  用数组运算求出每只股票缺失的交易日，并持久化每只股票的检查水位，
+  重复检查只处理水位之后的新日期
 """
 
+import json
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, Tuple, List
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
 import pandas as pd
 
+from tradingagents.dataflows.trading_calendar import (
+    DEFAULT_CACHE_DIR,
+    DateLike,
+    TradingCalendar,
+    get_trading_calendar,
+    to_day,
+    to_days,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -102,16 +122,12 @@ class DataCompletenessChecker:
                 latest_trade_dt = datetime.strptime(latest_trade_date, '%Y-%m-%d')
                 details["has_latest_trade_date"] = data_end_date.date() >= latest_trade_dt.date()
             
-            # 6. 计算预期交易日数量（粗略估算）
-            start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-            end_dt = datetime.strptime(end_date, '%Y-%m-%d')
-            total_days = (end_dt - start_dt).days + 1
-            
-            # 假设交易日约占总天数的 70%（考虑周末和节假日）
-            expected_trade_days = int(total_days * 0.7)
+            # 6. 按交易日历计算预期交易日数量
+            expected_trade_days = get_trading_calendar(market).count(start_date, end_date)
             details["expected_rows"] = expected_trade_days
             
             # 7. 计算完整性比率
+            completeness_ratio = 0.0
             if expected_trade_days > 0:
                 completeness_ratio = len(df) / expected_trade_days
                 details["completeness_ratio"] = completeness_ratio
@@ -187,63 +203,296 @@ class DataCompletenessChecker:
             return None
     
     def _get_latest_trade_date(self, market: str = "CN") -> Optional[str]:
-        """获取最新交易日"""
+        """获取最新交易日（本地缓存的交易日历，不再逐日探测）"""
         try:
-            if market == "CN":
-                # A股：使用 Tushare 查找最新交易日
-                from tradingagents.dataflows.providers.china.tushare import TushareProvider
-                import asyncio
-                
-                provider = TushareProvider()
-                if provider.is_available():
-                    loop = asyncio.get_event_loop()
-                    if loop.is_closed():
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                    
-                    latest_date = loop.run_until_complete(provider.find_latest_trade_date())
-                    if latest_date:
-                        return latest_date
-            
-            # 备用方案：假设最新交易日是今天或昨天（如果今天是周末则往前推）
-            today = datetime.now()
-            for delta in range(0, 5):  # 最多回溯5天
-                check_date = today - timedelta(days=delta)
-                # 跳过周末
-                if check_date.weekday() < 5:  # 0-4 是周一到周五
-                    return check_date.strftime('%Y-%m-%d')
-            
-            return None
-            
+            return get_trading_calendar(market).latest_trade_date()
         except Exception as e:
             self.logger.error(f"❌ 获取最新交易日失败: {e}")
             return None
     
     def _check_data_gaps(self, df: pd.DataFrame, date_col: str) -> List[str]:
-        """检查数据缺口"""
+        """检查数据缺口：相邻两条记录相隔超过3天（考虑周末）视为可能的缺口"""
         try:
-            df = df.sort_values(date_col)
-            dates = df[date_col].tolist()
-            
-            missing_dates = []
-            for i in range(len(dates) - 1):
-                current_date = dates[i]
-                next_date = dates[i + 1]
-                
-                # 计算日期差
-                delta = (next_date - current_date).days
-                
-                # 如果差距大于3天（考虑周末），可能有缺口
-                if delta > 3:
-                    missing_dates.append(f"{current_date.strftime('%Y-%m-%d')} 到 {next_date.strftime('%Y-%m-%d')}")
-            
-            return missing_dates
+            dates = np.sort(to_days(df[date_col]))
+            if len(dates) < 2:
+                return []
+            gap_at = np.flatnonzero(np.diff(dates).astype(np.int64) > 3)
+            starts = np.datetime_as_string(dates[gap_at])
+            ends = np.datetime_as_string(dates[gap_at + 1])
+            return [f"{a} 到 {b}" for a, b in zip(starts, ends)]
             
         except Exception as e:
             self.logger.error(f"❌ 检查数据缺口失败: {e}")
             return []
 
 
+_REPORT_COLUMNS = [
+    "first_date", "last_date", "expected_days", "present_days", "missing_days",
+    "stale_days", "coverage", "has_latest_trade_date", "is_complete",
+]
+
+
+def _long_form(data, date_col: Optional[str] = None) -> Tuple[pd.Index, np.ndarray, np.ndarray]:
+    """
+    统一输入为长表：(股票代码索引, 每行的代码序号, 每行的日期)
+
+    支持：
+    - DataFrame：含 symbol/code/ts_code 列与日期列（date/trade_date）
+    - Mapping：{股票代码: 日期序列 或 含日期列的 DataFrame}
+    """
+    if isinstance(data, pd.DataFrame):
+        sym_col = next((c for c in ("symbol", "code", "ts_code") if c in data.columns), None)
+        col = date_col or next((c for c in ("date", "trade_date") if c in data.columns), None)
+        if sym_col is None or col is None:
+            raise ValueError("DataFrame 需要包含股票代码列（symbol/code/ts_code）和日期列（date/trade_date）")
+        codes, symbols = pd.factorize(data[sym_col], sort=False)
+        return pd.Index(symbols, dtype=object), codes.astype(np.int64), to_days(data[col])
+
+    symbols = list(data.keys())
+    chunks = []
+    for key in symbols:
+        values = data[key]
+        if isinstance(values, pd.DataFrame):
+            col = date_col or next((c for c in ("date", "trade_date") if c in values.columns), None)
+            values = values[col] if col else values.index
+        chunks.append(to_days(values))
+    lengths = np.fromiter((len(c) for c in chunks), dtype=np.int64, count=len(chunks))
+    codes = np.repeat(np.arange(len(symbols), dtype=np.int64), lengths)
+    days = np.concatenate(chunks) if chunks else np.array([], dtype="datetime64[D]")
+    return pd.Index(symbols, dtype=object), codes, days
+
+
+class CompletenessEngine:
+    """
+    股票池数据完整性检查（向量化 + 增量）
+
+    每只股票的应有交易日为交易日历中 [首个数据日, 最新交易日] 的交易日，缺失日 =
+    应有交易日 - 已有交易日。整个股票池的 (代码, 交易日序号) 一次性排序去重，
+    缺失日由相邻已有交易日之间的序号区间展开得到，全程没有按日期的 Python 循环。
+
+    每只股票持久化一条水位：首个数据日、已确认的最后数据日（through）、已有交易日数
+    以及 through 之前的缺失日。再次检查时只处理 through 之后的数据；through 之后
+    到最新交易日之间尚无数据的交易日按"滞后"计入缺失，不写入水位，补齐后自然消失。
+    水位之前的数据被回补时，调用 reset() 重新全量检查这些股票。
+    """
+
+    def __init__(
+        self,
+        market: str = "CN",
+        calendar: Optional[TradingCalendar] = None,
+        state_path: Optional[Union[str, Path]] = None,
+        min_coverage: float = 0.9,
+    ):
+        self.market = market
+        self.calendar = calendar or get_trading_calendar(market)
+        self.state_path = Path(state_path) if state_path else DEFAULT_CACHE_DIR / f"completeness_{market}.json"
+        self.min_coverage = min_coverage
+        # 水位：按股票代码索引，日期列为 datetime64[D]
+        self._marks = pd.DataFrame(
+            {"first": pd.Series(dtype="datetime64[s]"), "through": pd.Series(dtype="datetime64[s]"),
+             "present": pd.Series(dtype=np.int64), "gaps": pd.Series(dtype=np.int64)},
+            index=pd.Index([], dtype=object),
+        )
+        self._gaps: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    # ==================== 水位持久化 ====================
+
+    def load(self) -> None:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"⚠️ [完整性] 读取检查水位失败: {self.state_path} - {e}")
+            return
+
+        symbols = data.get("symbols", {})
+        index = pd.Index(list(symbols.keys()), dtype=object)
+        self._gaps = {s: np.array(v["gaps"], dtype="datetime64[D]") for s, v in symbols.items() if v.get("gaps")}
+        self._marks = pd.DataFrame({
+            "first": np.array([v["first"] for v in symbols.values()], dtype="datetime64[D]").astype("datetime64[s]"),
+            "through": np.array([v["through"] for v in symbols.values()], dtype="datetime64[D]").astype("datetime64[s]"),
+            "present": np.array([v["present"] for v in symbols.values()], dtype=np.int64),
+            "gaps": np.array([len(v.get("gaps", [])) for v in symbols.values()], dtype=np.int64),
+        }, index=index)
+        logger.info(f"📂 [完整性] 载入 {len(index)} 只股票的检查水位")
+
+    def save(self) -> None:
+        marks = self._marks
+        firsts = np.datetime_as_string(marks["first"].values.astype("datetime64[D]"))
+        throughs = np.datetime_as_string(marks["through"].values.astype("datetime64[D]"))
+        symbols = {
+            symbol: {
+                "first": first,
+                "through": through,
+                "present": int(present),
+                "gaps": np.datetime_as_string(self._gaps[symbol]).tolist() if symbol in self._gaps else [],
+            }
+            for symbol, first, through, present in zip(marks.index, firsts, throughs, marks["present"].values)
+        }
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(self.state_path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            # json.dumps 走 C 编码器，比 json.dump 逐块写入快数倍
+            f.write(json.dumps({"market": self.market, "updated_at": datetime.now().isoformat(), "symbols": symbols}))
+        os.replace(tmp, self.state_path)
+
+    def reset(self, symbols: Optional[Iterable[str]] = None) -> None:
+        """清除水位（默认全部），下次检查时这些股票重新全量检查"""
+        with self._lock:
+            if symbols is None:
+                self._marks = self._marks.iloc[0:0]
+                self._gaps = {}
+            else:
+                symbols = list(symbols)
+                self._marks = self._marks.drop(index=symbols, errors="ignore")
+                for symbol in symbols:
+                    self._gaps.pop(symbol, None)
+
+    def watermark(self, symbol: str) -> Optional[Dict]:
+        if symbol not in self._marks.index:
+            return None
+        row = self._marks.loc[symbol]
+        return {"first": str(row["first"].date()), "through": str(row["through"].date()),
+                "present": int(row["present"]), "gaps": int(row["gaps"])}
+
+    # ==================== 检查 ====================
+
+    def check_universe(
+        self,
+        data,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+        symbols: Optional[Iterable[str]] = None,
+        date_col: Optional[str] = None,
+        persist: bool = True,
+    ) -> pd.DataFrame:
+        """
+        检查整个股票池
+
+        Args:
+            data: 长表 DataFrame（symbol + date 列）或 {股票代码: 日期序列/DataFrame}；
+                  已有水位的股票只需传入水位之后的新数据
+            start: 首次检查的起始日期（之前的数据忽略）
+            end: 检查截止日期，默认今天；以不晚于它的最近交易日为准
+            symbols: 股票池（默认为 data 与已有水位中的全部股票），没有任何数据的股票覆盖率为 0
+            persist: 是否把更新后的水位写回文件
+
+        Returns:
+            按股票代码索引的 DataFrame：first_date, last_date, expected_days, present_days,
+            missing_days, stale_days, coverage, has_latest_trade_date, is_complete
+        """
+        cal = self.calendar.days
+        n = len(cal)
+        end_idx = self.calendar.position(end if end is not None else datetime.now(), "right")
+        start_idx = self.calendar.position(start, "left") if start is not None else 0
+
+        data_symbols, codes, days = _long_form(data, date_col)
+
+        with self._lock:
+            if symbols is None:
+                universe = self._marks.index.union(data_symbols, sort=False)
+            else:
+                universe = pd.Index(list(dict.fromkeys(symbols)), dtype=object)
+            m = len(universe)
+            # 代码序号换算到股票池；末尾追加 -1，使无效代码（-1）和池外股票都映射为 -1
+            codes = np.append(universe.get_indexer(data_symbols), -1)[codes]
+            marks = self._marks.reindex(universe)
+            known = marks["through"].notna().values
+            wm = np.full(m, -1, dtype=np.int64)
+            wm[known] = np.searchsorted(cal, marks["through"].values[known].astype("datetime64[D]"))
+
+            # 只保留：股票池内、落在交易日上、位于 [start, end] 且在水位之后的记录
+            idx, on_calendar = self.calendar.locate(days)
+            keep = (codes >= 0) & on_calendar & (idx >= start_idx) & (idx <= end_idx)
+            keep[keep] &= idx[keep] > wm[codes[keep]]
+            key = np.unique(codes[keep] * n + idx[keep])
+            code, idx = key // n, key % n
+
+            present_new = np.bincount(code, minlength=m)
+            has_new = present_new > 0
+            group_start = np.flatnonzero(np.r_[True, code[1:] != code[:-1]]) if len(code) else np.zeros(0, np.int64)
+            group_end = np.r_[group_start[1:], len(code)] - 1 if len(code) else group_start
+            first_new = np.full(m, -1, dtype=np.int64)
+            last_new = np.full(m, -1, dtype=np.int64)
+            first_new[code[group_start]] = idx[group_start]
+            last_new[code[group_end]] = idx[group_end]
+
+            # 缺失区间：每个已有交易日与它前一个已有交易日（组首为水位）之间的交易日
+            prev = np.empty_like(idx)
+            prev[1:] = idx[:-1]
+            lead = code[group_start]
+            prev[group_start] = np.where(wm[lead] >= 0, wm[lead], idx[group_start] - 1)
+            run_len = idx - prev - 1
+            has_run = run_len > 0
+            run_len, run_start, run_code = run_len[has_run], prev[has_run] + 1, code[has_run]
+            offsets = np.arange(run_len.sum()) - np.repeat(np.cumsum(run_len) - run_len, run_len)
+            gap_idx = np.repeat(run_start, run_len) + offsets
+            gap_code = np.repeat(run_code, run_len)
+            gaps_new = np.bincount(gap_code, minlength=m)
+
+            # 合并水位
+            first_idx = np.where(known, np.searchsorted(cal, marks["first"].values.astype("datetime64[D]")), first_new)
+            first_idx[~known & ~has_new] = -1
+            through_idx = np.where(has_new, last_new, wm)
+            present = np.where(known, marks["present"].fillna(0).values.astype(np.int64), 0) + present_new
+            gap_count = np.where(known, marks["gaps"].fillna(0).values.astype(np.int64), 0) + gaps_new
+
+            if len(gap_code):
+                bounds = np.flatnonzero(np.r_[True, gap_code[1:] != gap_code[:-1]])
+                for c, chunk in zip(gap_code[bounds], np.split(cal[gap_idx], bounds[1:])):
+                    symbol = universe[c]
+                    old = self._gaps.get(symbol)
+                    self._gaps[symbol] = chunk if old is None else np.concatenate([old, chunk])
+
+            tracked = first_idx >= 0
+            updated = pd.DataFrame({
+                "first": cal[first_idx[tracked]].astype("datetime64[s]"),
+                "through": cal[through_idx[tracked]].astype("datetime64[s]"),
+                "present": present[tracked],
+                "gaps": gap_count[tracked],
+            }, index=universe[tracked])
+            rest = self._marks.index.difference(updated.index, sort=False)
+            self._marks = pd.concat([self._marks.loc[rest], updated]) if len(rest) else updated
+            if persist:
+                self.save()
+
+        # 报告：through 之后到最新交易日之间没有数据的交易日记为滞后
+        stale = np.where(tracked, np.maximum(end_idx - through_idx, 0), 0)
+        expected = np.where(tracked, np.maximum(end_idx, through_idx) - first_idx + 1, 0)
+        missing = gap_count + stale
+        with np.errstate(divide="ignore", invalid="ignore"):
+            coverage = np.where(expected > 0, present / np.maximum(expected, 1), 0.0)
+        has_latest = tracked & (through_idx >= end_idx)
+        report = pd.DataFrame({
+            "first_date": np.where(tracked, cal[np.maximum(first_idx, 0)], np.datetime64("NaT")),
+            "last_date": np.where(tracked, cal[np.maximum(through_idx, 0)], np.datetime64("NaT")),
+            "expected_days": expected,
+            "present_days": np.where(tracked, present, 0),
+            "missing_days": np.where(tracked, missing, 0),
+            "stale_days": stale,
+            "coverage": coverage,
+            "has_latest_trade_date": has_latest,
+            "is_complete": has_latest & (coverage >= self.min_coverage),
+        }, index=universe)
+        report.index.name = "symbol"
+        return report[_REPORT_COLUMNS]
+
+    def missing_dates(self, symbol: str, end: Optional[DateLike] = None) -> List[str]:
+        """某只股票缺失的交易日（水位内的缺口 + 水位之后尚无数据的交易日）"""
+        if symbol not in self._marks.index:
+            return []
+        through = to_day(self._marks.at[symbol, "through"])
+        end_day = end if end is not None else datetime.now()
+        tail = self.calendar.days[self.calendar.position(through, "right") + 1:
+                                  self.calendar.position(end_day, "right") + 1]
+        gaps = self._gaps.get(symbol, np.array([], dtype="datetime64[D]"))
+        return np.datetime_as_string(np.concatenate([gaps, tail])).tolist()
+
+
 # 全局实例
 _checker = None
 
@@ -254,3 +503,17 @@ def get_data_completeness_checker() -> DataCompletenessChecker:
         _checker = DataCompletenessChecker()
     return _checker
 
+
+_engines: Dict[str, CompletenessEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_completeness_engine(market: str = "CN") -> CompletenessEngine:
+    """获取股票池完整性检查引擎（每个市场一个，水位保存在本地缓存目录）"""
+    engine = _engines.get(market)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(market)
+            if engine is None:
+                engine = _engines[market] = CompletenessEngine(market)
+    return engine
@@ -102,38 +102,11 @@ class DataSourceManager:
         market_category = self._identify_market_category(symbol)
 
         try:
-            # 🔥 从数据库读取数据源配置（使用同步客户端）
-            from app.core.database import get_mongo_db_sync
-            db = get_mongo_db_sync()
-            config_collection = db.system_configs
-
-            # 获取最新的激活配置
-            config_data = config_collection.find_one(
-                {"is_active": True},
-                sort=[("version", -1)]
-            )
-
-            if config_data and config_data.get('data_source_configs'):
-                data_source_configs = config_data.get('data_source_configs', [])
-
-                # 🔥 过滤出启用的数据源，并按市场分类过滤
-                enabled_sources = []
-                for ds in data_source_configs:
-                    if not ds.get('enabled', True):
-                        continue
-
-                    # 检查数据源是否属于当前市场分类
-                    market_categories = ds.get('market_categories', [])
-                    if market_categories and market_category:
-                        # 如果数据源配置了市场分类，只选择匹配的数据源
-                        if market_category not in market_categories:
-                            continue
-
-                    enabled_sources.append(ds)
-
-                # 按优先级排序（数字越大优先级越高）
-                enabled_sources.sort(key=lambda x: x.get('priority', 0), reverse=True)
+            # 🔥 使用进程级配置快照（按版本戳刷新），避免每次取数都查询 system_configs
+            from tradingagents.config.data_source_priority import get_data_source_priority_config
+            priority_types = get_data_source_priority_config().get_priority(market_category)
 
+            if priority_types:
                 # 转换为 ChinaDataSource 枚举（使用统一编码）
                 source_mapping = {
                     DataSourceCode.TUSHARE: ChinaDataSource.TUSHARE,
@@ -142,8 +115,7 @@ class DataSourceManager:
                 }
 
                 result = []
-                for ds in enabled_sources:
-                    ds_type = ds.get('type', '').lower()
+                for ds_type in priority_types:
                     if ds_type in source_mapping:
                         source = source_mapping[ds_type]
                         # 排除 MongoDB（MongoDB 是最高优先级，不参与降级）
@@ -151,14 +123,14 @@ class DataSourceManager:
                             result.append(source)
 
                 if result:
-                    logger.info(f"✅ [数据源优先级] 市场={market_category or '全部'}, 从数据库读取: {[s.value for s in result]}")
+                    logger.debug(f"✅ [数据源优先级] 市场={market_category or '全部'}: {[s.value for s in result]}")
                     return result
                 else:
-                    logger.warning(f"⚠️ [数据源优先级] 市场={market_category or '全部'}, 数据库配置中没有可用的数据源，使用默认顺序")
+                    logger.debug(f"⚠️ [数据源优先级] 市场={market_category or '全部'}, 数据库配置中没有可用的数据源，使用默认顺序")
             else:
-                logger.warning("⚠️ [数据源优先级] 数据库中没有数据源配置，使用默认顺序")
+                logger.debug("⚠️ [数据源优先级] 数据库中没有数据源配置，使用默认顺序")
         except Exception as e:
-            logger.warning(f"⚠️ [数据源优先级] 从数据库读取失败: {e}，使用默认顺序")
+            logger.warning(f"⚠️ [数据源优先级] 读取配置快照失败: {e}，使用默认顺序")
 
         # 🔥 回退到默认顺序（兼容性）
         # 默认顺序：AKShare > Tushare > BaoStock
@@ -1032,6 +1004,25 @@ class DataSourceManager:
         """
         获取股票数据的统一接口，支持多周期数据
 
+        并发的相同请求（同数据源、股票、日期范围、周期）只会调用一次上游，其余请求共享结果
+
+        Args:
+            symbol: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+            period: 数据周期（daily/weekly/monthly），默认为daily
+
+        Returns:
+            str: 格式化的股票数据
+        """
+        from tradingagents.utils.single_flight import data_fetch_flight, make_flight_key
+        key = make_flight_key("get_stock_data", self.current_source.value, symbol, start_date, end_date, period)
+        return data_fetch_flight.do(key, self._fetch_stock_data, symbol, start_date, end_date, period)
+
+    def _fetch_stock_data(self, symbol: str, start_date: str = None, end_date: str = None, period: str = "daily") -> str:
+        """
+        获取股票数据（未合并的实际实现）
+
         Args:
             symbol: 股票代码
             start_date: 开始日期
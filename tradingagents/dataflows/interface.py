@@ -24,6 +24,7 @@ from tradingagents.utils.logging_init import setup_dataflow_logging
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.tool_memo import memoize_tool
 logger = get_logger('agents')
 logger = setup_dataflow_logging()
 
@@ -1511,6 +1512,7 @@ def get_china_stock_fundamentals_tushare(
 
 # ==================== 统一数据源接口 ====================
 
+@memoize_tool("china_stock_data")
 def get_china_stock_data_unified(
     ticker: Annotated[str, "中国股票代码，如：000001、600036等"],
     start_date: Annotated[str, "开始日期，格式：YYYY-MM-DD"],
@@ -1745,6 +1747,7 @@ def get_current_china_data_source() -> str:
 
 # ==================== 港股数据接口 ====================
 
+@memoize_tool("hk_stock_data")
 def get_hk_stock_data_unified(symbol: str, start_date: str = None, end_date: str = None) -> str:
     """
     获取港股数据的统一接口（根据用户配置选择数据源）
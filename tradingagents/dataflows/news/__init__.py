@@ -1,45 +1,11 @@
 """
 新闻数据获取模块
 统一管理各种新闻数据源
-"""
-
-# 导入 Google News
-try:
-    from .google_news import getNewsData
-    GOOGLE_NEWS_AVAILABLE = True
-except ImportError:
-    getNewsData = None
-    GOOGLE_NEWS_AVAILABLE = False
-
-# 导入 Reddit
-try:
-    from .reddit import fetch_top_from_category
-    REDDIT_AVAILABLE = True
-except ImportError:
-    fetch_top_from_category = None
-    REDDIT_AVAILABLE = False
-
-# 导入实时新闻
-try:
-    from .realtime_news import (
-        get_realtime_news,
-        get_news_with_sentiment,
-        search_news_by_keyword
-    )
-    REALTIME_NEWS_AVAILABLE = True
-except ImportError:
-    get_realtime_news = None
-    get_news_with_sentiment = None
-    search_news_by_keyword = None
-    REALTIME_NEWS_AVAILABLE = False
 
-# 导入中国财经数据聚合器
-try:
-    from .chinese_finance import ChineseFinanceDataAggregator
-    CHINESE_FINANCE_AVAILABLE = True
-except ImportError:
-    ChineseFinanceDataAggregator = None
-    CHINESE_FINANCE_AVAILABLE = False
+各新闻源在首次访问时才导入（导入 news.<子模块> 时不再连带加载其他新闻源），
+导入失败时对应名称为 None，*_AVAILABLE 为 False。
+"""
+from tradingagents.utils.lazy_exports import lazy_exports
 
 __all__ = [
     # Google News
@@ -61,3 +27,20 @@ __all__ = [
     'CHINESE_FINANCE_AVAILABLE',
 ]
 
+__getattr__, __dir__ = lazy_exports(__name__, globals(), {
+    # Google News
+    'getNewsData': [('.google_news', 'getNewsData')],
+    # Reddit
+    'fetch_top_from_category': [('.reddit', 'fetch_top_from_category')],
+    # 实时新闻
+    'get_realtime_news': [('.realtime_news', 'get_realtime_news')],
+    'get_news_with_sentiment': [('.realtime_news', 'get_news_with_sentiment')],
+    'search_news_by_keyword': [('.realtime_news', 'search_news_by_keyword')],
+    # 中国财经数据聚合器
+    'ChineseFinanceDataAggregator': [('.chinese_finance', 'ChineseFinanceDataAggregator')],
+}, flags={
+    'GOOGLE_NEWS_AVAILABLE': 'getNewsData',
+    'REDDIT_AVAILABLE': 'fetch_top_from_category',
+    'REALTIME_NEWS_AVAILABLE': 'get_realtime_news',
+    'CHINESE_FINANCE_AVAILABLE': 'ChineseFinanceDataAggregator',
+})
@@ -2,14 +2,24 @@
 """
 实时新闻数据获取工具
 解决新闻滞后性问题
+
+各新闻源并发获取：
+- 共享带连接池的 keep-alive 会话（requests.Session + HTTPAdapter）
+- 每个新闻源有独立的超时预算，整体有截止时间，超时后返回已完成新闻源的部分结果
+- 记录每个新闻源的耗时与错误统计（见 get_news_source_metrics）
 """
 
 import requests
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
+from urllib.parse import urlparse
 from zoneinfo import ZoneInfo
 
-from typing import List, Dict, Optional
+from requests.adapters import HTTPAdapter
+
+from typing import Any, Callable, List, Dict, Optional, Tuple
 import time
 import os
 from dataclasses import dataclass
@@ -18,9 +28,80 @@ from dataclasses import dataclass
 from tradingagents.config.runtime_settings import get_timezone_name
 
 from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.news_dedup import deduplicate_near_duplicates
 logger = get_logger('agents')
 
 
+# 单个新闻源的默认超时（秒）与整体截止时间（秒），可通过环境变量覆盖
+DEFAULT_SOURCE_TIMEOUT = float(os.getenv('TA_NEWS_SOURCE_TIMEOUT', '8'))
+DEFAULT_AGGREGATE_DEADLINE = float(os.getenv('TA_NEWS_DEADLINE', '15'))
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+_source_stats: Dict[str, Dict[str, Any]] = {}
+_source_stats_lock = threading.Lock()
+
+
+def _get_http_session() -> requests.Session:
+    """进程内共享的 keep-alive 会话（连接池按主机复用连接）"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=0)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers.update({'User-Agent': 'TradingAgents-CN/1.0'})
+                _session = session
+    return _session
+
+
+def _get_news_executor() -> ThreadPoolExecutor:
+    """新闻源抓取线程池（进程内共享；超过截止时间的任务在后台结束，不阻塞调用方）"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ta-news")
+    return _executor
+
+
+def _record_source_metric(source: str, status: str, latency: float, count: int, error: str = "") -> None:
+    with _source_stats_lock:
+        stats = _source_stats.setdefault(source, {
+            "calls": 0, "ok": 0, "empty": 0, "errors": 0, "timeouts": 0,
+            "items": 0, "total_latency": 0.0, "max_latency": 0.0, "last_error": "",
+        })
+        stats["calls"] += 1
+        stats[{"ok": "ok", "empty": "empty", "error": "errors", "timeout": "timeouts"}[status]] += 1
+        stats["items"] += count
+        stats["total_latency"] += latency
+        stats["max_latency"] = max(stats["max_latency"], latency)
+        if error:
+            stats["last_error"] = error
+
+
+def get_news_source_metrics() -> Dict[str, Dict[str, Any]]:
+    """各新闻源的累计统计（调用次数、成功/空结果/错误/超时次数、平均与最大耗时）"""
+    with _source_stats_lock:
+        result = {}
+        for source, stats in _source_stats.items():
+            item = dict(stats)
+            item["avg_latency"] = round(stats["total_latency"] / stats["calls"], 3) if stats["calls"] else 0.0
+            item["total_latency"] = round(stats["total_latency"], 3)
+            item["max_latency"] = round(stats["max_latency"], 3)
+            result[source] = item
+        return result
+
+
+def reset_news_source_metrics() -> None:
+    with _source_stats_lock:
+        _source_stats.clear()
+
 
 @dataclass
 class NewsItem:
@@ -37,7 +118,20 @@ class NewsItem:
 class RealtimeNewsAggregator:
     """实时新闻聚合器"""
 
-    def __init__(self):
+    FINNHUB_URL = "https://finnhub.io/api/v1/company-news"
+    ALPHA_VANTAGE_URL = "https://www.alphavantage.co/query"
+    NEWSAPI_URL = "https://newsapi.org/v2/everything"
+    RSS_SOURCES = [
+        "https://www.cls.cn/api/sw?app=CailianpressWeb&os=web&sv=7.7.5",
+        # 可以添加更多RSS源
+    ]
+
+    def __init__(self, source_timeouts: Optional[Dict[str, float]] = None, deadline: Optional[float] = None):
+        """
+        Args:
+            source_timeouts: 各新闻源的超时预算（秒），如 {'finnhub': 5}；未配置的使用 TA_NEWS_SOURCE_TIMEOUT
+            deadline: 整体截止时间（秒），默认 TA_NEWS_DEADLINE
+        """
         self.headers = {
             'User-Agent': 'TradingAgents-CN/1.0'
         }
@@ -47,74 +141,114 @@ class RealtimeNewsAggregator:
         self.alpha_vantage_key = os.getenv('ALPHA_VANTAGE_API_KEY')
         self.newsapi_key = os.getenv('NEWSAPI_KEY')
 
-    def get_realtime_stock_news(self, ticker: str, hours_back: int = 6, max_news: int = 10) -> List[NewsItem]:
+        self.source_timeouts = dict(source_timeouts or {})
+        self.deadline = DEFAULT_AGGREGATE_DEADLINE if deadline is None else deadline
+        # 最近一次聚合的各新闻源指标
+        self.last_metrics: Dict[str, Dict[str, Any]] = {}
+
+    def _timeout(self, source: str) -> float:
+        return float(self.source_timeouts.get(source, DEFAULT_SOURCE_TIMEOUT))
+
+    def _http_get(self, source: str, url: str, params: Optional[dict] = None) -> requests.Response:
+        response = _get_http_session().get(url, params=params, headers=self.headers, timeout=self._timeout(source))
+        response.raise_for_status()
+        return response
+
+    def _news_sources(self, ticker: str, hours_back: int) -> List[Tuple[str, str, Optional[Callable[[], List[NewsItem]]]]]:
+        """[(源标识, 显示名, 抓取函数)]，抓取函数为 None 表示未配置而跳过"""
+        sources = [
+            ("finnhub", "FinnHub",
+             (lambda: self._get_finnhub_realtime_news(ticker, hours_back)) if self.finnhub_key else None),
+            ("alpha_vantage", "Alpha Vantage",
+             (lambda: self._get_alpha_vantage_news(ticker, hours_back)) if self.alpha_vantage_key else None),
+            ("newsapi", "NewsAPI",
+             (lambda: self._get_newsapi_news(ticker, hours_back)) if self.newsapi_key else None),
+        ]
+        # 美股代码不使用东方财富新闻
+        is_us_suffix = '.' in ticker and any(suffix in ticker for suffix in ['.US', '.N', '.O', '.NYSE', '.NASDAQ'])
+        sources.append(("eastmoney", "东方财富",
+                        None if is_us_suffix else (lambda: self._get_eastmoney_news(ticker, hours_back))))
+        for rss_url in self.RSS_SOURCES:
+            sources.append((f"rss:{urlparse(rss_url).netloc}", "财联社RSS",
+                            lambda url=rss_url: self._parse_rss_feed(url, ticker, hours_back)))
+        return sources
+
+    def _run_source(self, source: str, label: str, fetch: Callable[[], List[NewsItem]],
+                    abandoned: threading.Event) -> Tuple[List[NewsItem], Dict[str, Any]]:
+        start = time.perf_counter()
+        try:
+            items = fetch() or []
+            error = None
+        except Exception as e:
+            items, error = [], e
+        latency = time.perf_counter() - start
+
+        # 调用方已按超时放弃：结果丢弃，指标已记为 timeout
+        if abandoned.is_set():
+            return [], {}
+
+        if error is not None:
+            logger.error(f"[新闻聚合器] {label} 新闻获取失败: {error}，耗时: {latency:.2f}秒")
+            _record_source_metric(source, "error", latency, 0, str(error))
+            return [], {"status": "error", "latency": round(latency, 3), "count": 0, "error": str(error)}
+
+        status = "ok" if items else "empty"
+        if items:
+            logger.info(f"[新闻聚合器] 成功从 {label} 获取 {len(items)} 条新闻，耗时: {latency:.2f}秒")
+        else:
+            logger.info(f"[新闻聚合器] {label} 未返回新闻，耗时: {latency:.2f}秒")
+        _record_source_metric(source, status, latency, len(items))
+        return items, {"status": status, "latency": round(latency, 3), "count": len(items)}
+
+    def _fetch_all_sources(self, ticker: str, hours_back: int, deadline: float) -> Tuple[List[NewsItem], Dict[str, Dict[str, Any]]]:
+        """并发抓取所有新闻源；超过截止时间的新闻源记为 timeout，返回已完成部分"""
+        metrics: Dict[str, Dict[str, Any]] = {}
+        futures = {}
+        executor = _get_news_executor()
+        for source, label, fetch in self._news_sources(ticker, hours_back):
+            if fetch is None:
+                logger.info(f"[新闻聚合器] {label} 未配置或不适用，跳过此新闻源")
+                metrics[source] = {"status": "skipped", "latency": 0.0, "count": 0}
+                continue
+            abandoned = threading.Event()
+            futures[source] = (executor.submit(self._run_source, source, label, fetch, abandoned), abandoned)
+
+        wait([future for future, _ in futures.values()], timeout=deadline)
+
+        all_news: List[NewsItem] = []
+        # 按新闻源优先级顺序合并，保证去重结果稳定
+        for source, (future, abandoned) in futures.items():
+            if future.done():
+                items, metrics[source] = future.result()
+                all_news.extend(items)
+            else:
+                abandoned.set()
+                future.cancel()
+                logger.warning(f"[新闻聚合器] {source} 超过整体截止时间 {deadline:.1f}秒，放弃等待")
+                _record_source_metric(source, "timeout", deadline, 0)
+                metrics[source] = {"status": "timeout", "latency": round(deadline, 3), "count": 0}
+        return all_news, metrics
+
+    def get_realtime_stock_news(self, ticker: str, hours_back: int = 6, max_news: int = 10,
+                                deadline: Optional[float] = None) -> List[NewsItem]:
         """
         获取实时股票新闻
-        优先级：专业API > 新闻API > 搜索引擎
+        各新闻源并发获取，结果按优先级合并：专业API > 新闻API > 中文财经源
 
         Args:
             ticker: 股票代码
             hours_back: 回溯小时数
             max_news: 最大新闻数量，默认10条
+            deadline: 整体截止时间（秒），默认使用实例配置
         """
         logger.info(f"[新闻聚合器] 开始获取 {ticker} 的实时新闻，回溯时间: {hours_back}小时")
         start_time = datetime.now(ZoneInfo(get_timezone_name()))
-        all_news = []
-
-        # 1. FinnHub实时新闻 (最高优先级)
-        logger.info(f"[新闻聚合器] 尝试从 FinnHub 获取 {ticker} 的新闻")
-        finnhub_start = datetime.now(ZoneInfo(get_timezone_name()))
-        finnhub_news = self._get_finnhub_realtime_news(ticker, hours_back)
-        finnhub_time = (datetime.now(ZoneInfo(get_timezone_name())) - finnhub_start).total_seconds()
-
-        if finnhub_news:
-            logger.info(f"[新闻聚合器] 成功从 FinnHub 获取 {len(finnhub_news)} 条新闻，耗时: {finnhub_time:.2f}秒")
-        else:
-            logger.info(f"[新闻聚合器] FinnHub 未返回新闻，耗时: {finnhub_time:.2f}秒")
-
-        all_news.extend(finnhub_news)
-
-        # 2. Alpha Vantage新闻
-        logger.info(f"[新闻聚合器] 尝试从 Alpha Vantage 获取 {ticker} 的新闻")
-        av_start = datetime.now(ZoneInfo(get_timezone_name()))
-        av_news = self._get_alpha_vantage_news(ticker, hours_back)
-        av_time = (datetime.now(ZoneInfo(get_timezone_name())) - av_start).total_seconds()
-
-        if av_news:
-            logger.info(f"[新闻聚合器] 成功从 Alpha Vantage 获取 {len(av_news)} 条新闻，耗时: {av_time:.2f}秒")
-        else:
-            logger.info(f"[新闻聚合器] Alpha Vantage 未返回新闻，耗时: {av_time:.2f}秒")
-
-        all_news.extend(av_news)
-
-        # 3. NewsAPI (如果配置了)
-        if self.newsapi_key:
-            logger.info(f"[新闻聚合器] 尝试从 NewsAPI 获取 {ticker} 的新闻")
-            newsapi_start = datetime.now(ZoneInfo(get_timezone_name()))
-            newsapi_news = self._get_newsapi_news(ticker, hours_back)
-            newsapi_time = (datetime.now(ZoneInfo(get_timezone_name())) - newsapi_start).total_seconds()
-
-            if newsapi_news:
-                logger.info(f"[新闻聚合器] 成功从 NewsAPI 获取 {len(newsapi_news)} 条新闻，耗时: {newsapi_time:.2f}秒")
-            else:
-                logger.info(f"[新闻聚合器] NewsAPI 未返回新闻，耗时: {newsapi_time:.2f}秒")
-
-            all_news.extend(newsapi_news)
-        else:
-            logger.info(f"[新闻聚合器] NewsAPI 密钥未配置，跳过此新闻源")
-
-        # 4. 中文财经新闻源
-        logger.info(f"[新闻聚合器] 尝试获取 {ticker} 的中文财经新闻")
-        chinese_start = datetime.now(ZoneInfo(get_timezone_name()))
-        chinese_news = self._get_chinese_finance_news(ticker, hours_back)
-        chinese_time = (datetime.now(ZoneInfo(get_timezone_name())) - chinese_start).total_seconds()
-
-        if chinese_news:
-            logger.info(f"[新闻聚合器] 成功获取 {len(chinese_news)} 条中文财经新闻，耗时: {chinese_time:.2f}秒")
-        else:
-            logger.info(f"[新闻聚合器] 未获取到中文财经新闻，耗时: {chinese_time:.2f}秒")
 
-        all_news.extend(chinese_news)
+        deadline = self.deadline if deadline is None else deadline
+        all_news, metrics = self._fetch_all_sources(ticker, hours_back, deadline)
+        self.last_metrics = metrics
+        summary = ", ".join(f"{name}={m['status']}/{m['latency']:.2f}s" for name, m in metrics.items())
+        logger.info(f"[新闻聚合器] 各新闻源结果: {summary}")
 
         # 去重和排序
         logger.info(f"[新闻聚合器] 开始对 {len(all_news)} 条新闻进行去重和排序")
@@ -145,362 +279,275 @@ class RealtimeNewsAggregator:
         return sorted_news
 
     def _get_finnhub_realtime_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
-        """获取FinnHub实时新闻"""
+        """获取FinnHub实时新闻（失败时抛出异常，由聚合器记录）"""
         if not self.finnhub_key:
             return []
 
-        try:
-            # 计算时间范围
-            end_time = datetime.now(ZoneInfo(get_timezone_name()))
-            start_time = end_time - timedelta(hours=hours_back)
-
-            # FinnHub API调用
-            url = "https://finnhub.io/api/v1/company-news"
-            params = {
-                'symbol': ticker,
-                'from': start_time.strftime('%Y-%m-%d'),
-                'to': end_time.strftime('%Y-%m-%d'),
-                'token': self.finnhub_key
-            }
-
-            response = requests.get(url, params=params, headers=self.headers)
-            response.raise_for_status()
-
-            news_data = response.json()
-            news_items = []
-
-            for item in news_data:
-                # 检查新闻时效性
-                publish_time = datetime.fromtimestamp(item.get('datetime', 0), tz=ZoneInfo(get_timezone_name()))
-                if publish_time < start_time:
-                    continue
+        # 计算时间范围
+        end_time = datetime.now(ZoneInfo(get_timezone_name()))
+        start_time = end_time - timedelta(hours=hours_back)
+
+        # FinnHub API调用
+        params = {
+            'symbol': ticker,
+            'from': start_time.strftime('%Y-%m-%d'),
+            'to': end_time.strftime('%Y-%m-%d'),
+            'token': self.finnhub_key
+        }
 
-                # 评估紧急程度
-                urgency = self._assess_news_urgency(item.get('headline', ''), item.get('summary', ''))
+        response = self._http_get("finnhub", self.FINNHUB_URL, params)
 
-                news_items.append(NewsItem(
-                    title=item.get('headline', ''),
-                    content=item.get('summary', ''),
-                    source=item.get('source', 'FinnHub'),
-                    publish_time=publish_time,
-                    url=item.get('url', ''),
-                    urgency=urgency,
-                    relevance_score=self._calculate_relevance(item.get('headline', ''), ticker)
-                ))
+        news_data = response.json()
+        news_items = []
 
-            return news_items
+        for item in news_data:
+            # 检查新闻时效性
+            publish_time = datetime.fromtimestamp(item.get('datetime', 0), tz=ZoneInfo(get_timezone_name()))
+            if publish_time < start_time:
+                continue
 
-        except Exception as e:
-            logger.error(f"FinnHub新闻获取失败: {e}")
-            return []
+            # 评估紧急程度
+            urgency = self._assess_news_urgency(item.get('headline', ''), item.get('summary', ''))
+
+            news_items.append(NewsItem(
+                title=item.get('headline', ''),
+                content=item.get('summary', ''),
+                source=item.get('source', 'FinnHub'),
+                publish_time=publish_time,
+                url=item.get('url', ''),
+                urgency=urgency,
+                relevance_score=self._calculate_relevance(item.get('headline', ''), ticker)
+            ))
+
+        return news_items
 
     def _get_alpha_vantage_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
-        """获取Alpha Vantage新闻"""
+        """获取Alpha Vantage新闻（失败时抛出异常，由聚合器记录）"""
         if not self.alpha_vantage_key:
             return []
 
-        try:
-            url = "https://www.alphavantage.co/query"
-            params = {
-                'function': 'NEWS_SENTIMENT',
-                'tickers': ticker,
-                'apikey': self.alpha_vantage_key,
-                'limit': 50
-            }
-
-            response = requests.get(url, params=params, headers=self.headers)
-            response.raise_for_status()
-
-            data = response.json()
-            news_items = []
-
-            if 'feed' in data:
-                for item in data['feed']:
-                    # 解析时间
-                    time_str = item.get('time_published', '')
-                    try:
-                        publish_time = datetime.strptime(time_str, '%Y%m%dT%H%M%S').replace(tzinfo=ZoneInfo(get_timezone_name()))
-                    except:
-                        continue
-
-                    # 检查时效性
-                    if publish_time < datetime.now(ZoneInfo(get_timezone_name())) - timedelta(hours=hours_back):
-                        continue
-
-                    urgency = self._assess_news_urgency(item.get('title', ''), item.get('summary', ''))
-
-                    news_items.append(NewsItem(
-                        title=item.get('title', ''),
-                        content=item.get('summary', ''),
-                        source=item.get('source', 'Alpha Vantage'),
-                        publish_time=publish_time,
-                        url=item.get('url', ''),
-                        urgency=urgency,
-                        relevance_score=self._calculate_relevance(item.get('title', ''), ticker)
-                    ))
+        params = {
+            'function': 'NEWS_SENTIMENT',
+            'tickers': ticker,
+            'apikey': self.alpha_vantage_key,
+            'limit': 50
+        }
 
-            return news_items
+        response = self._http_get("alpha_vantage", self.ALPHA_VANTAGE_URL, params)
 
-        except Exception as e:
-            logger.error(f"Alpha Vantage新闻获取失败: {e}")
-            return []
+        data = response.json()
+        news_items = []
 
-    def _get_newsapi_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
-        """获取NewsAPI新闻"""
-        try:
-            # 构建搜索查询
-            company_names = {
-                'AAPL': 'Apple',
-                'TSLA': 'Tesla',
-                'NVDA': 'NVIDIA',
-                'MSFT': 'Microsoft',
-                'GOOGL': 'Google'
-            }
-
-            query = f"{ticker} OR {company_names.get(ticker, ticker)}"
-
-            url = "https://newsapi.org/v2/everything"
-            params = {
-                'q': query,
-                'language': 'en',
-                'sortBy': 'publishedAt',
-                'from': (datetime.now(ZoneInfo(get_timezone_name())) - timedelta(hours=hours_back)).isoformat(),
-                'apiKey': self.newsapi_key
-            }
-
-            response = requests.get(url, params=params, headers=self.headers)
-            response.raise_for_status()
-
-            data = response.json()
-            news_items = []
-
-            for item in data.get('articles', []):
+        if 'feed' in data:
+            for item in data['feed']:
                 # 解析时间
-                time_str = item.get('publishedAt', '')
+                time_str = item.get('time_published', '')
                 try:
-                    publish_time = datetime.fromisoformat(time_str.replace('Z', '+00:00'))
+                    publish_time = datetime.strptime(time_str, '%Y%m%dT%H%M%S').replace(tzinfo=ZoneInfo(get_timezone_name()))
                 except:
                     continue
 
-                urgency = self._assess_news_urgency(item.get('title', ''), item.get('description', ''))
+                # 检查时效性
+                if publish_time < datetime.now(ZoneInfo(get_timezone_name())) - timedelta(hours=hours_back):
+                    continue
+
+                urgency = self._assess_news_urgency(item.get('title', ''), item.get('summary', ''))
 
                 news_items.append(NewsItem(
                     title=item.get('title', ''),
-                    content=item.get('description', ''),
-                    source=item.get('source', {}).get('name', 'NewsAPI'),
+                    content=item.get('summary', ''),
+                    source=item.get('source', 'Alpha Vantage'),
                     publish_time=publish_time,
                     url=item.get('url', ''),
                     urgency=urgency,
                     relevance_score=self._calculate_relevance(item.get('title', ''), ticker)
                 ))
 
-            return news_items
+        return news_items
 
-        except Exception as e:
-            logger.error(f"NewsAPI新闻获取失败: {e}")
-            return []
+    def _get_newsapi_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
+        """获取NewsAPI新闻（失败时抛出异常，由聚合器记录）"""
+        # 构建搜索查询
+        company_names = {
+            'AAPL': 'Apple',
+            'TSLA': 'Tesla',
+            'NVDA': 'NVIDIA',
+            'MSFT': 'Microsoft',
+            'GOOGL': 'Google'
+        }
 
-    def _get_chinese_finance_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
-        """获取中文财经新闻"""
-        # 集成中文财经新闻API：财联社、东方财富等
-        logger.info(f"[中文财经新闻] 开始获取 {ticker} 的中文财经新闻，回溯时间: {hours_back}小时")
-        start_time = datetime.now(ZoneInfo(get_timezone_name()))
+        query = f"{ticker} OR {company_names.get(ticker, ticker)}"
 
-        try:
-            news_items = []
+        params = {
+            'q': query,
+            'language': 'en',
+            'sortBy': 'publishedAt',
+            'from': (datetime.now(ZoneInfo(get_timezone_name())) - timedelta(hours=hours_back)).isoformat(),
+            'apiKey': self.newsapi_key
+        }
+
+        response = self._http_get("newsapi", self.NEWSAPI_URL, params)
 
-            # 1. 尝试使用AKShare获取东方财富个股新闻
+        data = response.json()
+        news_items = []
+
+        for item in data.get('articles', []):
+            # 解析时间
+            time_str = item.get('publishedAt', '')
             try:
-                logger.info(f"[中文财经新闻] 尝试通过 AKShare Provider 获取新闻")
-                from tradingagents.dataflows.providers.china.akshare import AKShareProvider
+                publish_time = datetime.fromisoformat(time_str.replace('Z', '+00:00'))
+            except:
+                continue
 
-                provider = AKShareProvider()
+            urgency = self._assess_news_urgency(item.get('title', ''), item.get('description', ''))
 
-                # 处理股票代码格式
-                # 如果是美股代码，不使用东方财富新闻
-                if '.' in ticker and any(suffix in ticker for suffix in ['.US', '.N', '.O', '.NYSE', '.NASDAQ']):
-                    logger.info(f"[中文财经新闻] 检测到美股代码 {ticker}，跳过东方财富新闻获取")
-                else:
-                    # 处理A股和港股代码
-                    clean_ticker = ticker.replace('.SH', '').replace('.SZ', '').replace('.SS', '')\
-                                    .replace('.HK', '').replace('.XSHE', '').replace('.XSHG', '')
-
-                    # 获取东方财富新闻
-                    logger.info(f"[中文财经新闻] 开始获取 {clean_ticker} 的东方财富新闻")
-                    em_start_time = datetime.now(ZoneInfo(get_timezone_name()))
-                    news_df = provider.get_stock_news_sync(symbol=clean_ticker)
-
-                    if not news_df.empty:
-                        logger.info(f"[中文财经新闻] 东方财富返回 {len(news_df)} 条新闻数据，开始处理")
-                        processed_count = 0
-                        skipped_count = 0
-                        error_count = 0
-
-                        # 转换为NewsItem格式
-                        for _, row in news_df.iterrows():
-                            try:
-                                # 解析时间
-                                time_str = row.get('时间', '')
-                                if time_str:
-                                    # 尝试解析时间格式，可能是'2023-01-01 12:34:56'格式
-                                    try:
-                                        publish_time = datetime.strptime(time_str, '%Y-%m-%d %H:%M:%S').replace(tzinfo=ZoneInfo(get_timezone_name()))
-                                    except:
-                                        # 尝试其他可能的格式
-                                        try:
-                                            publish_time = datetime.strptime(time_str, '%Y-%m-%d').replace(tzinfo=ZoneInfo(get_timezone_name()))
-                                        except:
-                                            logger.warning(f"[中文财经新闻] 无法解析时间格式: {time_str}，使用当前时间")
-                                            publish_time = datetime.now(ZoneInfo(get_timezone_name()))
-                                else:
-                                    logger.warning(f"[中文财经新闻] 新闻时间为空，使用当前时间")
-                                    publish_time = datetime.now(ZoneInfo(get_timezone_name()))
-
-                                # 检查时效性
-                                if publish_time < datetime.now(ZoneInfo(get_timezone_name())) - timedelta(hours=hours_back):
-                                    skipped_count += 1
-                                    continue
-
-                                # 评估紧急程度
-                                title = row.get('标题', '')
-                                content = row.get('内容', '')
-                                urgency = self._assess_news_urgency(title, content)
-
-                                news_items.append(NewsItem(
-                                    title=title,
-                                    content=content,
-                                    source='东方财富',
-                                    publish_time=publish_time,
-                                    url=row.get('链接', ''),
-                                    urgency=urgency,
-                                    relevance_score=self._calculate_relevance(title, ticker)
-                                ))
-                                processed_count += 1
-                            except Exception as item_e:
-                                logger.error(f"[中文财经新闻] 处理东方财富新闻项目失败: {item_e}")
-                                error_count += 1
-                                continue
-
-                        em_time = (datetime.now(ZoneInfo(get_timezone_name())) - em_start_time).total_seconds()
-                        logger.info(f"[中文财经新闻] 东方财富新闻处理完成，成功: {processed_count}条，跳过: {skipped_count}条，错误: {error_count}条，耗时: {em_time:.2f}秒")
-            except Exception as ak_e:
-                logger.error(f"[中文财经新闻] 获取东方财富新闻失败: {ak_e}")
-
-            # 2. 财联社RSS (如果可用)
-            logger.info(f"[中文财经新闻] 开始获取财联社RSS新闻")
-            rss_start_time = datetime.now(ZoneInfo(get_timezone_name()))
-            rss_sources = [
-                "https://www.cls.cn/api/sw?app=CailianpressWeb&os=web&sv=7.7.5",
-                # 可以添加更多RSS源
-            ]
-
-            rss_success_count = 0
-            rss_error_count = 0
-            total_rss_items = 0
-
-            for rss_url in rss_sources:
-                try:
-                    logger.info(f"[中文财经新闻] 尝试解析RSS源: {rss_url}")
-                    rss_item_start = datetime.now(ZoneInfo(get_timezone_name()))
-                    items = self._parse_rss_feed(rss_url, ticker, hours_back)
-                    rss_item_time = (datetime.now(ZoneInfo(get_timezone_name())) - rss_item_start).total_seconds()
-
-                    if items:
-                        logger.info(f"[中文财经新闻] 成功从RSS源获取 {len(items)} 条新闻，耗时: {rss_item_time:.2f}秒")
-                        news_items.extend(items)
-                        total_rss_items += len(items)
-                        rss_success_count += 1
-                    else:
-                        logger.info(f"[中文财经新闻] RSS源未返回相关新闻，耗时: {rss_item_time:.2f}秒")
-                except Exception as rss_e:
-                    logger.error(f"[中文财经新闻] 解析RSS源失败: {rss_e}")
-                    rss_error_count += 1
-                    continue
+            news_items.append(NewsItem(
+                title=item.get('title', ''),
+                content=item.get('description', ''),
+                source=item.get('source', {}).get('name', 'NewsAPI'),
+                publish_time=publish_time,
+                url=item.get('url', ''),
+                urgency=urgency,
+                relevance_score=self._calculate_relevance(item.get('title', ''), ticker)
+            ))
+
+        return news_items
 
-            # 记录RSS获取总结
-            rss_total_time = (datetime.now(ZoneInfo(get_timezone_name())) - rss_start_time).total_seconds()
-            logger.info(f"[中文财经新闻] RSS新闻获取完成，成功源: {rss_success_count}个，失败源: {rss_error_count}个，获取新闻: {total_rss_items}条，总耗时: {rss_total_time:.2f}秒")
+    def _get_eastmoney_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
+        """通过AKShare获取东方财富个股新闻（失败时抛出异常，由聚合器记录）"""
+        from tradingagents.dataflows.providers.china.akshare import AKShareProvider
 
-            # 记录中文财经新闻获取总结
-            total_time = (datetime.now(ZoneInfo(get_timezone_name())) - start_time).total_seconds()
-            logger.info(f"[中文财经新闻] {ticker} 的中文财经新闻获取完成，总共获取 {len(news_items)} 条新闻，总耗时: {total_time:.2f}秒")
+        provider = AKShareProvider()
 
+        # 处理A股和港股代码
+        clean_ticker = ticker.replace('.SH', '').replace('.SZ', '').replace('.SS', '')\
+                        .replace('.HK', '').replace('.XSHE', '').replace('.XSHG', '')
+
+        logger.info(f"[中文财经新闻] 开始获取 {clean_ticker} 的东方财富新闻")
+        news_df = provider.get_stock_news_sync(symbol=clean_ticker)
+        news_items = []
+        if news_df is None or news_df.empty:
             return news_items
 
-        except Exception as e:
-            logger.error(f"[中文财经新闻] 中文财经新闻获取失败: {e}")
-            return []
+        logger.info(f"[中文财经新闻] 东方财富返回 {len(news_df)} 条新闻数据，开始处理")
+        processed_count = 0
+        skipped_count = 0
+        error_count = 0
+
+        # 转换为NewsItem格式
+        for _, row in news_df.iterrows():
+            try:
+                # 解析时间
+                time_str = row.get('时间', '')
+                if time_str:
+                    # 尝试解析时间格式，可能是'2023-01-01 12:34:56'格式
+                    try:
+                        publish_time = datetime.strptime(time_str, '%Y-%m-%d %H:%M:%S').replace(tzinfo=ZoneInfo(get_timezone_name()))
+                    except:
+                        # 尝试其他可能的格式
+                        try:
+                            publish_time = datetime.strptime(time_str, '%Y-%m-%d').replace(tzinfo=ZoneInfo(get_timezone_name()))
+                        except:
+                            logger.warning(f"[中文财经新闻] 无法解析时间格式: {time_str}，使用当前时间")
+                            publish_time = datetime.now(ZoneInfo(get_timezone_name()))
+                else:
+                    logger.warning(f"[中文财经新闻] 新闻时间为空，使用当前时间")
+                    publish_time = datetime.now(ZoneInfo(get_timezone_name()))
+
+                # 检查时效性
+                if publish_time < datetime.now(ZoneInfo(get_timezone_name())) - timedelta(hours=hours_back):
+                    skipped_count += 1
+                    continue
+
+                # 评估紧急程度
+                title = row.get('标题', '')
+                content = row.get('内容', '')
+                urgency = self._assess_news_urgency(title, content)
+
+                news_items.append(NewsItem(
+                    title=title,
+                    content=content,
+                    source='东方财富',
+                    publish_time=publish_time,
+                    url=row.get('链接', ''),
+                    urgency=urgency,
+                    relevance_score=self._calculate_relevance(title, ticker)
+                ))
+                processed_count += 1
+            except Exception as item_e:
+                logger.error(f"[中文财经新闻] 处理东方财富新闻项目失败: {item_e}")
+                error_count += 1
+                continue
+
+        logger.info(f"[中文财经新闻] 东方财富新闻处理完成，成功: {processed_count}条，跳过: {skipped_count}条，错误: {error_count}条")
+        return news_items
 
     def _parse_rss_feed(self, rss_url: str, ticker: str, hours_back: int) -> List[NewsItem]:
-        """解析RSS源"""
+        """解析RSS源（通过共享会话获取内容，受超时预算约束；请求失败时抛出异常）"""
         logger.info(f"[RSS解析] 开始解析RSS源: {rss_url}，股票: {ticker}，回溯时间: {hours_back}小时")
         start_time = datetime.now(ZoneInfo(get_timezone_name()))
 
         try:
-            # 实际实现需要使用feedparser库
-            # 这里是简化实现，实际项目中应该替换为真实的RSS解析逻辑
             import feedparser
+        except ImportError:
+            logger.error(f"[RSS解析] feedparser库未安装，无法解析RSS源")
+            return []
+
+        logger.info(f"[RSS解析] 尝试获取RSS源内容")
+        response = self._http_get(f"rss:{urlparse(rss_url).netloc}", rss_url)
+        feed = feedparser.parse(response.content)
 
-            logger.info(f"[RSS解析] 尝试获取RSS源内容")
-            feed = feedparser.parse(rss_url)
+        if not feed or not feed.entries:
+            logger.warning(f"[RSS解析] RSS源未返回有效内容")
+            return []
 
-            if not feed or not feed.entries:
-                logger.warning(f"[RSS解析] RSS源未返回有效内容")
-                return []
+        logger.info(f"[RSS解析] 成功获取RSS源，包含 {len(feed.entries)} 条条目")
+        news_items = []
+        processed_count = 0
+        skipped_count = 0
 
-            logger.info(f"[RSS解析] 成功获取RSS源，包含 {len(feed.entries)} 条条目")
-            news_items = []
-            processed_count = 0
-            skipped_count = 0
+        for entry in feed.entries:
+            try:
+                # 解析时间
+                if hasattr(entry, 'published_parsed') and entry.published_parsed:
+                    publish_time = datetime.fromtimestamp(time.mktime(entry.published_parsed), tz=ZoneInfo(get_timezone_name()))
+                else:
+                    logger.warning(f"[RSS解析] 条目缺少发布时间，使用当前时间")
+                    publish_time = datetime.now(ZoneInfo(get_timezone_name()))
 
-            for entry in feed.entries:
-                try:
-                    # 解析时间
-                    if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                        publish_time = datetime.fromtimestamp(time.mktime(entry.published_parsed), tz=ZoneInfo(get_timezone_name()))
-                    else:
-                        logger.warning(f"[RSS解析] 条目缺少发布时间，使用当前时间")
-                        publish_time = datetime.now(ZoneInfo(get_timezone_name()))
-
-                    # 检查时效性
-                    if publish_time < datetime.now(ZoneInfo(get_timezone_name())) - timedelta(hours=hours_back):
-                        skipped_count += 1
-                        continue
-
-                    title = entry.title if hasattr(entry, 'title') else ''
-                    content = entry.description if hasattr(entry, 'description') else ''
-
-                    # 检查相关性
-                    if ticker.lower() not in title.lower() and ticker.lower() not in content.lower():
-                        skipped_count += 1
-                        continue
-
-                    # 评估紧急程度
-                    urgency = self._assess_news_urgency(title, content)
-
-                    news_items.append(NewsItem(
-                        title=title,
-                        content=content,
-                        source='财联社',
-                        publish_time=publish_time,
-                        url=entry.link if hasattr(entry, 'link') else '',
-                        urgency=urgency,
-                        relevance_score=self._calculate_relevance(title, ticker)
-                    ))
-                    processed_count += 1
-                except Exception as e:
-                    logger.error(f"[RSS解析] 处理RSS条目失败: {e}")
+                # 检查时效性
+                if publish_time < datetime.now(ZoneInfo(get_timezone_name())) - timedelta(hours=hours_back):
+                    skipped_count += 1
                     continue
 
-            total_time = (datetime.now(ZoneInfo(get_timezone_name())) - start_time).total_seconds()
-            logger.info(f"[RSS解析] RSS源解析完成，成功: {processed_count}条，跳过: {skipped_count}条，耗时: {total_time:.2f}秒")
-            return news_items
-        except ImportError:
-            logger.error(f"[RSS解析] feedparser库未安装，无法解析RSS源")
-            return []
-        except Exception as e:
-            logger.error(f"[RSS解析] 解析RSS源失败: {e}")
-            return []
+                title = entry.title if hasattr(entry, 'title') else ''
+                content = entry.description if hasattr(entry, 'description') else ''
+
+                # 检查相关性
+                if ticker.lower() not in title.lower() and ticker.lower() not in content.lower():
+                    skipped_count += 1
+                    continue
+
+                # 评估紧急程度
+                urgency = self._assess_news_urgency(title, content)
+
+                news_items.append(NewsItem(
+                    title=title,
+                    content=content,
+                    source='财联社',
+                    publish_time=publish_time,
+                    url=entry.link if hasattr(entry, 'link') else '',
+                    urgency=urgency,
+                    relevance_score=self._calculate_relevance(title, ticker)
+                ))
+                processed_count += 1
+            except Exception as e:
+                logger.error(f"[RSS解析] 处理RSS条目失败: {e}")
+                continue
+
+        total_time = (datetime.now(ZoneInfo(get_timezone_name())) - start_time).total_seconds()
+        logger.info(f"[RSS解析] RSS源解析完成，成功: {processed_count}条，跳过: {skipped_count}条，耗时: {total_time:.2f}秒")
+        return news_items
 
     def _assess_news_urgency(self, title: str, content: str) -> str:
         """评估新闻紧急程度"""
@@ -598,10 +645,19 @@ class RealtimeNewsAggregator:
             seen_titles.add(title_key)
             unique_news.append(item)
 
+        # 近似重复：转载稿件仅标点、来源后缀或个别词不同，每个聚类保留优先级最高（最早加入）的一条
+        exact_unique_count = len(unique_news)
+        unique_news, clusters = deduplicate_near_duplicates(unique_news, lambda item: item.title)
+        near_duplicate_count = exact_unique_count - len(unique_news)
+        for cluster in clusters:
+            logger.debug(f"[新闻去重] 近似重复聚类: 保留 '{cluster[0].title[:50]}'，"
+                         f"合并 {len(cluster) - 1} 条（来源: {', '.join(item.source for item in cluster)}）")
+
         # 记录去重结果
         time_taken = (datetime.now(ZoneInfo(get_timezone_name())) - start_time).total_seconds()
         logger.info(f"[新闻去重] 去重完成，原始新闻: {len(news_items)}条，去重后: {len(unique_news)}条，")
-        logger.info(f"[新闻去重] 去除重复: {duplicate_count}条，标题过短: {short_title_count}条，耗时: {time_taken:.2f}秒")
+        logger.info(f"[新闻去重] 去除重复: {duplicate_count}条，近似重复: {near_duplicate_count}条，"
+                    f"标题过短: {short_title_count}条，耗时: {time_taken:.2f}秒")
 
         return unique_news
 
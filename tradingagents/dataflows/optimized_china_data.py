@@ -199,6 +199,23 @@ class OptimizedChinaDataProvider:
         """
         获取A股基本面数据 - 优先使用缓存
 
+        并发的相同请求只会生成一次基本面报告，其余请求共享结果
+
+        Args:
+            symbol: 股票代码
+            force_refresh: 是否强制刷新缓存
+
+        Returns:
+            格式化的基本面数据字符串
+        """
+        from tradingagents.utils.single_flight import data_fetch_flight, make_flight_key
+        key = make_flight_key("get_fundamentals_data", symbol, force_refresh)
+        return data_fetch_flight.do(key, self._fetch_fundamentals_data, symbol, force_refresh)
+
+    def _fetch_fundamentals_data(self, symbol: str, force_refresh: bool = False) -> str:
+        """
+        获取A股基本面数据（未合并的实际实现）
+
         Args:
             symbol: 股票代码
             force_refresh: 是否强制刷新缓存
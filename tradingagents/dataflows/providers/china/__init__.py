@@ -1,39 +1,11 @@
 """
 中国市场数据提供器
 包含 A股、港股等中国市场的数据源
-"""
-
-# 导入 AKShare 提供器
-try:
-    from .akshare import AKShareProvider
-    AKSHARE_AVAILABLE = True
-except ImportError:
-    AKShareProvider = None
-    AKSHARE_AVAILABLE = False
-
-# 导入 Tushare 提供器
-try:
-    from .tushare import TushareProvider
-    TUSHARE_AVAILABLE = True
-except ImportError:
-    TushareProvider = None
-    TUSHARE_AVAILABLE = False
 
-# 导入 Baostock 提供器
-try:
-    from .baostock import BaostockProvider
-    BAOSTOCK_AVAILABLE = True
-except ImportError:
-    BaostockProvider = None
-    BAOSTOCK_AVAILABLE = False
-
-# 导入基本面快照工具
-try:
-    from .fundamentals_snapshot import get_fundamentals_snapshot
-    FUNDAMENTALS_SNAPSHOT_AVAILABLE = True
-except ImportError:
-    get_fundamentals_snapshot = None
-    FUNDAMENTALS_SNAPSHOT_AVAILABLE = False
+各提供器在首次访问时才导入（AKShare/Tushare/BaoStock SDK 导入开销较大），
+导入失败时对应名称为 None，*_AVAILABLE 为 False。
+"""
+from tradingagents.utils.lazy_exports import lazy_exports
 
 __all__ = [
     'AKShareProvider',
@@ -46,3 +18,18 @@ __all__ = [
     'FUNDAMENTALS_SNAPSHOT_AVAILABLE',
 ]
 
+__getattr__, __dir__ = lazy_exports(__name__, globals(), {
+    # AKShare 提供器
+    'AKShareProvider': [('.akshare', 'AKShareProvider')],
+    # Tushare 提供器
+    'TushareProvider': [('.tushare', 'TushareProvider')],
+    # Baostock 提供器
+    'BaostockProvider': [('.baostock', 'BaostockProvider')],
+    # 基本面快照工具
+    'get_fundamentals_snapshot': [('.fundamentals_snapshot', 'get_fundamentals_snapshot')],
+}, flags={
+    'AKSHARE_AVAILABLE': 'AKShareProvider',
+    'TUSHARE_AVAILABLE': 'TushareProvider',
+    'BAOSTOCK_AVAILABLE': 'BaostockProvider',
+    'FUNDAMENTALS_SNAPSHOT_AVAILABLE': 'get_fundamentals_snapshot',
+})
@@ -575,107 +575,79 @@ class AKShareProvider(BaseStockDataProvider):
             try:
                 logger.debug(f"📊 批量获取 {len(codes)} 只股票的实时行情... (尝试 {attempt + 1}/{max_retries})")
 
-                # 优先使用新浪财经接口（更稳定，不容易被封）
-                def fetch_spot_data_sina():
-                    import time
-                    time.sleep(0.3)  # 添加延迟避免频率限制
-                    return self.ak.stock_zh_a_spot()
-
+                # 优先使用新浪财经接口（更稳定，不容易被封），失败时回退东方财富
+                # 🔥 使用进程级共享快照：有效期内不重复下载全市场数据
+                from .spot_snapshot import SOURCE_EASTMONEY, SOURCE_SINA, get_spot_snapshot_service
+                snapshot_service = get_spot_snapshot_service()
                 try:
-                    spot_df = await asyncio.to_thread(fetch_spot_data_sina)
-                    data_source = "sina"
-                    logger.debug("✅ 使用新浪财经接口获取数据")
+                    snapshot = await snapshot_service.get_snapshot(SOURCE_SINA)
+                    logger.debug("✅ 使用新浪财经快照")
                 except Exception as e:
                     logger.warning(f"⚠️ 新浪财经接口失败: {e}，尝试东方财富接口...")
-                    # 回退到东方财富接口
-                    def fetch_spot_data_em():
-                        import time
-                        time.sleep(0.5)
-                        return self.ak.stock_zh_a_spot_em()
-                    spot_df = await asyncio.to_thread(fetch_spot_data_em)
-                    data_source = "eastmoney"
-                    logger.debug("✅ 使用东方财富接口获取数据")
-
-                if spot_df is None or spot_df.empty:
+                    snapshot = await snapshot_service.get_snapshot(SOURCE_EASTMONEY)
+                    logger.debug("✅ 使用东方财富快照")
+
+                if len(snapshot) == 0:
                     logger.warning("⚠️ 全市场快照为空")
                     if attempt < max_retries - 1:
                         await asyncio.sleep(retry_delay)
                         continue
                     return {}
 
-                # 构建代码到行情的映射
+                # 构建代码到行情的映射（按代码直接查找，无需遍历全市场）
                 quotes_map = {}
                 codes_set = set(codes)
 
-                # 构建代码映射表（支持带前缀的代码匹配）
-                # 例如：sh600000 -> 600000, sz000001 -> 000001
-                code_mapping = {}
-                for code in codes:
-                    code_mapping[code] = code  # 原始代码
-                    # 添加可能的前缀变体
-                    for prefix in ['sh', 'sz', 'bj']:
-                        code_mapping[f"{prefix}{code}"] = code
-
-                for _, row in spot_df.iterrows():
-                    raw_code = str(row.get("代码", ""))
-
-                    # 尝试匹配代码（支持带前缀和不带前缀）
-                    matched_code = None
-                    if raw_code in code_mapping:
-                        matched_code = code_mapping[raw_code]
-                    elif raw_code in codes_set:
-                        matched_code = raw_code
-
-                    if matched_code:
-                        quotes_data = {
-                            "name": str(row.get("名称", f"股票{matched_code}")),
-                            "price": self._safe_float(row.get("最新价", 0)),
-                            "change": self._safe_float(row.get("涨跌额", 0)),
-                            "change_percent": self._safe_float(row.get("涨跌幅", 0)),
-                            "volume": self._safe_int(row.get("成交量", 0)),
-                            "amount": self._safe_float(row.get("成交额", 0)),
-                            "open": self._safe_float(row.get("今开", 0)),
-                            "high": self._safe_float(row.get("最高", 0)),
-                            "low": self._safe_float(row.get("最低", 0)),
-                            "pre_close": self._safe_float(row.get("昨收", 0)),
-                            # 🔥 新增：财务指标字段
-                            "turnover_rate": self._safe_float(row.get("换手率", None)),  # 换手率（%）
-                            "volume_ratio": self._safe_float(row.get("量比", None)),  # 量比
-                            "pe": self._safe_float(row.get("市盈率-动态", None)),  # 动态市盈率
-                            "pb": self._safe_float(row.get("市净率", None)),  # 市净率
-                            "total_mv": self._safe_float(row.get("总市值", None)),  # 总市值（元）
-                            "circ_mv": self._safe_float(row.get("流通市值", None)),  # 流通市值（元）
-                        }
+                for matched_code, row in snapshot.get_rows(codes).items():
+                    quotes_data = {
+                        "name": str(row.get("名称", f"股票{matched_code}")),
+                        "price": self._safe_float(row.get("最新价", 0)),
+                        "change": self._safe_float(row.get("涨跌额", 0)),
+                        "change_percent": self._safe_float(row.get("涨跌幅", 0)),
+                        "volume": self._safe_int(row.get("成交量", 0)),
+                        "amount": self._safe_float(row.get("成交额", 0)),
+                        "open": self._safe_float(row.get("今开", 0)),
+                        "high": self._safe_float(row.get("最高", 0)),
+                        "low": self._safe_float(row.get("最低", 0)),
+                        "pre_close": self._safe_float(row.get("昨收", 0)),
+                        # 🔥 新增：财务指标字段
+                        "turnover_rate": self._safe_float(row.get("换手率", None)),  # 换手率（%）
+                        "volume_ratio": self._safe_float(row.get("量比", None)),  # 量比
+                        "pe": self._safe_float(row.get("市盈率-动态", None)),  # 动态市盈率
+                        "pb": self._safe_float(row.get("市净率", None)),  # 市净率
+                        "total_mv": self._safe_float(row.get("总市值", None)),  # 总市值（元）
+                        "circ_mv": self._safe_float(row.get("流通市值", None)),  # 流通市值（元）
+                    }
 
-                        # 转换为标准化字典（使用匹配后的代码）
-                        quotes_map[matched_code] = {
-                            "code": matched_code,
-                            "symbol": matched_code,
-                            "name": quotes_data.get("name", f"股票{matched_code}"),
-                            "price": float(quotes_data.get("price", 0)),
-                            "change": float(quotes_data.get("change", 0)),
-                            "change_percent": float(quotes_data.get("change_percent", 0)),
-                            "volume": int(quotes_data.get("volume", 0)),
-                            "amount": float(quotes_data.get("amount", 0)),
-                            "open_price": float(quotes_data.get("open", 0)),
-                            "high_price": float(quotes_data.get("high", 0)),
-                            "low_price": float(quotes_data.get("low", 0)),
-                            "pre_close": float(quotes_data.get("pre_close", 0)),
-                            # 🔥 新增：财务指标字段
-                            "turnover_rate": quotes_data.get("turnover_rate"),  # 换手率（%）
-                            "volume_ratio": quotes_data.get("volume_ratio"),  # 量比
-                            "pe": quotes_data.get("pe"),  # 动态市盈率
-                            "pe_ttm": quotes_data.get("pe"),  # TTM市盈率（与动态市盈率相同）
-                            "pb": quotes_data.get("pb"),  # 市净率
-                            "total_mv": quotes_data.get("total_mv") / 1e8 if quotes_data.get("total_mv") else None,  # 总市值（转换为亿元）
-                            "circ_mv": quotes_data.get("circ_mv") / 1e8 if quotes_data.get("circ_mv") else None,  # 流通市值（转换为亿元）
-                            # 扩展字段
-                            "full_symbol": self._get_full_symbol(matched_code),
-                            "market_info": self._get_market_info(matched_code),
-                            "data_source": "akshare",
-                            "last_sync": datetime.now(timezone.utc),
-                            "sync_status": "success"
-                        }
+                    # 转换为标准化字典（使用匹配后的代码）
+                    quotes_map[matched_code] = {
+                        "code": matched_code,
+                        "symbol": matched_code,
+                        "name": quotes_data.get("name", f"股票{matched_code}"),
+                        "price": float(quotes_data.get("price", 0)),
+                        "change": float(quotes_data.get("change", 0)),
+                        "change_percent": float(quotes_data.get("change_percent", 0)),
+                        "volume": int(quotes_data.get("volume", 0)),
+                        "amount": float(quotes_data.get("amount", 0)),
+                        "open_price": float(quotes_data.get("open", 0)),
+                        "high_price": float(quotes_data.get("high", 0)),
+                        "low_price": float(quotes_data.get("low", 0)),
+                        "pre_close": float(quotes_data.get("pre_close", 0)),
+                        # 🔥 新增：财务指标字段
+                        "turnover_rate": quotes_data.get("turnover_rate"),  # 换手率（%）
+                        "volume_ratio": quotes_data.get("volume_ratio"),  # 量比
+                        "pe": quotes_data.get("pe"),  # 动态市盈率
+                        "pe_ttm": quotes_data.get("pe"),  # TTM市盈率（与动态市盈率相同）
+                        "pb": quotes_data.get("pb"),  # 市净率
+                        "total_mv": quotes_data.get("total_mv") / 1e8 if quotes_data.get("total_mv") else None,  # 总市值（转换为亿元）
+                        "circ_mv": quotes_data.get("circ_mv") / 1e8 if quotes_data.get("circ_mv") else None,  # 流通市值（转换为亿元）
+                        # 扩展字段
+                        "full_symbol": self._get_full_symbol(matched_code),
+                        "market_info": self._get_market_info(matched_code),
+                        "data_source": "akshare",
+                        "last_sync": datetime.now(timezone.utc),
+                        "sync_status": "success"
+                    }
 
                 found_count = len(quotes_map)
                 missing_count = len(codes) - found_count
@@ -799,40 +771,33 @@ class AKShareProvider(BaseStockDataProvider):
     async def _get_realtime_quotes_data(self, code: str) -> Dict[str, Any]:
         """获取实时行情数据"""
         try:
-            # 方法1: 获取A股实时行情
-            def fetch_spot_data():
-                return self.ak.stock_zh_a_spot_em()
-
+            # 方法1: 从共享的全市场快照中查找（快照过期时由单个请求刷新）
             try:
-                spot_df = await asyncio.to_thread(fetch_spot_data)
+                from .spot_snapshot import SOURCE_EASTMONEY, get_spot_snapshot_service
+                snapshot = await get_spot_snapshot_service().get_snapshot(SOURCE_EASTMONEY)
+                row = snapshot.get_row(code)
 
-                if spot_df is not None and not spot_df.empty:
-                    # 查找对应股票
-                    stock_data = spot_df[spot_df['代码'] == code]
-
-                    if not stock_data.empty:
-                        row = stock_data.iloc[0]
-
-                        # 解析行情数据
-                        return {
-                            "name": str(row.get("名称", f"股票{code}")),
-                            "price": self._safe_float(row.get("最新价", 0)),
-                            "change": self._safe_float(row.get("涨跌额", 0)),
-                            "change_percent": self._safe_float(row.get("涨跌幅", 0)),
-                            "volume": self._safe_int(row.get("成交量", 0)),
-                            "amount": self._safe_float(row.get("成交额", 0)),
-                            "open": self._safe_float(row.get("今开", 0)),
-                            "high": self._safe_float(row.get("最高", 0)),
-                            "low": self._safe_float(row.get("最低", 0)),
-                            "pre_close": self._safe_float(row.get("昨收", 0)),
-                            # 🔥 新增：财务指标字段
-                            "turnover_rate": self._safe_float(row.get("换手率", None)),  # 换手率（%）
-                            "volume_ratio": self._safe_float(row.get("量比", None)),  # 量比
-                            "pe": self._safe_float(row.get("市盈率-动态", None)),  # 动态市盈率
-                            "pb": self._safe_float(row.get("市净率", None)),  # 市净率
-                            "total_mv": self._safe_float(row.get("总市值", None)),  # 总市值（元）
-                            "circ_mv": self._safe_float(row.get("流通市值", None)),  # 流通市值（元）
-                        }
+                if row is not None:
+                    # 解析行情数据
+                    return {
+                        "name": str(row.get("名称", f"股票{code}")),
+                        "price": self._safe_float(row.get("最新价", 0)),
+                        "change": self._safe_float(row.get("涨跌额", 0)),
+                        "change_percent": self._safe_float(row.get("涨跌幅", 0)),
+                        "volume": self._safe_int(row.get("成交量", 0)),
+                        "amount": self._safe_float(row.get("成交额", 0)),
+                        "open": self._safe_float(row.get("今开", 0)),
+                        "high": self._safe_float(row.get("最高", 0)),
+                        "low": self._safe_float(row.get("最低", 0)),
+                        "pre_close": self._safe_float(row.get("昨收", 0)),
+                        # 🔥 新增：财务指标字段
+                        "turnover_rate": self._safe_float(row.get("换手率", None)),  # 换手率（%）
+                        "volume_ratio": self._safe_float(row.get("量比", None)),  # 量比
+                        "pe": self._safe_float(row.get("市盈率-动态", None)),  # 动态市盈率
+                        "pb": self._safe_float(row.get("市净率", None)),  # 市净率
+                        "total_mv": self._safe_float(row.get("总市值", None)),  # 总市值（元）
+                        "circ_mv": self._safe_float(row.get("流通市值", None)),  # 流通市值（元）
+                    }
             except Exception as e:
                 logger.debug(f"获取{code}A股实时行情失败: {e}")
 
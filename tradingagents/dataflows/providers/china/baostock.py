@@ -3,13 +3,13 @@
 BaoStock统一数据提供器
 实现BaseStockDataProvider接口，提供标准化的BaoStock数据访问
 """
-import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, List, Optional, Union
 import pandas as pd
 
 from ..base_provider import BaseStockDataProvider
+from .baostock_session import BaoStockSessionBroker, get_baostock_session_broker
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +22,15 @@ class BaoStockProvider(BaseStockDataProvider):
         super().__init__("baostock")
         self.bs = None
         self.connected = False
+        self._session: Optional[BaoStockSessionBroker] = None
         self._init_baostock()
+
+    @property
+    def session(self) -> BaoStockSessionBroker:
+        """共享的 BaoStock 登录会话（首次查询时登录，之后复用）"""
+        if self._session is None:
+            self._session = get_baostock_session_broker(self.bs)
+        return self._session
     
     def _init_baostock(self):
         """初始化BaoStock连接"""
@@ -48,15 +56,7 @@ class BaoStockProvider(BaseStockDataProvider):
             return False
         
         try:
-            # 异步测试登录
-            def test_login():
-                lg = self.bs.login()
-                if lg.error_code != '0':
-                    raise Exception(f"登录失败: {lg.error_msg}")
-                self.bs.logout()
-                return True
-            
-            await asyncio.to_thread(test_login)
+            await self.session.aensure_login()
             logger.info("✅ BaoStock连接测试成功")
             return True
         except Exception as e:
@@ -71,37 +71,20 @@ class BaoStockProvider(BaseStockDataProvider):
         try:
             logger.info("📋 获取BaoStock股票列表（同步）...")
 
-            lg = self.bs.login()
-            if lg.error_code != '0':
-                logger.error(f"BaoStock登录失败: {lg.error_msg}")
-                return None
-
-            try:
-                rs = self.bs.query_stock_basic()
-                if rs.error_code != '0':
-                    logger.error(f"BaoStock查询失败: {rs.error_msg}")
-                    return None
+            data_list, fields = self.session.query("query_stock_basic")
 
-                data_list = []
-                while (rs.error_code == '0') & rs.next():
-                    data_list.append(rs.get_row_data())
-
-                if not data_list:
-                    logger.warning("⚠️ BaoStock股票列表为空")
-                    return None
-
-                # 转换为DataFrame
-                import pandas as pd
-                df = pd.DataFrame(data_list, columns=rs.fields)
+            if not data_list:
+                logger.warning("⚠️ BaoStock股票列表为空")
+                return None
 
-                # 只保留股票类型（type=1）
-                df = df[df['type'] == '1']
+            # 转换为DataFrame
+            df = pd.DataFrame(data_list, columns=fields)
 
-                logger.info(f"✅ BaoStock股票列表获取成功: {len(df)}只股票")
-                return df
+            # 只保留股票类型（type=1）
+            df = df[df['type'] == '1']
 
-            finally:
-                self.bs.logout()
+            logger.info(f"✅ BaoStock股票列表获取成功: {len(df)}只股票")
+            return df
 
         except Exception as e:
             logger.error(f"❌ BaoStock获取股票列表失败: {e}")
@@ -120,25 +103,7 @@ class BaoStockProvider(BaseStockDataProvider):
         try:
             logger.info("📋 获取BaoStock股票列表...")
             
-            def fetch_stock_list():
-                lg = self.bs.login()
-                if lg.error_code != '0':
-                    raise Exception(f"登录失败: {lg.error_msg}")
-                
-                try:
-                    rs = self.bs.query_stock_basic()
-                    if rs.error_code != '0':
-                        raise Exception(f"查询失败: {rs.error_msg}")
-                    
-                    data_list = []
-                    while (rs.error_code == '0') & rs.next():
-                        data_list.append(rs.get_row_data())
-                    
-                    return data_list, rs.fields
-                finally:
-                    self.bs.logout()
-            
-            data_list, fields = await asyncio.to_thread(fetch_stock_list)
+            data_list, fields = await self.session.aquery("query_stock_basic")
             
             if not data_list:
                 logger.warning("⚠️ BaoStock股票列表为空")
@@ -230,35 +195,16 @@ class BaoStockProvider(BaseStockDataProvider):
 
             logger.debug(f"📊 获取{code}估值数据: {start_date} 到 {end_date}")
 
-            def fetch_valuation_data():
-                bs_code = self._to_baostock_code(code)
-                lg = self.bs.login()
-                if lg.error_code != '0':
-                    raise Exception(f"登录失败: {lg.error_msg}")
-
-                try:
-                    # 🔥 获取估值指标：peTTM, pbMRQ, psTTM, pcfNcfTTM
-                    rs = self.bs.query_history_k_data_plus(
-                        code=bs_code,
-                        fields="date,code,close,peTTM,pbMRQ,psTTM,pcfNcfTTM",
-                        start_date=start_date,
-                        end_date=end_date,
-                        frequency="d",
-                        adjustflag="3"  # 不复权
-                    )
-
-                    if rs.error_code != '0':
-                        raise Exception(f"查询失败: {rs.error_msg}")
-
-                    data_list = []
-                    while (rs.error_code == '0') & rs.next():
-                        data_list.append(rs.get_row_data())
-
-                    return data_list, rs.fields
-                finally:
-                    self.bs.logout()
-
-            data_list, fields = await asyncio.to_thread(fetch_valuation_data)
+            # 🔥 获取估值指标：peTTM, pbMRQ, psTTM, pcfNcfTTM
+            data_list, fields = await self.session.aquery(
+                "query_history_k_data_plus",
+                code=self._to_baostock_code(code),
+                fields="date,code,close,peTTM,pbMRQ,psTTM,pcfNcfTTM",
+                start_date=start_date,
+                end_date=end_date,
+                frequency="d",
+                adjustflag="3"  # 不复权
+            )
 
             if not data_list:
                 logger.warning(f"⚠️ {code}估值数据为空")
@@ -288,36 +234,18 @@ class BaoStockProvider(BaseStockDataProvider):
     async def _get_stock_info_detail(self, code: str) -> Dict[str, Any]:
         """获取股票详细信息"""
         try:
-            def fetch_stock_info():
-                bs_code = self._to_baostock_code(code)
-                lg = self.bs.login()
-                if lg.error_code != '0':
-                    raise Exception(f"登录失败: {lg.error_msg}")
-                
-                try:
-                    rs = self.bs.query_stock_basic(code=bs_code)
-                    if rs.error_code != '0':
-                        return {"code": code, "name": f"股票{code}"}
-                    
-                    data_list = []
-                    while (rs.error_code == '0') & rs.next():
-                        data_list.append(rs.get_row_data())
-                    
-                    if not data_list:
-                        return {"code": code, "name": f"股票{code}"}
-                    
-                    row = data_list[0]
-                    return {
-                        "code": code,
-                        "name": str(row[1]) if len(row) > 1 else f"股票{code}",  # code_name
-                        "list_date": str(row[2]) if len(row) > 2 else "",  # ipoDate
-                        "industry": "未知",  # BaoStock基础信息不包含行业
-                        "area": "未知"  # BaoStock基础信息不包含地区
-                    }
-                finally:
-                    self.bs.logout()
-            
-            return await asyncio.to_thread(fetch_stock_info)
+            data_list, _ = await self.session.aquery("query_stock_basic", code=self._to_baostock_code(code))
+            if not data_list:
+                return {"code": code, "name": f"股票{code}"}
+
+            row = data_list[0]
+            return {
+                "code": code,
+                "name": str(row[1]) if len(row) > 1 else f"股票{code}",  # code_name
+                "list_date": str(row[2]) if len(row) > 2 else "",  # ipoDate
+                "industry": "未知",  # BaoStock基础信息不包含行业
+                "area": "未知"  # BaoStock基础信息不包含地区
+            }
             
         except Exception as e:
             logger.debug(f"获取{code}详细信息失败: {e}")
@@ -370,54 +298,37 @@ class BaoStockProvider(BaseStockDataProvider):
     async def _get_latest_kline_data(self, code: str) -> Dict[str, Any]:
         """获取最新K线数据作为行情"""
         try:
-            def fetch_latest_kline():
-                bs_code = self._to_baostock_code(code)
-                lg = self.bs.login()
-                if lg.error_code != '0':
-                    raise Exception(f"登录失败: {lg.error_msg}")
-                
-                try:
-                    # 获取最近5天的数据
-                    end_date = datetime.now().strftime('%Y-%m-%d')
-                    start_date = (datetime.now() - timedelta(days=5)).strftime('%Y-%m-%d')
-                    
-                    rs = self.bs.query_history_k_data_plus(
-                        code=bs_code,
-                        fields="date,code,open,high,low,close,preclose,volume,amount,pctChg",
-                        start_date=start_date,
-                        end_date=end_date,
-                        frequency="d",
-                        adjustflag="3"
-                    )
-                    
-                    if rs.error_code != '0':
-                        return {}
-                    
-                    data_list = []
-                    while (rs.error_code == '0') & rs.next():
-                        data_list.append(rs.get_row_data())
-                    
-                    if not data_list:
-                        return {}
-                    
-                    # 取最新一条数据
-                    latest_row = data_list[-1]
-                    return {
-                        "name": f"股票{code}",
-                        "open": self._safe_float(latest_row[2]),
-                        "high": self._safe_float(latest_row[3]),
-                        "low": self._safe_float(latest_row[4]),
-                        "close": self._safe_float(latest_row[5]),
-                        "preclose": self._safe_float(latest_row[6]),
-                        "volume": self._safe_int(latest_row[7]),
-                        "amount": self._safe_float(latest_row[8]),
-                        "change_percent": self._safe_float(latest_row[9]),
-                        "change": self._safe_float(latest_row[5]) - self._safe_float(latest_row[6])
-                    }
-                finally:
-                    self.bs.logout()
-            
-            return await asyncio.to_thread(fetch_latest_kline)
+            # 获取最近5天的数据
+            end_date = datetime.now().strftime('%Y-%m-%d')
+            start_date = (datetime.now() - timedelta(days=5)).strftime('%Y-%m-%d')
+
+            data_list, _ = await self.session.aquery(
+                "query_history_k_data_plus",
+                code=self._to_baostock_code(code),
+                fields="date,code,open,high,low,close,preclose,volume,amount,pctChg",
+                start_date=start_date,
+                end_date=end_date,
+                frequency="d",
+                adjustflag="3"
+            )
+
+            if not data_list:
+                return {}
+
+            # 取最新一条数据
+            latest_row = data_list[-1]
+            return {
+                "name": f"股票{code}",
+                "open": self._safe_float(latest_row[2]),
+                "high": self._safe_float(latest_row[3]),
+                "low": self._safe_float(latest_row[4]),
+                "close": self._safe_float(latest_row[5]),
+                "preclose": self._safe_float(latest_row[6]),
+                "volume": self._safe_int(latest_row[7]),
+                "amount": self._safe_float(latest_row[8]),
+                "change_percent": self._safe_float(latest_row[9]),
+                "change": self._safe_float(latest_row[5]) - self._safe_float(latest_row[6])
+            }
             
         except Exception as e:
             logger.debug(f"获取{code}最新K线数据失败: {e}")
@@ -565,41 +476,22 @@ class BaoStockProvider(BaseStockDataProvider):
             }
             bs_frequency = frequency_map.get(period, "d")
 
-            def fetch_historical_data():
-                bs_code = self._to_baostock_code(code)
-                lg = self.bs.login()
-                if lg.error_code != '0':
-                    raise Exception(f"登录失败: {lg.error_msg}")
-
-                try:
-                    # 根据频率选择不同的字段（周线和月线支持的字段较少）
-                    if bs_frequency == "d":
-                        fields_str = "date,code,open,high,low,close,preclose,volume,amount,adjustflag,turn,tradestatus,pctChg,isST"
-                    else:
-                        # 周线和月线只支持基础字段
-                        fields_str = "date,code,open,high,low,close,volume,amount,pctChg"
-
-                    rs = self.bs.query_history_k_data_plus(
-                        code=bs_code,
-                        fields=fields_str,
-                        start_date=start_date,
-                        end_date=end_date,
-                        frequency=bs_frequency,
-                        adjustflag="2"  # 前复权
-                    )
-
-                    if rs.error_code != '0':
-                        raise Exception(f"查询失败: {rs.error_msg}")
-
-                    data_list = []
-                    while (rs.error_code == '0') & rs.next():
-                        data_list.append(rs.get_row_data())
-
-                    return data_list, rs.fields
-                finally:
-                    self.bs.logout()
-
-            data_list, fields = await asyncio.to_thread(fetch_historical_data)
+            # 根据频率选择不同的字段（周线和月线支持的字段较少）
+            if bs_frequency == "d":
+                fields_str = "date,code,open,high,low,close,preclose,volume,amount,adjustflag,turn,tradestatus,pctChg,isST"
+            else:
+                # 周线和月线只支持基础字段
+                fields_str = "date,code,open,high,low,close,volume,amount,pctChg"
+
+            data_list, fields = await self.session.aquery(
+                "query_history_k_data_plus",
+                code=self._to_baostock_code(code),
+                fields=fields_str,
+                start_date=start_date,
+                end_date=end_date,
+                frequency=bs_frequency,
+                adjustflag="2"  # 前复权
+            )
 
             if not data_list:
                 logger.warning(f"⚠️ BaoStock历史数据为空: {code}")
@@ -663,50 +555,20 @@ class BaoStockProvider(BaseStockDataProvider):
 
             financial_data = {}
 
-            # 1. 获取盈利能力数据
-            try:
-                profit_data = await self._get_profit_data(code, year, quarter)
-                if profit_data:
-                    financial_data['profit_data'] = profit_data
-                    logger.debug(f"✅ {code}盈利能力数据获取成功")
-            except Exception as e:
-                logger.debug(f"获取{code}盈利能力数据失败: {e}")
-
-            # 2. 获取营运能力数据
-            try:
-                operation_data = await self._get_operation_data(code, year, quarter)
-                if operation_data:
-                    financial_data['operation_data'] = operation_data
-                    logger.debug(f"✅ {code}营运能力数据获取成功")
-            except Exception as e:
-                logger.debug(f"获取{code}营运能力数据失败: {e}")
-
-            # 3. 获取成长能力数据
-            try:
-                growth_data = await self._get_growth_data(code, year, quarter)
-                if growth_data:
-                    financial_data['growth_data'] = growth_data
-                    logger.debug(f"✅ {code}成长能力数据获取成功")
-            except Exception as e:
-                logger.debug(f"获取{code}成长能力数据失败: {e}")
-
-            # 4. 获取偿债能力数据
-            try:
-                balance_data = await self._get_balance_data(code, year, quarter)
-                if balance_data:
-                    financial_data['balance_data'] = balance_data
-                    logger.debug(f"✅ {code}偿债能力数据获取成功")
-            except Exception as e:
-                logger.debug(f"获取{code}偿债能力数据失败: {e}")
-
-            # 5. 获取现金流量数据
-            try:
-                cash_flow_data = await self._get_cash_flow_data(code, year, quarter)
-                if cash_flow_data:
-                    financial_data['cash_flow_data'] = cash_flow_data
-                    logger.debug(f"✅ {code}现金流量数据获取成功")
-            except Exception as e:
-                logger.debug(f"获取{code}现金流量数据失败: {e}")
+            # 五张报表在同一会话中批量查询，只排队一次
+            bs_code = self._to_baostock_code(code)
+            results = await self.session.aquery_batch([
+                (method, {"code": bs_code, "year": year, "quarter": quarter})
+                for _, method, _ in self._FINANCIAL_QUERIES
+            ])
+            for (key, _, label), result in zip(self._FINANCIAL_QUERIES, results):
+                if isinstance(result, Exception):
+                    logger.debug(f"获取{code}{label}数据失败: {result}")
+                    continue
+                record = self._first_record(result)
+                if record:
+                    financial_data[key] = record
+                    logger.debug(f"✅ {code}{label}数据获取成功")
 
             if financial_data:
                 logger.info(f"✅ BaoStock财务数据获取成功: {code}, {len(financial_data)}个数据集")
@@ -719,35 +581,29 @@ class BaoStockProvider(BaseStockDataProvider):
             logger.error(f"❌ BaoStock获取{code}财务数据失败: {e}")
             return {}
 
+    # 财务报表查询：(结果键, baostock 查询函数, 中文名称)
+    _FINANCIAL_QUERIES = [
+        ("profit_data", "query_profit_data", "盈利能力"),
+        ("operation_data", "query_operation_data", "营运能力"),
+        ("growth_data", "query_growth_data", "成长能力"),
+        ("balance_data", "query_balance_data", "偿债能力"),
+        ("cash_flow_data", "query_cash_flow_data", "现金流量"),
+    ]
+
+    @staticmethod
+    def _first_record(result) -> Optional[Dict[str, Any]]:
+        """(行列表, 字段列表) -> 第一行记录字典，无数据时返回 None"""
+        data_list, fields = result
+        if not data_list:
+            return None
+        return dict(zip(fields, data_list[0]))
+
     async def _get_profit_data(self, code: str, year: int, quarter: int) -> Optional[Dict[str, Any]]:
         """获取盈利能力数据"""
         try:
-            def fetch_profit_data():
-                bs_code = self._to_baostock_code(code)
-                lg = self.bs.login()
-                if lg.error_code != '0':
-                    raise Exception(f"登录失败: {lg.error_msg}")
-
-                try:
-                    rs = self.bs.query_profit_data(code=bs_code, year=year, quarter=quarter)
-                    if rs.error_code != '0':
-                        return None
-
-                    data_list = []
-                    while (rs.error_code == '0') & rs.next():
-                        data_list.append(rs.get_row_data())
-
-                    return data_list, rs.fields
-                finally:
-                    self.bs.logout()
-
-            result = await asyncio.to_thread(fetch_profit_data)
-            if not result or not result[0]:
-                return None
-
-            data_list, fields = result
-            df = pd.DataFrame(data_list, columns=fields)
-            return df.to_dict('records')[0] if not df.empty else None
+            result = await self.session.aquery("query_profit_data", code=self._to_baostock_code(code),
+                                               year=year, quarter=quarter)
+            return self._first_record(result)
 
         except Exception as e:
             logger.debug(f"获取{code}盈利能力数据失败: {e}")
@@ -756,32 +612,9 @@ class BaoStockProvider(BaseStockDataProvider):
     async def _get_operation_data(self, code: str, year: int, quarter: int) -> Optional[Dict[str, Any]]:
         """获取营运能力数据"""
         try:
-            def fetch_operation_data():
-                bs_code = self._to_baostock_code(code)
-                lg = self.bs.login()
-                if lg.error_code != '0':
-                    raise Exception(f"登录失败: {lg.error_msg}")
-
-                try:
-                    rs = self.bs.query_operation_data(code=bs_code, year=year, quarter=quarter)
-                    if rs.error_code != '0':
-                        return None
-
-                    data_list = []
-                    while (rs.error_code == '0') & rs.next():
-                        data_list.append(rs.get_row_data())
-
-                    return data_list, rs.fields
-                finally:
-                    self.bs.logout()
-
-            result = await asyncio.to_thread(fetch_operation_data)
-            if not result or not result[0]:
-                return None
-
-            data_list, fields = result
-            df = pd.DataFrame(data_list, columns=fields)
-            return df.to_dict('records')[0] if not df.empty else None
+            result = await self.session.aquery("query_operation_data", code=self._to_baostock_code(code),
+                                               year=year, quarter=quarter)
+            return self._first_record(result)
 
         except Exception as e:
             logger.debug(f"获取{code}营运能力数据失败: {e}")
@@ -790,32 +623,9 @@ class BaoStockProvider(BaseStockDataProvider):
     async def _get_growth_data(self, code: str, year: int, quarter: int) -> Optional[Dict[str, Any]]:
         """获取成长能力数据"""
         try:
-            def fetch_growth_data():
-                bs_code = self._to_baostock_code(code)
-                lg = self.bs.login()
-                if lg.error_code != '0':
-                    raise Exception(f"登录失败: {lg.error_msg}")
-
-                try:
-                    rs = self.bs.query_growth_data(code=bs_code, year=year, quarter=quarter)
-                    if rs.error_code != '0':
-                        return None
-
-                    data_list = []
-                    while (rs.error_code == '0') & rs.next():
-                        data_list.append(rs.get_row_data())
-
-                    return data_list, rs.fields
-                finally:
-                    self.bs.logout()
-
-            result = await asyncio.to_thread(fetch_growth_data)
-            if not result or not result[0]:
-                return None
-
-            data_list, fields = result
-            df = pd.DataFrame(data_list, columns=fields)
-            return df.to_dict('records')[0] if not df.empty else None
+            result = await self.session.aquery("query_growth_data", code=self._to_baostock_code(code),
+                                               year=year, quarter=quarter)
+            return self._first_record(result)
 
         except Exception as e:
             logger.debug(f"获取{code}成长能力数据失败: {e}")
@@ -824,32 +634,9 @@ class BaoStockProvider(BaseStockDataProvider):
     async def _get_balance_data(self, code: str, year: int, quarter: int) -> Optional[Dict[str, Any]]:
         """获取偿债能力数据"""
         try:
-            def fetch_balance_data():
-                bs_code = self._to_baostock_code(code)
-                lg = self.bs.login()
-                if lg.error_code != '0':
-                    raise Exception(f"登录失败: {lg.error_msg}")
-
-                try:
-                    rs = self.bs.query_balance_data(code=bs_code, year=year, quarter=quarter)
-                    if rs.error_code != '0':
-                        return None
-
-                    data_list = []
-                    while (rs.error_code == '0') & rs.next():
-                        data_list.append(rs.get_row_data())
-
-                    return data_list, rs.fields
-                finally:
-                    self.bs.logout()
-
-            result = await asyncio.to_thread(fetch_balance_data)
-            if not result or not result[0]:
-                return None
-
-            data_list, fields = result
-            df = pd.DataFrame(data_list, columns=fields)
-            return df.to_dict('records')[0] if not df.empty else None
+            result = await self.session.aquery("query_balance_data", code=self._to_baostock_code(code),
+                                               year=year, quarter=quarter)
+            return self._first_record(result)
 
         except Exception as e:
             logger.debug(f"获取{code}偿债能力数据失败: {e}")
@@ -858,32 +645,9 @@ class BaoStockProvider(BaseStockDataProvider):
     async def _get_cash_flow_data(self, code: str, year: int, quarter: int) -> Optional[Dict[str, Any]]:
         """获取现金流量数据"""
         try:
-            def fetch_cash_flow_data():
-                bs_code = self._to_baostock_code(code)
-                lg = self.bs.login()
-                if lg.error_code != '0':
-                    raise Exception(f"登录失败: {lg.error_msg}")
-
-                try:
-                    rs = self.bs.query_cash_flow_data(code=bs_code, year=year, quarter=quarter)
-                    if rs.error_code != '0':
-                        return None
-
-                    data_list = []
-                    while (rs.error_code == '0') & rs.next():
-                        data_list.append(rs.get_row_data())
-
-                    return data_list, rs.fields
-                finally:
-                    self.bs.logout()
-
-            result = await asyncio.to_thread(fetch_cash_flow_data)
-            if not result or not result[0]:
-                return None
-
-            data_list, fields = result
-            df = pd.DataFrame(data_list, columns=fields)
-            return df.to_dict('records')[0] if not df.empty else None
+            result = await self.session.aquery("query_cash_flow_data", code=self._to_baostock_code(code),
+                                               year=year, quarter=quarter)
+            return self._first_record(result)
 
         except Exception as e:
             logger.debug(f"获取{code}现金流量数据失败: {e}")
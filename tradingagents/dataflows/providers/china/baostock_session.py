@@ -0,0 +1,168 @@
+"""
+BaoStock 长连接会话
+
+baostock 模块在模块级保存唯一的 socket 和登录状态，既不是线程安全的，
+也不支持多个会话并存。此前 BaoStockProvider 每次查询都 login/logout 一次，
+全市场历史同步要为每只股票、每张财务报表多付一次登录往返。
+
+BaoStockSessionBroker 持有一个登录后的会话：
+
+- 所有 baostock 调用都在专用线程上串行执行，调用方（协程或线程）只提交查询
+- 首次查询时登录，之后复用；服务端会话过期或连接断开时自动重新登录并重试一次
+- query_batch 一次提交多条查询，在专用线程上连续执行，只排队一次
+- 每个 baostock 模块对象只有一个 broker（get_baostock_session_broker）
+"""
+from __future__ import annotations
+
+import asyncio
+import atexit
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 需要重新登录的错误码：未登录（会话过期）与网络类错误（连接已断开）
+RELOGIN_ERROR_CODES = frozenset({
+    "10001001",  # 用户未登陆
+    "10002001", "10002002", "10002003", "10002004",
+    "10002005", "10002006", "10002007", "10002008",
+})
+
+Query = Tuple[str, Dict[str, Any]]
+Rows = Tuple[List[List[str]], List[str]]
+
+
+class BaoStockQueryError(Exception):
+    """BaoStock 登录或查询返回了错误码"""
+
+    def __init__(self, error_code: str, error_msg: str):
+        super().__init__(f"[{error_code}] {error_msg}")
+        self.error_code = error_code
+        self.error_msg = error_msg
+
+
+class BaoStockSessionBroker:
+    """持有一个 BaoStock 登录会话，在专用线程上串行执行查询"""
+
+    def __init__(self, bs):
+        self.bs = bs
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ta-baostock")
+        self._logged_in = False
+        self.stats = {"logins": 0, "relogins": 0, "queries": 0}
+
+    # ---- 以下方法只在专用线程上执行 ----
+
+    def _login(self) -> None:
+        lg = self.bs.login()
+        if lg.error_code != '0':
+            raise BaoStockQueryError(lg.error_code, f"登录失败: {lg.error_msg}")
+        self._logged_in = True
+        self.stats["logins"] += 1
+
+    def _run_query(self, method: str, kwargs: Dict[str, Any]) -> Rows:
+        if not self._logged_in:
+            self._login()
+        rs = getattr(self.bs, method)(**kwargs)
+        if rs.error_code in RELOGIN_ERROR_CODES:
+            logger.info(f"🔄 BaoStock会话失效({rs.error_code})，重新登录")
+            self._logged_in = False
+            self.stats["relogins"] += 1
+            self._login()
+            rs = getattr(self.bs, method)(**kwargs)
+        self.stats["queries"] += 1
+        if rs.error_code != '0':
+            if rs.error_code in RELOGIN_ERROR_CODES:
+                self._logged_in = False
+            raise BaoStockQueryError(rs.error_code, f"查询失败: {rs.error_msg}")
+
+        rows = []
+        while (rs.error_code == '0') & rs.next():
+            rows.append(rs.get_row_data())
+        return rows, rs.fields
+
+    def _run_batch(self, queries: Sequence[Query]) -> List[Any]:
+        results: List[Any] = []
+        for method, kwargs in queries:
+            try:
+                results.append(self._run_query(method, kwargs))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _ensure_login(self) -> bool:
+        if not self._logged_in:
+            self._login()
+        return True
+
+    def _logout(self) -> None:
+        if self._logged_in:
+            try:
+                self.bs.logout()
+            except Exception as e:
+                logger.debug(f"BaoStock登出失败: {e}")
+            self._logged_in = False
+
+    # ---- 对外接口 ----
+
+    def query(self, method: str, **kwargs) -> Rows:
+        """
+        同步执行一条查询，返回 (行列表, 字段列表)
+
+        Args:
+            method: baostock 查询函数名，如 "query_history_k_data_plus"
+            **kwargs: 传给查询函数的参数
+
+        Raises:
+            BaoStockQueryError: 登录失败或查询返回错误码
+        """
+        return self._executor.submit(self._run_query, method, kwargs).result()
+
+    def query_batch(self, queries: Sequence[Query]) -> List[Any]:
+        """同步执行一批查询：结果与 queries 一一对应，失败的位置为异常对象"""
+        return self._executor.submit(self._run_batch, list(queries)).result()
+
+    async def aquery(self, method: str, **kwargs) -> Rows:
+        """query 的异步版本"""
+        return await asyncio.wrap_future(self._executor.submit(self._run_query, method, kwargs))
+
+    async def aquery_batch(self, queries: Sequence[Query]) -> List[Any]:
+        """query_batch 的异步版本"""
+        return await asyncio.wrap_future(self._executor.submit(self._run_batch, list(queries)))
+
+    async def aensure_login(self) -> bool:
+        """确保会话已登录（用于连接测试），登录失败时抛出 BaoStockQueryError"""
+        return await asyncio.wrap_future(self._executor.submit(self._ensure_login))
+
+    def close(self) -> None:
+        """登出并停止专用线程"""
+        try:
+            self._executor.submit(self._logout).result(timeout=10)
+        except Exception as e:
+            logger.debug(f"BaoStock会话关闭失败: {e}")
+        self._executor.shutdown(wait=False)
+
+
+_brokers: Dict[int, BaoStockSessionBroker] = {}
+_brokers_lock = threading.Lock()
+
+
+def get_baostock_session_broker(bs=None) -> BaoStockSessionBroker:
+    """获取 baostock 模块对应的全局会话（bs 为空时导入 baostock）"""
+    if bs is None:
+        import baostock as bs
+    broker = _brokers.get(id(bs))
+    if broker is None:
+        with _brokers_lock:
+            broker = _brokers.get(id(bs))
+            if broker is None:
+                broker = BaoStockSessionBroker(bs)
+                _brokers[id(bs)] = broker
+    return broker
+
+
+@atexit.register
+def _close_brokers() -> None:
+    for broker in list(_brokers.values()):
+        broker.close()
@@ -0,0 +1,212 @@
+"""
+A股全市场实时行情快照（进程级共享）
+
+AKShare 的 spot 接口每次返回全市场约5000行，此前单股行情、批量行情、
+QuotesService 和行情入库任务各自拉取。这里统一维护一份按6位代码索引的快照：
+
+- 快照在 TA_SPOT_SNAPSHOT_MAX_AGE_SECONDS（默认30秒）内视为新鲜，单股查询直接命中字典
+- 过期后只有一个请求真正拉取（single-flight）：同一事件循环中的协程等待同一个 future，
+  同步调用方（线程）在锁上等待，拉取完成后共用结果
+- 拉取失败时返回仍在容忍期内的旧快照，否则抛出原异常
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+import pandas as pd
+
+from tradingagents.utils.logging_manager import get_logger
+
+logger = get_logger('agents')
+
+SOURCE_EASTMONEY = "eastmoney"
+SOURCE_SINA = "sina"
+
+DEFAULT_MAX_AGE_SECONDS = 30.0
+
+_CODE_COLUMNS = ["代码", "code", "symbol", "股票代码"]
+
+
+def normalize_spot_code(raw) -> Optional[str]:
+    """将 spot 表中的代码（可能带 sh/sz/bj 前缀）标准化为6位数字代码"""
+    if raw is None:
+        return None
+    digits = ''.join(filter(str.isdigit, str(raw).strip()))
+    if not digits:
+        return None
+    return (digits.lstrip('0') or '0').zfill(6)
+
+
+def _default_fetcher(source: str) -> pd.DataFrame:
+    import akshare as ak
+    if source == SOURCE_SINA:
+        return ak.stock_zh_a_spot()
+    return ak.stock_zh_a_spot_em()
+
+
+class SpotSnapshot:
+    """一次拉取得到的全市场快照（只读，调用方不要修改 df）"""
+
+    def __init__(self, source: str, df: pd.DataFrame, fetched_at: float):
+        self.source = source
+        self.df = df
+        self.fetched_at = fetched_at
+        self._positions: Dict[str, int] = {}
+        code_col = next((c for c in _CODE_COLUMNS if c in df.columns), None)
+        if code_col is not None:
+            for pos, raw in enumerate(df[code_col].tolist()):
+                code = normalize_spot_code(raw)
+                if code and code not in self._positions:
+                    self._positions[code] = pos
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, code: str) -> bool:
+        return normalize_spot_code(code) in self._positions
+
+    def get_row(self, code: str) -> Optional[pd.Series]:
+        """按代码取一行，未找到返回 None"""
+        pos = self._positions.get(normalize_spot_code(code))
+        return None if pos is None else self.df.iloc[pos]
+
+    def get_rows(self, codes: Iterable[str]) -> Dict[str, pd.Series]:
+        """按代码批量取行，返回 {请求代码: 行}，只包含找到的代码"""
+        result = {}
+        for code in codes:
+            row = self.get_row(code)
+            if row is not None:
+                result[code] = row
+        return result
+
+
+class SpotSnapshotService:
+    """全市场快照的进程级缓存与单飞刷新"""
+
+    def __init__(self, fetcher: Optional[Callable[[str], pd.DataFrame]] = None,
+                 max_age_seconds: Optional[float] = None):
+        self._fetcher = fetcher or _default_fetcher
+        if max_age_seconds is None:
+            try:
+                max_age_seconds = float(os.getenv("TA_SPOT_SNAPSHOT_MAX_AGE_SECONDS", DEFAULT_MAX_AGE_SECONDS))
+            except ValueError:
+                max_age_seconds = DEFAULT_MAX_AGE_SECONDS
+        self.max_age_seconds = max_age_seconds
+
+        self._snapshots: Dict[str, SpotSnapshot] = {}
+        self._fetch_locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        # 异步单飞：{(source, loop_id): Future}
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+
+        self.stats = {"fetches": 0, "hits": 0, "shared_waits": 0, "errors": 0}
+
+    def _is_fresh(self, snap: Optional[SpotSnapshot], max_age: Optional[float]) -> bool:
+        limit = self.max_age_seconds if max_age is None else max_age
+        return snap is not None and snap.age < limit
+
+    def _fetch_lock(self, source: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._fetch_locks.setdefault(source, threading.Lock())
+
+    def peek(self, source: str = SOURCE_EASTMONEY) -> Optional[SpotSnapshot]:
+        """返回当前快照（不触发刷新，可能已过期或为 None）"""
+        return self._snapshots.get(source)
+
+    def invalidate(self, source: Optional[str] = None) -> None:
+        if source is None:
+            self._snapshots.clear()
+        else:
+            self._snapshots.pop(source, None)
+
+    def get_snapshot_sync(self, source: str = SOURCE_EASTMONEY, max_age: Optional[float] = None) -> SpotSnapshot:
+        """
+        同步获取快照（供线程中运行的同步代码使用）
+
+        Args:
+            source: eastmoney 或 sina
+            max_age: 可接受的最大快照年龄（秒），默认使用服务配置
+
+        Raises:
+            拉取失败且没有可用旧快照时抛出原异常
+        """
+        snap = self._snapshots.get(source)
+        if self._is_fresh(snap, max_age):
+            self.stats["hits"] += 1
+            return snap
+
+        lock = self._fetch_lock(source)
+        waited = not lock.acquire(blocking=False)
+        if waited:
+            lock.acquire()
+        try:
+            # 等锁期间其他调用方可能已经刷新
+            snap = self._snapshots.get(source)
+            if self._is_fresh(snap, max_age):
+                self.stats["shared_waits" if waited else "hits"] += 1
+                return snap
+            return self._refresh_locked(source)
+        finally:
+            lock.release()
+
+    async def get_snapshot(self, source: str = SOURCE_EASTMONEY, max_age: Optional[float] = None) -> SpotSnapshot:
+        """异步获取快照：并发调用方等待同一个刷新 future，拉取在线程中执行"""
+        snap = self._snapshots.get(source)
+        if self._is_fresh(snap, max_age):
+            self.stats["hits"] += 1
+            return snap
+
+        loop = asyncio.get_running_loop()
+        key = (source, id(loop))
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["shared_waits"] += 1
+            return await asyncio.shield(future)
+
+        future = loop.create_task(asyncio.to_thread(self.get_snapshot_sync, source, max_age))
+        self._inflight[key] = future
+        future.add_done_callback(lambda _f: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    def _refresh_locked(self, source: str) -> SpotSnapshot:
+        previous = self._snapshots.get(source)
+        start = time.monotonic()
+        try:
+            df = self._fetcher(source)
+            if df is None or getattr(df, "empty", True):
+                raise ValueError(f"{source} spot 返回空数据")
+        except Exception as e:
+            self.stats["errors"] += 1
+            # 旧快照在 3 倍新鲜期内仍可用，避免接口抖动时所有行情请求失败
+            if previous is not None and previous.age < self.max_age_seconds * 3:
+                logger.warning(f"⚠️ [行情快照] {source} 刷新失败，使用 {previous.age:.0f}秒前的快照: {e}")
+                return previous
+            raise
+
+        snap = SpotSnapshot(source, df, time.monotonic())
+        self._snapshots[source] = snap
+        self.stats["fetches"] += 1
+        logger.info(f"📊 [行情快照] {source} 已刷新: {len(snap)} 只股票, 耗时 {time.monotonic() - start:.2f}秒")
+        return snap
+
+
+_spot_snapshot_service: Optional[SpotSnapshotService] = None
+_service_lock = threading.Lock()
+
+
+def get_spot_snapshot_service() -> SpotSnapshotService:
+    """获取进程级全市场行情快照服务"""
+    global _spot_snapshot_service
+    if _spot_snapshot_service is None:
+        with _service_lock:
+            if _spot_snapshot_service is None:
+                _spot_snapshot_service = SpotSnapshotService()
+    return _spot_snapshot_service
@@ -1,28 +1,9 @@
 """
 港股数据提供器
-"""
-
-# 导入改进的港股工具
-try:
-    from .improved_hk import (
-        ImprovedHKStockProvider,
-        get_improved_hk_provider,
-        get_hk_stock_info_improved
-    )
-    HK_PROVIDER_AVAILABLE = True
-except ImportError:
-    ImprovedHKStockProvider = None
-    get_improved_hk_provider = None
-    get_hk_stock_info_improved = None
-    HK_PROVIDER_AVAILABLE = False
 
-# 导入港股数据工具
-try:
-    from .hk_stock import HKStockProvider
-    HK_STOCK_AVAILABLE = True
-except ImportError:
-    HKStockProvider = None
-    HK_STOCK_AVAILABLE = False
+各提供器在首次访问时才导入，导入失败时对应名称为 None，*_AVAILABLE 为 False。
+"""
+from tradingagents.utils.lazy_exports import lazy_exports
 
 __all__ = [
     'ImprovedHKStockProvider',
@@ -33,3 +14,14 @@ __all__ = [
     'HK_STOCK_AVAILABLE',
 ]
 
+__getattr__, __dir__ = lazy_exports(__name__, globals(), {
+    # 改进的港股工具
+    'ImprovedHKStockProvider': [('.improved_hk', 'ImprovedHKStockProvider')],
+    'get_improved_hk_provider': [('.improved_hk', 'get_improved_hk_provider')],
+    'get_hk_stock_info_improved': [('.improved_hk', 'get_hk_stock_info_improved')],
+    # 港股数据工具
+    'HKStockProvider': [('.hk_stock', 'HKStockProvider')],
+}, flags={
+    'HK_PROVIDER_AVAILABLE': 'ImprovedHKStockProvider',
+    'HK_STOCK_AVAILABLE': 'HKStockProvider',
+})
@@ -1,34 +1,10 @@
 """
 美股数据提供器
 包含 Finnhub, Yahoo Finance 等美股数据源
-"""
-
-# 导入 Finnhub 工具
-try:
-    from .finnhub import get_data_in_range
-    FINNHUB_AVAILABLE = True
-except ImportError:
-    get_data_in_range = None
-    FINNHUB_AVAILABLE = False
-
-# 导入 Yahoo Finance 工具
-try:
-    from .yfinance import YFinanceUtils
-    YFINANCE_AVAILABLE = True
-except ImportError:
-    YFinanceUtils = None
-    YFINANCE_AVAILABLE = False
 
-# 导入优化的美股数据提供器
-try:
-    from .optimized import OptimizedUSDataProvider
-    OPTIMIZED_US_AVAILABLE = True
-except ImportError:
-    OptimizedUSDataProvider = None
-    OPTIMIZED_US_AVAILABLE = False
-
-# 默认使用优化的提供器
-DefaultUSProvider = OptimizedUSDataProvider
+各提供器在首次访问时才导入，导入失败时对应名称为 None，*_AVAILABLE 为 False。
+"""
+from tradingagents.utils.lazy_exports import lazy_exports
 
 __all__ = [
     # Finnhub
@@ -45,3 +21,17 @@ __all__ = [
     'DefaultUSProvider',
 ]
 
+__getattr__, __dir__ = lazy_exports(__name__, globals(), {
+    # Finnhub 工具
+    'get_data_in_range': [('.finnhub', 'get_data_in_range')],
+    # Yahoo Finance 工具
+    'YFinanceUtils': [('.yfinance', 'YFinanceUtils')],
+    # 优化的美股数据提供器
+    'OptimizedUSDataProvider': [('.optimized', 'OptimizedUSDataProvider')],
+    # 默认使用优化的提供器
+    'DefaultUSProvider': [('.optimized', 'OptimizedUSDataProvider')],
+}, flags={
+    'FINNHUB_AVAILABLE': 'get_data_in_range',
+    'YFINANCE_AVAILABLE': 'YFinanceUtils',
+    'OPTIMIZED_US_AVAILABLE': 'OptimizedUSDataProvider',
+})
@@ -14,6 +14,8 @@ from typing import Optional, Dict, Any
 import yfinance as yf
 import pandas as pd
 
+from tradingagents.utils.tool_memo import memoize_tool
+
 # 导入缓存管理器（支持新旧路径）
 try:
     from ...cache import StockDataCache
@@ -519,6 +521,7 @@ def get_optimized_us_data_provider() -> OptimizedUSDataProvider:
     return _us_data_provider
 
 
+@memoize_tool("us_stock_data")
 def get_us_stock_data_cached(symbol: str, start_date: str, end_date: str,
                            force_refresh: bool = False) -> str:
     """
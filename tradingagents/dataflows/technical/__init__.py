@@ -1,18 +1,18 @@
 """
 技术指标计算模块
 提供各种技术分析指标的计算功能
-"""
 
-# 导入 stockstats
-try:
-    from .stockstats import StockstatsUtils
-    STOCKSTATS_AVAILABLE = True
-except ImportError:
-    StockstatsUtils = None
-    STOCKSTATS_AVAILABLE = False
+stockstats 在首次访问时才导入，导入失败时 StockstatsUtils 为 None。
+"""
+from tradingagents.utils.lazy_exports import lazy_exports
 
 __all__ = [
     'StockstatsUtils',
     'STOCKSTATS_AVAILABLE',
 ]
 
+__getattr__, __dir__ = lazy_exports(__name__, globals(), {
+    'StockstatsUtils': [('.stockstats', 'StockstatsUtils')],
+}, flags={
+    'STOCKSTATS_AVAILABLE': 'StockstatsUtils',
+})
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+交易日历（本地缓存）
+
+完整性检查、周/月线聚合等都需要知道哪些日期是交易日。逐日探测接口（例如回溯若干天
+调用 daily_basic）既慢又依赖网络，这里把交易所日历整段拉取一次并缓存为本地 JSON：
+
+- A股：优先 Tushare trade_cal（上交所），其次 AKShare tool_trade_date_hist_sina
+- 缓存超过 TA_TRADE_CALENDAR_TTL_DAYS 天或不覆盖今天时重新拉取；拉取失败时继续使用旧缓存
+- 其他市场或所有数据源都不可用时退化为工作日日历（不含节假日，不写入缓存）
+
+日历是有序的 numpy datetime64[D] 数组，区间切片和最近交易日查询都是二分查找。
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from tradingagents.utils.logging_manager import get_logger
+
+logger = get_logger('agents')
+
+CALENDAR_TTL_DAYS = int(os.getenv("TA_TRADE_CALENDAR_TTL_DAYS", "7"))
+DEFAULT_CACHE_DIR = Path(__file__).parent / "cache" / "data_cache" / "metadata"
+
+# 日历过期但数据源不可用时，至少间隔这么久（秒）才再次尝试拉取
+_RETRY_SECONDS = 600
+
+# 工作日日历的起点（A股 1990-12-19 开市）
+_WEEKDAY_START = "1990-12-19"
+
+DateLike = Union[str, date, datetime, np.datetime64, pd.Timestamp]
+
+
+def to_day(value: DateLike) -> np.datetime64:
+    """任意日期表示 -> numpy datetime64[D]"""
+    if isinstance(value, str) and len(value) == 8 and value.isdigit():
+        value = f"{value[:4]}-{value[4:6]}-{value[6:]}"
+    if isinstance(value, (pd.Timestamp, datetime)):
+        value = value.date()
+    return np.datetime64(value, "D")
+
+
+def to_days(values) -> np.ndarray:
+    """日期序列 -> datetime64[D] 数组（字符串、Timestamp、datetime64 均可）"""
+    arr = np.asarray(values)
+    if arr.dtype.kind == "M":
+        return arr.astype("datetime64[D]")
+    return pd.to_datetime(arr).values.astype("datetime64[D]")
+
+
+class TradingCalendar:
+    """交易日历：有序、去重的交易日数组"""
+
+    def __init__(self, market: str, days, source: str = "", updated_at: Optional[str] = None):
+        self.market = market
+        self.days = np.unique(to_days(days))
+        self.source = source
+        self.updated_at = updated_at
+
+    @classmethod
+    def weekdays(cls, market: str = "CN", start: DateLike = _WEEKDAY_START,
+                 end: Optional[DateLike] = None) -> "TradingCalendar":
+        """工作日日历（周一到周五），没有交易所日历时的近似"""
+        end_day = to_day(end) if end is not None else np.datetime64(f"{date.today().year}-12-31")
+        days = np.arange(to_day(start), end_day + 1, dtype="datetime64[D]")
+        return cls(market, days[np.is_busday(days)], source="weekday")
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    @property
+    def first(self) -> np.datetime64:
+        return self.days[0]
+
+    @property
+    def last(self) -> np.datetime64:
+        return self.days[-1]
+
+    def position(self, day: DateLike, side: str = "left") -> int:
+        """交易日序号：side=left 为不早于该日的第一个交易日，right 为不晚于该日的最后一个交易日"""
+        if side == "left":
+            return int(np.searchsorted(self.days, to_day(day), "left"))
+        return int(np.searchsorted(self.days, to_day(day), "right")) - 1
+
+    def locate(self, days: np.ndarray):
+        """批量定位：返回 (序号, 是否为交易日)"""
+        days = to_days(days)
+        idx = np.searchsorted(self.days, days)
+        valid = idx < len(self.days)
+        valid[valid] = self.days[idx[valid]] == days[valid]
+        return idx, valid
+
+    def is_trading_day(self, day: DateLike) -> bool:
+        d = to_day(day)
+        i = int(np.searchsorted(self.days, d))
+        return i < len(self.days) and self.days[i] == d
+
+    def sessions(self, start: DateLike, end: DateLike) -> np.ndarray:
+        """[start, end] 内的交易日"""
+        return self.days[self.position(start, "left"):self.position(end, "right") + 1]
+
+    def count(self, start: DateLike, end: DateLike) -> int:
+        return max(0, self.position(end, "right") - self.position(start, "left") + 1)
+
+    def latest_trade_date(self, as_of: Optional[DateLike] = None) -> Optional[str]:
+        """不晚于 as_of（默认今天）的最近交易日，YYYY-MM-DD"""
+        i = self.position(as_of if as_of is not None else date.today(), "right")
+        return str(self.days[i]) if i >= 0 else None
+
+    def covers(self, day: DateLike) -> bool:
+        return len(self.days) > 0 and self.first <= to_day(day) <= self.last
+
+    # ==================== 本地缓存 ====================
+
+    def to_dict(self) -> Dict:
+        return {
+            "market": self.market,
+            "source": self.source,
+            "updated_at": self.updated_at,
+            "days": np.datetime_as_string(self.days).tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TradingCalendar":
+        return cls(data["market"], np.array(data["days"], dtype="datetime64[D]"),
+                   source=data.get("source", ""), updated_at=data.get("updated_at"))
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self.to_dict()))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["TradingCalendar"]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️ [交易日历] 读取缓存失败: {path} - {e}")
+            return None
+
+    def is_stale(self, today: Optional[date] = None) -> bool:
+        today = today or date.today()
+        if not self.covers(today) or not self.updated_at:
+            return True
+        age = today - datetime.fromisoformat(self.updated_at).date()
+        return age.days >= CALENDAR_TTL_DAYS
+
+
+def _fetch_tushare_calendar(end: str) -> Optional[np.ndarray]:
+    from tradingagents.dataflows.providers.china.tushare import get_tushare_provider
+
+    provider = get_tushare_provider()
+    if not provider.is_available():
+        return None
+    df = provider.api.trade_cal(exchange="SSE", start_date=_WEEKDAY_START.replace("-", ""),
+                                end_date=end.replace("-", ""), is_open="1")
+    if df is None or df.empty:
+        return None
+    return to_days(df["cal_date"].astype(str).tolist())
+
+
+def _fetch_akshare_calendar(end: str) -> Optional[np.ndarray]:
+    import akshare as ak
+
+    df = ak.tool_trade_date_hist_sina()
+    if df is None or df.empty:
+        return None
+    days = to_days(df["trade_date"])
+    return days[days <= to_day(end)]
+
+
+_FETCHERS = {
+    "CN": [("tushare", _fetch_tushare_calendar), ("akshare", _fetch_akshare_calendar)],
+}
+
+
+def fetch_trade_calendar(market: str = "CN") -> Optional[TradingCalendar]:
+    """从数据源拉取交易日历（到今年年底），全部失败时返回 None"""
+    end = f"{date.today().year}-12-31"
+    for source, fetch in _FETCHERS.get(market, []):
+        try:
+            days = fetch(end)
+        except Exception as e:
+            logger.warning(f"⚠️ [交易日历] {source} 获取失败: {e}")
+            continue
+        if days is not None and len(days):
+            logger.info(f"📅 [交易日历] {market} 从 {source} 获取 {len(days)} 个交易日")
+            return TradingCalendar(market, days, source=source, updated_at=datetime.now().isoformat())
+    return None
+
+
+_calendars: Dict[str, TradingCalendar] = {}
+_checked_at: Dict[str, float] = {}
+_calendars_lock = threading.Lock()
+
+
+def _usable(market: str) -> Optional[TradingCalendar]:
+    calendar = _calendars.get(market)
+    if calendar is None:
+        return None
+    if not calendar.is_stale() or time.monotonic() - _checked_at[market] < _RETRY_SECONDS:
+        return calendar
+    return None
+
+
+def get_trading_calendar(market: str = "CN", cache_dir: Optional[Union[str, Path]] = None,
+                         refresh: bool = False) -> TradingCalendar:
+    """获取交易日历：进程内缓存 -> 本地 JSON 缓存 -> 数据源 -> 工作日近似"""
+    calendar = None if refresh else _usable(market)
+    if calendar is not None:
+        return calendar
+
+    with _calendars_lock:
+        calendar = None if refresh else _usable(market)
+        if calendar is not None:
+            return calendar
+
+        path = Path(cache_dir or DEFAULT_CACHE_DIR) / f"trade_calendar_{market}.json"
+        calendar = TradingCalendar.load(path)
+        if refresh or calendar is None or calendar.is_stale():
+            fetched = fetch_trade_calendar(market)
+            if fetched is not None:
+                calendar = fetched
+                try:
+                    calendar.save(path)
+                except Exception as e:
+                    logger.warning(f"⚠️ [交易日历] 写入缓存失败: {path} - {e}")
+            elif calendar is not None:
+                logger.warning(f"⚠️ [交易日历] {market} 刷新失败，继续使用缓存（更新于 {calendar.updated_at}）")
+
+        if calendar is None:
+            logger.warning(f"⚠️ [交易日历] {market} 无可用交易所日历，使用工作日近似（不含节假日）")
+            calendar = TradingCalendar.weekdays(market)
+
+        _calendars[market] = calendar
+        _checked_at[market] = time.monotonic()
+        return calendar
@@ -1,6 +1,8 @@
 # TradingAgents/graph/reflection.py
 
-from typing import Dict, Any
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
 from langchain_openai import ChatOpenAI
 
 # 导入统一日志系统
@@ -8,6 +10,16 @@ from tradingagents.utils.logging_init import get_logger
 logger = get_logger("default")
 
 
+# 复盘组件：名称 -> (LLM 提示中的组件类型, 从状态中取出待复盘内容的函数)
+REFLECTION_COMPONENTS = {
+    "bull": ("BULL", lambda state: state["investment_debate_state"]["bull_history"]),
+    "bear": ("BEAR", lambda state: state["investment_debate_state"]["bear_history"]),
+    "trader": ("TRADER", lambda state: state["trader_investment_plan"]),
+    "invest_judge": ("INVEST JUDGE", lambda state: state["investment_debate_state"]["judge_decision"]),
+    "risk_manager": ("RISK JUDGE", lambda state: state["risk_debate_state"]["judge_decision"]),
+}
+
+
 class Reflector:
     """Handles reflection on decisions and updating memory."""
 
@@ -123,3 +135,75 @@ Adhere strictly to these instructions, and ensure your output is detailed, accur
             "RISK JUDGE", judge_decision, situation, returns_losses
         )
         risk_manager_memory.add_situations([(situation, result)])
+
+    def reflect_all(self, current_state, returns_losses, memories: Dict[str, Any],
+                    max_workers: int = 5) -> Dict[str, Dict[str, Any]]:
+        """
+        并发复盘各组件，并一次性写回记忆库
+
+        各组件的复盘互不依赖（同一市场情况、各自的报告），在有界线程池中并发调用 LLM；
+        单个组件失败只记录错误，不影响其他组件。全部复盘完成后统一写回：
+        五个记忆库的情况文本相同，嵌入模型相同时只向量化一次。
+
+        Args:
+            memories: 组件名（见 REFLECTION_COMPONENTS）-> FinancialSituationMemory，值为 None 的组件跳过
+            max_workers: 并发调用 LLM 的最大线程数
+
+        Returns:
+            {组件名: {"status": "ok"/"failed"/"skipped", "seconds": 复盘耗时, "error": 错误信息}}
+        """
+        situation = self._extract_current_situation(current_state)
+        status: Dict[str, Dict[str, Any]] = {}
+        jobs = []
+        for name, memory in memories.items():
+            if memory is None:
+                status[name] = {"status": "skipped", "seconds": 0.0, "error": None}
+            else:
+                jobs.append(name)
+
+        def _run(name: str):
+            component_type, get_report = REFLECTION_COMPONENTS[name]
+            start = time.perf_counter()
+            try:
+                report = get_report(current_state)
+                result = self._reflect_on_component(component_type, report, situation, returns_losses)
+                return name, result, None, time.perf_counter() - start
+            except Exception as e:
+                logger.error(f"❌ [复盘] {name} 复盘失败: {e}")
+                return name, None, str(e), time.perf_counter() - start
+
+        wall_start = time.perf_counter()
+        results: Dict[str, str] = {}
+        if jobs:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs))),
+                                    thread_name_prefix="ta-reflect") as pool:
+                for name, result, error, elapsed in pool.map(_run, jobs):
+                    status[name] = {"status": "failed" if error else "ok",
+                                    "seconds": round(elapsed, 3), "error": error}
+                    if error is None:
+                        results[name] = result
+        reflect_wall = time.perf_counter() - wall_start
+
+        self._write_back(situation, results, memories, status)
+
+        serial = sum(item["seconds"] for item in status.values())
+        ok = sum(1 for item in status.values() if item["status"] == "ok")
+        logger.info(f"🪞 [复盘] 完成 {ok}/{len(jobs)} 个组件，墙钟耗时 {reflect_wall:.2f}秒，"
+                    f"串行耗时 {serial:.2f}秒")
+        return status
+
+    def _write_back(self, situation: str, results: Dict[str, str], memories: Dict[str, Any],
+                    status: Dict[str, Dict[str, Any]]) -> None:
+        """批量写回复盘结果：同一嵌入模型的记忆库共享一次向量化结果"""
+        embeddings: Dict[Any, Optional[list]] = {}
+        for name, result in results.items():
+            memory = memories[name]
+            key_fn = getattr(memory, "embedding_key", None)
+            key = key_fn() if callable(key_fn) else None
+            try:
+                if key not in embeddings:
+                    embeddings[key] = memory.get_embedding(situation)
+                memory.add_situations([(situation, result)], embeddings=[embeddings[key]])
+            except Exception as e:
+                logger.error(f"❌ [复盘] {name} 写入记忆失败: {e}")
+                status[name].update(status="failed", error=str(e))
@@ -30,6 +30,8 @@ from tradingagents.agents.utils.agent_states import (
     RiskDebateState,
 )
 from tradingagents.dataflows.interface import set_config
+from tradingagents.utils.tool_memo import ToolMemo, activate_tool_memo
+from tradingagents.llm_adapters.response_cache import configure_llm_cache, get_llm_response_cache
 
 from .conditional_logic import ConditionalLogic
 from .setup import GraphSetup
@@ -212,6 +214,9 @@ class TradingAgentsGraph:
         # Update the interface's config
         set_config(self.config)
 
+        # LLM 响应缓存（TA_LLM_CACHE_MODE: off/readwrite/record/replay，默认 off）
+        configure_llm_cache(self.config)
+
         # Create necessary directories
         os.makedirs(
             os.path.join(self.config["project_dir"], "dataflows/data_cache"),
@@ -809,6 +814,7 @@ class TradingAgentsGraph:
         self.log_states_dict = {}  # date to full state dict
 
         # Set up the graph
+        self.selected_analysts = list(selected_analysts)
         self.graph = self.graph_setup.setup_graph(selected_analysts)
 
     def _create_tool_nodes(self) -> Dict[str, ToolNode]:
@@ -869,6 +875,42 @@ class TradingAgentsGraph:
             ),
         }
 
+    def _config_flag(self, key: str, env_name: str, default: str) -> bool:
+        value = self.config.get(key)
+        if value is None:
+            value = os.getenv(env_name, default)
+        return str(value).lower() in ("1", "true", "yes", "on")
+
+    def _prefetch_tool_data(self, memo: ToolMemo, company_name: str, trade_date: str) -> None:
+        """在第一个分析师运行前，并发加载各分析师必然会请求的数据（参数与分析师提示词一致）"""
+        from datetime import datetime, timedelta
+        from tradingagents.tools.unified_news_tool import create_unified_news_tool
+
+        def _fn(tool_obj):
+            return getattr(tool_obj, "func", tool_obj)
+
+        try:
+            fundamentals_start = (datetime.strptime(trade_date, "%Y-%m-%d") - timedelta(days=10)).strftime("%Y-%m-%d")
+        except (TypeError, ValueError):
+            fundamentals_start = None
+
+        jobs = []
+        if "market" in self.selected_analysts:
+            jobs.append(("market", _fn(self.toolkit.get_stock_market_data_unified),
+                         {"ticker": company_name, "start_date": trade_date, "end_date": trade_date}))
+        if "fundamentals" in self.selected_analysts:
+            jobs.append(("fundamentals", _fn(self.toolkit.get_stock_fundamentals_unified),
+                         {"ticker": company_name, "start_date": fundamentals_start,
+                          "end_date": trade_date, "curr_date": trade_date}))
+        if "news" in self.selected_analysts:
+            jobs.append(("news", create_unified_news_tool(self.toolkit), {"stock_code": company_name, "max_news": 10}))
+        if "social" in self.selected_analysts:
+            jobs.append(("social", _fn(self.toolkit.get_stock_sentiment_unified),
+                         {"ticker": company_name, "curr_date": trade_date}))
+
+        logger.info(f"🚀 [数据预取] 开始并发预取: {[name for name, _, _ in jobs]}")
+        memo.prefetch(jobs)
+
     def propagate(self, company_name, trade_date, progress_callback=None, task_id=None):
         """Run the trading agents graph for a company on a specific date.
 
@@ -878,6 +920,38 @@ class TradingAgentsGraph:
             progress_callback: Optional callback function for progress updates
             task_id: Optional task ID for tracking performance data
         """
+        llm_cache = get_llm_response_cache()
+        llm_cache_before = llm_cache.summary() if llm_cache else None
+
+        final_state, decision = self._propagate_with_memo(company_name, trade_date, progress_callback, task_id)
+
+        if llm_cache:
+            after = llm_cache.summary()
+            delta = {k: after[k] - llm_cache_before[k] for k in ("lookups", "hits", "misses", "writes")}
+            final_state.setdefault('performance_metrics', {})['llm_cache'] = dict(delta, mode=after["mode"])
+            logger.info(f"💾 [LLM缓存] 模式={after['mode']}，查询 {delta['lookups']} 次，"
+                        f"命中 {delta['hits']} 次，写入 {delta['writes']} 次")
+        return final_state, decision
+
+    def _propagate_with_memo(self, company_name, trade_date, progress_callback=None, task_id=None):
+        # 本次运行内复用工具结果（TA_TOOL_MEMO，默认开启）
+        if not self._config_flag("tool_memo", "TA_TOOL_MEMO", "true"):
+            return self._propagate(company_name, trade_date, progress_callback, task_id)
+
+        memo = ToolMemo(run_id=task_id)
+        with activate_tool_memo(memo):
+            # 可选：并发预取可预测的数据集（TA_TOOL_PREFETCH，默认关闭）
+            if self._config_flag("tool_prefetch", "TA_TOOL_PREFETCH", "false"):
+                self._prefetch_tool_data(memo, company_name, trade_date)
+            final_state, decision = self._propagate(company_name, trade_date, progress_callback, task_id)
+
+        summary = memo.summary()
+        final_state.setdefault('performance_metrics', {})['tool_memo'] = summary
+        logger.info(f"♻️ [工具复用] 调用 {summary['calls']} 次，命中 {summary['hits']} 次，"
+                    f"预取 {summary['prefetched']} 项，节省约 {summary['saved_seconds']:.2f}秒")
+        return final_state, decision
+
+    def _propagate(self, company_name, trade_date, progress_callback=None, task_id=None):
 
         # 添加详细的接收日志
         logger.debug(f"🔍 [GRAPH DEBUG] ===== TradingAgentsGraph.propagate 接收参数 =====")
@@ -1375,21 +1449,27 @@ class TradingAgentsGraph:
             json.dump(self.log_states_dict, f, indent=4)
 
     def reflect_and_remember(self, returns_losses):
-        """Reflect on decisions and update memory based on returns."""
-        self.reflector.reflect_bull_researcher(
-            self.curr_state, returns_losses, self.bull_memory
-        )
-        self.reflector.reflect_bear_researcher(
-            self.curr_state, returns_losses, self.bear_memory
-        )
-        self.reflector.reflect_trader(
-            self.curr_state, returns_losses, self.trader_memory
-        )
-        self.reflector.reflect_invest_judge(
-            self.curr_state, returns_losses, self.invest_judge_memory
-        )
-        self.reflector.reflect_risk_manager(
-            self.curr_state, returns_losses, self.risk_manager_memory
+        """Reflect on decisions and update memory based on returns.
+
+        五个组件并发复盘（TA_REFLECTION_WORKERS 控制并发数，默认 5，设为 1 即串行），
+        单个组件失败不影响其他组件；返回各组件的复盘状态。
+        """
+        workers = self.config.get("reflection_workers") or os.getenv("TA_REFLECTION_WORKERS", "5")
+        try:
+            workers = max(1, int(workers))
+        except (TypeError, ValueError):
+            workers = 5
+        return self.reflector.reflect_all(
+            self.curr_state,
+            returns_losses,
+            {
+                "bull": self.bull_memory,
+                "bear": self.bear_memory,
+                "trader": self.trader_memory,
+                "invest_judge": self.invest_judge_memory,
+                "risk_manager": self.risk_manager_memory,
+            },
+            max_workers=workers,
         )
 
     def process_signal(self, full_signal, stock_symbol=None):
@@ -0,0 +1,286 @@
+"""
+LLM 响应缓存（内容寻址，支持录制/回放）
+
+通过 LangChain 全局缓存钩子（set_llm_cache）接入，所有适配器（ChatOpenAI 子类、
+DeepSeek、DashScope、Google 等）无需改动即可生效。缓存键为以下内容的 SHA-256：
+
+- 模型标识与采样参数（model、temperature、max_tokens 等，即 LangChain 的 llm_string）
+- 绑定的工具 schema（bind_tools 传入的 tools 同样进入 llm_string）
+- 规范化后的消息（去掉消息 id、response_metadata、usage_metadata，键排序）
+
+模式：
+- off: 不启用（默认）
+- readwrite: 命中直接返回，未命中调用模型并写入
+- record: 始终调用模型，并用最新响应覆盖缓存（录制真实流量）
+- replay: 只读缓存，未命中抛出 LLMCacheMissError（完全离线运行）
+
+后端：sqlite（单文件，默认）或 filesystem（每条响应一个 JSON 文件，便于审阅/提交到仓库）。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.globals import get_llm_cache, set_llm_cache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+from tradingagents.utils.logging_manager import get_logger
+
+logger = get_logger('agents')
+
+CACHE_MODES = ("off", "readwrite", "record", "replay")
+CACHE_BACKENDS = ("sqlite", "filesystem")
+
+# 每次调用都会变化、与请求语义无关的消息字段
+_VOLATILE_MESSAGE_KEYS = {"id", "response_metadata", "usage_metadata"}
+
+
+class LLMCacheMissError(RuntimeError):
+    """回放模式下缓存未命中"""
+
+
+def normalize_prompt(prompt: str) -> str:
+    """规范化 LangChain 序列化后的消息列表（去掉易变字段、键排序）"""
+    try:
+        data = json.loads(prompt)
+    except (TypeError, ValueError):
+        return prompt
+    # 只去掉消息自身的易变字段（kwargs 顶层），保留序列化结构中的类 id 与工具调用 id
+    if isinstance(data, list):
+        for item in data:
+            if isinstance(item, dict) and isinstance(item.get("kwargs"), dict):
+                item["kwargs"] = {k: v for k, v in item["kwargs"].items() if k not in _VOLATILE_MESSAGE_KEYS}
+    return json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+def make_cache_key(prompt: str, llm_string: str) -> str:
+    """由 llm_string（模型+采样参数+工具 schema）与规范化消息计算内容哈希"""
+    digest = hashlib.sha256()
+    digest.update(llm_string.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(normalize_prompt(prompt).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _model_label(llm_string: str) -> str:
+    """从 llm_string 中提取模型名（仅用于记录，便于排查）"""
+    head = llm_string.split("---", 1)[0]
+    try:
+        kwargs = json.loads(head).get("kwargs", {})
+        return str(kwargs.get("model_name") or kwargs.get("model") or "")
+    except (ValueError, AttributeError):
+        return ""
+
+
+def _dump_generations(generations: Sequence[Generation]) -> str:
+    items = []
+    for gen in generations:
+        item: Dict[str, Any] = {"text": gen.text, "generation_info": gen.generation_info}
+        if isinstance(gen, ChatGeneration):
+            item["message"] = message_to_dict(gen.message)
+        items.append(item)
+    return json.dumps(items, ensure_ascii=False, default=str)
+
+
+def _load_generations(payload: str) -> RETURN_VAL_TYPE:
+    generations = []
+    for item in json.loads(payload):
+        if "message" in item:
+            message = messages_from_dict([item["message"]])[0]
+            generations.append(ChatGeneration(message=message, generation_info=item.get("generation_info")))
+        else:
+            generations.append(Generation(text=item["text"], generation_info=item.get("generation_info")))
+    return generations
+
+
+class SQLiteResponseStore:
+    """SQLite 后端：单文件，线程安全"""
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses ("
+            " key TEXT PRIMARY KEY, model TEXT, payload TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM llm_responses WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, model: str, payload: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, model, payload, created_at) VALUES (?, ?, ?, ?)",
+                (key, model, payload, time.time()),
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+
+
+class FileSystemResponseStore:
+    """文件系统后端：<root>/<key前2位>/<key>.json，原子写入"""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)["payload"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"⚠️ [LLM缓存] 读取缓存文件失败 {key}: {e}")
+            return None
+
+    def put(self, key: str, model: str, payload: str) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "model": model, "created_at": time.time(), "payload": payload},
+                      f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+
+    def clear(self) -> None:
+        for path in self.root.glob("*/*.json"):
+            path.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.root.glob("*/*.json"))
+
+
+class LLMResponseCache(BaseCache):
+    """按模式读写底层存储的 LangChain 缓存"""
+
+    def __init__(self, store, mode: str = "readwrite"):
+        if mode not in CACHE_MODES or mode == "off":
+            raise ValueError(f"不支持的LLM缓存模式: {mode}")
+        self.store = store
+        self.mode = mode
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"lookups": 0, "hits": 0, "misses": 0, "writes": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        self._count("lookups")
+        if self.mode == "record":
+            self._count("misses")
+            return None
+
+        key = make_cache_key(prompt, llm_string)
+        payload = self.store.get(key)
+        if payload is None:
+            self._count("misses")
+            if self.mode == "replay":
+                raise LLMCacheMissError(
+                    f"LLM缓存未命中（回放模式）: key={key[:16]} model={_model_label(llm_string) or '?'}，"
+                    f"请先以 record 模式录制"
+                )
+            return None
+
+        self._count("hits")
+        logger.debug(f"💾 [LLM缓存] 命中 {key[:16]}")
+        return _load_generations(payload)
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if self.mode == "replay":
+            return
+        key = make_cache_key(prompt, llm_string)
+        try:
+            self.store.put(key, _model_label(llm_string), _dump_generations(return_val))
+            self._count("writes")
+        except Exception as e:
+            # 缓存写入失败不影响分析流程
+            logger.warning(f"⚠️ [LLM缓存] 写入失败 {key[:16]}: {e}")
+
+    def clear(self, **kwargs: Any) -> None:
+        self.store.clear()
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats, mode=self.mode)
+
+
+def create_response_store(backend: str, path: str):
+    if backend == "sqlite":
+        return SQLiteResponseStore(path)
+    if backend == "filesystem":
+        return FileSystemResponseStore(path)
+    raise ValueError(f"不支持的LLM缓存后端: {backend}（可选: {', '.join(CACHE_BACKENDS)}）")
+
+
+_installed_signature: Optional[tuple] = None
+
+
+def configure_llm_cache(config: Optional[Dict[str, Any]] = None) -> Optional[LLMResponseCache]:
+    """
+    按配置安装全局 LLM 响应缓存
+
+    优先读取 config 中的 llm_cache_mode / llm_cache_backend / llm_cache_path，
+    否则读取环境变量 TA_LLM_CACHE_MODE / TA_LLM_CACHE_BACKEND / TA_LLM_CACHE_PATH。
+    相同配置重复调用时复用已安装的缓存。
+    """
+    global _installed_signature
+    config = config or {}
+
+    mode = str(config.get("llm_cache_mode") or os.getenv("TA_LLM_CACHE_MODE", "off")).strip().lower()
+    if mode not in CACHE_MODES:
+        logger.warning(f"⚠️ [LLM缓存] 未知模式 {mode}，已禁用")
+        mode = "off"
+
+    current = get_llm_cache()
+    if mode == "off":
+        if isinstance(current, LLMResponseCache):
+            set_llm_cache(None)
+            _installed_signature = None
+        return None
+
+    backend = str(config.get("llm_cache_backend") or os.getenv("TA_LLM_CACHE_BACKEND", "sqlite")).strip().lower()
+    default_path = os.path.join("./data/llm_cache", "responses.sqlite" if backend == "sqlite" else "")
+    path = os.path.abspath(str(config.get("llm_cache_path") or os.getenv("TA_LLM_CACHE_PATH") or default_path))
+
+    signature = (mode, backend, path)
+    if isinstance(current, LLMResponseCache) and signature == _installed_signature:
+        return current
+
+    cache = LLMResponseCache(create_response_store(backend, path), mode=mode)
+    set_llm_cache(cache)
+    _installed_signature = signature
+    logger.info(f"💾 [LLM缓存] 已启用: 模式={mode}, 后端={backend}, 路径={path}")
+    return cache
+
+
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """返回当前安装的响应缓存（未启用时为 None）"""
+    current = get_llm_cache()
+    return current if isinstance(current, LLMResponseCache) else None
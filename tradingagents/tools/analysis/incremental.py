@@ -0,0 +1,523 @@
+"""
+增量技术指标引擎
+
+新K线到来时只更新状态，不再对整段历史重新计算 MA/EMA/RSI/MACD/BOLL/ATR/KDJ。
+
+- 每根K线的计算量只与指标窗口长度有关，与历史长度无关
+- 滚动均值/方差、EWM 按 pandas 的在线算法（含 Kahan 补偿、常数序列处理）逐步复现，
+  结果与 indicators.compute_many 的批量计算逐位一致
+- 状态可序列化为 JSON（to_dict/from_dict），与缓存的 OHLCV 一起保存，
+  下次加载后直接追加新K线
+
+示例：
+    >>> engine = IncrementalIndicatorEngine.from_history(df)   # 首次：回放历史
+    >>> state = engine.to_dict()                               # 与K线缓存一起保存
+    >>> engine = IncrementalIndicatorEngine.from_dict(state)
+    >>> engine.update({"high": 10.5, "low": 9.8, "close": 10.2})
+    {'ma5': ..., 'dif': ..., 'kdj_k': ...}
+"""
+from __future__ import annotations
+
+import json
+import math
+from collections import deque
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+import pandas as pd
+
+from tradingagents.tools.analysis.indicators import SUPPORTED, IndicatorSpec
+
+NAN = float("nan")
+
+STATE_VERSION = 1
+
+DEFAULT_SPECS = [
+    IndicatorSpec("ma", {"n": 5}),
+    IndicatorSpec("ma", {"n": 10}),
+    IndicatorSpec("ma", {"n": 20}),
+    IndicatorSpec("ema", {"n": 12}),
+    IndicatorSpec("ema", {"n": 26}),
+    IndicatorSpec("macd"),
+    IndicatorSpec("rsi", {"n": 14}),
+    IndicatorSpec("boll", {"n": 20, "k": 2}),
+    IndicatorSpec("atr", {"n": 14}),
+    IndicatorSpec("kdj", {"n": 9, "m1": 3, "m2": 3}),
+]
+
+
+def _is_nan(x: float) -> bool:
+    return x != x
+
+
+def _signbit(x: float) -> bool:
+    return math.copysign(1.0, x) < 0
+
+
+# ==================== 基础状态 ====================
+
+class _State:
+    """可序列化状态基类：__slots__ 中的字段即状态"""
+
+    __slots__ = ()
+    kind = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"kind": self.kind}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            data[name] = list(value) if isinstance(value, deque) else value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "_State":
+        obj = cls.__new__(cls)
+        for name in cls.__slots__:
+            value = data[name]
+            setattr(obj, name, deque(value) if name == "buffer" else value)
+        return obj
+
+
+class _RollingMean(_State):
+    """pandas roll_mean 的增量版本（固定窗口）"""
+
+    __slots__ = ("window", "min_periods", "buffer", "nobs", "sum_x", "comp_add", "comp_remove",
+                 "neg_ct", "prev_value", "same_ct")
+    kind = "rolling_mean"
+
+    def __init__(self, window: int, min_periods: int):
+        self.window = window
+        self.min_periods = min_periods
+        self.buffer = deque()
+        self._reset(NAN)
+
+    def _reset(self, first: float):
+        self.nobs = 0
+        self.sum_x = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.neg_ct = 0
+        self.prev_value = first
+        self.same_ct = 0
+
+    def _add(self, val: float):
+        if val == val:
+            self.nobs += 1
+            y = val - self.comp_add
+            t = self.sum_x + y
+            self.comp_add = t - self.sum_x - y
+            self.sum_x = t
+            if _signbit(val):
+                self.neg_ct += 1
+            if val == self.prev_value:
+                self.same_ct += 1
+            else:
+                self.same_ct = 1
+            self.prev_value = val
+
+    def _remove(self, val: float):
+        if val == val:
+            self.nobs -= 1
+            y = -val - self.comp_remove
+            t = self.sum_x + y
+            self.comp_remove = t - self.sum_x - y
+            self.sum_x = t
+            if _signbit(val):
+                self.neg_ct -= 1
+
+    def update(self, val: float) -> float:
+        if not self.buffer or self.window <= 1:
+            # 首个窗口（或窗口为1时每步）重新初始化，与批量算法一致
+            self.buffer.clear()
+            self._reset(val)
+        elif len(self.buffer) >= self.window:
+            self._remove(self.buffer.popleft())
+        self.buffer.append(val)
+        self._add(val)
+
+        if self.nobs >= self.min_periods and self.nobs > 0:
+            result = self.sum_x / self.nobs
+            if self.same_ct >= self.nobs:
+                result = self.prev_value
+            elif self.neg_ct == 0 and result < 0:
+                result = 0.0
+            elif self.neg_ct == self.nobs and result > 0:
+                result = 0.0
+            return result
+        return NAN
+
+
+class _RollingStd(_State):
+    """pandas roll_var（Welford + Kahan）的增量版本，返回标准差（ddof=1）"""
+
+    __slots__ = ("window", "min_periods", "buffer", "nobs", "mean_x", "ssqdm_x", "comp_add", "comp_remove",
+                 "prev_value", "same_ct")
+    kind = "rolling_std"
+    ddof = 1
+
+    def __init__(self, window: int, min_periods: int):
+        self.window = window
+        self.min_periods = min_periods
+        self.buffer = deque()
+        self._reset(NAN)
+
+    def _reset(self, first: float):
+        self.nobs = 0.0
+        self.mean_x = 0.0
+        self.ssqdm_x = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.prev_value = first
+        self.same_ct = 0
+
+    def _add(self, val: float):
+        if val != val:
+            return
+        self.nobs += 1
+        if val == self.prev_value:
+            self.same_ct += 1
+        else:
+            self.same_ct = 1
+        self.prev_value = val
+        prev_mean = self.mean_x - self.comp_add
+        y = val - self.comp_add
+        t = y - self.mean_x
+        self.comp_add = t + self.mean_x - y
+        if self.nobs:
+            self.mean_x = self.mean_x + t / self.nobs
+        else:
+            self.mean_x = 0.0
+        self.ssqdm_x = self.ssqdm_x + (val - prev_mean) * (val - self.mean_x)
+
+    def _remove(self, val: float):
+        if val == val:
+            self.nobs -= 1
+            if self.nobs:
+                prev_mean = self.mean_x - self.comp_remove
+                y = val - self.comp_remove
+                t = y - self.mean_x
+                self.comp_remove = t + self.mean_x - y
+                self.mean_x = self.mean_x - t / self.nobs
+                self.ssqdm_x = self.ssqdm_x - (val - prev_mean) * (val - self.mean_x)
+            else:
+                self.mean_x = 0.0
+                self.ssqdm_x = 0.0
+
+    def update(self, val: float) -> float:
+        if not self.buffer or self.window <= 1:
+            self.buffer.clear()
+            self._reset(val)
+        elif len(self.buffer) >= self.window:
+            self._remove(self.buffer.popleft())
+        self.buffer.append(val)
+        self._add(val)
+
+        if self.nobs >= self.min_periods and self.nobs > self.ddof:
+            if self.nobs == 1 or self.same_ct >= self.nobs:
+                var = 0.0
+            else:
+                var = self.ssqdm_x / (self.nobs - self.ddof)
+        else:
+            return NAN
+        return math.sqrt(var) if var >= 0 else 0.0
+
+
+class _RollingExtreme(_State):
+    """滚动最小/最大值（忽略 NaN，非 NaN 个数不足 min_periods 时为 NaN）"""
+
+    __slots__ = ("window", "min_periods", "buffer", "use_max")
+    kind = "rolling_extreme"
+
+    def __init__(self, window: int, min_periods: int, use_max: bool):
+        self.window = window
+        self.min_periods = min_periods
+        self.buffer = deque(maxlen=window)
+        self.use_max = use_max
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "_RollingExtreme":
+        obj = super().from_dict(data)
+        obj.buffer = deque(obj.buffer, maxlen=obj.window)
+        return obj
+
+    def update(self, val: float) -> float:
+        self.buffer.append(val)
+        valid = [v for v in self.buffer if v == v]
+        if len(valid) < self.min_periods or not valid:
+            return NAN
+        return max(valid) if self.use_max else min(valid)
+
+
+class _Ewm(_State):
+    """pandas ewma 的增量版本（ignore_na=False, min_periods=1）"""
+
+    __slots__ = ("alpha", "adjust", "weighted", "old_wt", "nobs", "started")
+    kind = "ewm"
+
+    def __init__(self, com: float, adjust: bool):
+        self.alpha = 1. / (1. + com)
+        self.adjust = adjust
+        self.weighted = NAN
+        self.old_wt = 1.
+        self.nobs = 0
+        self.started = False
+
+    def update(self, cur: float) -> float:
+        is_observation = cur == cur
+        if not self.started:
+            self.started = True
+            self.weighted = cur
+            self.nobs = int(is_observation)
+            self.old_wt = 1.
+        else:
+            self.nobs += is_observation
+            if self.weighted == self.weighted:
+                self.old_wt *= 1. - self.alpha
+                if is_observation:
+                    new_wt = 1. if self.adjust else self.alpha
+                    # 常数序列不做运算，避免浮点误差
+                    if self.weighted != cur:
+                        self.weighted = self.old_wt * self.weighted + new_wt * cur
+                        self.weighted /= (self.old_wt + new_wt)
+                    if self.adjust:
+                        self.old_wt += new_wt
+                    else:
+                        self.old_wt = 1.
+            elif is_observation:
+                self.weighted = cur
+        return self.weighted if self.nobs >= 1 else NAN
+
+
+class _KdjSmooth(_State):
+    """KDJ 递推平滑（初始值50，输入为 NaN 时输出 NaN 且状态不变）"""
+
+    __slots__ = ("alpha", "last")
+    kind = "kdj_smooth"
+
+    def __init__(self, m: int):
+        self.alpha = 1 / float(m)
+        self.last = 50.0
+
+    def update(self, val: float) -> float:
+        if _is_nan(val):
+            return NAN
+        self.last = (1 - self.alpha) * self.last + self.alpha * val
+        return self.last
+
+
+_STATE_TYPES = {cls.kind: cls for cls in (_RollingMean, _RollingStd, _RollingExtreme, _Ewm, _KdjSmooth)}
+
+
+def _nan_to_none(value):
+    if isinstance(value, float) and value != value:
+        return None
+    if isinstance(value, list):
+        return [_nan_to_none(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _nan_to_none(v) for k, v in value.items()}
+    return value
+
+
+def _none_to_nan(value, key: str = ""):
+    if value is None and key not in ("kind",):
+        return NAN
+    if isinstance(value, list):
+        return [NAN if v is None else v for v in value]
+    if isinstance(value, dict):
+        return {k: _none_to_nan(v, k) for k, v in value.items()}
+    return value
+
+
+# ==================== 引擎 ====================
+
+class IncrementalIndicatorEngine:
+    """
+    单只股票的增量指标引擎
+
+    支持与 compute_many 相同的指标与列名：ma{n}、ema{n}、dif/dea/macd_hist、rsi{n}、
+    boll_mid/boll_upper/boll_lower、atr{n}、kdj_k/kdj_d/kdj_j。
+    rsi 额外支持 params["method"]（ema/sma/china），与 indicators.rsi 一致。
+    """
+
+    def __init__(self, specs: Optional[List[IndicatorSpec]] = None):
+        self.specs: List[IndicatorSpec] = []
+        seen = set()
+        for spec in specs or DEFAULT_SPECS:
+            name = spec.name.lower()
+            if name not in SUPPORTED:
+                raise ValueError(f"不支持的指标: {name}")
+            key = (name, tuple(sorted((spec.params or {}).items())))
+            if key not in seen:
+                seen.add(key)
+                self.specs.append(IndicatorSpec(name, dict(spec.params or {})))
+        self.bars = 0
+        self.prev_close = NAN
+        self.last: Dict[str, float] = {}
+        self._states: Dict[str, _State] = {}
+        self._step: Dict[str, float] = {}
+
+    # ---------- 共享状态 ----------
+
+    def _feed(self, key: str, factory: Callable[[], _State], value: float) -> float:
+        """同一根K线内，同一状态只更新一次（多个指标共享）"""
+        if key in self._step:
+            return self._step[key]
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = factory()
+        result = self._step[key] = state.update(value)
+        return result
+
+    def _mean(self, tag: str, n: int, min_periods: int, value: float) -> float:
+        return self._feed(f"mean:{tag}:{n}:{min_periods}", lambda: _RollingMean(n, min_periods), value)
+
+    def _ewm(self, tag: str, com: float, adjust: bool, value: float) -> float:
+        return self._feed(f"ewm:{tag}:{com!r}:{int(adjust)}", lambda: _Ewm(com, adjust), value)
+
+    # ---------- 更新 ----------
+
+    def update(self, bar: Mapping[str, Any]) -> Dict[str, float]:
+        """
+        追加一根K线并返回最新的指标值
+
+        Args:
+            bar: 至少包含 close；atr/kdj 需要 high、low
+        """
+        close = float(bar["close"])
+        high = float(bar["high"]) if bar.get("high") is not None else NAN
+        low = float(bar["low"]) if bar.get("low") is not None else NAN
+        prev_close = self.prev_close
+        delta = close - prev_close
+
+        self._step = {}
+        out: Dict[str, float] = {}
+        for spec in self.specs:
+            out.update(self._update_spec(spec, close, high, low, prev_close, delta))
+        self._step = {}
+
+        self.prev_close = close
+        self.bars += 1
+        self.last = out
+        return dict(out)
+
+    def _update_spec(self, spec: IndicatorSpec, close: float, high: float, low: float,
+                     prev_close: float, delta: float) -> Dict[str, float]:
+        name, params = spec.name, spec.params or {}
+
+        if name == "ma":
+            n = int(params.get("n", params.get("period", 20)))
+            return {f"ma{n}": self._mean("close", n, 1, close)}
+
+        if name == "ema":
+            n = int(params.get("n", params.get("period", 20)))
+            return {f"ema{n}": self._ewm("close", (n - 1) / 2, False, close)}
+
+        if name == "macd":
+            fast = int(params.get("fast", 12))
+            slow = int(params.get("slow", 26))
+            signal = int(params.get("signal", 9))
+            dif = self._ewm("close", (fast - 1) / 2, False, close) - self._ewm("close", (slow - 1) / 2, False, close)
+            dea = self._ewm(f"dif{fast}_{slow}", (signal - 1) / 2, False, dif)
+            return {"dif": dif, "dea": dea, "macd_hist": dif - dea}
+
+        if name == "rsi":
+            n = int(params.get("n", params.get("period", 14)))
+            method = params.get("method", "ema")
+            # 与 Series.where(..., 0) 一致：NaN 视为 0，loss 为 -0.0
+            gain = delta if delta > 0 else 0.0
+            loss = -(delta if delta < 0 else 0.0)
+            if method == "ema":
+                alpha = 1 / float(n)
+                com = (1 - alpha) / alpha
+                avg_gain = self._ewm("gain", com, False, gain)
+                avg_loss = self._ewm("loss", com, False, loss)
+            elif method == "sma":
+                avg_gain = self._mean("gain", n, 1, gain)
+                avg_loss = self._mean("loss", n, 1, loss)
+            elif method == "china":
+                avg_gain = self._ewm("gain", float(n - 1), True, gain)
+                avg_loss = self._ewm("loss", float(n - 1), True, loss)
+            else:
+                raise ValueError(f"不支持的RSI计算方法: {method}，支持的方法: 'ema', 'sma', 'china'")
+            if avg_loss == 0 or _is_nan(avg_loss) or _is_nan(avg_gain):
+                value = NAN
+            else:
+                value = 100 - (100 / (1 + avg_gain / avg_loss))
+            return {f"rsi{n}": value}
+
+        if name == "boll":
+            n = int(params.get("n", 20))
+            k = float(params.get("k", 2.0))
+            mid = self._mean("close", n, 1, close)
+            std = self._feed(f"std:close:{n}:1", lambda: _RollingStd(n, 1), close)
+            return {"boll_mid": mid, "boll_upper": mid + k * std, "boll_lower": mid - k * std}
+
+        if name == "atr":
+            n = int(params.get("n", 14))
+            tr = NAN
+            for part in (abs(high - low), abs(high - prev_close), abs(low - prev_close)):
+                if part == part and (tr != tr or part > tr):
+                    tr = part
+            return {f"atr{n}": self._mean("tr", n, n, tr)}
+
+        if name == "kdj":
+            n = int(params.get("n", 9))
+            m1 = int(params.get("m1", 3))
+            m2 = int(params.get("m2", 3))
+            lowest = self._feed(f"min:low:{n}", lambda: _RollingExtreme(n, n, False), low)
+            highest = self._feed(f"max:high:{n}", lambda: _RollingExtreme(n, n, True), high)
+            span = highest - lowest
+            if span == 0 or _is_nan(span):
+                rsv = NAN
+            else:
+                rsv = (close - lowest) / span * 100
+            k = self._feed(f"kdj_k:{n}:{m1}", lambda: _KdjSmooth(m1), rsv)
+            d = self._feed(f"kdj_d:{n}:{m1}:{m2}", lambda: _KdjSmooth(m2), k)
+            return {"kdj_k": k, "kdj_d": d, "kdj_j": 3 * k - 2 * d}
+
+        raise ValueError(f"不支持的指标: {name}")
+
+    def update_many(self, df: pd.DataFrame) -> pd.DataFrame:
+        """依次追加多根K线，返回每根K线对应的指标值（index 与 df 相同）"""
+        rows = [self.update(bar) for bar in df.to_dict("records")]
+        return pd.DataFrame(rows, index=df.index)
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame, specs: Optional[List[IndicatorSpec]] = None) -> "IncrementalIndicatorEngine":
+        """从已有K线回放构建状态（仅首次需要，之后增量追加）"""
+        engine = cls(specs)
+        for bar in df.to_dict("records"):
+            engine.update(bar)
+        return engine
+
+    # ---------- 序列化 ----------
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出为 JSON 可序列化的字典（NaN 以 None 表示）"""
+        return _nan_to_none({
+            "version": STATE_VERSION,
+            "specs": [{"name": s.name, "params": s.params} for s in self.specs],
+            "bars": self.bars,
+            "prev_close": self.prev_close,
+            "last": self.last,
+            "states": {key: state.to_dict() for key, state in self._states.items()},
+        })
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IncrementalIndicatorEngine":
+        if data.get("version") != STATE_VERSION:
+            raise ValueError(f"不支持的指标状态版本: {data.get('version')}")
+        engine = cls([IndicatorSpec(s["name"], s.get("params")) for s in data["specs"]])
+        engine.bars = data["bars"]
+        engine.prev_close = NAN if data["prev_close"] is None else data["prev_close"]
+        engine.last = {k: (NAN if v is None else v) for k, v in (data.get("last") or {}).items()}
+        for key, raw in data["states"].items():
+            raw = _none_to_nan(raw)
+            engine._states[key] = _STATE_TYPES[raw["kind"]].from_dict(raw)
+        return engine
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text: str) -> "IncrementalIndicatorEngine":
+        return cls.from_dict(json.loads(text))
@@ -146,17 +146,55 @@ def boll(close: pd.Series, n: int = 20, k: float = 2.0, min_periods: int = None)
     return pd.DataFrame({"boll_mid": mid, "boll_upper": upper, "boll_lower": lower})
 
 
-def atr(high: pd.Series, low: pd.Series, close: pd.Series, n: int = 14) -> pd.Series:
+def _true_range(high, low, close):
+    """真实波幅：max(|H-L|, |H-前收|, |L-前收|)，忽略 NaN（支持 Series 与宽表 DataFrame）"""
     prev_close = close.shift(1)
-    tr = pd.concat([
-        (high - low).abs(),
-        (high - prev_close).abs(),
-        (low - prev_close).abs(),
-    ], axis=1).max(axis=1)
-    return tr.rolling(window=int(n), min_periods=int(n)).mean()
+    tr = np.fmax(np.fmax((high - low).abs().to_numpy(), (high - prev_close).abs().to_numpy()),
+                 (low - prev_close).abs().to_numpy())
+    if isinstance(close, pd.DataFrame):
+        return pd.DataFrame(tr, index=close.index, columns=close.columns)
+    return pd.Series(tr, index=close.index)
+
+
+def atr(high: pd.Series, low: pd.Series, close: pd.Series, n: int = 14) -> pd.Series:
+    return _true_range(high, low, close).rolling(window=int(n), min_periods=int(n)).mean()
+
+
+def _recursive_smooth(values: np.ndarray, alpha: float, init: float = 50.0) -> np.ndarray:
+    """
+    KDJ 递推平滑：y[t] = (1 - alpha) * y[t-1] + alpha * x[t]，x 为 NaN 时输出 NaN 且状态不变
+
+    与逐元素循环的浮点运算顺序完全一致（结果逐位相同）：
+    - 一维：np.frompyfunc 构造的 ufunc.accumulate
+    - 二维（时间 x 股票）：沿时间轴逐行向量化，每行一次 NumPy 运算覆盖所有股票
+    """
+    beta = 1 - alpha
+    values = np.asarray(values, dtype=float)
+    mask = np.isnan(values)
+
+    if values.ndim == 1:
+        step = np.frompyfunc(lambda last, x: last if x != x else beta * last + alpha * x, 2, 1)
+        seeded = np.empty(len(values) + 1, dtype=object)
+        seeded[0] = init
+        seeded[1:] = values
+        out = step.accumulate(seeded)[1:].astype(float)
+    else:
+        out = np.empty_like(values)
+        last = np.full(values.shape[1], init, dtype=float)
+        for t in range(values.shape[0]):
+            last = np.where(mask[t], last, beta * last + alpha * values[t])
+            out[t] = last
+    out[mask] = np.nan
+    return out
 
 
 def kdj(high: pd.Series, low: pd.Series, close: pd.Series, n: int = 9, m1: int = 3, m2: int = 3) -> pd.DataFrame:
+    k, d, j = _kdj_parts(high, low, close, n=n, m1=m1, m2=m2)
+    return pd.DataFrame({"kdj_k": k, "kdj_d": d, "kdj_j": j})
+
+
+def _kdj_parts(high, low, close, n: int = 9, m1: int = 3, m2: int = 3):
+    """返回 (K, D, J)，类型与输入一致（Series 或 时间 x 股票 的 DataFrame）"""
     lowest_low = low.rolling(window=int(n), min_periods=int(n)).min()
     highest_high = high.rolling(window=int(n), min_periods=int(n)).max()
     rsv = (close - lowest_low) / (highest_high - lowest_low) * 100
@@ -164,111 +202,171 @@ def kdj(high: pd.Series, low: pd.Series, close: pd.Series, n: int = 9, m1: int =
     rsv = rsv.replace([np.inf, -np.inf], np.nan)
 
     # 按经典公式递推（初始化 50）
-    k = pd.Series(np.nan, index=close.index)
-    d = pd.Series(np.nan, index=close.index)
-    alpha_k = 1 / float(m1)
-    alpha_d = 1 / float(m2)
-    last_k = 50.0
-    last_d = 50.0
-    for i in range(len(close)):
-        rv = rsv.iloc[i]
-        if np.isnan(rv):
-            k.iloc[i] = np.nan
-            d.iloc[i] = np.nan
-            continue
-        curr_k = (1 - alpha_k) * last_k + alpha_k * rv
-        curr_d = (1 - alpha_d) * last_d + alpha_d * curr_k
-        k.iloc[i] = curr_k
-        d.iloc[i] = curr_d
-        last_k, last_d = curr_k, curr_d
+    k = _recursive_smooth(rsv.to_numpy(dtype=float), 1 / float(m1))
+    d = _recursive_smooth(k, 1 / float(m2))
     j = 3 * k - 2 * d
-    return pd.DataFrame({"kdj_k": k, "kdj_d": d, "kdj_j": j})
+
+    def _wrap(arr):
+        if isinstance(close, pd.DataFrame):
+            return pd.DataFrame(arr, index=close.index, columns=close.columns)
+        return pd.Series(arr, index=close.index)
+
+    return _wrap(k), _wrap(d), _wrap(j)
+
+
+def _spec_key(spec: IndicatorSpec):
+    p = spec.params or {}
+    return (spec.name.lower(), tuple(sorted(p.items())))
+
+
+class _IndicatorKernel:
+    """
+    多指标计算核：在同一组输入序列上依次计算多个指标，共享中间结果
+
+    - 输入可以是单只股票的 Series，也可以是 时间 x 股票 的宽表 DataFrame（面板）
+    - EMA、滚动均值按参数缓存，MACD 与 EMA、BOLL 中轨与 MA 之间复用
+    - 只产出新列，不复制输入数据
+    """
+
+    def __init__(self, close, high=None, low=None):
+        self.close = close
+        self.high = high
+        self.low = low
+        self._cache: Dict[tuple, Any] = {}
+
+    def _cached(self, key: tuple, fn):
+        if key not in self._cache:
+            self._cache[key] = fn()
+        return self._cache[key]
+
+    def _ema(self, n: int):
+        return self._cached(("ema", n), lambda: ema(self.close, n))
+
+    def _rolling_mean(self, n: int):
+        return self._cached(("mean", n), lambda: ma(self.close, n, min_periods=1))
+
+    def _require_hl(self, name: str):
+        if self.high is None or self.low is None:
+            raise ValueError(f"指标 {name} 需要 high/low 数据")
+
+    def columns(self, spec: IndicatorSpec) -> Dict[str, Any]:
+        name = spec.name.lower()
+        params = spec.params or {}
+
+        if name == "ma":
+            n = int(params.get("n", params.get("period", 20)))
+            return {f"ma{n}": self._rolling_mean(n)}
+
+        if name == "ema":
+            n = int(params.get("n", params.get("period", 20)))
+            return {f"ema{n}": self._ema(n)}
+
+        if name == "macd":
+            fast = int(params.get("fast", 12))
+            slow = int(params.get("slow", 26))
+            signal = int(params.get("signal", 9))
+            dif = self._ema(fast) - self._ema(slow)
+            dea = dif.ewm(span=int(signal), adjust=False).mean()
+            return {"dif": dif, "dea": dea, "macd_hist": dif - dea}
+
+        if name == "rsi":
+            n = int(params.get("n", params.get("period", 14)))
+            return {f"rsi{n}": rsi(self.close, n)}
+
+        if name == "boll":
+            n = int(params.get("n", 20))
+            k = float(params.get("k", 2.0))
+            mid = self._rolling_mean(n)
+            std = self.close.rolling(window=n, min_periods=1).std()
+            return {"boll_mid": mid, "boll_upper": mid + k * std, "boll_lower": mid - k * std}
+
+        if name == "atr":
+            self._require_hl(name)
+            n = int(params.get("n", 14))
+            tr = self._cached(("tr",), lambda: _true_range(self.high, self.low, self.close))
+            return {f"atr{n}": tr.rolling(window=n, min_periods=n).mean()}
+
+        if name == "kdj":
+            self._require_hl(name)
+            n = int(params.get("n", 9))
+            m1 = int(params.get("m1", 3))
+            m2 = int(params.get("m2", 3))
+            k, d, j = _kdj_parts(self.high, self.low, self.close, n=n, m1=m1, m2=m2)
+            return {"kdj_k": k, "kdj_d": d, "kdj_j": j}
+
+        raise ValueError(f"不支持的指标: {name}")
+
+    def compute(self, specs: List[IndicatorSpec]) -> Dict[str, Any]:
+        """按顺序计算所有指标（同名列后者覆盖前者），返回 {列名: 序列}"""
+        result: Dict[str, Any] = {}
+        seen = set()
+        for spec in specs:
+            key = _spec_key(spec)
+            if key in seen:
+                continue
+            seen.add(key)
+            result.update(self.columns(spec))
+        return result
+
+
+_REQUIRED_COLS = {"atr": ["high", "low", "close"], "kdj": ["high", "low", "close"]}
+
+
+def _kernel_for(df: pd.DataFrame, specs: List[IndicatorSpec]) -> _IndicatorKernel:
+    for spec in specs:
+        _require_cols(df, _REQUIRED_COLS.get(spec.name.lower(), ["close"]))
+    return _IndicatorKernel(
+        df["close"],
+        df["high"] if "high" in df.columns else None,
+        df["low"] if "low" in df.columns else None,
+    )
 
 
 def compute_indicator(df: pd.DataFrame, spec: IndicatorSpec) -> pd.DataFrame:
     name = spec.name.lower()
-    params = spec.params or {}
+    if name not in SUPPORTED:
+        raise ValueError(f"不支持的指标: {name}")
     out = df.copy()
-
-    if name == "ma":
-        _require_cols(df, ["close"])
-        n = int(params.get("n", params.get("period", 20)))
-        out[f"ma{n}"] = ma(df["close"], n)
-        return out
-
-    if name == "ema":
-        _require_cols(df, ["close"])
-        n = int(params.get("n", params.get("period", 20)))
-        out[f"ema{n}"] = ema(df["close"], n)
-        return out
-
-    if name == "macd":
-        _require_cols(df, ["close"])
-        fast = int(params.get("fast", 12))
-        slow = int(params.get("slow", 26))
-        signal = int(params.get("signal", 9))
-        macd_df = macd(df["close"], fast=fast, slow=slow, signal=signal)
-        for c in macd_df.columns:
-            out[c] = macd_df[c]
-        return out
-
-    if name == "rsi":
-        _require_cols(df, ["close"])
-        n = int(params.get("n", params.get("period", 14)))
-        out[f"rsi{n}"] = rsi(df["close"], n)
-        return out
-
-    if name == "boll":
-        _require_cols(df, ["close"])
-        n = int(params.get("n", 20))
-        k = float(params.get("k", 2.0))
-        boll_df = boll(df["close"], n=n, k=k)
-        for c in boll_df.columns:
-            out[c] = boll_df[c]
-        return out
-
-    if name == "atr":
-        _require_cols(df, ["high", "low", "close"])
-        n = int(params.get("n", 14))
-        out[f"atr{n}"] = atr(df["high"], df["low"], df["close"], n=n)
-        return out
-
-    if name == "kdj":
-        _require_cols(df, ["high", "low", "close"])
-        n = int(params.get("n", 9))
-        m1 = int(params.get("m1", 3))
-        m2 = int(params.get("m2", 3))
-        kdj_df = kdj(df["high"], df["low"], df["close"], n=n, m1=m1, m2=m2)
-        for c in kdj_df.columns:
-            out[c] = kdj_df[c]
-        return out
-
-    raise ValueError(f"不支持的指标: {name}")
+    for col, values in _kernel_for(df, [spec]).columns(spec).items():
+        out[col] = values
+    return out
 
 
 def compute_many(df: pd.DataFrame, specs: List[IndicatorSpec]) -> pd.DataFrame:
     if not specs:
         return df.copy()
-    # 粗略去重（按 name+sorted(params)）
-    def key(s: IndicatorSpec):
-        p = s.params or {}
-        items = tuple(sorted(p.items()))
-        return (s.name.lower(), items)
-
-    unique_specs: List[IndicatorSpec] = []
-    seen = set()
     for s in specs:
-        k = key(s)
-        if k not in seen:
-            seen.add(k)
-            unique_specs.append(s)
+        if s.name.lower() not in SUPPORTED:
+            raise ValueError(f"不支持的指标: {s.name.lower()}")
 
+    # 一次计算所有指标（共享中间结果），只复制一次 DataFrame
+    columns = _kernel_for(df, specs).compute(specs)
     out = df.copy()
-    for s in unique_specs:
-        out = compute_indicator(out, s)
+    for col, values in columns.items():
+        out[col] = values
     return out
 
 
+def compute_panel(close: pd.DataFrame, specs: List[IndicatorSpec],
+                  high: Optional[pd.DataFrame] = None,
+                  low: Optional[pd.DataFrame] = None) -> Dict[str, pd.DataFrame]:
+    """
+    面板（多股票）批量计算指标
+
+    Args:
+        close: 收盘价宽表（index=日期, columns=股票代码）
+        specs: 指标列表
+        high/low: 最高/最低价宽表（ATR、KDJ 需要），形状与 close 相同
+
+    Returns:
+        {指标列名: 宽表}，每列结果与对单只股票调用 compute_many 的对应列完全一致
+    """
+    for s in specs:
+        if s.name.lower() not in SUPPORTED:
+            raise ValueError(f"不支持的指标: {s.name.lower()}")
+    return _IndicatorKernel(close, high, low).compute(specs)
+
+
 def last_values(df: pd.DataFrame, columns: List[str]) -> Dict[str, Any]:
     if df.empty:
         return {c: None for c in columns}
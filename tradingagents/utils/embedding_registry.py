@@ -0,0 +1,197 @@
+"""
+本地模型共享注册表与向量缓存
+
+EnhancedNewsFilter 等组件原先每个实例各自加载 SentenceTransformer / transformers 模型，
+并逐条编码新闻。这里提供：
+
+- ModelRegistry: 进程内按模型名懒加载、线程安全（同一模型并发首次加载只加载一次），
+  加载失败（如依赖未安装）也会记住，后续实例不再重复尝试
+- EmbeddingCache: 按 (模型名, 文本) 哈希缓存向量的 LRU，重复标题无需再次编码
+- encode_texts: 请求内去重 + 查缓存 + 对未命中文本按批次编码，返回 L2 归一化向量
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SENTENCE_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
+DEFAULT_BATCH_SIZE = int(os.getenv("TA_EMBEDDING_BATCH_SIZE", "32"))
+DEFAULT_CACHE_SIZE = int(os.getenv("TA_EMBEDDING_CACHE_SIZE", "20000"))
+
+
+def _load_sentence_model(name: str) -> Any:
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(name, device="cpu")
+
+
+def _load_classifier(name: str) -> Tuple[Any, Any]:
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(name)
+    model = AutoModelForSequenceClassification.from_pretrained(name)
+    model.eval()
+    return tokenizer, model
+
+
+class ModelRegistry:
+    """按 (类型, 模型名) 懒加载并共享模型实例"""
+
+    def __init__(self, loaders: Optional[Dict[str, Callable[[str], Any]]] = None):
+        self._loaders: Dict[str, Callable[[str], Any]] = {
+            "sentence": _load_sentence_model,
+            "classifier": _load_classifier,
+        }
+        if loaders:
+            self._loaders.update(loaders)
+        self._models: Dict[Tuple[str, str], Any] = {}
+        self._failures: Dict[Tuple[str, str], BaseException] = {}
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.load_count = 0
+
+    def get(self, kind: str, name: str) -> Any:
+        """返回已加载的模型；首次调用时加载（加载失败抛出原始异常，之后直接重抛）"""
+        key = (kind, name)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key in self._models:
+                return self._models[key]
+            if key in self._failures:
+                raise self._failures[key]
+            logger.info(f"[模型注册表] 正在加载 {kind} 模型: {name}")
+            try:
+                model = self._loaders[kind](name)
+            except BaseException as e:
+                self._failures[key] = e
+                raise
+            self._models[key] = model
+            self.load_count += 1
+            logger.info(f"[模型注册表] ✅ 模型加载完成: {name}")
+            return model
+
+    def is_loaded(self, kind: str, name: str) -> bool:
+        return (kind, name) in self._models
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+            self._failures.clear()
+            self._locks.clear()
+
+
+class EmbeddingCache:
+    """(模型名, 文本) → 向量 的线程安全 LRU 缓存"""
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model_name: str, text: str) -> str:
+        return hashlib.sha1(f"{model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[np.ndarray]]:
+        result = []
+        with self._lock:
+            for key in keys:
+                vector = self._data.get(key)
+                if vector is None:
+                    self.misses += 1
+                else:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                result.append(vector)
+        return result
+
+    def put_many(self, items: Sequence[Tuple[str, np.ndarray]]) -> None:
+        with self._lock:
+            for key, vector in items:
+                self._data[key] = vector
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+
+_registry: Optional[ModelRegistry] = None
+_cache: Optional[EmbeddingCache] = None
+_singleton_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    global _registry
+    if _registry is None:
+        with _singleton_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _cache
+    if _cache is None:
+        with _singleton_lock:
+            if _cache is None:
+                _cache = EmbeddingCache()
+    return _cache
+
+
+def encode_texts(
+    texts: Sequence[str],
+    model_name: str = DEFAULT_SENTENCE_MODEL,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    registry: Optional[ModelRegistry] = None,
+    cache: Optional[EmbeddingCache] = None,
+) -> np.ndarray:
+    """
+    编码一组文本，返回 (len(texts), dim) 的 float32 L2 归一化向量
+
+    请求内重复文本只编码一次；已缓存的文本直接复用；其余按 batch_size 批量编码。
+    """
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    registry = registry if registry is not None else get_model_registry()
+    cache = cache if cache is not None else get_embedding_cache()
+
+    keys = [EmbeddingCache.key(model_name, text) for text in texts]
+    unique: Dict[str, str] = {}
+    for key, text in zip(keys, texts):
+        unique.setdefault(key, text)
+
+    unique_keys = list(unique)
+    cached = dict(zip(unique_keys, cache.get_many(unique_keys)))
+    missing = [key for key in unique_keys if cached[key] is None]
+    if missing:
+        model = registry.get("sentence", model_name)
+        encoded = np.asarray(
+            model.encode([unique[key] for key in missing], batch_size=batch_size, show_progress_bar=False),
+            dtype=np.float32,
+        )
+        norms = np.linalg.norm(encoded, axis=1, keepdims=True)
+        encoded = encoded / np.where(norms == 0, 1.0, norms)
+        new_items = list(zip(missing, encoded))
+        cache.put_many(new_items)
+        cached.update(new_items)
+
+    return np.stack([cached[key] for key in keys])
@@ -12,6 +12,7 @@ import numpy as np
 
 # 导入基础过滤器
 from .news_filter import NewsRelevanceFilter, create_news_filter, get_company_name
+from .embedding_registry import DEFAULT_SENTENCE_MODEL, encode_texts, get_model_registry
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +34,7 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
         self.use_local_model = use_local_model
         
         # 语义模型相关
+        self.semantic_model_name = DEFAULT_SENTENCE_MODEL
         self.sentence_model = None
         self.company_embedding = None
         
@@ -47,19 +49,17 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
             self._init_classification_model()
     
     def _init_semantic_model(self):
-        """初始化语义相似度模型"""
+        """初始化语义相似度模型（模型由共享注册表懒加载，进程内只加载一次）"""
         try:
             logger.info("[增强过滤器] 正在加载语义相似度模型...")
             
             # 尝试使用sentence-transformers
             try:
-                from sentence_transformers import SentenceTransformer
-                
                 # 使用轻量级中文模型
-                model_name = "paraphrase-multilingual-MiniLM-L12-v2"  # 支持中文的轻量级模型
-                self.sentence_model = SentenceTransformer(model_name)
+                model_name = self.semantic_model_name  # 支持中文的轻量级模型
+                self.sentence_model = get_model_registry().get("sentence", model_name)
                 
-                # 预计算公司相关的embedding
+                # 预计算公司相关的embedding（命中向量缓存时无需编码）
                 company_texts = [
                     self.company_name,
                     f"{self.company_name}股票",
@@ -69,8 +69,8 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
                     f"{self.company_name}财报"
                 ]
                 
-                self.company_embedding = self.sentence_model.encode(company_texts)
-                logger.info(f"[增强过滤器] ✅ 语义模型加载成功: {model_name}")
+                self.company_embedding = encode_texts(company_texts, model_name)
+                logger.info(f"[增强过滤器] ✅ 语义模型就绪: {model_name}")
                 
             except ImportError:
                 logger.warning("[增强过滤器] sentence-transformers未安装，跳过语义过滤")
@@ -81,22 +81,18 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
             self.use_semantic = False
     
     def _init_classification_model(self):
-        """初始化本地分类模型"""
+        """初始化本地分类模型（模型由共享注册表懒加载，进程内只加载一次）"""
         try:
             logger.info("[增强过滤器] 正在加载本地分类模型...")
             
             # 尝试使用transformers库的中文分类模型
             try:
-                from transformers import AutoTokenizer, AutoModelForSequenceClassification
-                import torch
-                
                 # 使用轻量级中文文本分类模型
                 model_name = "uer/roberta-base-finetuned-chinanews-chinese"
                 
-                self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-                self.classification_model = AutoModelForSequenceClassification.from_pretrained(model_name)
+                self.tokenizer, self.classification_model = get_model_registry().get("classifier", model_name)
                 
-                logger.info(f"[增强过滤器] ✅ 分类模型加载成功: {model_name}")
+                logger.info(f"[增强过滤器] ✅ 分类模型就绪: {model_name}")
                 
             except ImportError:
                 logger.warning("[增强过滤器] transformers未安装，跳过本地模型分类")
@@ -117,36 +113,39 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
         Returns:
             float: 语义相似度评分 (0-100)
         """
-        if not self.use_semantic or self.sentence_model is None:
-            return 0
+        return self.calculate_semantic_similarities([(title, content)])[0]
+    
+    def calculate_semantic_similarities(self, items: List[Tuple[str, str]]) -> List[float]:
+        """
+        批量计算语义相似度评分（一次请求内的所有新闻一起编码，重复标题复用缓存向量）
+        
+        Args:
+            items: [(新闻标题, 新闻内容)]
+            
+        Returns:
+            List[float]: 各条新闻的语义相似度评分 (0-100)
+        """
+        if not self.use_semantic or self.sentence_model is None or not items:
+            return [0] * len(items)
         
         try:
             # 组合标题和内容的前200字符
-            text = f"{title} {content[:200]}"
-            
-            # 计算文本embedding
-            text_embedding = self.sentence_model.encode([text])
+            texts = [f"{title} {content[:200]}" for title, content in items]
             
-            # 计算与公司相关文本的相似度
-            similarities = []
-            for company_emb in self.company_embedding:
-                similarity = np.dot(text_embedding[0], company_emb) / (
-                    np.linalg.norm(text_embedding[0]) * np.linalg.norm(company_emb)
-                )
-                similarities.append(similarity)
+            # 批量计算文本embedding（已L2归一化，点积即余弦相似度）
+            text_embeddings = encode_texts(texts, self.semantic_model_name)
             
-            # 取最高相似度
-            max_similarity = max(similarities)
+            # 与公司相关文本的相似度，取最高相似度
+            max_similarity = (text_embeddings @ self.company_embedding.T).max(axis=1)
             
             # 转换为0-100评分
-            semantic_score = max(0, min(100, max_similarity * 100))
-            
-            logger.debug(f"[增强过滤器] 语义相似度评分: {semantic_score:.1f}")
-            return semantic_score
+            scores = np.clip(max_similarity * 100, 0, 100).tolist()
+            logger.debug(f"[增强过滤器] 语义相似度评分: {len(scores)}条")
+            return scores
             
         except Exception as e:
             logger.error(f"[增强过滤器] 语义相似度计算失败: {e}")
-            return 0
+            return [0] * len(items)
     
     def classify_news_relevance(self, title: str, content: str) -> float:
         """
@@ -159,56 +158,71 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
         Returns:
             float: 分类相关性评分 (0-100)
         """
-        if not self.use_local_model or self.classification_model is None:
-            return 0
+        return self.classify_news_relevance_batch([(title, content)])[0]
+    
+    def classify_news_relevance_batch(self, items: List[Tuple[str, str]], batch_size: int = 16) -> List[float]:
+        """
+        批量使用本地模型分类新闻相关性
+        
+        Args:
+            items: [(新闻标题, 新闻内容)]
+            batch_size: 每批推理的条数
+            
+        Returns:
+            List[float]: 各条新闻的分类相关性评分 (0-100)
+        """
+        if not self.use_local_model or self.classification_model is None or not items:
+            return [0] * len(items)
         
         try:
             import torch
             
-            # 构建分类文本
-            text = f"{title} {content[:300]}"
+            # 构建分类文本，添加公司信息作为上下文
+            context_texts = [
+                f"关于{self.company_name}({self.stock_code})的新闻: {title} {content[:300]}"
+                for title, content in items
+            ]
             
-            # 添加公司信息作为上下文
-            context_text = f"关于{self.company_name}({self.stock_code})的新闻: {text}"
-            
-            # 分词和编码
-            inputs = self.tokenizer(
-                context_text,
-                return_tensors="pt",
-                truncation=True,
-                padding=True,
-                max_length=512
-            )
-            
-            # 模型推理
-            with torch.no_grad():
-                outputs = self.classification_model(**inputs)
-                logits = outputs.logits
-                
-                # 使用softmax获取概率分布
-                probabilities = torch.softmax(logits, dim=-1)
-                
-                # 假设第一个类别是"相关"，第二个是"不相关"
-                # 这里需要根据具体模型调整
-                relevance_prob = probabilities[0][0].item()  # 相关性概率
-                
-                # 转换为0-100评分
-                classification_score = relevance_prob * 100
+            scores: List[float] = []
+            for start in range(0, len(context_texts), batch_size):
+                # 分词和编码
+                inputs = self.tokenizer(
+                    context_texts[start:start + batch_size],
+                    return_tensors="pt",
+                    truncation=True,
+                    padding=True,
+                    max_length=512
+                )
                 
-                logger.debug(f"[增强过滤器] 分类模型评分: {classification_score:.1f}")
-                return classification_score
+                # 模型推理
+                with torch.no_grad():
+                    logits = self.classification_model(**inputs).logits
+                    
+                    # 使用softmax获取概率分布
+                    probabilities = torch.softmax(logits, dim=-1)
+                    
+                    # 假设第一个类别是"相关"，第二个是"不相关"
+                    # 这里需要根据具体模型调整；转换为0-100评分
+                    scores.extend((probabilities[:, 0] * 100).tolist())
+            
+            logger.debug(f"[增强过滤器] 分类模型评分: {len(scores)}条")
+            return scores
                 
         except Exception as e:
             logger.error(f"[增强过滤器] 本地模型分类失败: {e}")
-            return 0
+            return [0] * len(items)
     
-    def calculate_enhanced_relevance_score(self, title: str, content: str) -> Dict[str, float]:
+    def calculate_enhanced_relevance_score(self, title: str, content: str,
+                                           semantic_score: Optional[float] = None,
+                                           classification_score: Optional[float] = None) -> Dict[str, float]:
         """
         计算增强相关性评分（综合多种方法）
         
         Args:
             title: 新闻标题
             content: 新闻内容
+            semantic_score: 已批量计算的语义评分（为空时单独计算）
+            classification_score: 已批量计算的分类评分（为空时单独计算）
             
         Returns:
             Dict: 包含各种评分的字典
@@ -221,14 +235,16 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
         
         # 2. 语义相似度评分
         if self.use_semantic:
-            semantic_score = self.calculate_semantic_similarity(title, content)
+            if semantic_score is None:
+                semantic_score = self.calculate_semantic_similarity(title, content)
             scores['semantic_score'] = semantic_score
         else:
             scores['semantic_score'] = 0
         
         # 3. 本地模型分类评分
         if self.use_local_model:
-            classification_score = self.classify_news_relevance(title, content)
+            if classification_score is None:
+                classification_score = self.classify_news_relevance(title, content)
             scores['classification_score'] = classification_score
         else:
             scores['classification_score'] = 0
@@ -272,12 +288,18 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
         
         filtered_news = []
         
-        for idx, row in news_df.iterrows():
-            title = row.get('新闻标题', row.get('标题', ''))
-            content = row.get('新闻内容', row.get('内容', ''))
-            
+        rows = [row for _, row in news_df.iterrows()]
+        items = [(row.get('新闻标题', row.get('标题', '')), row.get('新闻内容', row.get('内容', ''))) for row in rows]
+        
+        # 模型评分对整批新闻一次性计算
+        semantic_scores = self.calculate_semantic_similarities(items) if self.use_semantic else [None] * len(items)
+        classification_scores = (self.classify_news_relevance_batch(items) if self.use_local_model
+                                 else [None] * len(items))
+        
+        for row, (title, content), semantic_score, classification_score in zip(
+                rows, items, semantic_scores, classification_scores):
             # 计算增强评分
-            scores = self.calculate_enhanced_relevance_score(title, content)
+            scores = self.calculate_enhanced_relevance_score(title, content, semantic_score, classification_score)
             
             if scores['final_score'] >= min_score:
                 row_dict = row.to_dict()
@@ -0,0 +1,78 @@
+"""
+包级别的按需导出
+
+数据源相关包（dataflows、providers、news 等）的 __init__ 原先在导入时就加载
+tushare、akshare、baostock、yfinance 等 SDK，导致启动 API、Worker 甚至 `cli/main.py --help`
+都要付出全部导入开销。这里用模块级 __getattr__（PEP 562）把公开名称改为首次访问时才导入，
+并保留原有的“新旧路径依次尝试、失败时为 None、附带 *_AVAILABLE 标记”语义。
+
+用法（在包的 __init__.py 中）::
+
+    __getattr__, __dir__ = lazy_exports(__name__, globals(), {
+        "TushareProvider": [(".tushare", "TushareProvider")],
+    }, flags={"TUSHARE_AVAILABLE": "TushareProvider"})
+"""
+from __future__ import annotations
+
+import importlib
+import logging
+from typing import Any, Callable, Dict, List, MutableMapping, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Candidates = Sequence[Tuple[str, str]]
+
+
+def lazy_exports(
+    package: str,
+    namespace: MutableMapping[str, Any],
+    exports: Dict[str, Candidates],
+    flags: Optional[Dict[str, str]] = None,
+    required: Sequence[str] = (),
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    生成包的 __getattr__ / __dir__
+
+    Args:
+        package: 包名（传 __name__），用于解析相对模块路径
+        namespace: 包的 globals()，加载结果会写回其中，后续访问不再经过 __getattr__
+        exports: 名称 -> 候选 (模块, 属性) 列表，按顺序尝试，全部导入失败时该名称为 None
+        flags: 可用性标记 -> 对应的导出名称，标记值为该名称是否加载成功；
+               若标记本身也在 exports 中，则优先使用其模块中定义的标记
+        required: 必需的名称，导入失败时直接抛出异常（与原先的顶层导入行为一致）
+
+    Returns:
+        (__getattr__, __dir__)
+    """
+    flags = flags or {}
+    required = frozenset(required)
+
+    def _load(name: str) -> Any:
+        error: Optional[BaseException] = None
+        for module_name, attr in exports[name]:
+            try:
+                return getattr(importlib.import_module(module_name, package), attr)
+            except (ImportError, AttributeError) as e:
+                if name in required:
+                    raise
+                error = e
+        if name in flags:
+            # 标记自身加载失败时，按对应名称是否可用推断
+            return __getattr__(flags[name]) is not None
+        logger.debug(f"{package}.{name} 不可用: {error}")
+        return None
+
+    def __getattr__(name: str) -> Any:
+        if name in exports:
+            value = _load(name)
+        elif name in flags:
+            value = __getattr__(flags[name]) is not None
+        else:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(exports) | set(flags))
+
+    return __getattr__, __dir__
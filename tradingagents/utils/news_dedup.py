@@ -0,0 +1,228 @@
+"""
+新闻近似重复检测（MinHash + LSH 分桶）
+
+转载稿件常常只在标点、来源后缀或个别词上不同，精确标题去重无法识别。
+这里把文本规范化后切成特征片段（中日韩文字用字符二元组，拉丁文字用相邻单词二元组），
+计算 MinHash 签名并按 band 分桶：桶内文档只与桶内最早的文档及前一个文档组成候选对，
+候选对数与文档数成线性，只有候选对才做精确 Jaccard 校验。
+
+- cluster_near_duplicates: 返回聚类（输入下标列表）
+- deduplicate_near_duplicates: 每个聚类保留一个代表（默认保留输入顺序中最早的一条）
+
+实时新闻聚合器、新闻同步 worker 与 alpha 的 SQLite NewsStore 共用此模块。
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+import zlib
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+
+# 中日韩文字（含日文假名、韩文）按字符处理，其余按字母数字单词处理
+_TOKEN_RE = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯]+|[a-z0-9]+")
+# 标题开头的来源标签，如 "【财联社】"、"[Reuters]"
+_LEADING_TAG_RE = re.compile(r"^\s*[【\[（(][^】\]）)]{1,12}[】\]）)]\s*")
+# 结尾的来源说明，如 "（来源：新浪财经）"
+_TRAILING_SOURCE_RE = re.compile(r"[（(]\s*(来源|source)\s*[:：][^）)]{0,20}[）)]\s*$", re.IGNORECASE)
+# 结尾的 " - Reuters"、"｜财联社"、"_东方财富网" 等短后缀
+_SUFFIX_SEPARATORS = re.compile(r"\s+[-–—|]\s+|[｜|_]")
+_MAX_SUFFIX_LEN = 16
+
+_PRIME = np.uint64(4294967291)  # 小于 2^32 的最大素数，保证 a*h+b 不溢出 uint64
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+def normalize_news_text(text: str) -> str:
+    """去掉来源标签/后缀，全角转半角、转小写"""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text).strip()
+    text = _LEADING_TAG_RE.sub("", text)
+    text = _TRAILING_SOURCE_RE.sub("", text)
+    parts = _SUFFIX_SEPARATORS.split(text)
+    if len(parts) > 1 and len(parts[-1].strip()) <= _MAX_SUFFIX_LEN and len(parts[-1]) < len(text) / 2:
+        text = text[: len(text) - len(parts[-1])]
+        text = _SUFFIX_SEPARATORS.sub(" ", text).strip()
+    return text.lower()
+
+
+def shingles(text: str) -> FrozenSet[str]:
+    """特征片段：中日韩文字为字符二元组，拉丁文字为相邻单词二元组（只有单字/单词时保留原样）"""
+    result = set()
+    words: List[str] = []
+    for token in _TOKEN_RE.findall(normalize_news_text(text)):
+        if token[0].isascii():
+            words.append(token)
+        elif len(token) == 1:
+            result.add(token)
+        else:
+            result.update(token[i:i + 2] for i in range(len(token) - 1))
+    if len(words) == 1:
+        result.add(words[0])
+    else:
+        result.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return frozenset(result)
+
+
+def _jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter)
+
+
+class NearDuplicateDetector:
+    """MinHash LSH 近似重复聚类器"""
+
+    def __init__(self, threshold: float = 0.5, num_perm: int = 64, bands: int = 16,
+                 seed: int = 20240601, chunk_size: int = 4096):
+        """
+        Args:
+            threshold: 判定为重复的 Jaccard 相似度下限
+            num_perm: MinHash 置换数量（必须能被 bands 整除）
+            bands: LSH band 数；num_perm/bands 行一组，S 曲线拐点约 (1/bands)^(bands/num_perm)
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm 必须能被 bands 整除")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.chunk_size = chunk_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_PRIME), size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), size=(num_perm, 1), dtype=np.uint64)
+        # band 内多行签名合并为一个 uint64 桶键（溢出回绕即可，候选还会精确校验）
+        self._band_mix = rng.integers(1, 2 ** 63, size=self.rows, dtype=np.uint64) | np.uint64(1)
+
+    def signatures(self, shingle_sets: Sequence[FrozenSet[str]]) -> np.ndarray:
+        """批量计算 MinHash 签名，返回 (文档数, num_perm)；空文档的签名全为最大值"""
+        n = len(shingle_sets)
+        sigs = np.full((n, self.num_perm), _MAX_HASH, dtype=np.uint64)
+        for start in range(0, n, self.chunk_size):
+            chunk = shingle_sets[start:start + self.chunk_size]
+            lengths = np.fromiter((len(s) for s in chunk), dtype=np.int64, count=len(chunk))
+            nonempty = np.flatnonzero(lengths)
+            if not len(nonempty):
+                continue
+            hashes = np.fromiter(
+                (zlib.crc32(s.encode("utf-8")) for i in nonempty for s in chunk[i]),
+                dtype=np.uint64, count=int(lengths.sum()),
+            )
+            permuted = (self._a * hashes + self._b) % _PRIME
+            offsets = np.concatenate(([0], np.cumsum(lengths[nonempty])[:-1]))
+            sigs[start + nonempty] = np.minimum.reduceat(permuted, offsets, axis=1).T
+        return sigs
+
+    def _band_keys(self, sigs: np.ndarray) -> np.ndarray:
+        """每个 band 的多行签名合并为一个 uint64 桶键，返回 (文档数, bands)"""
+        banded = sigs.reshape(len(sigs), self.bands, self.rows)
+        return (banded * self._band_mix).sum(axis=2, dtype=np.uint64)
+
+    def _candidate_pairs(self, keys: np.ndarray, valid: np.ndarray) -> np.ndarray:
+        """
+        同桶候选对：每个 band 内按桶键稳定排序，桶内每个文档只与桶内最早的文档及前一个文档配对，
+        候选数与文档数成线性（热门桶不会退化为平方复杂度）；多个 band 产生的重复候选合并
+        """
+        n = len(keys)
+        idx = np.flatnonzero(valid)
+        pairs = []
+        for band in range(self.bands):
+            band_keys = keys[idx, band]
+            order = np.argsort(band_keys, kind="stable")
+            sorted_keys = band_keys[order]
+            new_group = np.empty(len(order), dtype=bool)
+            new_group[:1] = True
+            new_group[1:] = sorted_keys[1:] != sorted_keys[:-1]
+            group_start = np.maximum.accumulate(np.where(new_group, np.arange(len(order)), 0))
+            members = ~new_group
+            if members.any():
+                other = idx[order[members]]
+                first = idx[order[group_start[members]]]
+                previous = idx[order[np.flatnonzero(members) - 1]]
+                pairs.append(first.astype(np.int64) * n + other)
+                pairs.append(previous.astype(np.int64) * n + other)
+        if not pairs:
+            return np.empty((0, 2), dtype=np.int64)
+        encoded = np.unique(np.concatenate(pairs))
+        return np.stack((encoded // n, encoded % n), axis=1)
+
+    def cluster(self, texts: Sequence[str]) -> List[List[int]]:
+        """返回近似重复聚类，每个聚类为按输入顺序排列的下标列表（聚类按首个成员排序）"""
+        sets = [shingles(t) for t in texts]
+        n = len(sets)
+        if n == 0:
+            return []
+        valid = np.fromiter((bool(s) for s in sets), dtype=bool, count=n)
+        candidates = self._candidate_pairs(self._band_keys(self.signatures(sets)), valid)
+
+        parent = list(range(n))
+
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        threshold = self.threshold
+        for i, j in candidates.tolist():
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j and _jaccard(sets[i], sets[j]) >= threshold:
+                # 以较早的文档为根，代表即聚类中的首条
+                if root_i < root_j:
+                    parent[root_j] = root_i
+                else:
+                    parent[root_i] = root_j
+
+        groups: Dict[int, List[int]] = {}
+        for i in range(n):
+            groups.setdefault(find(i), []).append(i)
+        return sorted(groups.values(), key=lambda g: g[0])
+
+
+_default_detector: Optional[NearDuplicateDetector] = None
+
+
+def get_near_duplicate_detector() -> NearDuplicateDetector:
+    """默认参数的共享检测器"""
+    global _default_detector
+    if _default_detector is None:
+        _default_detector = NearDuplicateDetector()
+    return _default_detector
+
+
+def cluster_near_duplicates(texts: Sequence[str], threshold: Optional[float] = None) -> List[List[int]]:
+    detector = get_near_duplicate_detector() if threshold is None else NearDuplicateDetector(threshold=threshold)
+    return detector.cluster(texts)
+
+
+def deduplicate_near_duplicates(
+    items: Sequence[T],
+    text_of: Callable[[T], str],
+    threshold: Optional[float] = None,
+    prefer: Optional[Callable[[T], object]] = None,
+) -> Tuple[List[T], List[List[T]]]:
+    """
+    每个近似重复聚类保留一个代表
+
+    Args:
+        items: 新闻条目（任意类型）
+        text_of: 取用于比较的文本（通常为标题）
+        prefer: 可选的代表选择键（取最大者）；默认保留聚类中输入顺序最早的一条
+
+    Returns:
+        (保持输入顺序的代表列表, 含多个成员的聚类列表)
+    """
+    clusters = cluster_near_duplicates([text_of(item) or "" for item in items], threshold)
+    keep = []
+    duplicates = []
+    for group in clusters:
+        rep = max(group, key=lambda i: prefer(items[i])) if prefer else group[0]
+        keep.append(rep)
+        if len(group) > 1:
+            duplicates.append([items[i] for i in group])
+    return [items[i] for i in sorted(keep)], duplicates
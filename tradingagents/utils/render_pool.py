@@ -0,0 +1,217 @@
+"""
+报告渲染线程池与导出缓存
+
+Word / PDF 导出每次都要启动 pandoc（或 wkhtmltopdf）子进程并写临时文件，同一份报告
+反复点击导出会重复这些开销。这里提供进程内共享的渲染池：
+
+- 有界并发：最多 workers 个渲染同时运行，另有 queue_size 个排队，超出时立即拒绝
+  （RenderQueueFull），不会让突发的导出请求堆积成一串子进程
+- 单任务超时：调用方最多等待 timeout 秒（RenderTimeout）；已开始的渲染会继续完成
+  并写入缓存，稍后重试可直接命中
+- 内容寻址缓存：键为 (命名空间, 目标格式, Markdown 内容) 的 SHA-256，内容不变的
+  报告再次导出直接返回；同一键正在渲染时，其他请求等待同一个结果
+- Web（Streamlit）与 API 下载共用 get_render_pool()，通过命名空间区分两者不同的渲染参数
+
+渲染函数接收 Markdown 文本并返回 bytes；抛出的异常原样传给调用方，不缓存。
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Optional
+
+from tradingagents.utils.logging_manager import get_logger
+
+logger = get_logger('agents')
+
+DEFAULT_WORKERS = int(os.getenv("TA_RENDER_WORKERS", "2"))
+DEFAULT_QUEUE_SIZE = int(os.getenv("TA_RENDER_QUEUE_SIZE", "8"))
+DEFAULT_TIMEOUT = float(os.getenv("TA_RENDER_TIMEOUT", "120"))
+DEFAULT_CACHE_MB = int(os.getenv("TA_RENDER_CACHE_MB", "64"))
+
+Renderer = Callable[[str], bytes]
+
+
+class RenderQueueFull(Exception):
+    """渲染队列已满"""
+
+
+class RenderTimeout(Exception):
+    """等待渲染结果超时"""
+
+
+def render_key(markdown: str, fmt: str, namespace: str = "") -> str:
+    """导出缓存键：命名空间 + 目标格式 + Markdown 内容的 SHA-256"""
+    h = hashlib.sha256()
+    h.update(f"{namespace}\0{fmt}\0".encode("utf-8"))
+    h.update(markdown.encode("utf-8"))
+    return h.hexdigest()
+
+
+class RenderCache:
+    """按总字节数限制的 LRU 缓存"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._items[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class RenderPool:
+    """有界渲染线程池 + 导出缓存"""
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        cache_bytes: int = DEFAULT_CACHE_MB * 1024 * 1024,
+    ):
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.timeout = timeout
+        self.cache = RenderCache(cache_bytes)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="report-render")
+        self._inflight: Dict[str, Future] = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "renders": 0, "coalesced": 0, "rejected": 0, "timeouts": 0, "errors": 0}
+
+    def submit(self, markdown: str, fmt: str, renderer: Renderer, namespace: str = "",
+               cache_key: Optional[str] = None) -> Future:
+        """
+        提交渲染任务：命中缓存返回已完成的 Future，相同内容正在渲染时返回同一个 Future
+
+        cache_key 为参与缓存键计算的内容，默认即 markdown；markdown 中含生成时间等
+        每次都不同的字段时，传入去掉这些字段的内容，相同报告才能命中缓存
+        """
+        key = render_key(markdown if cache_key is None else cache_key, fmt, namespace)
+        data = self.cache.get(key)
+        if data is not None:
+            self.stats["hits"] += 1
+            future: Future = Future()
+            future.set_result(data)
+            return future
+
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                return future
+            if self._pending >= self.workers + self.queue_size:
+                self.stats["rejected"] += 1
+                raise RenderQueueFull(
+                    f"报告导出繁忙：{self._pending} 个渲染任务正在处理或排队，请稍后重试"
+                )
+            self._pending += 1
+            self.stats["renders"] += 1
+            future = self._executor.submit(self._run, key, fmt, markdown, renderer)
+            self._inflight[key] = future
+        future.add_done_callback(lambda _f: self._finish(key))
+        return future
+
+    def _run(self, key: str, fmt: str, markdown: str, renderer: Renderer) -> bytes:
+        try:
+            data = renderer(markdown)
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        if not isinstance(data, (bytes, bytearray)):
+            raise TypeError(f"渲染函数应返回 bytes，实际为 {type(data).__name__}")
+        data = bytes(data)
+        self.cache.put(key, data)
+        logger.debug(f"🖨️ [渲染池] {fmt} 渲染完成: {key[:12]}，{len(data)} 字节")
+        return data
+
+    def _finish(self, key: str) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._pending -= 1
+
+    def render(self, markdown: str, fmt: str, renderer: Renderer, namespace: str = "",
+               timeout: Optional[float] = None, cache_key: Optional[str] = None) -> bytes:
+        """同步渲染（Streamlit 等同步调用方使用）"""
+        future = self.submit(markdown, fmt, renderer, namespace, cache_key)
+        wait = self.timeout if timeout is None else timeout
+        try:
+            return future.result(timeout=wait)
+        except FutureTimeoutError:
+            self.stats["timeouts"] += 1
+            raise RenderTimeout(f"{fmt} 渲染超过 {wait:g} 秒未完成，完成后再次导出将直接返回") from None
+
+    async def render_async(self, markdown: str, fmt: str, renderer: Renderer, namespace: str = "",
+                           timeout: Optional[float] = None, cache_key: Optional[str] = None) -> bytes:
+        """异步渲染：等待期间不阻塞事件循环"""
+        future = self.submit(markdown, fmt, renderer, namespace, cache_key)
+        if future.done():
+            return future.result()
+        wait = self.timeout if timeout is None else timeout
+        try:
+            # shield：超时只放弃等待，不取消其他请求共享的任务
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), wait)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise RenderTimeout(f"{fmt} 渲染超过 {wait:g} 秒未完成，完成后再次导出将直接返回") from None
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+_render_pool: Optional[RenderPool] = None
+_render_pool_lock = threading.Lock()
+
+
+def get_render_pool() -> RenderPool:
+    """进程内共享的渲染池"""
+    global _render_pool
+    if _render_pool is None:
+        with _render_pool_lock:
+            if _render_pool is None:
+                _render_pool = RenderPool()
+                logger.info(
+                    f"🖨️ [渲染池] 初始化: workers={_render_pool.workers}, queue={_render_pool.queue_size}, "
+                    f"timeout={_render_pool.timeout:g}s, cache={_render_pool.cache.max_bytes // (1024 * 1024)}MB"
+                )
+    return _render_pool
@@ -0,0 +1,234 @@
+"""
+请求合并（single-flight）
+
+同一时刻对同一 (操作, 股票, 参数) 的多次缓存未命中只触发一次上游调用，
+其余调用方等待并共享结果（或异常）。
+
+- SingleFlight：线程安全，用于同步取数路径
+- AsyncSingleFlight：按事件循环合并协程，用于 async 服务
+- 可选跨进程：TA_SINGLE_FLIGHT_REDIS=true 时，领头的调用方先获取 Redis 锁；
+  拿不到锁说明其他进程正在取同一份数据，等待锁释放后再执行（此时通常命中缓存）
+
+注意：所有等待者拿到的是同一个结果对象，被合并的函数应返回不会被调用方修改的值。
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from tradingagents.utils.logging_manager import get_logger
+
+logger = get_logger('agents')
+
+REDIS_LOCK_PREFIX = "tradingagents:singleflight:"
+DEFAULT_REDIS_LOCK_TTL = 30.0
+
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def make_flight_key(operation: str, *args, **kwargs) -> Tuple:
+    """由操作名和参数构造合并键（参数需可哈希，不可哈希的值按 repr 处理）"""
+    def _h(v):
+        try:
+            hash(v)
+            return v
+        except TypeError:
+            return repr(v)
+    return (operation, tuple(_h(a) for a in args), tuple(sorted((k, _h(v)) for k, v in kwargs.items())))
+
+
+def _redis_enabled() -> bool:
+    return os.getenv("TA_SINGLE_FLIGHT_REDIS", "false").lower() in ("1", "true", "yes", "on")
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class _RedisGate:
+    """跨进程互斥：拿到锁的进程执行，其余进程等锁释放后再执行"""
+
+    def __init__(self, client_getter: Optional[Callable[[], Any]], lock_ttl: float):
+        self._client_getter = client_getter
+        self.lock_ttl = lock_ttl
+
+    def _client(self):
+        if self._client_getter is not None:
+            return self._client_getter()
+        if not _redis_enabled():
+            return None
+        try:
+            from tradingagents.config.database_manager import get_redis_client
+            return get_redis_client()
+        except Exception:
+            return None
+
+    def run(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        client = self._client()
+        if client is None:
+            return fn()
+
+        redis_key = f"{REDIS_LOCK_PREFIX}{key!r}"
+        token = uuid.uuid4().hex
+        try:
+            acquired = client.set(redis_key, token, nx=True, px=int(self.lock_ttl * 1000))
+        except Exception as e:
+            logger.debug(f"single-flight Redis 锁不可用，直接执行: {e}")
+            return fn()
+
+        if not acquired:
+            # 其他进程正在执行相同请求：等待其完成（最多一个锁周期）
+            deadline = time.monotonic() + self.lock_ttl
+            while time.monotonic() < deadline:
+                try:
+                    if not client.exists(redis_key):
+                        break
+                except Exception:
+                    break
+                time.sleep(0.05)
+            return fn()
+
+        try:
+            return fn()
+        finally:
+            try:
+                client.eval(_RELEASE_SCRIPT, 1, redis_key, token)
+            except Exception as e:
+                logger.debug(f"释放 single-flight Redis 锁失败: {e}")
+
+
+class SingleFlight:
+    """线程安全的请求合并组"""
+
+    def __init__(self, name: str = "default", redis_client_getter: Optional[Callable[[], Any]] = None,
+                 redis_lock_ttl: float = DEFAULT_REDIS_LOCK_TTL):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._gate = _RedisGate(redis_client_getter, redis_lock_ttl)
+        self.stats = {"executions": 0, "coalesced": 0}
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """执行 fn(*args, **kwargs)；若相同 key 正在执行，则等待并返回其结果"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.stats["executions"] += 1
+            else:
+                call.waiters += 1
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._gate.run(key, lambda: fn(*args, **kwargs))
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            if call.waiters:
+                logger.debug(f"🔗 [single-flight:{self.name}] {key} 合并了 {call.waiters} 个并发请求")
+            call.event.set()
+
+
+class AsyncSingleFlight:
+    """协程版请求合并组（按事件循环隔离）"""
+
+    def __init__(self, name: str = "default", redis_client_getter: Optional[Callable[[], Any]] = None,
+                 redis_lock_ttl: float = DEFAULT_REDIS_LOCK_TTL):
+        self.name = name
+        self._calls: Dict[Tuple[int, Hashable], asyncio.Future] = {}
+        self._gate = _RedisGate(redis_client_getter, redis_lock_ttl)
+        self.stats = {"executions": 0, "coalesced": 0}
+
+    async def do(self, key: Hashable, coro_fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """await coro_fn(*args, **kwargs)；若相同 key 正在执行，则等待同一个结果"""
+        loop = asyncio.get_running_loop()
+        call_key = (id(loop), key)
+        future = self._calls.get(call_key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(future)
+
+        future = loop.create_task(self._run(key, coro_fn, args, kwargs))
+        self._calls[call_key] = future
+        future.add_done_callback(lambda _f: self._calls.pop(call_key, None))
+        return await asyncio.shield(future)
+
+    async def _run(self, key, coro_fn, args, kwargs):
+        self.stats["executions"] += 1
+        client = self._gate._client()
+        if client is None:
+            return await coro_fn(*args, **kwargs)
+
+        # 跨进程：锁的获取/等待放到线程中，避免阻塞事件循环
+        loop = asyncio.get_running_loop()
+        acquired = asyncio.Event()
+        done = threading.Event()
+
+        def _hold():
+            def _signal():
+                loop.call_soon_threadsafe(acquired.set)
+                done.wait(self._gate.lock_ttl)
+            self._gate.run(key, _signal)
+
+        holder = asyncio.ensure_future(asyncio.to_thread(_hold))
+        await acquired.wait()
+        try:
+            return await coro_fn(*args, **kwargs)
+        finally:
+            done.set()
+            await holder
+
+
+def single_flight(group: SingleFlight, operation: str, skip_self: bool = True):
+    """同步方法装饰器：按 (operation, 参数) 合并并发调用，默认不把 self 计入键"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key_args = args[1:] if skip_self else args
+            return group.do(make_flight_key(operation, *key_args, **kwargs), fn, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def async_single_flight(group: AsyncSingleFlight, operation: str, skip_self: bool = True):
+    """协程方法装饰器：按 (operation, 参数) 合并并发调用，默认不把 self 计入键"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            key_args = args[1:] if skip_self else args
+            return await group.do(make_flight_key(operation, *key_args, **kwargs), fn, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# 全局合并组（同步取数 / 异步服务）
+data_fetch_flight = SingleFlight("data_fetch")
+async_data_fetch_flight = AsyncSingleFlight("async_data_fetch")
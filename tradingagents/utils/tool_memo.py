@@ -0,0 +1,217 @@
+"""
+单次分析运行内的工具结果复用（run-scoped memo）
+
+一次 TradingAgentsGraph.propagate 中，市场/基本面/新闻/情绪分析师会以相同的
+股票代码和日期多次调用数据工具（基本面工具内部还会再取一次价格）。
+这里在运行期间按 (工具名, 规范化参数) 缓存结果：
+
+- propagate 开始时创建 ToolMemo 并通过 contextvars 激活，运行结束即丢弃（不跨运行）
+- 同一键正在计算时，其他调用方等待并复用结果（预取与分析师调用不会重复取数）
+- 抛出异常或以 "❌" 开头的错误结果不缓存
+- 可选预取：在第一个分析师运行前并发加载可预测的数据集
+- 统计命中次数与节省的耗时，写入 performance_metrics
+"""
+from __future__ import annotations
+
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from tradingagents.utils.logging_manager import get_logger
+
+logger = get_logger('agents')
+
+# 这些参数按股票代码处理（去空格、转大写）
+_SYMBOL_ARGS = {"ticker", "stock_code", "symbol"}
+
+_active_memo: contextvars.ContextVar[Optional["ToolMemo"]] = contextvars.ContextVar(
+    "tradingagents_tool_memo", default=None
+)
+
+
+def normalize_tool_args(fn: Callable, args: tuple, kwargs: dict) -> Tuple:
+    """按函数签名绑定参数（补全默认值），规范化字符串后生成可哈希的键"""
+    try:
+        bound = inspect.signature(fn).bind(*args, **kwargs)
+        bound.apply_defaults()
+        items = bound.arguments.items()
+    except (TypeError, ValueError):
+        items = list(enumerate(args)) + sorted(kwargs.items())
+
+    normalized = []
+    for name, value in items:
+        if isinstance(value, str):
+            value = value.strip()
+            if name in _SYMBOL_ARGS:
+                value = value.upper()
+        try:
+            hash(value)
+        except TypeError:
+            value = repr(value)
+        normalized.append((name, value))
+    return tuple(normalized)
+
+
+class _Entry:
+    __slots__ = ("event", "value", "elapsed", "ok")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.elapsed = 0.0
+        self.ok = False
+
+
+class ToolMemo:
+    """单次运行的工具结果缓存（线程安全）"""
+
+    def __init__(self, run_id: Optional[str] = None):
+        self.run_id = run_id
+        self._entries: Dict[Tuple[str, Hashable], _Entry] = {}
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Any] = {
+            "calls": 0,
+            "hits": 0,
+            "misses": 0,
+            "saved_seconds": 0.0,
+            "prefetched": 0,
+            "prefetch_seconds": 0.0,
+            "by_tool": {},
+        }
+
+    def _tool_stats(self, tool_name: str) -> Dict[str, Any]:
+        return self.stats["by_tool"].setdefault(tool_name, {"hits": 0, "misses": 0, "saved_seconds": 0.0})
+
+    def call(self, tool_name: str, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """返回缓存结果；未命中时执行 fn 并缓存"""
+        memo_key = (tool_name, key)
+        with self._lock:
+            self.stats["calls"] += 1
+            entry = self._entries.get(memo_key)
+            leader = entry is None
+            if leader:
+                entry = self._entries[memo_key] = _Entry()
+
+        if not leader:
+            wait_start = time.perf_counter()
+            entry.event.wait()
+            waited = time.perf_counter() - wait_start
+            if entry.ok:
+                saved = max(0.0, entry.elapsed - waited)
+                with self._lock:
+                    self.stats["hits"] += 1
+                    self.stats["saved_seconds"] += saved
+                    tool_stats = self._tool_stats(tool_name)
+                    tool_stats["hits"] += 1
+                    tool_stats["saved_seconds"] += saved
+                logger.debug(f"♻️ [工具复用] {tool_name} 命中，节省 {saved:.2f}秒")
+                return entry.value
+            # 上一次执行失败：重新执行（不缓存失败结果）
+            return self.call(tool_name, key, fn)
+
+        start = time.perf_counter()
+        try:
+            value = fn()
+        except BaseException:
+            with self._lock:
+                self._entries.pop(memo_key, None)
+            entry.event.set()
+            raise
+
+        entry.elapsed = time.perf_counter() - start
+        entry.value = value
+        entry.ok = not (isinstance(value, str) and value.lstrip().startswith("❌"))
+        with self._lock:
+            self.stats["misses"] += 1
+            self._tool_stats(tool_name)["misses"] += 1
+            if not entry.ok:
+                self._entries.pop(memo_key, None)
+        entry.event.set()
+        return value
+
+    def prefetch(self, jobs: List[Tuple[str, Callable, dict]], max_workers: int = 4) -> Dict[str, float]:
+        """
+        并发执行预取任务（任务本身应是已加 memoize_tool 的函数，结果自动进入缓存）
+
+        Args:
+            jobs: [(显示名, 函数, 关键字参数)]
+
+        Returns:
+            {显示名: 耗时秒数}，失败的任务耗时为 -1
+        """
+        if not jobs:
+            return {}
+        timings: Dict[str, float] = {}
+        start = time.perf_counter()
+
+        def _run(job):
+            name, fn, kwargs = job
+            job_start = time.perf_counter()
+            try:
+                with activate_tool_memo(self):
+                    fn(**kwargs)
+                return name, time.perf_counter() - job_start
+            except Exception as e:
+                logger.warning(f"⚠️ [数据预取] {name} 失败: {e}")
+                return name, -1.0
+
+        # 每个任务在当前上下文的副本中运行，并显式激活本 memo
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs))),
+                                thread_name_prefix="ta-prefetch") as pool:
+            futures = [pool.submit(contextvars.copy_context().run, _run, job) for job in jobs]
+            for future in futures:
+                name, elapsed = future.result()
+                timings[name] = elapsed
+
+        wall = time.perf_counter() - start
+        self.stats["prefetched"] += sum(1 for t in timings.values() if t >= 0)
+        self.stats["prefetch_seconds"] = round(self.stats["prefetch_seconds"] + wall, 3)
+        logger.info(f"🚀 [数据预取] 完成 {len(jobs)} 项，墙钟耗时 {wall:.2f}秒，"
+                    f"串行耗时 {sum(t for t in timings.values() if t > 0):.2f}秒")
+        return timings
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            result = dict(self.stats)
+            result["saved_seconds"] = round(result["saved_seconds"], 3)
+            result["by_tool"] = {
+                name: dict(s, saved_seconds=round(s["saved_seconds"], 3)) for name, s in self.stats["by_tool"].items()
+            }
+        return result
+
+
+def get_active_memo() -> Optional[ToolMemo]:
+    return _active_memo.get()
+
+
+@contextmanager
+def activate_tool_memo(memo: ToolMemo) -> Iterator[ToolMemo]:
+    """在当前上下文中激活 memo（LangGraph 节点与 ToolNode 线程会继承该上下文）"""
+    token = _active_memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _active_memo.reset(token)
+
+
+def memoize_tool(tool_name: str):
+    """
+    工具函数装饰器：存在活动 memo 时按 (tool_name, 规范化参数) 复用结果，否则直接调用
+
+    放在 @tool 之下，保持原函数签名与文档供 LangChain 生成工具描述。
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            memo = _active_memo.get()
+            if memo is None:
+                return fn(*args, **kwargs)
+            key = normalize_tool_args(fn, args, kwargs)
+            return memo.call(tool_name, key, lambda: fn(*args, **kwargs))
+        return wrapper
+    return decorator
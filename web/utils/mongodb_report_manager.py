@@ -190,6 +190,10 @@ class MongoDBReportManager:
                 "updated_at": timestamp
             }
 
+            # 检索词（报告列表按关键词搜索只匹配 search_terms）
+            from app.services.report_search_index import build_search_terms
+            document["search_terms"] = build_search_terms(document)
+
             # 插入文档
             result = self.collection.insert_one(document)
 
@@ -410,6 +414,10 @@ class MongoDBReportManager:
             # 添加保存时间戳
             report_data['saved_at'] = datetime.now()
 
+            # 整篇替换会覆盖已有检索词，按新内容重新生成
+            from app.services.report_search_index import build_search_terms
+            report_data['search_terms'] = build_search_terms(report_data)
+
             # 使用upsert操作，如果存在则更新，不存在则插入
             result = self.collection.replace_one(
                 {"analysis_id": report_data['analysis_id']},
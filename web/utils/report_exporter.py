@@ -16,8 +16,15 @@ import base64
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.render_pool import get_render_pool
 logger = get_logger('web')
 
+# 渲染缓存命名空间（与 API 下载的渲染参数不同，缓存不互通）
+RENDER_NAMESPACE = "web"
+
+# 生成时间占位符：缓存键按不含生成时间的报告内容计算，渲染前再填入实际时间
+_TIMESTAMP_SLOT = "\0TIMESTAMP\0"
+
 # 导入MongoDB报告管理器
 try:
     from web.utils.mongodb_report_manager import mongodb_report_manager
@@ -163,8 +170,8 @@ class ReportExporter:
 
         return content
 
-    def generate_markdown_report(self, results: Dict[str, Any]) -> str:
-        """生成Markdown格式的报告"""
+    def generate_markdown_report(self, results: Dict[str, Any], timestamp: Optional[str] = None) -> str:
+        """生成Markdown格式的报告（timestamp 默认为当前时间）"""
 
         stock_symbol = self._clean_text_for_markdown(results.get('stock_symbol', 'N/A'))
         decision = results.get('decision', {})
@@ -172,7 +179,8 @@ class ReportExporter:
         is_demo = results.get('is_demo', False)
         
         # 生成时间戳
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        if timestamp is None:
+            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
         # 清理关键数据
         action = self._clean_text_for_markdown(decision.get('action', 'N/A')).upper()
@@ -379,9 +387,17 @@ class ReportExporter:
 
         # 首先生成markdown内容
         logger.info("📝 生成Markdown内容...")
-        md_content = self.generate_markdown_report(results)
+        return self._render_with_pool(results, "docx", self._render_docx)
+
+    def _render_with_pool(self, results: Dict[str, Any], fmt: str, renderer) -> bytes:
+        """经共享渲染池转换；缓存键不含生成时间，同一份结果再次导出直接返回缓存"""
+        template = self.generate_markdown_report(results, timestamp=_TIMESTAMP_SLOT)
+        md_content = template.replace(_TIMESTAMP_SLOT, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
         logger.info(f"✅ Markdown内容生成完成，长度: {len(md_content)} 字符")
+        return get_render_pool().render(md_content, fmt, renderer, namespace=RENDER_NAMESPACE, cache_key=template)
 
+    def _render_docx(self, md_content: str) -> bytes:
+        """使用pypandoc将markdown转换为docx（在渲染池线程中执行）"""
         try:
             logger.info("📁 创建临时文件用于docx输出...")
             # 创建临时文件用于docx输出
@@ -453,9 +469,10 @@ class ReportExporter:
 
         # 首先生成markdown内容
         logger.info("📝 生成Markdown内容...")
-        md_content = self.generate_markdown_report(results)
-        logger.info(f"✅ Markdown内容生成完成，长度: {len(md_content)} 字符")
+        return self._render_with_pool(results, "pdf", self._render_pdf)
 
+    def _render_pdf(self, md_content: str) -> bytes:
+        """依次尝试各PDF引擎将markdown转换为PDF（在渲染池线程中执行）"""
         # 简化的PDF引擎列表，优先使用最可能成功的
         pdf_engines = [
             ('wkhtmltopdf', 'HTML转PDF引擎，推荐安装'),